@@ -0,0 +1,49 @@
+from django.core.mail import EmailMessage
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+
+from app_usuarios.correos import encolar_correo, procesar_bandeja
+from app_usuarios.models import Usuario, Rol, RolUsuario
+
+
+@override_settings(CORREOS_POR_MINUTO=0, CORREOS_CUOTA_DIARIA=0)
+class PruebasMetricasCorreo(TestCase):
+
+    def setUp(self):
+        self.client = Client()
+        self.superadmin = Usuario.objects.create_user(
+            username='super_metricas', email='super@metricas.com', password='test123', documento='901'
+        )
+        RolUsuario.objects.create(usuario=self.superadmin, rol=Rol.objects.create(nombre='superadmin'))
+        self.client.force_login(self.superadmin)
+        self.url = reverse('metricas_correo')
+
+    def test_muestra_envios_y_cola(self):
+        encolar_correo(EmailMessage(subject='Enviado', body='Hola', to=['ana@correo.com']))
+        procesar_bandeja()
+        encolar_correo(EmailMessage(subject='En cola', body='Hola', to=['eva@correo.com']))
+
+        response = self.client.get(self.url, {'dias': 30})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, 'metricas_correo.html')
+        resumen = response.context['resumen']
+        self.assertEqual(resumen['dias'], 30)
+        self.assertEqual(resumen['por_origen'][0]['enviados'], 1)
+        self.assertEqual(resumen['colas']['listos'], 1)
+        self.assertEqual(resumen['colas']['certificados_pendientes'], 0)
+        self.assertContains(response, 'Transaccional')
+
+    def test_periodo_invalido_usa_siete_dias(self):
+        response = self.client.get(self.url, {'dias': 'x'})
+        self.assertEqual(response.context['resumen']['dias'], 7)
+
+    def test_solo_superadmin(self):
+        otro = Usuario.objects.create_user(
+            username='otro_metricas', email='otro@metricas.com', password='test123', documento='902'
+        )
+        self.client.force_login(otro)
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 302)
@@ -2104,8 +2104,8 @@ class DetalleEventoAdminTestCase(TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response.context['estados'], ['Cerrado'])
     
-    @patch('app_admin.views.EmailMessage')
-    def test_post_cambiar_estado_pendiente_a_aprobado(self, mock_email):
+    @patch('app_admin.views.encolar_correo')
+    def test_post_cambiar_estado_pendiente_a_aprobado(self, mock_encolar):
         """Test POST: cambiar estado de pendiente a aprobado"""
         evento = self.crear_evento(estado='pendiente')
         url = reverse('detalle_evento_admin', args=[evento.eve_id])
@@ -2116,8 +2116,8 @@ class DetalleEventoAdminTestCase(TestCase):
         self.assertEqual(evento.eve_estado, 'aprobado')
         self.assertRedirects(response, reverse('dashboard_superadmin'))
         
-        # Verificar que se envió email
-        self.assertTrue(mock_email.called)
+        # Verificar que se encoló el email
+        self.assertTrue(mock_encolar.called)
     
     def test_post_cambiar_estado_inscripciones_cerradas_a_aprobado(self):
         """Test POST: aprobar desde inscripciones cerradas"""
@@ -2190,8 +2190,8 @@ class DetalleEventoAdminTestCase(TestCase):
         self.assertTrue(Evento.objects.filter(eve_id=evento.eve_id).exists())
         self.assertRedirects(response, url)
     
-    @patch('app_admin.views.EmailMessage')
-    def test_post_email_sin_administrador(self, mock_email):
+    @patch('app_admin.views.encolar_correo')
+    def test_post_email_sin_administrador(self, mock_encolar):
         """Test POST: cambio de estado sin administrador asignado"""
         evento = Evento.objects.create(
             eve_nombre='Evento Sin Admin',
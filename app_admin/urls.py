@@ -13,6 +13,7 @@ urlpatterns = [
     path('eliminar-administrador/<int:admin_id>/', views.eliminar_administrador, name='eliminar_administrador'),
     path('crear-area-categoria/', views.crear_area_categoria, name='crear_area_categoria'),
     path('crear-codigo-invitacion-admin/', views.crear_codigo_invitacion_admin, name='crear_codigo_invitacion_admin'),
+    path('metricas-correo/', views.metricas_correo, name='metricas_correo'),
     path('listar-codigos-invitacion-admin/', views.listar_codigos_invitacion_admin, name='listar_codigos_invitacion_admin'),
     path('accion-codigo-invitacion-admin/<str:codigo>/<str:accion>/', views.accion_codigo_invitacion_admin, name='accion_codigo_invitacion_admin'),
 ]
\ No newline at end of file
@@ -5,14 +5,18 @@ from app_eventos.models import Evento
 from app_areas.models import Categoria, Area
 from app_administradores.models import AdministradorEvento, CodigoInvitacionAdminEvento
 from django.core.mail import EmailMessage, send_mail
+from app_usuarios.correos import encolar_correo
+from app_usuarios.metricas_correo import resumen_metricas
+from app_administradores.certificados import envios_pendientes
 from django.utils import timezone
 import uuid
-from app_usuarios.models import Rol, RolUsuario
+from app_usuarios.models import RolUsuario
+from app_usuarios.catalogo_roles import id_rol
 from collections import defaultdict
 from django.contrib.auth.decorators import login_required, user_passes_test
 from app_usuarios.models import Usuario
 from app_usuarios.permisos import es_superadmin
-from django.template.loader import render_to_string
+from app_usuarios.plantillas_correo import renderizar_correo, contexto_evento
 from django.db import transaction
 from app_asistentes.models import Asistente, AsistenteEvento
 from app_participantes.models import Participante, ParticipanteEvento
@@ -61,7 +65,7 @@ def _eliminar_informacion_evento_cerrado(evento):
                 if not AsistenteEvento.objects.filter(asistente=asistente).exists():
                     usuario = asistente.usuario
                     # Eliminar rol de asistente
-                    RolUsuario.objects.filter(usuario=usuario, rol__nombre='asistente').delete()
+                    RolUsuario.objects.filter(usuario=usuario, rol_id=id_rol('asistente')).delete()
                     asistente.delete()
                     # Si el usuario no tiene más roles, eliminarlo
                     if not RolUsuario.objects.filter(usuario=usuario).exists():
@@ -82,7 +86,7 @@ def _eliminar_informacion_evento_cerrado(evento):
                 if not ParticipanteEvento.objects.filter(participante=participante).exists():
                     usuario = participante.usuario
                     # Eliminar rol de participante
-                    RolUsuario.objects.filter(usuario=usuario, rol__nombre='participante').delete()
+                    RolUsuario.objects.filter(usuario=usuario, rol_id=id_rol('participante')).delete()
                     participante.delete()
                     # Si el usuario no tiene más roles, eliminarlo
                     if not RolUsuario.objects.filter(usuario=usuario).exists():
@@ -103,7 +107,7 @@ def _eliminar_informacion_evento_cerrado(evento):
                 if not EvaluadorEvento.objects.filter(evaluador=evaluador).exists():
                     usuario = evaluador.usuario
                     # Eliminar rol de evaluador
-                    RolUsuario.objects.filter(usuario=usuario, rol__nombre='evaluador').delete()
+                    RolUsuario.objects.filter(usuario=usuario, rol_id=id_rol('evaluador')).delete()
                     evaluador.delete()
                     # Si el usuario no tiene más roles, eliminarlo
                     if not RolUsuario.objects.filter(usuario=usuario).exists():
@@ -130,7 +134,7 @@ def _eliminar_informacion_evento_cerrado(evento):
                     codigos_admin.delete()
                     
                     # Eliminar rol de administrador
-                    RolUsuario.objects.filter(usuario=usuario_admin, rol__nombre='administrador_evento').delete()
+                    RolUsuario.objects.filter(usuario=usuario_admin, rol_id=id_rol('administrador_evento')).delete()
                     
                     # Eliminar el registro AdministradorEvento
                     administrador.delete()
@@ -275,11 +279,8 @@ def crear_codigo_invitacion_admin(request):
         """
         email = EmailMessage(asunto, mensaje, to=[email_destino])
         email.content_subtype = 'html'
-        try:
-            email.send()
-            messages.success(request, 'Código de invitación generado y enviado exitosamente.')
-        except Exception as e:
-            messages.error(request, f'Error al enviar el correo: {e}')
+        encolar_correo(email)
+        messages.success(request, 'Código de invitación generado y enviado exitosamente.')
         return redirect('crear_codigo_invitacion_admin')
     return render(request, 'crear_codigo_invitacion_admin.html')
 
@@ -339,18 +340,18 @@ def detalle_evento_admin(request, eve_id):
         admin_evento = evento.eve_administrador_fk
         admin_usuario = admin_evento.usuario if admin_evento else None
         if admin_usuario and admin_usuario.email:
-            cuerpo_html = render_to_string('correo_estado_evento_admin.html', {
-                'evento': evento,
-                'nuevo_estado': nuevo_estado,
-                'admin': admin_usuario,
-            })
+            cuerpo_html = renderizar_correo(
+                'correo_estado_evento_admin.html',
+                {'evento': contexto_evento(evento), 'nuevo_estado': nuevo_estado},
+                nombre=admin_usuario.get_full_name() or admin_usuario.email,
+            )
             email = EmailMessage(
                 subject=f'Actualización de estado de tu evento: {evento.eve_nombre}',
                 body=cuerpo_html,
                 to=[admin_usuario.email],
             )
             email.content_subtype = 'html'
-            email.send(fail_silently=True)
+            encolar_correo(email)
 
         messages.success(request, 'Estado actualizado exitosamente')
         return redirect('dashboard_superadmin')
@@ -523,6 +524,22 @@ def crear_area_categoria(request):
         'mensaje_categoria': mensaje_categoria
     })
 
+@login_required
+@user_passes_test(es_superadmin, login_url='ver_eventos')
+def metricas_correo(request):
+    """Tiempos, resultados y errores del envío de correos, y estado de las colas"""
+    periodos = [1, 7, 30]
+    try:
+        dias = int(request.GET.get('dias', 7))
+    except ValueError:
+        dias = 7
+    if dias not in periodos:
+        dias = 7
+    return render(request, 'metricas_correo.html', {
+        'resumen': resumen_metricas(dias, certificados_pendientes=envios_pendientes()),
+        'periodos': periodos,
+    })
+
 @login_required
 @user_passes_test(es_superadmin, login_url='ver_eventos')
 def listar_codigos_invitacion_admin(request):
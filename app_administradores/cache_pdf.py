@@ -0,0 +1,105 @@
+"""
+Caché en disco de los PDF de certificados, direccionada por contenido.
+
+Cada archivo se guarda en MEDIA_ROOT/certificados/cache/ con el hash de lo
+que determina el PDF (configuración, plantilla y datos del destinatario). Si
+la configuración cambia, el hash cambia y la entrada vieja deja de usarse
+hasta que la poda la elimina. La fecha de modificación del archivo registra
+el último uso, así que la poda elimina primero lo que lleva más tiempo sin leerse.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import time
+
+from django.conf import settings
+
+DIRECTORIO_CACHE = os.path.join('certificados', 'cache')
+
+
+def directorio_cache():
+    return os.path.join(settings.MEDIA_ROOT, DIRECTORIO_CACHE)
+
+
+def clave_pdf(*partes):
+    """Hash estable de las partes (cadenas, números, diccionarios) que definen un PDF"""
+    contenido = json.dumps(partes, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(contenido.encode('utf-8')).hexdigest()
+
+
+def ruta_pdf(clave):
+    # Un subdirectorio por prefijo evita directorios con miles de archivos
+    return os.path.join(directorio_cache(), clave[:2], f'{clave}.pdf')
+
+
+def leer_pdf(clave):
+    """Contenido en caché o None; la lectura cuenta como uso para la poda"""
+    ruta = ruta_pdf(clave)
+    try:
+        with open(ruta, 'rb') as archivo:
+            contenido = archivo.read()
+        os.utime(ruta)
+    except OSError:
+        return None
+    return contenido
+
+
+def existe_pdf(clave):
+    return os.path.exists(ruta_pdf(clave))
+
+
+def guardar_pdf(clave, contenido):
+    """Escritura atómica: un lector nunca ve un PDF a medio escribir"""
+    ruta = ruta_pdf(clave)
+    os.makedirs(os.path.dirname(ruta), exist_ok=True)
+    descriptor, temporal = tempfile.mkstemp(dir=os.path.dirname(ruta), suffix='.tmp')
+    try:
+        with os.fdopen(descriptor, 'wb') as archivo:
+            archivo.write(contenido)
+        os.replace(temporal, ruta)
+    except OSError:
+        if os.path.exists(temporal):
+            os.remove(temporal)
+        raise
+
+
+def tamano_maximo():
+    return getattr(settings, 'CERTIFICADOS_CACHE_MAX_MB', 500) * 1024 * 1024
+
+
+def podar_cache(max_bytes=None, dias=None):
+    """
+    Elimina las entradas sin uso en los últimos `dias` y, si la caché supera
+    max_bytes, las menos usadas recientemente hasta quedar en el 90 % del límite.
+    Devuelve (archivos eliminados, bytes liberados).
+    """
+    if max_bytes is None:
+        max_bytes = tamano_maximo()
+    limite_uso = time.time() - dias * 86400 if dias else None
+
+    entradas = []
+    for raiz, _, archivos in os.walk(directorio_cache()):
+        for nombre in archivos:
+            ruta = os.path.join(raiz, nombre)
+            try:
+                estado = os.stat(ruta)
+            except OSError:
+                continue
+            entradas.append((estado.st_mtime, estado.st_size, ruta))
+
+    entradas.sort()
+    total = sum(tamano for _, tamano, _ in entradas)
+    objetivo = max_bytes * 0.9 if total > max_bytes else total
+    eliminados = liberados = 0
+    for usado, tamano, ruta in entradas:
+        vencido = limite_uso is not None and usado < limite_uso
+        if not vencido and total - liberados <= objetivo:
+            continue
+        try:
+            os.remove(ruta)
+        except OSError:
+            continue
+        eliminados += 1
+        liberados += tamano
+    return eliminados, liberados
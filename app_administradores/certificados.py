@@ -0,0 +1,648 @@
+import base64
+import hashlib
+import logging
+import mimetypes
+import os
+import zipfile
+from collections import deque, namedtuple
+from datetime import timedelta
+from functools import lru_cache
+from urllib.parse import urljoin
+from io import BytesIO
+
+from PIL import Image
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.http import HttpResponse, HttpResponseNotModified
+from django.template.loader import get_template
+from django.urls import reverse
+from django.utils.cache import patch_cache_control
+from django.utils import timezone
+
+from app_asistentes.models import AsistenteEvento
+from app_evaluadores.models import EvaluadorEvento
+from app_evaluadores.ranking import ranking_evento
+from app_eventos.models import ConfiguracionCertificado
+from app_participantes.models import ParticipanteEvento
+from app_usuarios.correos import reabrir_conexion
+from app_usuarios.limite_correos import devolver_envio, reservar_envio
+from app_usuarios.metricas_correo import Cronometro, registrar_envio
+from .models import TrabajoCertificados, EnvioCertificado
+from .cache_pdf import clave_pdf, existe_pdf, guardar_pdf, leer_pdf
+from .pdf_pool import iterar_pdfs
+from .plantillas import PLANTILLA_CERTIFICADO, PlantillaCertificado
+
+logger = logging.getLogger(__name__)
+
+# Relación de cada inscripción con el perfil que tiene el usuario, por tipo de certificado
+RELACION_USUARIO = {
+    'asistencia': 'asistente',
+    'participacion': 'participante',
+    'evaluador': 'evaluador',
+}
+# Resultado de procesar_lote: envíos procesados y segundos de espera si el límite de correo lo frenó
+Lote = namedtuple('Lote', ['procesados', 'espera'])
+# Reintentos de un envío antes de marcarlo como error definitivo
+MAX_INTENTOS = 3
+# Espera tras el primer fallo; se duplica en cada intento siguiente
+ESPERA_REINTENTO = timedelta(minutes=1)
+# Un envío que lleva más de esto en 'procesando' se considera abandonado por un worker caído
+TIEMPO_MAXIMO_PROCESANDO = timedelta(minutes=15)
+# Lado máximo en píxeles del logo y la firma incrustados en el PDF
+IMAGEN_MAX_LADO = 800
+TIEMPO_CACHE_IMAGENES = 60 * 60 * 24
+
+
+def imagen_to_base64(imagen_field):
+    """Convierte un campo de imagen de Django a base64 para usar en PDFs"""
+    if imagen_field and hasattr(imagen_field, 'path'):
+        try:
+            with open(imagen_field.path, 'rb') as image_file:
+                encoded_string = base64.b64encode(image_file.read()).decode('utf-8')
+                # Detectar el formato de la imagen
+                mime_type, _ = mimetypes.guess_type(imagen_field.path)
+                if mime_type:
+                    format_name = mime_type.split('/')[1]
+                else:
+                    # Fallback basado en la extensión
+                    ext = os.path.splitext(imagen_field.path)[1].lower()
+                    if ext in ['.jpg', '.jpeg']:
+                        format_name = 'jpeg'
+                    elif ext == '.png':
+                        format_name = 'png'
+                    elif ext == '.gif':
+                        format_name = 'gif'
+                    else:
+                        format_name = 'jpeg'  # default
+
+                return encoded_string, format_name
+        except Exception as e:
+            print(f"Error al convertir imagen a base64: {e}")
+            return None, None
+    return None, None
+
+
+def datos_certificado(evento, usuario, **extra):
+    """Valores de los marcadores **CLAVE** del cuerpo del certificado"""
+    datos = {
+        'NOMBRE': f'{usuario.first_name} {usuario.last_name}',
+        'DOCUMENTO': usuario.documento,
+        'EVENTO': evento.eve_nombre,
+        'FECHA': evento.eve_fecha_inicio.strftime('%d de %B de %Y'),
+        'CIUDAD': evento.eve_ciudad,
+        'LUGAR': evento.eve_lugar,
+    }
+    datos.update(extra)
+    return datos
+
+
+def inscripciones_certificables(evento, tipo):
+    """Inscripciones aprobadas y confirmadas que pueden recibir el certificado de tipo"""
+    if tipo == 'asistencia':
+        return AsistenteEvento.objects.filter(
+            evento=evento,
+            confirmado=True,
+            asi_eve_estado='Aprobado'
+        ).select_related('asistente__usuario')
+    if tipo == 'participacion':
+        return ParticipanteEvento.objects.filter(
+            evento=evento,
+            confirmado=True,
+            par_eve_estado='Aprobado'
+        ).select_related('participante__usuario')
+    if tipo == 'evaluador':
+        return EvaluadorEvento.objects.filter(
+            evento=evento,
+            confirmado=True,
+            eva_eve_estado='Aprobado'
+        ).select_related('evaluador__usuario')
+    return None
+
+
+def destinatarios_certificado(evento, tipo):
+    """(usuario, datos) de todos los que reciben el certificado de tipo en el evento"""
+    if tipo == 'premiacion':
+        return [
+            (posicion['participante'].usuario, datos_certificado(
+                evento, posicion['participante'].usuario,
+                PUESTO=f"{posicion['puesto']}°",
+                PUNTUACION=str(posicion['participante_evento'].par_eve_valor)
+            ))
+            for posicion in ranking_evento(evento, solo_calificados=True, solo_confirmados=True, con_proyectos=False)
+        ]
+    inscripciones = inscripciones_certificables(evento, tipo)
+    if inscripciones is None:
+        return []
+    destinatarios = []
+    for inscripcion in inscripciones.order_by('id'):
+        usuario = getattr(inscripcion, RELACION_USUARIO[tipo]).usuario
+        destinatarios.append((usuario, datos_certificado(evento, usuario)))
+    return destinatarios
+
+
+def renderizar_certificado(configuracion, datos, imagenes=None):
+    """
+    HTML del certificado de un destinatario. Para varios destinatarios conviene
+    compilar una PlantillaCertificado y reutilizarla.
+    """
+    if imagenes is None:
+        imagenes = imagenes_certificado(configuracion)
+    return PlantillaCertificado(configuracion, imagenes).renderizar(datos)
+
+
+def imagenes_certificado(configuracion):
+    """Logo y firma de la configuración en base64: (logo, formato, firma, formato)"""
+    return imagen_certificado(configuracion, 'logo') + imagen_certificado(configuracion, 'firma')
+
+
+def _clave_imagen(configuracion, campo):
+    imagen_field = getattr(configuracion, campo)
+    if not imagen_field:
+        return None
+    try:
+        modificado = os.path.getmtime(imagen_field.path)
+    except (OSError, NotImplementedError, ValueError):
+        return None
+    # El nombre y la fecha de modificación cambian al subir un archivo nuevo
+    return f'certificado_imagen:{configuracion.pk}:{campo}:{imagen_field.name}:{modificado}'
+
+
+def imagen_certificado(configuracion, campo):
+    """
+    Versión en caché de imagen_to_base64 para el logo o la firma de una
+    configuración: el archivo se lee, se reduce y se codifica una sola vez.
+    """
+    clave = _clave_imagen(configuracion, campo)
+    if clave is None:
+        return imagen_to_base64(getattr(configuracion, campo))
+    imagen = cache.get(clave)
+    if imagen is None:
+        imagen = optimizar_imagen(getattr(configuracion, campo))
+        cache.set(clave, imagen, TIEMPO_CACHE_IMAGENES)
+    return imagen
+
+
+def optimizar_imagen(imagen_field):
+    """
+    Base64 de una copia reducida de la imagen; el certificado nunca la muestra
+    a más de IMAGEN_MAX_LADO píxeles, así que no tiene sentido incrustar el original.
+    """
+    try:
+        with Image.open(imagen_field.path) as imagen:
+            formato = (imagen.format or 'PNG').upper()
+            if max(imagen.size) <= IMAGEN_MAX_LADO or formato not in ('PNG', 'JPEG'):
+                return imagen_to_base64(imagen_field)
+            imagen.thumbnail((IMAGEN_MAX_LADO, IMAGEN_MAX_LADO))
+            salida = BytesIO()
+            if formato == 'JPEG':
+                imagen.convert('RGB').save(salida, 'JPEG', quality=85, optimize=True)
+            else:
+                imagen.save(salida, 'PNG', optimize=True)
+    except Exception:
+        logger.warning('No se pudo optimizar la imagen del certificado %s', imagen_field.name, exc_info=True)
+        return imagen_to_base64(imagen_field)
+    return base64.b64encode(salida.getvalue()).decode('utf-8'), formato.lower()
+
+
+def invalidar_imagenes_certificado(configuracion):
+    """Descarta del caché el logo y la firma actuales antes de reemplazarlos"""
+    claves = [_clave_imagen(configuracion, campo) for campo in ('logo', 'firma')]
+    cache.delete_many([clave for clave in claves if clave])
+
+
+@lru_cache(maxsize=None)
+def huella_plantilla(nombre=PLANTILLA_CERTIFICADO):
+    """Hash del código de la plantilla; cambia solo con un despliegue, por eso se memoriza"""
+    return hashlib.sha256(get_template(nombre).template.source.encode('utf-8')).hexdigest()
+
+
+def huella_configuracion(configuracion):
+    """Versión de la configuración: cambia al editar el texto, la plantilla o las imágenes"""
+    return clave_pdf(
+        configuracion.pk,
+        configuracion.tipo,
+        configuracion.plantilla,
+        configuracion.titulo,
+        configuracion.cuerpo,
+        _clave_imagen(configuracion, 'logo'),
+        _clave_imagen(configuracion, 'firma'),
+    )
+
+
+def version_certificado(configuracion):
+    return (huella_plantilla(), huella_configuracion(configuracion))
+
+
+def clave_certificado(configuracion, datos):
+    """Clave en la caché de disco del PDF de un destinatario"""
+    return clave_pdf(version_certificado(configuracion), datos)
+
+
+def iterar_certificados(configuracion, lista_datos, base_url='', procesos=1):
+    """
+    PDF de cada destinatario de lista_datos en el mismo orden. Los que ya están
+    en la caché de disco se leen; el resto se renderiza en el pool y se guarda.
+    Es perezoso: solo avanza lo necesario para entregar el siguiente PDF, así
+    que sirve tanto para envíos como para exportaciones de miles de certificados.
+    Cada resultado es el contenido del PDF o la excepción que lo impidió.
+    """
+    version = version_certificado(configuracion)
+    plantilla = None
+    orden = deque()   # (clave, en_cache, datos) en el orden de entrada
+    listos = deque()  # PDF renderizados aún no entregados
+
+    def compilar():
+        nonlocal plantilla
+        if plantilla is None:
+            plantilla = PlantillaCertificado(configuracion, imagenes_certificado(configuracion))
+        return plantilla
+
+    def faltantes():
+        for datos in lista_datos:
+            clave = clave_pdf(version, datos)
+            en_cache = existe_pdf(clave)
+            orden.append((clave, en_cache, datos))
+            if not en_cache:
+                yield compilar().renderizar(datos), base_url
+
+    pdfs = iterar_pdfs(faltantes(), procesos)
+    agotado = False
+    while True:
+        if not orden and not agotado:
+            # Avanza el recorrido hasta el siguiente PDF a renderizar (o el final)
+            try:
+                listos.append(next(pdfs))
+            except StopIteration:
+                agotado = True
+        if not orden:
+            break
+        clave, en_cache, datos = orden.popleft()
+        contenido = leer_pdf(clave) if en_cache else None
+        if contenido is None:
+            if en_cache:
+                # Se podó entre la consulta y la lectura
+                contenido = next(iterar_pdfs([(compilar().renderizar(datos), base_url)]))
+            else:
+                contenido = listos.popleft() if listos else next(pdfs)
+            if not isinstance(contenido, Exception):
+                guardar_pdf(clave, contenido)
+        yield contenido
+
+
+class _SalidaZip:
+    """Archivo de solo escritura donde zipfile deja los bytes hasta que se entregan"""
+
+    def __init__(self):
+        self.partes = []
+
+    def write(self, datos):
+        self.partes.append(bytes(datos))
+        return len(datos)
+
+    def flush(self):
+        pass
+
+    def vaciar(self):
+        contenido = b''.join(self.partes)
+        self.partes = []
+        return contenido
+
+
+def zip_certificados(evento, tipo, configuracion, base_url='', procesos=1):
+    """
+    Genera un ZIP con el certificado de cada destinatario, entregado por partes:
+    cada PDF se agrega y se entrega apenas está listo, así que la memoria no
+    depende del número de certificados. Los que no se pudieron generar se listan
+    en errores.txt al final del archivo.
+    """
+    destinatarios = destinatarios_certificado(evento, tipo)
+    salida = _SalidaZip()
+    nombres = set()
+    errores = []
+    # Los PDF ya vienen comprimidos: ZIP_STORED evita gastar CPU sin ganar espacio
+    with zipfile.ZipFile(salida, mode='w', compression=zipfile.ZIP_STORED) as archivo_zip:
+        pdfs = iterar_certificados(configuracion, [datos for _, datos in destinatarios], base_url, procesos)
+        for (usuario, datos), pdf_file in zip(destinatarios, pdfs):
+            if isinstance(pdf_file, Exception):
+                errores.append(f'{datos["NOMBRE"]} <{usuario.email}>: {pdf_file}')
+                continue
+            nombre = mensaje_certificado(evento, tipo, datos)[2]
+            if nombre in nombres:
+                nombre = f'{nombre[:-4]}_{usuario.pk}.pdf'
+            nombres.add(nombre)
+            archivo_zip.writestr(nombre, pdf_file)
+            yield salida.vaciar()
+        if errores:
+            archivo_zip.writestr('errores.txt', '\n'.join(errores))
+    yield salida.vaciar()
+
+
+def eventos_con_certificado(eventos, tipo, usuario=None):
+    """
+    Ids de los eventos cuyo certificado de tipo ya se puede descargar: tiene
+    configuración y el evento terminó o el administrador ya emitió ese tipo.
+    Los de premiación solo los elige el administrador, así que únicamente están
+    disponibles para el usuario si se le emitió uno.
+    """
+    ids = [evento.pk for evento in eventos]
+    configurados = set(
+        ConfiguracionCertificado.objects.filter(evento_id__in=ids, tipo=tipo).values_list('evento_id', flat=True)
+    )
+    if tipo == 'premiacion':
+        if usuario is None:
+            return set()
+        return configurados & set(
+            EnvioCertificado.objects.filter(
+                trabajo__evento_id__in=ids, trabajo__tipo=tipo, usuario=usuario
+            ).values_list('trabajo__evento_id', flat=True)
+        )
+    emitidos = set(
+        TrabajoCertificados.objects.filter(evento_id__in=ids, tipo=tipo).values_list('evento_id', flat=True)
+    )
+    hoy = timezone.localdate()
+    return {
+        evento.pk for evento in eventos
+        if evento.pk in configurados and (evento.pk in emitidos or evento.eve_fecha_fin < hoy)
+    }
+
+
+def datos_certificado_usuario(evento, tipo, usuario):
+    """Datos del certificado de tipo que le corresponde al usuario, o None si no tiene uno disponible"""
+    if tipo == 'premiacion':
+        if evento.pk not in eventos_con_certificado([evento], tipo, usuario):
+            return None
+        # Los mismos datos (puesto, puntuación) con los que el administrador lo emitió
+        return EnvioCertificado.objects.filter(
+            trabajo__evento=evento, trabajo__tipo=tipo, usuario=usuario
+        ).order_by('-id').values_list('datos', flat=True).first()
+    if evento.pk not in eventos_con_certificado([evento], tipo):
+        return None
+    inscripciones = inscripciones_certificables(evento, tipo)
+    if inscripciones is None or not inscripciones.filter(**{f'{RELACION_USUARIO[tipo]}__usuario': usuario}).exists():
+        return None
+    return datos_certificado(evento, usuario)
+
+
+def respuesta_certificado(request, evento, tipo, usuario):
+    """
+    Descarga del certificado propio. El PDF se genera en la primera petición y
+    luego sale de la caché de disco; el ETag (hash del contenido) permite al
+    navegador reutilizar su copia. None si el usuario no tiene certificado disponible.
+    """
+    datos = datos_certificado_usuario(evento, tipo, usuario)
+    if datos is None:
+        return None
+    configuracion = ConfiguracionCertificado.objects.get(evento=evento, tipo=tipo)
+
+    etag = f'"{clave_certificado(configuracion, datos)}"'
+    if etag in request.headers.get('If-None-Match', ''):
+        response = HttpResponseNotModified()
+    else:
+        pdf_file = next(iterar_certificados(configuracion, [datos], request.build_absolute_uri('/')))
+        if isinstance(pdf_file, Exception):
+            raise pdf_file
+        response = HttpResponse(pdf_file, content_type='application/pdf')
+        response['Content-Disposition'] = f'attachment; filename="{mensaje_certificado(evento, tipo, datos)[2]}"'
+    response['ETag'] = etag
+    patch_cache_control(response, private=True, max_age=60 * 60 * 24)
+    return response
+
+
+def envios_pendientes():
+    """Certificados encolados que aún no se han enviado (para el panel de métricas de correo)"""
+    return EnvioCertificado.objects.filter(estado__in=['pendiente', 'procesando']).count()
+
+
+def procesos_pdf():
+    """Procesos del comando procesar_certificados para renderizar PDFs; 1 renderiza en el propio proceso"""
+    return max(1, getattr(settings, 'CERTIFICADOS_PROCESOS_PDF', 1))
+
+
+def mensaje_certificado(evento, tipo, datos):
+    """Asunto, cuerpo y nombre del adjunto del correo que acompaña al certificado"""
+    if tipo == 'premiacion':
+        asunto = f'Certificado de Premiación - {evento.eve_nombre}'
+        cuerpo = (
+            f'Estimado/a {datos["NOMBRE"]},\n\n¡Felicitaciones! Adjuntamos su certificado de premiación '
+            f'del evento "{evento.eve_nombre}" donde obtuvo el {datos["PUESTO"]} lugar con una puntuación '
+            f'de {datos["PUNTUACION"]} puntos.\n\nSaludos cordiales.'
+        )
+    else:
+        asunto = f'Certificado de {tipo.title()} - {evento.eve_nombre}'
+        cuerpo = (
+            f'Estimado/a {datos["NOMBRE"]},\n\nAdjuntamos su certificado de {tipo} '
+            f'del evento "{evento.eve_nombre}".\n\nSaludos cordiales.'
+        )
+    return asunto, cuerpo, f'certificado_{tipo}_{datos["DOCUMENTO"]}.pdf'
+
+
+def url_descarga(evento, tipo):
+    """Ruta de la descarga del certificado propio desde el panel de cada rol"""
+    if tipo == 'asistencia':
+        return reverse('descargar_certificado_asistente', args=[evento.pk])
+    if tipo == 'evaluador':
+        return reverse('descargar_certificado_evaluador', args=[evento.pk])
+    return reverse('descargar_certificado_participante', args=[evento.pk, tipo])
+
+
+def mensaje_aviso(evento, tipo, datos, enlace):
+    """Asunto y cuerpo del aviso de certificado disponible, sin adjunto"""
+    asunto = f'Certificado de {tipo.title()} disponible - {evento.eve_nombre}'
+    cuerpo = (
+        f'Estimado/a {datos["NOMBRE"]},\n\nSu certificado de {tipo} del evento "{evento.eve_nombre}" '
+        f'ya está disponible. Puede descargarlo desde su panel en EventSoft o en el siguiente enlace:\n\n'
+        f'{enlace}\n\nSaludos cordiales.'
+    )
+    return asunto, cuerpo
+
+
+def encolar_certificados(evento, tipo, destinatarios, creado_por=None, base_url='', solo_aviso=False):
+    """
+    Crea el trabajo y un envío pendiente por destinatario sin generar ningún PDF;
+    el comando procesar_certificados se encarga del resto. Con solo_aviso se
+    envía el enlace de descarga en lugar del PDF adjunto.
+    destinatarios: lista de (usuario, datos).
+    """
+    with transaction.atomic():
+        trabajo = TrabajoCertificados.objects.create(
+            evento=evento,
+            tipo=tipo,
+            creado_por=creado_por,
+            base_url=base_url,
+            solo_aviso=solo_aviso,
+        )
+        EnvioCertificado.objects.bulk_create([
+            EnvioCertificado(trabajo=trabajo, usuario=usuario, email=usuario.email, datos=datos)
+            for usuario, datos in destinatarios
+        ])
+    return trabajo
+
+
+def liberar_envios_abandonados():
+    """Devuelve a la cola los envíos que un worker dejó a medias"""
+    limite = timezone.now() - TIEMPO_MAXIMO_PROCESANDO
+    return EnvioCertificado.objects.filter(
+        estado='procesando',
+        iniciado__lt=limite
+    ).update(estado='pendiente')
+
+
+def reclamar_envios(limite):
+    """
+    Marca como 'procesando' hasta `limite` envíos pendientes cuyo reintento ya
+    toca. SKIP LOCKED permite que varios workers reclamen lotes a la vez sin
+    tomar las mismas filas.
+    """
+    with transaction.atomic():
+        ids = list(
+            EnvioCertificado.objects.select_for_update(skip_locked=True)
+            .filter(estado='pendiente', proximo_intento__lte=timezone.now())
+            .order_by('id')
+            .values_list('id', flat=True)[:limite]
+        )
+        EnvioCertificado.objects.filter(id__in=ids).update(estado='procesando', iniciado=timezone.now())
+    return list(
+        EnvioCertificado.objects.filter(id__in=ids)
+        .select_related('trabajo__evento')
+        .order_by('id')
+    )
+
+
+def procesar_lote(limite=20, procesos=1):
+    """
+    Genera y envía un lote de certificados pendientes. Devuelve un Lote con
+    cuántos envíos se procesaron (con éxito o no) y, si el límite de correo no
+    dejó enviar ninguno, los segundos que conviene esperar. Lote(0, 0) indica
+    que no hay envíos listos.
+    Con procesos > 1 los PDF se generan en el pool de pdf_pool, que queda
+    abierto entre lotes: quien lo pide debe cerrarlo con cerrar_pool().
+    """
+    # Primero se reclaman los envíos: con la cola vacía no se toca el limitador
+    envios = reclamar_envios(limite)
+    if not envios:
+        return Lote(0, 0)
+    concedidos, espera = reservar_envio(len(envios), parcial=True)
+    if concedidos < len(envios):
+        # Lo que el límite no permite enviar ahora vuelve a la cola sin contar como intento
+        EnvioCertificado.objects.filter(
+            id__in=[envio.id for envio in envios[concedidos:]]
+        ).update(estado='pendiente', iniciado=None)
+        envios = envios[:concedidos]
+    if not envios:
+        return Lote(0, espera)
+
+    trabajo_ids = {envio.trabajo_id for envio in envios}
+    TrabajoCertificados.objects.filter(id__in=trabajo_ids, estado='pendiente').update(estado='en_proceso')
+
+    por_trabajo = {}
+    for envio in envios:
+        por_trabajo.setdefault(envio.trabajo_id, []).append(envio)
+
+    conexion = get_connection()
+    try:
+        conexion.open()
+    except Exception as e:
+        # Sin servidor de correo ningún envío sale: vuelven a la cola y se devuelve el cupo
+        for envio in envios:
+            registrar_fallo(envio, e)
+            registrar_envio('certificado', 'error', 0, error=e)
+        devolver_envio(len(envios))
+        cerrar_trabajos(trabajo_ids)
+        return Lote(len(envios), 0)
+
+    try:
+        for grupo in por_trabajo.values():
+            trabajo = grupo[0].trabajo
+            pendientes = list(grupo)
+            if trabajo.solo_aviso:
+                enlace = urljoin(trabajo.base_url, url_descarga(trabajo.evento, trabajo.tipo))
+                for envio in grupo:
+                    asunto, cuerpo = mensaje_aviso(trabajo.evento, trabajo.tipo, envio.datos, enlace)
+                    enviar_correo(envio, asunto, cuerpo, conexion=conexion)
+                continue
+            try:
+                configuracion = ConfiguracionCertificado.objects.get(evento=trabajo.evento, tipo=trabajo.tipo)
+                # Los PDF se generan en paralelo (o salen de la caché) y llegan en orden
+                pdfs = iterar_certificados(
+                    configuracion, [envio.datos for envio in grupo], trabajo.base_url, procesos
+                )
+                # La preparación de cada envío incluye la espera de su PDF
+                cronometro = Cronometro()
+                for envio, pdf_file in zip(grupo, pdfs):
+                    pendientes.remove(envio)
+                    enviar_certificado(envio, pdf_file, conexion, cronometro)
+                    cronometro = Cronometro()
+            except Exception as e:
+                for envio in pendientes:
+                    registrar_fallo(envio, e)
+                    registrar_envio('certificado', 'error', 0, error=e)
+    finally:
+        conexion.close()
+
+    cerrar_trabajos(trabajo_ids)
+    return Lote(len(envios), 0)
+
+
+def enviar_certificado(envio, pdf_file, conexion=None, cronometro=None):
+    """Envía por correo el PDF de un envío y registra el resultado"""
+    if isinstance(pdf_file, Exception):
+        registrar_fallo(envio, pdf_file)
+        registrar_envio('certificado', 'error', 0, cronometro, pdf_file)
+        return False
+    trabajo = envio.trabajo
+    asunto, cuerpo, nombre_archivo = mensaje_certificado(trabajo.evento, trabajo.tipo, envio.datos)
+    return enviar_correo(envio, asunto, cuerpo, (nombre_archivo, pdf_file, 'application/pdf'), conexion, cronometro)
+
+
+def enviar_correo(envio, asunto, cuerpo, adjunto=None, conexion=None, cronometro=None):
+    cronometro = cronometro or Cronometro()
+    try:
+        email = EmailMessage(
+            subject=asunto,
+            body=cuerpo,
+            from_email=settings.DEFAULT_FROM_EMAIL,
+            to=[envio.email],
+            connection=conexion,
+        )
+        if adjunto:
+            email.attach(*adjunto)
+        cronometro.cambiar('envio')
+        email.send()
+    except Exception as e:
+        registrar_fallo(envio, e)
+        registrar_envio('certificado', 'error', 0, cronometro, e)
+        if conexion:
+            # La sesión SMTP puede haber quedado inservible para el resto del lote
+            reabrir_conexion(conexion)
+        return False
+    envio.estado = 'enviado'
+    envio.fecha_envio = timezone.now()
+    envio.error = ''
+    envio.save(update_fields=['estado', 'error', 'fecha_envio'])
+    registrar_envio('certificado', 'enviado', 1, cronometro)
+    return True
+
+
+def registrar_fallo(envio, error):
+    """Programa un reintento con espera exponencial o marca el envío como error si agotó los intentos"""
+    envio.intentos += 1
+    envio.error = str(error)
+    if envio.intentos >= MAX_INTENTOS:
+        envio.estado = 'error'
+    else:
+        envio.estado = 'pendiente'
+        envio.proximo_intento = timezone.now() + ESPERA_REINTENTO * 2 ** (envio.intentos - 1)
+    envio.save(update_fields=['estado', 'intentos', 'error', 'proximo_intento'])
+
+
+def cerrar_trabajos(trabajo_ids):
+    """Marca como terminados los trabajos que ya no tienen envíos por hacer"""
+    for trabajo in TrabajoCertificados.objects.filter(id__in=trabajo_ids, fecha_fin__isnull=True):
+        if trabajo.envios.filter(estado__in=['pendiente', 'procesando']).exists():
+            continue
+        trabajo.estado = 'con_errores' if trabajo.envios.filter(estado='error').exists() else 'completado'
+        trabajo.fecha_fin = timezone.now()
+        trabajo.save(update_fields=['estado', 'fecha_fin'])
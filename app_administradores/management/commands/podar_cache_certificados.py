@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from app_administradores.cache_pdf import podar_cache, tamano_maximo
+
+
+class Command(BaseCommand):
+    help = 'Elimina PDF de certificados en caché sin uso reciente o que exceden el tamaño máximo'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--max-mb', type=int, help='Tamaño máximo de la caché (por defecto CERTIFICADOS_CACHE_MAX_MB)')
+        parser.add_argument('--dias', type=int, help='Elimina además los PDF sin uso en los últimos N días')
+
+    def handle(self, *args, **options):
+        max_bytes = options['max_mb'] * 1024 * 1024 if options['max_mb'] is not None else tamano_maximo()
+        eliminados, liberados = podar_cache(max_bytes, options['dias'])
+        self.stdout.write(self.style.SUCCESS(
+            f'PDF eliminados de la caché: {eliminados} ({liberados / (1024 * 1024):.1f} MB liberados)'
+        ))
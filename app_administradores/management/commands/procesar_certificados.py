@@ -0,0 +1,70 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from app_administradores.cache_pdf import podar_cache
+from app_administradores.certificados import liberar_envios_abandonados, procesar_lote, procesos_pdf
+from app_administradores.pdf_pool import cerrar_pool
+
+# Espera máxima tras un lote frenado por el límite de correo; más allá de esto
+# es la cuota diaria la que está agotada y --una-vez no se queda esperándola
+ESPERA_MAXIMA_LIMITE = 60
+# Segundos mínimos entre dos podas de la caché de PDF
+INTERVALO_PODA = 10 * 60
+
+
+class Command(BaseCommand):
+    help = 'Genera y envía por correo los certificados encolados desde la gestión de certificados'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--una-vez', action='store_true', help='Vacía la cola actual y termina')
+        parser.add_argument('--lote', type=int, default=20, help='Envíos reclamados por iteración')
+        parser.add_argument('--espera', type=float, default=5, help='Segundos de espera con la cola vacía')
+        parser.add_argument(
+            '--procesos', type=int, default=None,
+            help='Procesos que generan los PDF en paralelo (por defecto CERTIFICADOS_PROCESOS_PDF)'
+        )
+
+    def handle(self, *args, **options):
+        procesos = max(1, options['procesos'] or procesos_pdf())
+        liberados = liberar_envios_abandonados()
+        if liberados:
+            self.stdout.write(self.style.WARNING(f'Envíos abandonados devueltos a la cola: {liberados}'))
+
+        procesados = 0
+        # La caché solo crece cuando se procesan envíos: sin lotes nuevos no hay nada que podar
+        pendiente_poda = False
+        ultima_poda = None
+        try:
+            while True:
+                lote = procesar_lote(options['lote'], procesos)
+                procesados += lote.procesados
+                if lote.procesados:
+                    pendiente_poda = True
+                    continue
+                if lote.espera:
+                    # Quedan envíos en la cola pero el límite de correo no deja enviarlos todavía
+                    if options['una_vez'] and lote.espera > ESPERA_MAXIMA_LIMITE:
+                        self.stdout.write(self.style.WARNING(
+                            'Cuota diaria de correo agotada: quedan certificados pendientes en la cola'
+                        ))
+                        break
+                    time.sleep(min(lote.espera, ESPERA_MAXIMA_LIMITE))
+                    continue
+                # Con la cola vacía se aprovecha para mantener la caché de PDF dentro del
+                # límite, como mucho una vez cada INTERVALO_PODA para no recorrerla en cada espera
+                if pendiente_poda and (
+                    ultima_poda is None or time.monotonic() - ultima_poda >= INTERVALO_PODA
+                ):
+                    podar_cache()
+                    pendiente_poda = False
+                    ultima_poda = time.monotonic()
+                if options['una_vez']:
+                    break
+                time.sleep(options['espera'])
+                liberar_envios_abandonados()
+        finally:
+            # Los procesos hijos del pool no deben sobrevivir al comando
+            cerrar_pool()
+
+        self.stdout.write(self.style.SUCCESS(f'Certificados procesados: {procesados}'))
@@ -0,0 +1,54 @@
+# Generated by Django 5.2.4 on 2026-10-18 01:15
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_administradores', '0003_codigoinvitacionadminevento_usuario_and_more'),
+        ('app_eventos', '0004_remove_evento_inscripciones_habilitadas'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrabajoCertificados',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo', models.CharField(max_length=20)),
+                ('base_url', models.CharField(blank=True, max_length=255)),
+                ('estado', models.CharField(choices=[('pendiente', 'Pendiente'), ('en_proceso', 'En proceso'), ('completado', 'Completado'), ('con_errores', 'Completado con errores')], default='pendiente', max_length=12)),
+                ('fecha_creacion', models.DateTimeField(default=django.utils.timezone.now)),
+                ('fecha_fin', models.DateTimeField(blank=True, null=True)),
+                ('creado_por', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='trabajos_certificados', to=settings.AUTH_USER_MODEL)),
+                ('evento', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='trabajos_certificados', to='app_eventos.evento')),
+            ],
+            options={
+                'verbose_name': 'Trabajo de Certificados',
+                'verbose_name_plural': 'Trabajos de Certificados',
+            },
+        ),
+        migrations.CreateModel(
+            name='EnvioCertificado',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('email', models.EmailField(max_length=254)),
+                ('datos', models.JSONField(default=dict)),
+                ('estado', models.CharField(choices=[('pendiente', 'Pendiente'), ('procesando', 'Procesando'), ('enviado', 'Enviado'), ('error', 'Error')], db_index=True, default='pendiente', max_length=12)),
+                ('intentos', models.PositiveSmallIntegerField(default=0)),
+                ('error', models.TextField(blank=True)),
+                ('iniciado', models.DateTimeField(blank=True, null=True)),
+                ('fecha_envio', models.DateTimeField(blank=True, null=True)),
+                ('usuario', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='envios_certificados', to=settings.AUTH_USER_MODEL)),
+                ('trabajo', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='envios', to='app_administradores.trabajocertificados')),
+            ],
+            options={
+                'verbose_name': 'Envío de Certificado',
+                'verbose_name_plural': 'Envíos de Certificados',
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-18 01:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_administradores', '0004_trabajos_certificados'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='trabajocertificados',
+            name='solo_aviso',
+            field=models.BooleanField(default=False),
+        ),
+    ]
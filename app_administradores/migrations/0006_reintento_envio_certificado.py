@@ -0,0 +1,25 @@
+# Generated by Django 5.2.4 on 2026-10-18 03:18
+
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_administradores', '0005_trabajocertificados_solo_aviso'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='enviocertificado',
+            name='proximo_intento',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddIndex(
+            model_name='enviocertificado',
+            index=models.Index(fields=['estado', 'proximo_intento'], name='envio_certificado_cola_idx'),
+        ),
+    ]
@@ -63,4 +63,80 @@ class CodigoInvitacionEvento(models.Model):
     
     class Meta:
         verbose_name = "Código de Invitación a Evento"
-        verbose_name_plural = "Códigos de Invitación a Eventos"
\ No newline at end of file
+        verbose_name_plural = "Códigos de Invitación a Eventos"
+
+class TrabajoCertificados(models.Model):
+    """Envío masivo de certificados que procesa en segundo plano el comando procesar_certificados"""
+    ESTADOS = [
+        ('pendiente', 'Pendiente'),
+        ('en_proceso', 'En proceso'),
+        ('completado', 'Completado'),
+        ('con_errores', 'Completado con errores'),
+    ]
+
+    evento = models.ForeignKey('app_eventos.Evento', on_delete=models.CASCADE, related_name='trabajos_certificados')
+    tipo = models.CharField(max_length=20)
+    creado_por = models.ForeignKey(Usuario, on_delete=models.SET_NULL, null=True, blank=True, related_name='trabajos_certificados')
+    # URL base para resolver recursos relativos del certificado fuera de la petición
+    base_url = models.CharField(max_length=255, blank=True)
+    # Solo se avisa por correo con el enlace de descarga, sin adjuntar el PDF
+    solo_aviso = models.BooleanField(default=False)
+    estado = models.CharField(max_length=12, choices=ESTADOS, default='pendiente')
+    fecha_creacion = models.DateTimeField(default=timezone.now)
+    fecha_fin = models.DateTimeField(null=True, blank=True)
+
+    def progreso(self):
+        """Conteo de envíos por estado con una sola consulta agrupada"""
+        conteos = dict(
+            self.envios.values_list('estado').annotate(total=models.Count('id')).order_by()
+        )
+        total = sum(conteos.values())
+        enviados = conteos.get('enviado', 0)
+        errores = conteos.get('error', 0)
+        return {
+            'total': total,
+            'enviados': enviados,
+            'errores': errores,
+            'pendientes': total - enviados - errores,
+            'porcentaje': round((enviados + errores) * 100 / total) if total else 100,
+        }
+
+    def __str__(self):
+        return f"Certificados de {self.tipo} - {self.evento.eve_nombre} ({self.estado})"
+
+    class Meta:
+        verbose_name = "Trabajo de Certificados"
+        verbose_name_plural = "Trabajos de Certificados"
+
+
+class EnvioCertificado(models.Model):
+    """Certificado de un destinatario dentro de un TrabajoCertificados"""
+    ESTADOS = [
+        ('pendiente', 'Pendiente'),
+        ('procesando', 'Procesando'),
+        ('enviado', 'Enviado'),
+        ('error', 'Error'),
+    ]
+
+    trabajo = models.ForeignKey(TrabajoCertificados, on_delete=models.CASCADE, related_name='envios')
+    usuario = models.ForeignKey(Usuario, on_delete=models.CASCADE, related_name='envios_certificados')
+    email = models.EmailField()
+    # Valores de los marcadores **CLAVE** tomados al encolar (NOMBRE, DOCUMENTO, PUESTO...)
+    datos = models.JSONField(default=dict)
+    estado = models.CharField(max_length=12, choices=ESTADOS, default='pendiente', db_index=True)
+    intentos = models.PositiveSmallIntegerField(default=0)
+    error = models.TextField(blank=True)
+    # Tras un fallo el envío no se reintenta antes de esta fecha
+    proximo_intento = models.DateTimeField(default=timezone.now)
+    iniciado = models.DateTimeField(null=True, blank=True)
+    fecha_envio = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"Certificado para {self.email} ({self.estado})"
+
+    class Meta:
+        verbose_name = "Envío de Certificado"
+        verbose_name_plural = "Envíos de Certificados"
+        indexes = [
+            models.Index(fields=['estado', 'proximo_intento'], name='envio_certificado_cola_idx'),
+        ]
@@ -0,0 +1,99 @@
+"""
+Renderizado de PDFs de certificados en paralelo con un pool de procesos.
+
+WeasyPrint consume CPU y no libera el GIL, así que los hilos no ayudan. Este
+módulo solo importa WeasyPrint y la librería estándar para que los procesos
+hijos (iniciados con 'spawn') no necesiten cargar Django.
+"""
+import multiprocessing
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from weasyprint import HTML
+
+_pool = None
+_procesos_pool = 0
+
+
+def _precalentar():
+    """Carga WeasyPrint, fuentes y hojas de estilo por defecto al iniciar cada proceso"""
+    HTML(string='<p style="font-family: serif">.</p><p style="font-family: sans-serif">.</p>').write_pdf()
+
+
+def _renderizar(html, base_url):
+    return HTML(string=html, base_url=base_url or None).write_pdf()
+
+
+def _obtener_pool(procesos):
+    """Pool compartido entre lotes; se recrea si cambia el tamaño"""
+    global _pool, _procesos_pool
+    if _pool is not None and _procesos_pool != procesos:
+        cerrar_pool()
+    if _pool is None:
+        _pool = ProcessPoolExecutor(
+            max_workers=procesos,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_precalentar,
+        )
+        _procesos_pool = procesos
+    return _pool
+
+
+def cerrar_pool(esperar=True):
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=esperar, cancel_futures=not esperar)
+        _pool = None
+
+
+def iterar_pdfs(documentos, procesos=1):
+    """
+    Genera los PDFs de documentos [(html, base_url), ...] y los entrega en el
+    mismo orden de entrada. Cada resultado es el contenido del PDF o la excepción
+    que produjo ese documento, para que un fallo no detenga al resto.
+    Con procesos <= 1 se renderiza en el proceso actual.
+    """
+    if procesos <= 1:
+        for html, base_url in documentos:
+            try:
+                yield _renderizar(html, base_url)
+            except Exception as e:
+                yield e
+        return
+
+    pool = _obtener_pool(procesos)
+    # Ventana acotada: no se encolan más documentos de los que el pool puede
+    # atender, así la memoria no crece con el tamaño de la exportación
+    pendientes = deque()
+    for html, base_url in documentos:
+        pendientes.append(_encolar(pool, html, base_url))
+        if len(pendientes) >= procesos * 2:
+            yield _resultado(pendientes.popleft())
+    while pendientes:
+        yield _resultado(pendientes.popleft())
+
+
+def _encolar(pool, html, base_url):
+    try:
+        return pool.submit(_renderizar, html, base_url)
+    except BrokenProcessPool as e:
+        futuro = Future()
+        futuro.set_exception(e)
+        return futuro
+
+
+def _resultado(futuro):
+    try:
+        return futuro.result()
+    except BrokenProcessPool as e:
+        # Un proceso murió (p. ej. por memoria); el siguiente lote usará un pool nuevo
+        cerrar_pool(esperar=False)
+        return e
+    except Exception as e:
+        return e
+
+
+def renderizar_pdfs(documentos, procesos=1):
+    """Versión en lista de iterar_pdfs"""
+    return list(iterar_pdfs(documentos, procesos))
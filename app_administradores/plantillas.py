@@ -0,0 +1,54 @@
+
+from django.template.loader import render_to_string
+from django.utils.html import escape
+
+from app_usuarios.plantillas import PATRON_MARCADOR, renderizar_en_segmentos, unir_segmentos
+
+# Marcadores **CLAVE** que se pueden usar en el cuerpo de un certificado
+MARCADORES_BASE = ('NOMBRE', 'DOCUMENTO', 'EVENTO', 'FECHA', 'CIUDAD', 'LUGAR')
+MARCADORES_PREMIACION = ('PUESTO', 'PUNTUACION')
+PLANTILLA_CERTIFICADO = 'app_administradores/certificado_plantilla.html'
+
+
+def marcadores_permitidos(tipo):
+    if tipo == 'premiacion':
+        return MARCADORES_BASE + MARCADORES_PREMIACION
+    return MARCADORES_BASE
+
+
+def marcadores_desconocidos(cuerpo, tipo):
+    """Marcadores del cuerpo que no se podrán reemplazar al enviar, en orden de aparición"""
+    permitidos = set(marcadores_permitidos(tipo))
+    desconocidos = []
+    for nombre in PATRON_MARCADOR.findall(cuerpo or ''):
+        if nombre not in permitidos and nombre not in desconocidos:
+            desconocidos.append(nombre)
+    return desconocidos
+
+
+class PlantillaCertificado:
+    """
+    Certificado de una configuración renderizado una sola vez con Django.
+    Los marcadores quedan como huecos en una lista de segmentos, y cada
+    destinatario solo requiere unir los segmentos con sus datos.
+    """
+
+    def __init__(self, configuracion, imagenes, plantilla=PLANTILLA_CERTIFICADO):
+        logo_base64, logo_format, firma_base64, firma_format = imagenes
+        self.segmentos = renderizar_en_segmentos(lambda hueco: render_to_string(plantilla, {
+            'configuracion': configuracion,
+            'cuerpo_renderizado': PATRON_MARCADOR.sub(lambda m: hueco(m.group(1)), configuracion.cuerpo),
+            'datos': {},
+            'es_preview': False,
+            'logo_base64': logo_base64,
+            'logo_format': logo_format,
+            'firma_base64': firma_base64,
+            'firma_format': firma_format,
+        }))
+
+    def renderizar(self, datos):
+        # Un marcador sin dato se deja tal cual, como hacía el reemplazo de texto
+        return unir_segmentos(
+            self.segmentos,
+            lambda nombre: escape(str(datos[nombre])) if nombre in datos else f'**{nombre}**'
+        )
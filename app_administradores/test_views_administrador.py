@@ -121,8 +121,8 @@ class CrearEventoTestCase(TestCase):
         self.assertIn('areas', response.context)
         self.assertFalse(response.context['mostrar_mensajes_en_formulario'])
     
-    @patch('app_administradores.views.EmailMessage')
-    def test_post_crear_evento_exitoso(self, mock_email):
+    @patch('app_administradores.views.encolar_correo')
+    def test_post_crear_evento_exitoso(self, mock_encolar):
         """Test POST: crear evento exitosamente"""
         fecha_inicio = (timezone.now() + timedelta(days=1)).strftime('%Y-%m-%d')
         fecha_fin = (timezone.now() + timedelta(days=2)).strftime('%Y-%m-%d')
@@ -146,8 +146,8 @@ class CrearEventoTestCase(TestCase):
         self.codigo.refresh_from_db()
         self.assertEqual(self.codigo.limite_eventos, 4)
         
-        # Verificar que se envió email
-        self.assertTrue(mock_email.called)
+        # Verificar que se encoló el email
+        self.assertTrue(mock_encolar.called)
     
     def test_post_crear_evento_sin_administrador(self):
         """Test POST: usuario sin AdministradorEvento asociado"""
@@ -337,8 +337,8 @@ class CrearEventoTestCase(TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertFalse(Evento.objects.exists())
     
-    @patch('app_administradores.views.EmailMessage')
-    def test_post_crear_evento_con_archivos(self, mock_email):
+    @patch('app_administradores.views.encolar_correo')
+    def test_post_crear_evento_con_archivos(self, mock_encolar):
         """Test POST: crear evento con imagen y programación"""
         imagen = SimpleUploadedFile(
             "test.jpg",
@@ -1027,4 +1027,80 @@ class GestionAsistentesTestCase(TestCase):
         
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response.context['evento'], self.evento)
-        self.assertEqual(len(response.context['asistentes']), 1)
\ No newline at end of file
+        self.assertEqual(len(response.context['asistentes']), 1)
+
+
+class DetalleParticipanteTestCase(TestCase):
+    """
+    Tests para detalle_participante con inscripciones grupales
+    """
+
+    def setUp(self):
+        self.client = Client()
+        rol_admin = Rol.objects.create(nombre='administrador_evento')
+        admin_user = Usuario.objects.create_user(
+            username='admin1',
+            email='admin1@test.com',
+            password='test123',
+            documento='123456'
+        )
+        RolUsuario.objects.create(usuario=admin_user, rol=rol_admin)
+        administrador = AdministradorEvento.objects.create(usuario=admin_user)
+        self.evento = Evento.objects.create(
+            eve_nombre='Evento',
+            eve_descripcion='Desc',
+            eve_ciudad='Manizales',
+            eve_lugar='SENA',
+            eve_fecha_inicio=timezone.now().date(),
+            eve_fecha_fin=timezone.now().date() + timedelta(days=1),
+            eve_estado='aprobado',
+            eve_capacidad=100,
+            eve_tienecosto='NO',
+            eve_administrador_fk=administrador
+        )
+
+        def inscribir(n, codigo):
+            usuario = Usuario.objects.create_user(
+                username=f'par{n}',
+                email=f'par{n}@test.com',
+                password='test123',
+                documento=f'90{n}'
+            )
+            return ParticipanteEvento.objects.create(
+                participante=Participante.objects.create(usuario=usuario),
+                evento=self.evento,
+                par_eve_fecha_hora=timezone.now(),
+                par_eve_estado='Pendiente',
+                codigo=codigo
+            )
+
+        self.lider = inscribir(1, 'GRUPO1')
+        self.integrante = inscribir(2, 'GRUPO1')
+        self.otro = inscribir(3, 'GRUPO2')
+
+        self.client.login(email='admin1@test.com', password='test123')
+        session = self.client.session
+        session['rol_sesion'] = 'administrador_evento'
+        session.save()
+
+    @patch('app_administradores.views.encolar_correo')
+    def test_rechazo_se_propaga_solo_al_equipo(self, mock_encolar):
+        """Test: el cambio de estado alcanza a los integrantes del mismo equipo"""
+        url = reverse('detalle_participante_evento', args=[self.evento.eve_id, self.lider.participante_id])
+        self.client.post(url, {'estado': 'Rechazado'})
+
+        self.integrante.refresh_from_db()
+        self.otro.refresh_from_db()
+        self.assertEqual(self.integrante.par_eve_estado, 'Rechazado')
+        self.assertEqual(self.otro.par_eve_estado, 'Pendiente')
+
+    def test_detalle_muestra_los_integrantes_del_equipo(self):
+        """Test: los integrantes se buscan por el equipo de la inscripción"""
+        url = reverse('detalle_participante_evento', args=[self.evento.eve_id, self.lider.participante_id])
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            {pe.id for pe in response.context['integrantes_grupo']},
+            {self.lider.id, self.integrante.id}
+        )
@@ -0,0 +1,99 @@
+import os
+import shutil
+import tempfile
+import time
+from datetime import date
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from app_usuarios.models import Usuario
+from app_administradores import pdf_pool
+from app_administradores.cache_pdf import directorio_cache, guardar_pdf, podar_cache, ruta_pdf
+from app_administradores.certificados import iterar_certificados
+from app_administradores.models import AdministradorEvento
+from app_eventos.models import Evento, ConfiguracionCertificado
+
+
+class PruebasCachePdf(TestCase):
+
+    def setUp(self):
+        self.media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media, ignore_errors=True)
+        ajustes = override_settings(MEDIA_ROOT=self.media)
+        ajustes.enable()
+        self.addCleanup(ajustes.disable)
+
+        admin_user = Usuario.objects.create_user(
+            username='admin_cpdf', email='admin@cpdf.com', password='password123', documento='1'
+        )
+        evento = Evento.objects.create(
+            eve_nombre="Evento Caché",
+            eve_estado="Aprobado",
+            eve_capacidad=50,
+            eve_tienecosto="No",
+            eve_fecha_inicio=date(2025, 9, 1),
+            eve_fecha_fin=date(2025, 9, 3),
+            eve_administrador_fk=AdministradorEvento.objects.create(usuario=admin_user),
+        )
+        self.configuracion = ConfiguracionCertificado.objects.create(
+            evento=evento,
+            tipo='asistencia',
+            titulo='Constancia',
+            cuerpo='Certificamos que **NOMBRE** asistió.',
+        )
+        self.datos = [{'NOMBRE': f'Persona {i}', 'DOCUMENTO': str(i)} for i in range(4)]
+
+    def generar(self, datos):
+        with mock.patch.object(pdf_pool, '_renderizar', wraps=pdf_pool._renderizar) as renderizar:
+            pdfs = list(iterar_certificados(self.configuracion, datos))
+        return pdfs, renderizar.call_count
+
+    def test_reenvio_lee_de_la_cache(self):
+        primeros, renderizados = self.generar(self.datos[:2])
+        self.assertEqual(renderizados, 2)
+
+        # Mezcla de entradas en caché y nuevas: el orden se conserva
+        segundos, renderizados = self.generar(self.datos)
+        self.assertEqual(renderizados, 2)
+        self.assertEqual(segundos[:2], primeros)
+        self.assertEqual(len(segundos), 4)
+        self.assertTrue(all(pdf.startswith(b'%PDF') for pdf in segundos))
+
+    def test_cambiar_la_configuracion_invalida_la_cache(self):
+        self.generar(self.datos[:1])
+        self.configuracion.cuerpo = 'Hacemos constar que **NOMBRE** asistió.'
+        self.configuracion.save()
+
+        _, renderizados = self.generar(self.datos[:1])
+        self.assertEqual(renderizados, 1)
+
+    def test_entrada_podada_se_vuelve_a_generar(self):
+        self.generar(self.datos[:1])
+        shutil.rmtree(directorio_cache())
+        pdfs, renderizados = self.generar(self.datos[:1])
+        self.assertEqual(renderizados, 1)
+        self.assertTrue(pdfs[0].startswith(b'%PDF'))
+
+    def test_poda_elimina_lo_menos_usado(self):
+        ahora = time.time()
+        for i, clave in enumerate(['aa01', 'bb02', 'cc03', 'dd04']):
+            guardar_pdf(clave, b'x' * 100)
+            os.utime(ruta_pdf(clave), (ahora - 1000 + i, ahora - 1000 + i))
+
+        self.assertEqual(podar_cache(max_bytes=300), (2, 200))
+        self.assertFalse(os.path.exists(ruta_pdf('aa01')))
+        self.assertTrue(os.path.exists(ruta_pdf('dd04')))
+
+    def test_comando_de_poda_por_antiguedad(self):
+        guardar_pdf('viejo', b'x' * 10)
+        guardar_pdf('nuevo', b'x' * 10)
+        antiguo = time.time() - 40 * 86400
+        os.utime(ruta_pdf('viejo'), (antiguo, antiguo))
+
+        call_command('podar_cache_certificados', '--dias', '30', stdout=StringIO())
+
+        self.assertFalse(os.path.exists(ruta_pdf('viejo')))
+        self.assertTrue(os.path.exists(ruta_pdf('nuevo')))
@@ -0,0 +1,201 @@
+import shutil
+import tempfile
+from datetime import date, timedelta
+
+from django.core import mail
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from app_usuarios.models import Usuario, Rol, RolUsuario, MetricaCorreo
+from app_administradores.models import AdministradorEvento, TrabajoCertificados
+from app_administradores.certificados import destinatarios_certificado, encolar_certificados, procesar_lote
+from app_asistentes.models import Asistente, AsistenteEvento
+from app_eventos.models import Evento, ConfiguracionCertificado
+from app_participantes.models import Participante, ParticipanteEvento
+
+
+class PruebasDescargaCertificado(TestCase):
+
+    def setUp(self):
+        """Evento terminado con certificado de asistencia y un asistente aprobado."""
+        self.client = Client()
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media, ignore_errors=True)
+        ajustes = override_settings(MEDIA_ROOT=media)
+        ajustes.enable()
+        self.addCleanup(ajustes.disable)
+
+        self.admin_user = Usuario.objects.create_user(
+            username='admin_desc', email='admin@desc.com', password='password123', documento='1'
+        )
+        RolUsuario.objects.create(
+            usuario=self.admin_user,
+            rol=Rol.objects.create(nombre='administrador_evento', descripcion='Administrador de evento'),
+        )
+        administrador = AdministradorEvento.objects.create(usuario=self.admin_user)
+        hoy = timezone.localdate()
+        self.evento = Evento.objects.create(
+            eve_nombre="Evento Descarga",
+            eve_ciudad="Manizales",
+            eve_lugar="Auditorio",
+            eve_estado="Aprobado",
+            eve_capacidad=50,
+            eve_tienecosto="No",
+            eve_fecha_inicio=hoy - timedelta(days=3),
+            eve_fecha_fin=hoy - timedelta(days=1),
+            eve_administrador_fk=administrador,
+        )
+        ConfiguracionCertificado.objects.create(
+            evento=self.evento,
+            tipo='asistencia',
+            titulo='Constancia',
+            cuerpo='Certificamos que **NOMBRE** asistió a **EVENTO**.',
+        )
+
+        self.usuario = Usuario.objects.create_user(
+            username='asis_desc', email='asis@desc.com', password='password123',
+            documento='77', first_name='Ana', last_name='Ruiz'
+        )
+        RolUsuario.objects.create(
+            usuario=self.usuario,
+            rol=Rol.objects.create(nombre='asistente', descripcion='Asistente'),
+        )
+        self.inscripcion = AsistenteEvento.objects.create(
+            asistente=Asistente.objects.create(usuario=self.usuario),
+            evento=self.evento,
+            asi_eve_estado='Aprobado',
+            asi_eve_fecha_hora=timezone.now(),
+            confirmado=True,
+        )
+        self.client.force_login(self.usuario)
+        self.url = reverse('descargar_certificado_asistente', args=[self.evento.pk])
+
+    def test_descarga_el_pdf_con_cabeceras_de_cache(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        self.assertTrue(response.content.startswith(b'%PDF'))
+        self.assertIn('attachment', response['Content-Disposition'])
+        self.assertIn('private', response['Cache-Control'])
+        self.assertTrue(response['ETag'])
+
+    def test_etag_vigente_responde_304(self):
+        etag = self.client.get(self.url)['ETag']
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+    def test_cambiar_la_configuracion_cambia_el_etag(self):
+        etag = self.client.get(self.url)['ETag']
+        ConfiguracionCertificado.objects.update(titulo='Certificado')
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_evento_sin_terminar_ni_emitido_no_se_descarga(self):
+        Evento.objects.filter(pk=self.evento.pk).update(eve_fecha_fin=timezone.localdate() + timedelta(days=5))
+
+        response = self.client.get(self.url)
+        self.assertRedirects(response, reverse('dashboard_asistente'), fetch_redirect_response=False)
+
+        TrabajoCertificados.objects.create(evento=self.evento, tipo='asistencia')
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+
+    def test_el_ultimo_dia_del_evento_aun_no_se_descarga(self):
+        Evento.objects.filter(pk=self.evento.pk).update(eve_fecha_fin=timezone.localdate())
+
+        self.assertEqual(self.client.get(self.url).status_code, 302)
+
+    def test_inscripcion_no_confirmada_no_se_descarga(self):
+        AsistenteEvento.objects.filter(pk=self.inscripcion.pk).update(confirmado=False)
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 302)
+
+    def test_dashboard_muestra_el_enlace_de_descarga(self):
+        response = self.client.get(reverse('dashboard_asistente'))
+        self.assertContains(response, self.url)
+
+    def test_envio_solo_aviso_manda_el_enlace_sin_adjunto(self):
+        self.client.force_login(self.admin_user)
+        self.client.post(
+            reverse('enviar_certificados', args=[self.evento.pk, 'asistencia']),
+            {'destinatarios': [self.inscripcion.id], 'solo_aviso': 'on'},
+        )
+        self.assertTrue(TrabajoCertificados.objects.get().solo_aviso)
+
+        procesar_lote()
+
+        self.assertEqual(len(mail.outbox), 1)
+        correo = mail.outbox[0]
+        self.assertEqual(correo.attachments, [])
+        self.assertIn(self.url, correo.body)
+        self.assertEqual(TrabajoCertificados.objects.get().estado, 'completado')
+        metrica = MetricaCorreo.objects.get()
+        self.assertEqual((metrica.origen, metrica.resultado, metrica.destinatarios), ('certificado', 'enviado', 1))
+
+
+class PruebasDescargaPremiacion(TestCase):
+
+    def setUp(self):
+        """Evento terminado con certificado de premiación y dos participantes calificados."""
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media, ignore_errors=True)
+        ajustes = override_settings(MEDIA_ROOT=media)
+        ajustes.enable()
+        self.addCleanup(ajustes.disable)
+
+        admin_user = Usuario.objects.create_user(
+            username='admin_prem', email='admin@prem.com', password='password123', documento='1'
+        )
+        hoy = timezone.localdate()
+        self.evento = Evento.objects.create(
+            eve_nombre="Evento Premiación",
+            eve_ciudad="Manizales",
+            eve_lugar="Auditorio",
+            eve_estado="Aprobado",
+            eve_capacidad=50,
+            eve_tienecosto="No",
+            eve_fecha_inicio=hoy - timedelta(days=3),
+            eve_fecha_fin=hoy - timedelta(days=1),
+            eve_administrador_fk=AdministradorEvento.objects.create(usuario=admin_user),
+        )
+        ConfiguracionCertificado.objects.create(
+            evento=self.evento, tipo='premiacion', titulo='Premio', cuerpo='**NOMBRE**, puesto **PUESTO**.'
+        )
+        rol = Rol.objects.create(nombre='participante', descripcion='Participante')
+        self.usuarios = []
+        for i, valor in enumerate([4.8, 2.1]):
+            usuario = Usuario.objects.create_user(
+                username=f'part_prem{i}', email=f'part{i}@prem.com', password='password123', documento=f'8{i}'
+            )
+            RolUsuario.objects.create(usuario=usuario, rol=rol)
+            ParticipanteEvento.objects.create(
+                participante=Participante.objects.create(usuario=usuario),
+                evento=self.evento,
+                par_eve_estado='Aprobado',
+                par_eve_fecha_hora=timezone.now(),
+                par_eve_valor=valor,
+                confirmado=True,
+            )
+            self.usuarios.append(usuario)
+        self.url = reverse('descargar_certificado_participante', args=[self.evento.pk, 'premiacion'])
+
+    def test_solo_los_premiados_por_el_administrador_lo_descargan(self):
+        premiado, otro = self.usuarios
+        # El administrador elige solo al primero del ranking
+        elegidos = [(u, datos) for u, datos in destinatarios_certificado(self.evento, 'premiacion') if u == premiado]
+        encolar_certificados(self.evento, 'premiacion', elegidos)
+
+        self.client.force_login(premiado)
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+
+        self.client.force_login(otro)
+        self.assertEqual(self.client.get(self.url).status_code, 302)
@@ -0,0 +1,111 @@
+import shutil
+import tempfile
+import zipfile
+from datetime import date
+from io import BytesIO
+from unittest import mock
+
+from django.http import StreamingHttpResponse
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from app_usuarios.models import Usuario, Rol, RolUsuario
+from app_administradores import pdf_pool
+from app_administradores.models import AdministradorEvento
+from app_eventos.models import Evento, ConfiguracionCertificado
+from app_participantes.models import Participante, ParticipanteEvento
+
+
+class PruebasExportarCertificadosZip(TestCase):
+
+    def setUp(self):
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media, ignore_errors=True)
+        ajustes = override_settings(MEDIA_ROOT=media, CERTIFICADOS_PROCESOS_PDF=4)
+        ajustes.enable()
+        self.addCleanup(ajustes.disable)
+
+        self.admin_user = Usuario.objects.create_user(
+            username='admin_zip', email='admin@zip.com', password='password123', documento='1'
+        )
+        RolUsuario.objects.create(
+            usuario=self.admin_user,
+            rol=Rol.objects.create(nombre='administrador_evento', descripcion='Administrador de evento')
+        )
+        self.evento = Evento.objects.create(
+            eve_nombre="Evento ZIP",
+            eve_estado="Aprobado",
+            eve_capacidad=50,
+            eve_tienecosto="No",
+            eve_fecha_inicio=date(2025, 9, 1),
+            eve_fecha_fin=date(2025, 9, 3),
+            eve_administrador_fk=AdministradorEvento.objects.create(usuario=self.admin_user),
+        )
+        for tipo in ('participacion', 'premiacion'):
+            ConfiguracionCertificado.objects.create(
+                evento=self.evento, tipo=tipo, titulo='Certificado', cuerpo='Para **NOMBRE**.'
+            )
+        for i, valor in enumerate([3.0, 4.5, None]):
+            usuario = Usuario.objects.create_user(
+                username=f'part_zip{i}', email=f'part{i}@zip.com', password='password123', documento=f'7{i}'
+            )
+            ParticipanteEvento.objects.create(
+                participante=Participante.objects.create(usuario=usuario),
+                evento=self.evento,
+                par_eve_estado='Aprobado',
+                par_eve_fecha_hora=timezone.now(),
+                par_eve_valor=valor,
+                confirmado=True,
+            )
+        self.client.force_login(self.admin_user)
+
+    def descargar(self, tipo):
+        response = self.client.get(reverse('exportar_certificados_zip', args=[self.evento.pk, tipo]))
+        self.assertIsInstance(response, StreamingHttpResponse)
+        self.assertEqual(response['Content-Type'], 'application/zip')
+        return zipfile.ZipFile(BytesIO(b''.join(response.streaming_content)))
+
+    def test_zip_con_un_pdf_por_destinatario(self):
+        archivo = self.descargar('participacion')
+        self.assertEqual(archivo.namelist(), [
+            'certificado_participacion_70.pdf',
+            'certificado_participacion_71.pdf',
+            'certificado_participacion_72.pdf',
+        ])
+        self.assertTrue(archivo.read('certificado_participacion_70.pdf').startswith(b'%PDF'))
+
+    def test_premiacion_sigue_el_ranking(self):
+        archivo = self.descargar('premiacion')
+        self.assertEqual(archivo.namelist(), ['certificado_premiacion_71.pdf', 'certificado_premiacion_70.pdf'])
+
+    def test_la_descarga_se_genera_a_medida_que_se_lee(self):
+        with mock.patch.object(pdf_pool, '_renderizar', wraps=pdf_pool._renderizar) as renderizar:
+            response = self.client.get(reverse('exportar_certificados_zip', args=[self.evento.pk, 'participacion']))
+            contenido = iter(response.streaming_content)
+            next(contenido)
+            self.assertEqual(renderizar.call_count, 1)
+            list(contenido)
+            self.assertEqual(renderizar.call_count, 3)
+
+    def test_fallos_se_listan_en_errores_txt(self):
+        original = pdf_pool._renderizar
+
+        def fallar_uno(html, base_url):
+            # Falla el segundo destinatario
+            if renderizar.call_count == 2:
+                raise ValueError('sin fuentes')
+            return original(html, base_url)
+
+        with mock.patch.object(pdf_pool, '_renderizar', side_effect=fallar_uno) as renderizar:
+            archivo = self.descargar('participacion')
+        self.assertEqual(len(archivo.namelist()), 3)
+        self.assertIn('errores.txt', archivo.namelist())
+        self.assertIn('part1@zip.com', archivo.read('errores.txt').decode())
+
+    def test_la_vista_no_inicia_procesos_hijos(self):
+        # Aunque el comando use varios procesos, la vista renderiza en el servidor web
+        with mock.patch.object(pdf_pool, '_obtener_pool') as obtener_pool:
+            archivo = self.descargar('participacion')
+        obtener_pool.assert_not_called()
+        self.assertEqual(len(archivo.namelist()), 3)
@@ -0,0 +1,80 @@
+import base64
+from datetime import date
+from io import BytesIO
+from unittest import mock
+
+from PIL import Image
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, Client
+from django.urls import reverse
+
+from app_usuarios.models import Usuario, Rol, RolUsuario
+from app_administradores import certificados
+from app_administradores.models import AdministradorEvento
+from app_eventos.models import Evento, ConfiguracionCertificado
+
+
+def imagen_png(nombre, lado, color):
+    salida = BytesIO()
+    Image.new('RGB', (lado, lado), color).save(salida, 'PNG')
+    return SimpleUploadedFile(nombre, salida.getvalue(), content_type='image/png')
+
+
+class PruebasImagenesCertificado(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.admin_user = Usuario.objects.create_user(
+            username='admin_img', email='admin@img.com', password='password123', documento='1'
+        )
+        RolUsuario.objects.create(
+            usuario=self.admin_user,
+            rol=Rol.objects.create(nombre='administrador_evento', descripcion='Administrador de evento')
+        )
+        self.evento = Evento.objects.create(
+            eve_nombre="Evento Imágenes",
+            eve_estado="Aprobado",
+            eve_capacidad=50,
+            eve_tienecosto="No",
+            eve_fecha_inicio=date(2025, 9, 1),
+            eve_fecha_fin=date(2025, 9, 3),
+            eve_administrador_fk=AdministradorEvento.objects.create(usuario=self.admin_user),
+        )
+        self.configuracion = ConfiguracionCertificado.objects.create(
+            evento=self.evento,
+            tipo='asistencia',
+            titulo='Constancia',
+            cuerpo='Certificamos que **NOMBRE** asistió.',
+            logo=imagen_png('logo.png', 1600, 'red'),
+        )
+
+    def test_la_imagen_se_lee_una_sola_vez(self):
+        with mock.patch.object(certificados, 'optimizar_imagen', wraps=certificados.optimizar_imagen) as optimizar:
+            primero = certificados.imagenes_certificado(self.configuracion)
+            for _ in range(5):
+                self.assertEqual(certificados.imagenes_certificado(self.configuracion), primero)
+        self.assertEqual(optimizar.call_count, 1)
+        self.assertEqual(primero[2:], (None, None))
+
+    def test_la_copia_incrustada_se_reduce(self):
+        logo_base64, logo_format, _, _ = certificados.imagenes_certificado(self.configuracion)
+        self.assertEqual(logo_format, 'png')
+        with Image.open(BytesIO(base64.b64decode(logo_base64))) as logo:
+            self.assertEqual(logo.size, (certificados.IMAGEN_MAX_LADO, certificados.IMAGEN_MAX_LADO))
+
+    def test_subir_un_logo_nuevo_invalida_el_cache(self):
+        anterior = certificados.imagenes_certificado(self.configuracion)
+        self.client.force_login(self.admin_user)
+
+        self.client.post(reverse('configurar_certificado', args=[self.evento.pk, 'asistencia']), {
+            'titulo': 'Constancia',
+            'cuerpo': 'Certificamos que **NOMBRE** asistió.',
+            'logo': imagen_png('logo_nuevo.png', 100, 'blue'),
+        })
+
+        self.configuracion.refresh_from_db()
+        nuevo = certificados.imagenes_certificado(self.configuracion)
+        self.assertNotEqual(nuevo[0], anterior[0])
+        with Image.open(BytesIO(base64.b64decode(nuevo[0]))) as logo:
+            self.assertEqual(logo.getpixel((0, 0)), (0, 0, 255))
@@ -0,0 +1,89 @@
+from datetime import date
+
+from django.core import mail
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from app_usuarios.models import Usuario, Rol, RolUsuario, CorreoSaliente
+from app_usuarios.correos import procesar_bandeja
+from app_administradores.models import AdministradorEvento
+from app_asistentes.models import Asistente, AsistenteEvento
+from app_eventos.models import Evento
+
+
+@override_settings(CORREOS_POR_MINUTO=2, CORREOS_CUOTA_DIARIA=0, CORREOS_DESTINATARIOS_POR_LOTE=1)
+class PruebasNotificacionesAdministrador(TestCase):
+
+    def setUp(self):
+        """Administrador con un evento aprobado y tres asistentes."""
+        self.client = Client()
+        self.rol_admin = Rol.objects.create(nombre='administrador_evento', descripcion='Administrador de evento')
+        self.admin_user = self.crear_administrador('admin_notif')
+        self.evento = Evento.objects.create(
+            eve_nombre="Evento Notificaciones",
+            eve_ciudad="Manizales",
+            eve_lugar="Auditorio",
+            eve_estado="Aprobado",
+            eve_capacidad=50,
+            eve_tienecosto="No",
+            eve_fecha_inicio=date(2025, 9, 1),
+            eve_fecha_fin=date(2025, 9, 3),
+            eve_administrador_fk=self.admin_user.administrador,
+        )
+        self.inscripciones = []
+        for i in range(3):
+            usuario = Usuario.objects.create_user(
+                username=f'asis_notif{i}', email=f'asis{i}@notif.com', password='password123',
+                documento=f'9{i}', first_name='Asis', last_name=str(i)
+            )
+            self.inscripciones.append(AsistenteEvento.objects.create(
+                asistente=Asistente.objects.create(usuario=usuario),
+                evento=self.evento,
+                asi_eve_estado='Aprobado',
+                asi_eve_fecha_hora=timezone.now(),
+            ))
+        self.client.force_login(self.admin_user)
+
+    def crear_administrador(self, username):
+        usuario = Usuario.objects.create_user(
+            username=username, email=f'{username}@notif.com', password='password123', documento='1'
+        )
+        RolUsuario.objects.create(usuario=usuario, rol=self.rol_admin)
+        AdministradorEvento.objects.create(usuario=usuario)
+        return usuario
+
+    def enviar(self):
+        return self.client.post(reverse('gestionar_notificaciones'), {
+            'tipo': 'asistentes',
+            'evento': self.evento.pk,
+            'asunto': 'Aviso',
+            'mensaje': 'Hola **NOMBRE**',
+            'seleccionados': [ae.pk for ae in self.inscripciones],
+        })
+
+    def test_el_progreso_informa_enviados_y_aplazados(self):
+        self.enviar()
+        grupo = self.client.session['ultima_notificacion']
+        url = reverse('progreso_notificaciones', args=[grupo])
+        self.assertContains(self.client.get(reverse('gestionar_notificaciones')), url)
+
+        procesar_bandeja()
+
+        data = self.client.get(url).json()
+        self.assertTrue(data['success'])
+        self.assertEqual(
+            (data['total'], data['enviados'], data['aplazados'], data['fallidos']),
+            (3, 2, 1, 0),
+        )
+        self.assertFalse(data['terminado'])
+        self.assertEqual(mail.outbox[0].body, 'Hola Asis 0')
+
+    def test_progreso_de_otro_administrador_no_es_visible(self):
+        self.enviar()
+        grupo = CorreoSaliente.objects.first().grupo
+        self.client.force_login(self.crear_administrador('otro_notif'))
+
+        response = self.client.get(reverse('progreso_notificaciones', args=[grupo]))
+
+        self.assertEqual(response.status_code, 404)
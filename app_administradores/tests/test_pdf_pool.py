@@ -0,0 +1,28 @@
+from django.test import SimpleTestCase
+
+from app_administradores.pdf_pool import cerrar_pool, renderizar_pdfs
+
+
+class PruebasPoolPdf(SimpleTestCase):
+
+    def tearDown(self):
+        cerrar_pool()
+
+    def documentos(self):
+        # El último no es HTML: debe fallar solo ese documento
+        return [(f'<p>Certificado {i}</p>', None) for i in range(5)] + [(123, None)]
+
+    def comprobar(self, resultados):
+        self.assertEqual(len(resultados), 6)
+        for i in range(5):
+            self.assertIsInstance(resultados[i], bytes)
+            self.assertTrue(resultados[i].startswith(b'%PDF'))
+        self.assertIsInstance(resultados[5], Exception)
+
+    def test_en_el_mismo_proceso(self):
+        self.comprobar(renderizar_pdfs(self.documentos(), procesos=1))
+
+    def test_con_pool_conserva_el_orden(self):
+        resultados = renderizar_pdfs(self.documentos(), procesos=2)
+        self.comprobar(resultados)
+        self.assertEqual(resultados[:5], renderizar_pdfs(self.documentos(), procesos=1)[:5])
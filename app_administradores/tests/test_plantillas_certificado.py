@@ -0,0 +1,91 @@
+from datetime import date
+from unittest import mock
+
+from django.template.loader import render_to_string
+from django.test import TestCase
+from django.urls import reverse
+
+from app_usuarios.models import Usuario, Rol, RolUsuario
+from app_administradores import plantillas
+from app_administradores.models import AdministradorEvento
+from app_administradores.plantillas import PlantillaCertificado, marcadores_desconocidos
+from app_eventos.models import Evento, ConfiguracionCertificado
+
+IMAGENES = ('bG9nbw==', 'png', None, None)
+
+
+class PruebasPlantillaCertificado(TestCase):
+
+    def setUp(self):
+        self.admin_user = Usuario.objects.create_user(
+            username='admin_pla', email='admin@pla.com', password='password123', documento='1'
+        )
+        RolUsuario.objects.create(
+            usuario=self.admin_user,
+            rol=Rol.objects.create(nombre='administrador_evento', descripcion='Administrador de evento')
+        )
+        self.evento = Evento.objects.create(
+            eve_nombre="Evento Plantillas",
+            eve_estado="Aprobado",
+            eve_capacidad=50,
+            eve_tienecosto="No",
+            eve_fecha_inicio=date(2025, 9, 1),
+            eve_fecha_fin=date(2025, 9, 3),
+            eve_administrador_fk=AdministradorEvento.objects.create(usuario=self.admin_user),
+        )
+        self.configuracion = ConfiguracionCertificado.objects.create(
+            evento=self.evento,
+            tipo='premiacion',
+            titulo='Premio',
+            cuerpo='Certificamos que **NOMBRE** (**DOCUMENTO**) obtuvo el **PUESTO** lugar.\n\nEvento **EVENTO**.',
+        )
+
+    def renderizado_directo(self, datos):
+        """El reemplazo de texto seguido de render_to_string que usaban las vistas"""
+        cuerpo = self.configuracion.cuerpo
+        for clave, valor in datos.items():
+            cuerpo = cuerpo.replace(f'**{clave}**', valor)
+        return render_to_string('app_administradores/certificado_plantilla.html', {
+            'configuracion': self.configuracion,
+            'cuerpo_renderizado': cuerpo,
+            'datos': datos,
+            'es_preview': False,
+            'logo_base64': IMAGENES[0],
+            'logo_format': IMAGENES[1],
+            'firma_base64': None,
+            'firma_format': None,
+        })
+
+    def test_coincide_con_el_renderizado_completo(self):
+        plantilla = PlantillaCertificado(self.configuracion, IMAGENES)
+        destinatarios = [
+            {'NOMBRE': 'Ana García', 'DOCUMENTO': '10', 'PUESTO': '1°', 'EVENTO': 'Feria'},
+            {'NOMBRE': "O'Brien & <Co>", 'DOCUMENTO': '20', 'PUESTO': '2°', 'EVENTO': 'Feria'},
+            # Sin PUESTO: el marcador queda tal cual
+            {'NOMBRE': 'Luis', 'DOCUMENTO': '30', 'EVENTO': 'Feria'},
+        ]
+        for datos in destinatarios:
+            self.assertEqual(plantilla.renderizar(datos), self.renderizado_directo(datos))
+
+    def test_la_plantilla_django_se_renderiza_una_vez(self):
+        with mock.patch.object(plantillas, 'render_to_string', wraps=render_to_string) as renderizar:
+            plantilla = PlantillaCertificado(self.configuracion, IMAGENES)
+            for i in range(20):
+                plantilla.renderizar({'NOMBRE': f'Persona {i}', 'DOCUMENTO': str(i), 'PUESTO': '3°'})
+        self.assertEqual(renderizar.call_count, 1)
+
+    def test_marcadores_desconocidos(self):
+        cuerpo = 'Hola **NOMBRE**, puesto **PUESTO**, **CARGO** y **CARGO**; **negrita** no es marcador.'
+        self.assertEqual(marcadores_desconocidos(cuerpo, 'asistencia'), ['PUESTO', 'CARGO'])
+        self.assertEqual(marcadores_desconocidos(cuerpo, 'premiacion'), ['CARGO'])
+
+    def test_configuracion_con_marcador_desconocido_no_se_guarda(self):
+        self.client.force_login(self.admin_user)
+        url = reverse('configurar_certificado', args=[self.evento.pk, 'asistencia'])
+
+        response = self.client.post(url, {'titulo': 'Asistencia', 'cuerpo': 'Gracias **NOMBRE**, **PUESTO** lugar.'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, '**PUESTO**')
+        configuracion = ConfiguracionCertificado.objects.get(evento=self.evento, tipo='asistencia')
+        self.assertNotIn('**PUESTO**', configuracion.cuerpo)
@@ -0,0 +1,247 @@
+import shutil
+import tempfile
+from datetime import date, timedelta
+from io import StringIO
+from unittest.mock import patch
+
+from django.core import mail
+from django.core.mail.backends import locmem
+from django.core.management import call_command
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from app_usuarios.models import Usuario, Rol, RolUsuario
+from app_administradores.models import AdministradorEvento, TrabajoCertificados, EnvioCertificado
+from app_administradores.certificados import Lote, procesar_lote
+from app_eventos.models import Evento, ConfiguracionCertificado
+from app_participantes.models import Participante, ParticipanteEvento
+
+
+class PruebasTrabajosCertificados(TestCase):
+
+    def setUp(self):
+        """Administrador con un evento configurado y tres participantes aprobados."""
+        self.client = Client()
+        # La caché de PDF se escribe en un MEDIA_ROOT temporal
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media, ignore_errors=True)
+        ajustes = override_settings(MEDIA_ROOT=media)
+        ajustes.enable()
+        self.addCleanup(ajustes.disable)
+        rol_admin = Rol.objects.create(nombre='administrador_evento', descripcion='Administrador de evento')
+        self.admin_user = Usuario.objects.create_user(
+            username='admin_cert', email='admin@cert.com', password='password123', documento='1'
+        )
+        RolUsuario.objects.create(usuario=self.admin_user, rol=rol_admin)
+        administrador = AdministradorEvento.objects.create(usuario=self.admin_user)
+        self.evento = Evento.objects.create(
+            eve_nombre="Evento Certificados",
+            eve_ciudad="Manizales",
+            eve_lugar="Auditorio",
+            eve_estado="Aprobado",
+            eve_capacidad=50,
+            eve_tienecosto="No",
+            eve_fecha_inicio=date(2025, 9, 1),
+            eve_fecha_fin=date(2025, 9, 3),
+            eve_administrador_fk=administrador,
+        )
+        ConfiguracionCertificado.objects.create(
+            evento=self.evento,
+            tipo='participacion',
+            titulo='Constancia',
+            cuerpo='Certificamos que **NOMBRE** participó en **EVENTO**.',
+        )
+
+        self.inscripciones = []
+        for i in range(3):
+            usuario = Usuario.objects.create_user(
+                username=f'part_cert{i}', email=f'part{i}@cert.com', password='password123',
+                documento=f'5{i}', first_name='Part', last_name=str(i)
+            )
+            self.inscripciones.append(ParticipanteEvento.objects.create(
+                participante=Participante.objects.create(usuario=usuario),
+                evento=self.evento,
+                par_eve_estado='Aprobado',
+                par_eve_fecha_hora=timezone.now(),
+                confirmado=True,
+            ))
+
+        self.client.force_login(self.admin_user)
+        self.url = reverse('enviar_certificados', args=[self.evento.pk, 'participacion'])
+
+    def test_el_envio_se_encola_sin_generar_correos(self):
+        response = self.client.post(self.url, {'destinatarios': [pe.id for pe in self.inscripciones[:2]]})
+
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(len(mail.outbox), 0)
+        trabajo = TrabajoCertificados.objects.get(evento=self.evento)
+        self.assertEqual(trabajo.estado, 'pendiente')
+        self.assertEqual(trabajo.creado_por, self.admin_user)
+        self.assertEqual(
+            sorted(trabajo.envios.values_list('email', flat=True)),
+            ['part0@cert.com', 'part1@cert.com'],
+        )
+        self.assertEqual(trabajo.envios.first().datos['EVENTO'], 'Evento Certificados')
+        self.assertContains(self.client.get(self.url), reverse('progreso_certificados', args=[trabajo.id]))
+
+    def test_destinatarios_no_aprobados_se_ignoran(self):
+        ParticipanteEvento.objects.filter(pk=self.inscripciones[2].pk).update(par_eve_estado='Pendiente')
+        self.client.post(self.url, {'destinatarios': [self.inscripciones[2].id, 'x']})
+        self.assertFalse(EnvioCertificado.objects.exists())
+
+    def test_worker_envia_los_certificados_y_cierra_el_trabajo(self):
+        self.client.post(self.url, {'destinatarios': [pe.id for pe in self.inscripciones]})
+
+        call_command('procesar_certificados', '--una-vez', '--lote', '2', stdout=StringIO())
+
+        self.assertEqual(len(mail.outbox), 3)
+        correo = mail.outbox[0]
+        self.assertEqual(correo.subject, 'Certificado de Participacion - Evento Certificados')
+        self.assertEqual(correo.attachments[0][0], 'certificado_participacion_50.pdf')
+        trabajo = TrabajoCertificados.objects.get(evento=self.evento)
+        self.assertEqual(trabajo.estado, 'completado')
+        self.assertIsNotNone(trabajo.fecha_fin)
+        self.assertEqual(trabajo.progreso()['enviados'], 3)
+
+    def test_worker_pasa_los_procesos_y_cierra_el_pool(self):
+        with patch('app_administradores.management.commands.procesar_certificados.procesar_lote',
+                   return_value=Lote(0, 0)) as lote, \
+                patch('app_administradores.management.commands.procesar_certificados.cerrar_pool') as cerrar:
+            call_command('procesar_certificados', '--una-vez', '--procesos', '3', stdout=StringIO())
+        lote.assert_called_once_with(20, 3)
+        cerrar.assert_called_once_with()
+
+    def test_worker_poda_la_cache_solo_tras_procesar_envios(self):
+        comando = 'app_administradores.management.commands.procesar_certificados'
+        lotes = [Lote(2, 0), Lote(0, 0), Lote(0, 0), Lote(0, 0)]
+
+        class Detener(Exception):
+            pass
+
+        with patch(f'{comando}.procesar_lote', side_effect=lotes), \
+                patch(f'{comando}.time.sleep', side_effect=[None, None, Detener]), \
+                patch(f'{comando}.podar_cache') as podar:
+            with self.assertRaises(Detener):
+                call_command('procesar_certificados', stdout=StringIO())
+
+        # Tres esperas con la cola vacía, pero una sola poda: la de después del lote
+        podar.assert_called_once_with()
+
+    def test_fallos_se_reintentan_y_quedan_como_error(self):
+        self.client.post(self.url, {'destinatarios': [self.inscripciones[0].id]})
+        ConfiguracionCertificado.objects.all().delete()
+
+        self.assertEqual(procesar_lote().procesados, 1)
+        envio = EnvioCertificado.objects.get()
+        self.assertEqual((envio.estado, envio.intentos), ('pendiente', 1))
+        self.assertGreater(envio.proximo_intento, timezone.now())
+        # Espera exponencial: no se reintenta en el siguiente lote
+        self.assertEqual(procesar_lote().procesados, 0)
+
+        for _ in range(2):
+            EnvioCertificado.objects.update(proximo_intento=timezone.now())
+            procesar_lote()
+        envio.refresh_from_db()
+        self.assertEqual(envio.estado, 'error')
+        self.assertEqual(TrabajoCertificados.objects.get().estado, 'con_errores')
+        self.assertEqual(procesar_lote().procesados, 0)
+
+    def test_sin_conexion_los_envios_vuelven_a_la_cola_y_se_devuelve_el_cupo(self):
+        self.client.post(self.url, {'destinatarios': [pe.id for pe in self.inscripciones]})
+
+        with patch('django.core.mail.backends.locmem.EmailBackend.open', side_effect=ConnectionRefusedError('SMTP caído')), \
+                patch('app_administradores.certificados.devolver_envio') as devolver:
+            self.assertEqual(procesar_lote().procesados, 3)
+
+        devolver.assert_called_with(3)
+        self.assertEqual(
+            list(EnvioCertificado.objects.values_list('estado', 'intentos').distinct()), [('pendiente', 1)]
+        )
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_la_conexion_se_reabre_tras_un_error_de_envio(self):
+        self.client.post(self.url, {'destinatarios': [pe.id for pe in self.inscripciones]})
+        original = locmem.EmailBackend.send_messages
+
+        def enviar(backend, mensajes):
+            if mensajes[0].to == ['part0@cert.com']:
+                raise ConnectionResetError('Sesión cerrada')
+            return original(backend, mensajes)
+
+        with patch('django.core.mail.backends.locmem.EmailBackend.send_messages', enviar), \
+                patch('app_administradores.certificados.reabrir_conexion') as reabrir:
+            procesar_lote()
+
+        reabrir.assert_called_once()
+        self.assertEqual(len(mail.outbox), 2)
+
+    def test_envios_abandonados_vuelven_a_la_cola(self):
+        self.client.post(self.url, {'destinatarios': [self.inscripciones[0].id]})
+        EnvioCertificado.objects.update(estado='procesando', iniciado=timezone.now() - timedelta(hours=1))
+
+        call_command('procesar_certificados', '--una-vez', stdout=StringIO())
+
+        self.assertEqual(EnvioCertificado.objects.get().estado, 'enviado')
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_progreso_del_trabajo(self):
+        self.client.post(self.url, {'destinatarios': [pe.id for pe in self.inscripciones]})
+        trabajo = TrabajoCertificados.objects.get()
+        procesar_lote(limite=1)
+
+        response = self.client.get(reverse('progreso_certificados', args=[trabajo.id]))
+
+        data = response.json()
+        self.assertTrue(data['success'])
+        self.assertEqual(data['estado'], 'en_proceso')
+        self.assertEqual((data['total'], data['enviados'], data['pendientes']), (3, 1, 2))
+        self.assertFalse(data['terminado'])
+
+    def test_progreso_de_otro_administrador_no_es_visible(self):
+        self.client.post(self.url, {'destinatarios': [self.inscripciones[0].id]})
+        trabajo = TrabajoCertificados.objects.get()
+        otro = Usuario.objects.create_user(
+            username='otro_admin', email='otro@cert.com', password='password123', documento='2'
+        )
+        RolUsuario.objects.create(usuario=otro, rol=Rol.objects.get(nombre='administrador_evento'))
+        AdministradorEvento.objects.create(usuario=otro)
+        self.client.force_login(otro)
+
+        response = self.client.get(reverse('progreso_certificados', args=[trabajo.id]))
+        self.assertEqual(response.status_code, 403)
+
+    @override_settings(CORREOS_POR_MINUTO=2, CORREOS_CUOTA_DIARIA=0)
+    def test_el_worker_respeta_el_limite_de_correo(self):
+        self.client.post(self.url, {'destinatarios': [pe.id for pe in self.inscripciones]})
+
+        self.assertEqual(procesar_lote().procesados, 2)
+        # El envío que no cabía en el minuto vuelve a la cola sin gastar un intento
+        envio = EnvioCertificado.objects.get(estado='pendiente')
+        self.assertEqual(envio.intentos, 0)
+        lote = procesar_lote()
+        self.assertEqual(lote.procesados, 0)
+        self.assertGreater(lote.espera, 0)
+
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertEqual(TrabajoCertificados.objects.get().progreso()['pendientes'], 1)
+
+    @override_settings(CORREOS_POR_MINUTO=2, CORREOS_CUOTA_DIARIA=0)
+    def test_una_vez_espera_al_limite_en_lugar_de_terminar(self):
+        self.client.post(self.url, {'destinatarios': [pe.id for pe in self.inscripciones]})
+
+        # El reloj avanza solo cuando el comando duerme esperando al límite
+        ahora = [timezone.now()]
+
+        def dormir(segundos):
+            ahora[0] += timedelta(seconds=segundos)
+
+        with patch('app_administradores.management.commands.procesar_certificados.time.sleep',
+                   side_effect=dormir) as espera, \
+                patch('django.utils.timezone.now', side_effect=lambda: ahora[0]):
+            call_command('procesar_certificados', '--una-vez', stdout=StringIO())
+
+        espera.assert_called()
+
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertEqual(TrabajoCertificados.objects.get().progreso()['pendientes'], 0)
@@ -36,6 +36,7 @@ urlpatterns = [
     path('detalle-evaluador/<int:eve_id>/<int:evaluador_id>/', views.detalle_evaluador, name='detalle_evaluador_evento'),
     path('descargar-documento-evaluador/<int:eve_id>/<int:evaluador_id>/', views.descargar_documento_evaluador, name='descargar_documento_evaluador_evento'),
     path('gestionar-notificaciones/', views.gestionar_notificaciones, name='gestionar_notificaciones'),
+    path('gestionar-notificaciones/<uuid:grupo>/progreso/', views.progreso_notificaciones, name='progreso_notificaciones'),
     
     # URLs para gestión de archivos del evento
     path('gestionar-archivos/<int:eve_id>/', views.gestionar_archivos_evento, name='gestionar_archivos_evento'),
@@ -49,6 +50,8 @@ urlpatterns = [
     # URL específica para premiación debe ir antes que la URL general
     path('certificados/<int:eve_id>/premiacion/enviar/', views.enviar_certificados_premiacion, name='enviar_certificados_premiacion'),
     path('certificados/<int:eve_id>/<str:tipo>/enviar/', views.enviar_certificados, name='enviar_certificados'),
+    path('certificados/<int:eve_id>/<str:tipo>/exportar/', views.exportar_certificados_zip, name='exportar_certificados_zip'),
+    path('certificados/trabajos/<int:trabajo_id>/progreso/', views.progreso_certificados, name='progreso_certificados'),
 
     path('evento/<int:eve_id>/restriccion_rubrica/', views.restriccion_rubrica, name='restriccion_rubrica'),
 
@@ -5,7 +5,7 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
 from django.urls import reverse
 from django.views.decorators.http import require_http_methods
-from django.http import JsonResponse, FileResponse
+from django.http import JsonResponse, FileResponse, StreamingHttpResponse
 from django.core.files.base import ContentFile
 from django.utils.crypto import get_random_string
 from django.conf import settings
@@ -19,15 +19,22 @@ from django.template.loader import get_template
 from xhtml2pdf import pisa
 from django.contrib import messages
 from django.shortcuts import redirect
-from .models import AdministradorEvento, CodigoInvitacionAdminEvento, CodigoInvitacionEvento
+from .models import AdministradorEvento, CodigoInvitacionAdminEvento, CodigoInvitacionEvento, TrabajoCertificados
+from .plantillas import marcadores_desconocidos, marcadores_permitidos
+from .certificados import (
+    RELACION_USUARIO, datos_certificado, encolar_certificados, imagenes_certificado,
+    inscripciones_certificables, invalidar_imagenes_certificado, zip_certificados
+)
 from app_eventos.models import Evento
 from app_eventos.models import EventoCategoria
 from app_areas.models import Area, Categoria
 from app_participantes.models import ParticipanteEvento, Participante
 from app_asistentes.models import AsistenteEvento
 from app_evaluadores.models import Criterio, Calificacion
+from app_evaluadores.ranking import ranking_evento, sincronizar_notas_pendientes
+from app_participantes.grupos import grupos_del_evento
 from app_evaluadores.models import EvaluadorEvento, Evaluador
-from app_usuarios.models import Usuario
+from app_usuarios.models import Usuario, CorreoSaliente
 from app_asistentes.models import Asistente, AsistenteEvento
 from app_participantes.models import Participante, ParticipanteEvento
 from app_evaluadores.models import Evaluador, EvaluadorEvento
@@ -42,7 +49,10 @@ import mimetypes
 import os
 from django.template.loader import render_to_string
 from django.core.mail import EmailMessage
-from app_usuarios.models import Rol, RolUsuario
+from app_usuarios.correos import encolar_correo, encolar_notificacion, resumen_notificacion
+from app_usuarios.plantillas_correo import renderizar_correo, contexto_evento
+from app_usuarios.models import RolUsuario
+from app_usuarios.catalogo_roles import id_rol
 from django.template import Context, Template
 from app_eventos.models import ConfiguracionCertificado
 from django.contrib import messages
@@ -187,17 +197,13 @@ def crear_evento(request):
             EventoCategoria.objects.create(evento=evento, categoria_id=cat_id)
 
         # Enviar correo a los superadmin
-        try:
-            rol_superadmin = Rol.objects.get(nombre__iexact='superadmin')
-            usuarios_superadmin = RolUsuario.objects.filter(rol=rol_superadmin).select_related('usuario')
-            correos_superadmin = [ru.usuario.email for ru in usuarios_superadmin if ru.usuario.email]
-        except Rol.DoesNotExist:
-            correos_superadmin = []
+        usuarios_superadmin = RolUsuario.objects.filter(rol_id=id_rol('superadmin')).select_related('usuario')
+        correos_superadmin = [ru.usuario.email for ru in usuarios_superadmin if ru.usuario.email]
 
         if correos_superadmin:
-            cuerpo_html = render_to_string('correo_nuevo_evento_superadmin.html', {
-                'evento': evento,
-                'creador': request.user,
+            cuerpo_html = renderizar_correo('correo_nuevo_evento_superadmin.html', {
+                'evento': contexto_evento(evento),
+                'creador': request.user.get_full_name() or request.user.email,
             })
             email = EmailMessage(
                 subject=f'Nuevo evento creado: {evento.eve_nombre}',
@@ -205,7 +211,7 @@ def crear_evento(request):
                 to=correos_superadmin,
             )
             email.content_subtype = 'html'
-            email.send(fail_silently=True)
+            encolar_correo(email)
 
         messages.success(request, "Evento creado exitosamente.")
         return redirect(reverse('dashboard_adminevento'))
@@ -373,7 +379,7 @@ def _eliminar_informacion_evento_completo(evento):
             asistente = Asistente.objects.get(id=asistente_id)
             if not AsistenteEvento.objects.filter(asistente=asistente).exists():
                 usuario = asistente.usuario
-                RolUsuario.objects.filter(usuario=usuario, rol__nombre='asistente').delete()
+                RolUsuario.objects.filter(usuario=usuario, rol_id=id_rol('asistente')).delete()
                 asistente.delete()
                 if not RolUsuario.objects.filter(usuario=usuario).exists():
                     usuario.delete()
@@ -391,7 +397,7 @@ def _eliminar_informacion_evento_completo(evento):
             participante = Participante.objects.get(id=participante_id)
             if not ParticipanteEvento.objects.filter(participante=participante).exists():
                 usuario = participante.usuario
-                RolUsuario.objects.filter(usuario=usuario, rol__nombre='participante').delete()
+                RolUsuario.objects.filter(usuario=usuario, rol_id=id_rol('participante')).delete()
                 participante.delete()
                 if not RolUsuario.objects.filter(usuario=usuario).exists():
                     usuario.delete()
@@ -409,7 +415,7 @@ def _eliminar_informacion_evento_completo(evento):
             evaluador = Evaluador.objects.get(id=evaluador_id)
             if not EvaluadorEvento.objects.filter(evaluador=evaluador).exists():
                 usuario = evaluador.usuario
-                RolUsuario.objects.filter(usuario=usuario, rol__nombre='evaluador').delete()
+                RolUsuario.objects.filter(usuario=usuario, rol_id=id_rol('evaluador')).delete()
                 evaluador.delete()
                 if not RolUsuario.objects.filter(usuario=usuario).exists():
                     usuario.delete()
@@ -432,7 +438,7 @@ def _eliminar_informacion_evento_completo(evento):
             if not tiene_limite_positivo:
                 # Eliminar códigos, rol y usuario
                 codigos_admin.delete()
-                RolUsuario.objects.filter(usuario=usuario_admin, rol__nombre='administrador_evento').delete()
+                RolUsuario.objects.filter(usuario=usuario_admin, rol_id=id_rol('administrador_evento')).delete()
                 administrador.delete()
                 if not RolUsuario.objects.filter(usuario=usuario_admin).exists():
                     usuario_admin.delete()
@@ -561,11 +567,11 @@ def detalle_asistente(request, eve_id, asistente_id):
         usuario_asistente = asistente_evento.asistente.usuario
         if usuario_asistente and usuario_asistente.email:
             
-            cuerpo_html = render_to_string('correo_estado_asistente.html', {
-                'evento': evento,
-                'asistente': usuario_asistente,
-                'nuevo_estado': nuevo_estado,
-            })
+            cuerpo_html = renderizar_correo(
+                'correo_estado_asistente.html',
+                {'evento': contexto_evento(evento), 'nuevo_estado': nuevo_estado},
+                nombre=usuario_asistente.get_full_name() or usuario_asistente.email,
+            )
             email = EmailMessage(
                 subject=f'Actualización de estado de tu inscripción como asistente en {evento.eve_nombre}',
                 body=cuerpo_html,
@@ -576,7 +582,7 @@ def detalle_asistente(request, eve_id, asistente_id):
                 # Adjuntar QR
                 qr_path = asistente_evento.asi_eve_qr.path
                 email.attach_file(qr_path)
-            email.send(fail_silently=True)
+            encolar_correo(email)
 
         return redirect('ver_asistentes_evento', eve_id=eve_id)
 
@@ -616,12 +622,12 @@ def detalle_participante(request, eve_id, participante_id):
         creador=participante
     )
 
-    # Si es proyecto grupal, obtener también a los demás integrantes del mismo código
+    # Si es proyecto grupal, obtener también a los demás integrantes del mismo equipo
     integrantes_grupo = []
-    if participante_evento.codigo:
+    if participante_evento.equipo_id:
         integrantes_grupo = (
             ParticipanteEvento.objects
-            .filter(evento=evento, codigo=participante_evento.codigo)
+            .filter(equipo_id=participante_evento.equipo_id)
             .select_related('participante__usuario')
         )
 
@@ -650,10 +656,9 @@ def detalle_participante(request, eve_id, participante_id):
                 Proyecto.objects.filter(evento=evento, creador=participante).update(estado='Aprobado')
 
                 # Si es grupal, aprobar a todos los integrantes del grupo
-                if participante_evento.codigo:
+                if participante_evento.equipo_id:
                     grupo_qs = ParticipanteEvento.objects.filter(
-                        evento=evento,
-                        codigo=participante_evento.codigo
+                        equipo_id=participante_evento.equipo_id
                     ).select_related('participante__usuario')
 
                     for pe in grupo_qs:
@@ -671,11 +676,11 @@ def detalle_participante(request, eve_id, participante_id):
 
                         usuario_int = pe.participante.usuario
                         if usuario_int and usuario_int.email:
-                            cuerpo_html_int = render_to_string('correo_estado_participante.html', {
-                                'evento': evento,
-                                'participante': usuario_int,
-                                'nuevo_estado': 'Aprobado',
-                            })
+                            cuerpo_html_int = renderizar_correo(
+                                'correo_estado_participante.html',
+                                {'evento': contexto_evento(evento), 'nuevo_estado': 'Aprobado'},
+                                nombre=usuario_int.get_full_name() or usuario_int.email,
+                            )
                             email_int = EmailMessage(
                                 subject=f'Actualización de estado de tu inscripción como participante en {evento.eve_nombre}',
                                 body=cuerpo_html_int,
@@ -685,7 +690,7 @@ def detalle_participante(request, eve_id, participante_id):
                             if pe.par_eve_qr:
                                 qr_path_int = pe.par_eve_qr.path
                                 email_int.attach_file(qr_path_int)
-                            email_int.send(fail_silently=True)
+                            encolar_correo(email_int)
 
                 messages.success(request, "Inscripción aprobada")
 
@@ -699,10 +704,9 @@ def detalle_participante(request, eve_id, participante_id):
                 # Proyectos propios vuelven a Pendiente
                 Proyecto.objects.filter(evento=evento, creador=participante).update(estado='Pendiente')
 
-                if participante_evento.codigo:
+                if participante_evento.equipo_id:
                     ParticipanteEvento.objects.filter(
-                        evento=evento,
-                        codigo=participante_evento.codigo
+                        equipo_id=participante_evento.equipo_id
                     ).exclude(id=participante_evento.id).update(par_eve_estado='Pendiente')
 
                 messages.info(request, "Estado restablecido a pendiente")
@@ -714,21 +718,20 @@ def detalle_participante(request, eve_id, participante_id):
                 # Proyectos propios pasan a Rechazado
                 Proyecto.objects.filter(evento=evento, creador=participante).update(estado='Rechazado')
 
-                if participante_evento.codigo:
+                if participante_evento.equipo_id:
                     ParticipanteEvento.objects.filter(
-                        evento=evento,
-                        codigo=participante_evento.codigo
+                        equipo_id=participante_evento.equipo_id
                     ).exclude(id=participante_evento.id).update(par_eve_estado='Rechazado')
 
                 messages.warning(request, "Inscripción rechazada")
 
             # Correo al participante principal
             if usuario_participante and usuario_participante.email:
-                cuerpo_html = render_to_string('correo_estado_participante.html', {
-                    'evento': evento,
-                    'participante': usuario_participante,
-                    'nuevo_estado': nuevo_estado,
-                })
+                cuerpo_html = renderizar_correo(
+                    'correo_estado_participante.html',
+                    {'evento': contexto_evento(evento), 'nuevo_estado': nuevo_estado},
+                    nombre=usuario_participante.get_full_name() or usuario_participante.email,
+                )
                 email = EmailMessage(
                     subject=f'Actualización de estado de tu inscripción como participante en {evento.eve_nombre}',
                     body=cuerpo_html,
@@ -738,7 +741,7 @@ def detalle_participante(request, eve_id, participante_id):
                 if nuevo_estado == 'Aprobado' and participante_evento.par_eve_qr:
                     qr_path = participante_evento.par_eve_qr.path
                     email.attach_file(qr_path)
-                email.send(fail_silently=True)
+                encolar_correo(email)
 
             return redirect('detalle_participante_evento', eve_id=eve_id, participante_id=participante_id)
 
@@ -831,11 +834,11 @@ def detalle_evaluador(request, eve_id, evaluador_id):
             # Enviar correo al evaluador
             usuario_evaluador = usuario
             if usuario_evaluador and usuario_evaluador.email:
-                cuerpo_html = render_to_string('correo_estado_evaluador.html', {
-                    'evento': evento,
-                    'evaluador': usuario_evaluador,
-                    'nuevo_estado': nuevo_estado,
-                })
+                cuerpo_html = renderizar_correo(
+                    'correo_estado_evaluador.html',
+                    {'evento': contexto_evento(evento), 'nuevo_estado': nuevo_estado},
+                    nombre=usuario_evaluador.get_full_name() or usuario_evaluador.email,
+                )
                 email = EmailMessage(
                     subject=f'Actualización de estado de tu inscripción como evaluador en {evento.eve_nombre}',
                     body=cuerpo_html,
@@ -845,7 +848,7 @@ def detalle_evaluador(request, eve_id, evaluador_id):
                 if nuevo_estado == 'Aprobado' and evaluador_evento.eva_eve_qr:
                     qr_path = evaluador_evento.eva_eve_qr.path
                     email.attach_file(qr_path)
-                email.send(fail_silently=True)
+                encolar_correo(email)
 
             return redirect('detalle_evaluador_evento', eve_id=eve_id, evaluador_id=evaluador_id)
     return render(request, 'detalle_evaluador.html', {
@@ -1126,123 +1129,9 @@ def ver_tabla_posiciones(request, eve_id):
         messages.error(request, "Solo puedes acceder a esta función si el evento está aprobado.")
         return redirect('listar_eventos')
 
-    criterios = Criterio.objects.filter(cri_evento_fk=evento)
-    peso_total = sum(c.cri_peso for c in criterios) or 1
-
-    from app_participantes.models import Proyecto
-
-    # Participantes aprobados (PE principal)
-    participantes_evento = ParticipanteEvento.objects.filter(
-        evento=evento,
-        par_eve_estado='Aprobado'
-    ).select_related('participante__usuario', 'proyecto')
-
-    # --- construir estructura por participante ---
-    datos = {}
-
-    for pe in participantes_evento:
-        p = pe.participante
-        if p.id not in datos:
-            # calcular / usar nota
-            if pe.par_eve_valor is not None:
-                puntaje_ponderado = pe.par_eve_valor
-            else:
-                calificaciones = Calificacion.objects.filter(
-                    participante=p,
-                    criterio__cri_evento_fk=evento
-                ).select_related('criterio')
-                evaluadores_ids = set(c.evaluador_id for c in calificaciones)
-                num_evaluadores = len(evaluadores_ids)
-                if num_evaluadores > 0:
-                    puntaje_ponderado = sum(
-                        c.cal_valor * c.criterio.cri_peso for c in calificaciones
-                    ) / (peso_total * num_evaluadores)
-                    puntaje_ponderado = round(puntaje_ponderado, 2)
-                    pe.par_eve_valor = puntaje_ponderado
-                    pe.save()
-                else:
-                    puntaje_ponderado = 0
-
-            datos[p.id] = {
-                'participante': p,
-                'puntaje': puntaje_ponderado,
-                'principal_proyecto': pe.proyecto,
-                'proyectos_extra': set(),
-                'codigo': pe.codigo,
-            }
-
-    # proyectos creados por cada participante (principal + extras)
-    for p_id, info in list(datos.items()):
-        p = info['participante']
-        creados = Proyecto.objects.filter(
-            evento=evento,
-            creador=p
-        ).order_by('fecha_subida', 'id')
-
-        principal = info['principal_proyecto']
-        extras = set()
-
-        for pr in creados:
-            if principal and pr.id == principal.id:
-                continue
-            extras.add(pr)
-
-        info['proyectos_extra'] = extras
-
-    # proyectos del líder para integrantes grupales
-    for p_id, info in list(datos.items()):
-        codigo = info['codigo']
-        if not codigo:
-            continue
-
-        lider_ids = Proyecto.objects.filter(
-            evento=evento
-        ).exclude(creador__isnull=True).values_list('creador_id', flat=True)
-
-        pe_lider = ParticipanteEvento.objects.filter(
-            evento=evento,
-            codigo=codigo,
-            participante_id__in=lider_ids
-        ).first()
-
-        if not pe_lider:
-            continue
-
-        proyectos_lider = Proyecto.objects.filter(
-            evento=evento,
-            creador_id=pe_lider.participante_id
-        ).order_by('fecha_subida', 'id')
-
-        principal = info['principal_proyecto']
-        extras = info['proyectos_extra']
-
-        for pr in proyectos_lider:
-            if principal and pr.id == principal.id:
-                continue
-            extras.add(pr)
-
-        info['proyectos_extra'] = extras
-
-    # lista final de posiciones
-    posiciones = []
-    for info in datos.values():
-        proyectos = []
-        if info['principal_proyecto']:
-            proyectos.append(info['principal_proyecto'])
-        extras_ordenados = sorted(
-            list(info['proyectos_extra']),
-            key=lambda pr: (pr.fecha_subida, pr.id)
-        )
-        proyectos.extend(extras_ordenados)
-
-        posiciones.append({
-            'participante': info['participante'],
-            'puntaje': info['puntaje'],
-            'proyectos': proyectos,          # lista de proyectos
-            'codigo': info['codigo'],        # para tipo de participación
-        })
-
-    posiciones.sort(key=lambda x: x['puntaje'], reverse=True)
+    # Completa las notas que falten y ordena en la base de datos
+    sincronizar_notas_pendientes(evento)
+    posiciones = ranking_evento(evento)
 
     return render(request, 'tabla_posiciones.html', {
         'evento': evento,
@@ -1257,88 +1146,7 @@ def descargar_tabla_posiciones_pdf_admin(request, eve_id):
         messages.error(request, "No tienes permiso para acceder a este evento.")
         return redirect('dashboard_adminevento')
 
-    participantes_evento = ParticipanteEvento.objects.filter(
-        evento=evento,
-        par_eve_estado='Aprobado',
-        par_eve_valor__isnull=False
-    ).select_related('participante__usuario', 'proyecto')
-
-    from app_participantes.models import Proyecto
-
-    datos = {}
-    for pe in participantes_evento:
-        p = pe.participante
-        if p.id not in datos:
-            datos[p.id] = {
-                'participante': p,
-                'puntaje': pe.par_eve_valor,
-                'principal_proyecto': pe.proyecto,
-                'proyectos_extra': set(),
-                'codigo': pe.codigo,
-            }
-
-    for p_id, info in list(datos.items()):
-        p = info['participante']
-        creados = Proyecto.objects.filter(
-            evento=evento,
-            creador=p
-        ).order_by('fecha_subida', 'id')
-
-        principal = info['principal_proyecto']
-        extras = set()
-        for pr in creados:
-            if principal and pr.id == principal.id:
-                continue
-            extras.add(pr)
-        info['proyectos_extra'] = extras
-
-    for p_id, info in list(datos.items()):
-        codigo = info['codigo']
-        if not codigo:
-            continue
-        lider_ids = Proyecto.objects.filter(
-            evento=evento
-        ).exclude(creador__isnull=True).values_list('creador_id', flat=True)
-
-        pe_lider = ParticipanteEvento.objects.filter(
-            evento=evento,
-            codigo=codigo,
-            participante_id__in=lider_ids
-        ).first()
-        if not pe_lider:
-            continue
-
-        proyectos_lider = Proyecto.objects.filter(
-            evento=evento,
-            creador_id=pe_lider.participante_id
-        ).order_by('fecha_subida', 'id')
-
-        principal = info['principal_proyecto']
-        extras = info['proyectos_extra']
-        for pr in proyectos_lider:
-            if principal and pr.id == principal.id:
-                continue
-            extras.add(pr)
-        info['proyectos_extra'] = extras
-
-    posiciones = []
-    for info in datos.values():
-        proyectos = []
-        if info['principal_proyecto']:
-            proyectos.append(info['principal_proyecto'])
-        extras_ordenados = sorted(
-            list(info['proyectos_extra']),
-            key=lambda pr: (pr.fecha_subida, pr.id)
-        )
-        proyectos.extend(extras_ordenados)
-        posiciones.append({
-            'participante': info['participante'],
-            'puntaje': info['puntaje'],
-            'proyectos': proyectos,
-            'codigo': info['codigo'],
-        })
-
-    posiciones.sort(key=lambda x: x['puntaje'], reverse=True)
+    posiciones = ranking_evento(evento, solo_calificados=True)
 
     # --- PDF landscape ---
     response = HttpResponse(content_type='application/pdf')
@@ -1370,7 +1178,7 @@ def descargar_tabla_posiciones_pdf_admin(request, eve_id):
     data = [["Posición", "Nombre del Participante", "Correo",
              "Tipo de participación", "Proyectos", "Puntaje"]]
 
-    for i, pos in enumerate(posiciones, start=1):
+    for pos in posiciones:
         p = pos['participante']
         nombre = f"{p.usuario.first_name} {p.usuario.last_name}"
         correo = p.usuario.email
@@ -1382,7 +1190,7 @@ def descargar_tabla_posiciones_pdf_admin(request, eve_id):
         proyectos_par = Paragraph(nombres_proyectos, styles['Normal'])
         puntaje = f"{pos['puntaje']:.1f}"
 
-        data.append([str(i), nombre, correo, tipo, proyectos_par, puntaje])
+        data.append([str(pos['puesto']), nombre, correo, tipo, proyectos_par, puntaje])
 
     col_widths = [
         0.8*inch,
@@ -1437,41 +1245,27 @@ def info_detallada_admin(request, eve_id):
 
     participantes_info = []
 
+    # Referente de cada grupo y todas las calificaciones del evento, en consultas fijas
+    grupos = grupos_del_evento(evento)
+    calificaciones_por_participante = {}
+    for c in Calificacion.objects.select_related(
+        'criterio',
+        'evaluador__usuario'
+    ).filter(criterio__cri_evento_fk=evento).order_by('pk'):
+        calificaciones_por_participante.setdefault(c.participante_id, []).append(c)
+
     for pe in participantes_evento:
         participante = pe.participante
 
-        # -------- buscar participante de referencia (para grupales) --------
-        participante_referencia = participante
-
-        if pe.codigo:
-            # todos los integrantes del grupo
-            grupo = ParticipanteEvento.objects.filter(
-                evento=evento,
-                codigo=pe.codigo
-            ).select_related('participante')
-
-            # primero intenta encontrar alguien con calificaciones
-            ref = None
-            for pe_g in grupo:
-                if Calificacion.objects.filter(
-                    participante=pe_g.participante,
-                    criterio__cri_evento_fk=evento
-                ).exists():
-                    ref = pe_g.participante
-                    break
-
-            # si no hay nadie calificado aún, se mantiene el propio participante
-            if ref:
-                participante_referencia = ref
+        # -------- participante de referencia (para grupales) --------
+        # si nadie del grupo está calificado aún, se mantiene el propio participante
+        referencia_id = participante.id
+        grupo = grupos.get(pe.codigo) if pe.codigo else None
+        if grupo and grupo.referencia is not None:
+            referencia_id = grupo.referencia
 
         # -------- calificaciones sobre el referente (individual o grupo) --------
-        calificaciones = Calificacion.objects.select_related(
-            'criterio',
-            'evaluador__usuario'
-        ).filter(
-            participante=participante_referencia,
-            criterio__cri_evento_fk=evento
-        )
+        calificaciones = calificaciones_por_participante.get(referencia_id, [])
 
         evaluadores_ids = {c.evaluador_id for c in calificaciones}
         num_evaluadores = len(evaluadores_ids)
@@ -1567,47 +1361,35 @@ def gestionar_notificaciones(request):
         if not asunto or not mensaje or not seleccionados:
             messages.error(request, 'Debes completar el asunto, mensaje y seleccionar al menos un destinatario.')
         else:
-            enviados = 0
             if tipo == 'asistentes':
-                qs = AsistenteEvento.objects.select_related('asistente__usuario').filter(pk__in=seleccionados)
-                for ae in qs:
-                    usuario = ae.asistente.usuario
-                    if usuario.email:
-                        email = EmailMessage(
-                            subject=asunto,
-                            body=mensaje,
-                            to=[usuario.email],
-                        )
-                        email.content_subtype = 'html'
-                        email.send(fail_silently=True)
-                        enviados += 1
+                qs = AsistenteEvento.objects.select_related('asistente__usuario', 'evento').filter(pk__in=seleccionados)
+                inscripciones = [(ae.asistente.usuario, ae.evento) for ae in qs]
             elif tipo == 'participantes':
-                qs = ParticipanteEvento.objects.select_related('participante__usuario').filter(pk__in=seleccionados)
-                for pe in qs:
-                    usuario = pe.participante.usuario
-                    if usuario.email:
-                        email = EmailMessage(
-                            subject=asunto,
-                            body=mensaje,
-                            to=[usuario.email],
-                        )
-                        email.content_subtype = 'html'
-                        email.send(fail_silently=True)
-                        enviados += 1
+                qs = ParticipanteEvento.objects.select_related('participante__usuario', 'evento').filter(pk__in=seleccionados)
+                inscripciones = [(pe.participante.usuario, pe.evento) for pe in qs]
             elif tipo == 'evaluadores':
-                qs = EvaluadorEvento.objects.select_related('evaluador__usuario').filter(pk__in=seleccionados)
-                for ee in qs:
-                    usuario = ee.evaluador.usuario
-                    if usuario.email:
-                        email = EmailMessage(
-                            subject=asunto,
-                            body=mensaje,
-                            to=[usuario.email],
-                        )
-                        email.content_subtype = 'html'
-                        email.send(fail_silently=True)
-                        enviados += 1
-            messages.success(request, f'Notificaciones enviadas a {enviados} destinatario(s).')
+                qs = EvaluadorEvento.objects.select_related('evaluador__usuario', 'evento').filter(pk__in=seleccionados)
+                inscripciones = [(ee.evaluador.usuario, ee.evento) for ee in qs]
+            else:
+                inscripciones = []
+            # Un solo mensaje para todos; **NOMBRE**, **DOCUMENTO** y **EVENTO** se
+            # reemplazan con los datos de cada destinatario al enviarlo
+            datos_destinatarios = {
+                usuario.email: {
+                    'NOMBRE': f"{usuario.first_name} {usuario.last_name}".strip(),
+                    'DOCUMENTO': usuario.documento,
+                    'EVENTO': evento.eve_nombre,
+                }
+                for usuario, evento in inscripciones if usuario.email
+            }
+            grupo = encolar_notificacion(asunto, mensaje, datos_destinatarios, creado_por=request.user)
+            # El progreso real del envío se muestra en la página con progreso_notificaciones
+            request.session['ultima_notificacion'] = str(grupo)
+            messages.success(
+                request,
+                f'Notificación programada para {len(datos_destinatarios)} destinatario(s). '
+                'Los correos se envían de forma escalonada según el límite del servidor de correo.'
+            )
             return redirect('gestionar_notificaciones')
 
     return render(request, 'gestionar_notificaciones.html', {
@@ -1622,6 +1404,25 @@ def gestionar_notificaciones(request):
         'filtro_estado': filtro_estado,
         'filtro_confirmado': filtro_confirmado,
         'evento_seleccionado': evento_seleccionado,
+        'ultima_notificacion': request.session.get('ultima_notificacion'),
+    })
+
+
+@login_required
+@user_passes_test(es_administrador_evento, login_url='ver_eventos')
+def progreso_notificaciones(request, grupo):
+    """Destinatarios enviados, aplazados y fallidos de una notificación masiva"""
+    correos = CorreoSaliente.objects.filter(grupo=grupo)
+    if not correos.filter(creado_por=request.user).exists():
+        return JsonResponse({'success': False, 'error': 'Notificación no encontrada.'}, status=404)
+
+    detalle_errores = list(
+        correos.filter(estado='error').order_by('id').values('para', 'error')[:20]
+    )
+    return JsonResponse({
+        'success': True,
+        **resumen_notificacion(grupo),
+        'detalle_errores': detalle_errores,
     })
 
 
@@ -1701,39 +1502,6 @@ def eliminar_archivo_evento(request, eve_id):
     return redirect('gestionar_archivos_evento', eve_id=eve_id)
 
 
-# ===============================
-# FUNCIONES HELPER
-# ===============================
-
-def imagen_to_base64(imagen_field):
-    """Convierte un campo de imagen de Django a base64 para usar en PDFs"""
-    if imagen_field and hasattr(imagen_field, 'path'):
-        try:
-            with open(imagen_field.path, 'rb') as image_file:
-                encoded_string = base64.b64encode(image_file.read()).decode('utf-8')
-                # Detectar el formato de la imagen
-                mime_type, _ = mimetypes.guess_type(imagen_field.path)
-                if mime_type:
-                    format_name = mime_type.split('/')[1]
-                else:
-                    # Fallback basado en la extensión
-                    ext = os.path.splitext(imagen_field.path)[1].lower()
-                    if ext in ['.jpg', '.jpeg']:
-                        format_name = 'jpeg'
-                    elif ext == '.png':
-                        format_name = 'png'
-                    elif ext == '.gif':
-                        format_name = 'gif'
-                    else:
-                        format_name = 'jpeg'  # default
-                
-                return encoded_string, format_name
-        except Exception as e:
-            print(f"Error al convertir imagen a base64: {e}")
-            return None, None
-    return None, None
-
-
 # ===============================
 # GESTIÓN DE CERTIFICADOS
 # ===============================
@@ -1810,6 +1578,25 @@ def configurar_certificado(request, eve_id, tipo):
         configuracion.cuerpo = request.POST.get('cuerpo', configuracion.cuerpo)
         configuracion.plantilla = request.POST.get('plantilla', configuracion.plantilla)
         
+        # Los marcadores se validan aquí para no descubrir el error al enviar
+        desconocidos = marcadores_desconocidos(configuracion.cuerpo, tipo)
+        if desconocidos:
+            messages.error(
+                request,
+                f"El cuerpo usa marcadores no disponibles: {', '.join(f'**{m}**' for m in desconocidos)}. "
+                f"Marcadores disponibles: {', '.join(f'**{m}**' for m in marcadores_permitidos(tipo))}."
+            )
+            return render(request, 'configurar_certificado.html', {
+                'evento': evento,
+                'tipo': tipo,
+                'configuracion': configuracion,
+                'plantillas': ConfiguracionCertificado.PLANTILLA_CHOICES
+            })
+        
+        # Las imágenes en caché del certificado dejan de valer si se sube una nueva
+        if 'logo' in request.FILES or 'firma' in request.FILES:
+            invalidar_imagenes_certificado(configuracion)
+        
         # Manejar logo
         if 'logo' in request.FILES:
             configuracion.logo = request.FILES['logo']
@@ -1819,6 +1606,10 @@ def configurar_certificado(request, eve_id, tipo):
             configuracion.firma = request.FILES['firma']
         
         configuracion.save()
+        
+        # Las versiones reducidas se generan una vez aquí y no en cada envío
+        if 'logo' in request.FILES or 'firma' in request.FILES:
+            imagenes_certificado(configuracion)
         messages.success(request, f"Configuración del certificado de {tipo} guardada correctamente.")
         return redirect('previsualizar_certificado', eve_id=eve_id, tipo=tipo)
     
@@ -1891,8 +1682,7 @@ def previsualizar_certificado(request, eve_id, tipo):
     
     if request.GET.get('formato') == 'pdf':
         # Convertir imágenes a base64 para el PDF
-        logo_base64, logo_format = imagen_to_base64(configuracion.logo)
-        firma_base64, firma_format = imagen_to_base64(configuracion.firma)
+        logo_base64, logo_format, firma_base64, firma_format = imagenes_certificado(configuracion)
         
         # Generar PDF de previsualización
         html_content = render_to_string('certificado_plantilla.html', {
@@ -1937,25 +1727,9 @@ def enviar_certificados(request, eve_id, tipo):
         return redirect('configurar_certificado', eve_id=eve_id, tipo=tipo)
     
     # Obtener destinatarios según el tipo
-    destinatarios = []
-    if tipo == 'asistencia':
-        destinatarios = AsistenteEvento.objects.filter(
-            evento=evento, 
-            confirmado=True,
-            asi_eve_estado='Aprobado'
-        ).select_related('asistente__usuario')
-    elif tipo == 'participacion':
-        destinatarios = ParticipanteEvento.objects.filter(
-            evento=evento, 
-            confirmado=True,
-            par_eve_estado='Aprobado'
-        ).select_related('participante__usuario')
-    elif tipo == 'evaluador':
-        destinatarios = EvaluadorEvento.objects.filter(
-            evento=evento, 
-            confirmado=True,
-            eva_eve_estado='Aprobado'
-        ).select_related('evaluador__usuario')
+    destinatarios = inscripciones_certificables(evento, tipo)
+    if destinatarios is None:
+        destinatarios = []
     
     if request.method == 'POST':
         
@@ -1964,79 +1738,28 @@ def enviar_certificados(request, eve_id, tipo):
         if not destinatarios_seleccionados:
             messages.error(request, "Debe seleccionar al menos un destinatario.")
         else:
-            # Procesar envío de certificados
-            enviados = 0
-            errores = []
-            
-            for dest_id in destinatarios_seleccionados:
-                try:
-                    # Buscar destinatario según el tipo
-                    if tipo == 'asistencia':
-                        dest_obj = AsistenteEvento.objects.get(id=dest_id)
-                        usuario = dest_obj.asistente.usuario
-                    elif tipo == 'participacion':
-                        dest_obj = ParticipanteEvento.objects.get(id=dest_id)
-                        usuario = dest_obj.participante.usuario
-                    elif tipo == 'evaluador':
-                        dest_obj = EvaluadorEvento.objects.get(id=dest_id)
-                        usuario = dest_obj.evaluador.usuario
-                    
-                    # Preparar datos del certificado
-                    datos_certificado = {
-                        'NOMBRE': f'{usuario.first_name} {usuario.last_name}',
-                        'DOCUMENTO': usuario.documento,
-                        'EVENTO': evento.eve_nombre,
-                        'FECHA': evento.eve_fecha_inicio.strftime('%d de %B de %Y'),
-                        'CIUDAD': evento.eve_ciudad,
-                        'LUGAR': evento.eve_lugar,
-                    }
-                    
-                    # Renderizar el cuerpo del certificado
-                    cuerpo_con_datos = configuracion.cuerpo
-                    for clave, valor in datos_certificado.items():
-                        cuerpo_con_datos = cuerpo_con_datos.replace(f'**{clave}**', valor)
-                    
-                    # Convertir imágenes a base64 para el PDF
-                    logo_base64, logo_format = imagen_to_base64(configuracion.logo)
-                    firma_base64, firma_format = imagen_to_base64(configuracion.firma)
-                    
-                    # Generar PDF del certificado
-                    html_content = render_to_string('app_administradores/certificado_plantilla.html', {
-                        'configuracion': configuracion,
-                        'cuerpo_renderizado': cuerpo_con_datos,
-                        'datos': datos_certificado,
-                        'es_preview': False,
-                        'logo_base64': logo_base64,
-                        'logo_format': logo_format,
-                        'firma_base64': firma_base64,
-                        'firma_format': firma_format,
-                    })
-                    
-                    pdf_file = HTML(string=html_content, base_url=request.build_absolute_uri()).write_pdf()
-                    
-                    # Enviar por correo electrónico
-                    email = EmailMessage(
-                        subject=f'Certificado de {tipo.title()} - {evento.eve_nombre}',
-                        body=f'Estimado/a {datos_certificado["NOMBRE"]},\n\nAdjuntamos su certificado de {tipo} del evento "{evento.eve_nombre}".\n\nSaludos cordiales.',
-                        from_email=settings.DEFAULT_FROM_EMAIL,
-                        to=[usuario.email],
-                    )
-                    
-                    filename = f'certificado_{tipo}_{usuario.documento}.pdf'
-                    email.attach(filename, pdf_file, 'application/pdf')
-                    email.send()
-                    
-                    enviados += 1
-                    
-                except Exception as e:
-                    errores.append(f'{usuario.email}: {str(e)}')
-            
-            if enviados > 0:
-                messages.success(request, f"Se enviaron {enviados} certificados correctamente.")
-            
-            if errores:
-                messages.warning(request, f"Errores en el envío: {', '.join(errores)}")
-            
+            # Solo destinatarios aprobados de este evento; los PDF y correos los genera
+            # en segundo plano el comando procesar_certificados
+            relacion_usuario = RELACION_USUARIO.get(tipo)
+            envios = []
+            seleccionados = []
+            if relacion_usuario:
+                seleccionados = destinatarios.filter(id__in=[d for d in destinatarios_seleccionados if d.isdigit()])
+            for dest_obj in seleccionados:
+                usuario = getattr(dest_obj, relacion_usuario).usuario
+                envios.append((usuario, datos_certificado(evento, usuario)))
+
+            if envios:
+                encolar_certificados(
+                    evento, tipo, envios,
+                    creado_por=request.user,
+                    base_url=request.build_absolute_uri(),
+                    solo_aviso=request.POST.get('solo_aviso') == 'on'
+                )
+                messages.success(request, f"Se programó el envío de {len(envios)} certificados. Puedes seguir el progreso en esta página.")
+            else:
+                messages.error(request, "Los destinatarios seleccionados no son válidos.")
+
             return redirect('enviar_certificados', eve_id=eve_id, tipo=tipo)
     
     # Verificar advertencias para mostrar en el template
@@ -2046,12 +1769,16 @@ def enviar_certificados(request, eve_id, tipo):
     if not configuracion.firma:
         advertencias.append("No has configurado una firma para el certificado")
     
+    # Último envío masivo de este tipo para mostrar su progreso
+    trabajo = evento.trabajos_certificados.filter(tipo=tipo).order_by('-id').first()
+    
     return render(request, 'app_administradores/enviar_certificados.html', {
         'evento': evento,
         'tipo': tipo,
         'configuracion': configuracion,
         'destinatarios': destinatarios,
-        'advertencias': advertencias
+        'advertencias': advertencias,
+        'trabajo': trabajo
     })
 
 
@@ -2073,118 +1800,53 @@ def enviar_certificados_premiacion(request, eve_id):
         messages.error(request, "Debe configurar el certificado de premiación primero.")
         return redirect('configurar_certificado', eve_id=eve_id, tipo='premiacion')
     
-    # Obtener participantes con calificación final usando par_eve_valor
-    participantes_con_puntuacion = []
-    
-    # Obtener todos los participantes confirmados del evento que tienen calificación
-    participantes_evento = ParticipanteEvento.objects.filter(
-        evento=evento, 
-        confirmado=True,
-        par_eve_estado='Aprobado',
-        par_eve_valor__isnull=False
-    ).select_related('participante__usuario').order_by('-par_eve_valor')
-    
-    for participante_evento in participantes_evento:
-        participantes_con_puntuacion.append({
+    # Ranking de participantes confirmados con calificación final (par_eve_valor);
+    # los empatados comparten puesto y el siguiente salta (1, 1, 3)
+    participantes_ranking = []
+    for posicion in ranking_evento(evento, solo_calificados=True, solo_confirmados=True, con_proyectos=False):
+        participante_evento = posicion['participante_evento']
+        usuario = participante_evento.participante.usuario
+        participantes_ranking.append({
             'id': participante_evento.id,
             'participante_evento': participante_evento,
             'participante': participante_evento.participante,
-            'nombre_completo': f'{participante_evento.participante.usuario.first_name} {participante_evento.participante.usuario.last_name}',
-            'documento': participante_evento.participante.usuario.documento,
-            'email': participante_evento.participante.usuario.email,
+            'nombre_completo': f'{usuario.first_name} {usuario.last_name}',
+            'documento': usuario.documento,
+            'email': usuario.email,
             'estado': participante_evento.par_eve_estado,
-            'puntuacion_total': participante_evento.par_eve_valor
+            'puntuacion_total': participante_evento.par_eve_valor,
+            'puesto': posicion['puesto'],
         })
     
-    # Asignar puestos considerando empates basados en par_eve_valor
-    participantes_ranking = []
-    puesto_actual = 1
-    
-    for i, participante in enumerate(participantes_con_puntuacion):
-        # Si no es el primero y tiene la misma puntuación que el anterior, mantiene el puesto
-        if i > 0 and participante['puntuacion_total'] == participantes_con_puntuacion[i-1]['puntuacion_total']:
-            participante['puesto'] = participantes_ranking[i-1]['puesto']
-        else:
-            participante['puesto'] = puesto_actual
-        
-        participantes_ranking.append(participante)
-        puesto_actual = i + 2  # Siguiente puesto disponible
-    
     if request.method == 'POST':
         participantes_seleccionados = request.POST.getlist('participantes')  
         if not participantes_seleccionados:
             messages.error(request, "Debe seleccionar al menos un participante.")
         else:
-            # Procesar envío de certificados
-            enviados = 0
-            errores = []
-            
-            # Crear diccionario para acceso rápido por ID
+            # Se encola un envío por participante; el puesto y la puntuación se fijan ahora
             participantes_dict = {str(p['id']): p for p in participantes_ranking}
-            
+            envios = []
             for part_id in participantes_seleccionados:
-                try:
-                    participante_data = participantes_dict[part_id]
-                    participante_evento = participante_data['participante_evento']
-                    usuario = participante_data['participante'].usuario
-                    
-                    # Preparar datos del certificado incluyendo PUESTO
-                    datos_certificado = {
-                        'NOMBRE': f'{usuario.first_name} {usuario.last_name}',
-                        'DOCUMENTO': usuario.documento,
-                        'EVENTO': evento.eve_nombre,
-                        'FECHA': evento.eve_fecha_inicio.strftime('%d de %B de %Y'),
-                        'CIUDAD': evento.eve_ciudad,
-                        'LUGAR': evento.eve_lugar,
-                        'PUESTO': f"{participante_data['puesto']}°",
-                        'PUNTUACION': str(participante_data['puntuacion_total'])
-                    }
-                    
-                    # Renderizar el cuerpo del certificado
-                    cuerpo_con_datos = configuracion.cuerpo
-                    for clave, valor in datos_certificado.items():
-                        cuerpo_con_datos = cuerpo_con_datos.replace(f'**{clave}**', valor)
-                    
-                    # Convertir imágenes a base64 para el PDF
-                    logo_base64, logo_format = imagen_to_base64(configuracion.logo)
-                    firma_base64, firma_format = imagen_to_base64(configuracion.firma)
-                    
-                    # Generar PDF del certificado
-                    html_content = render_to_string('app_administradores/certificado_plantilla.html', {
-                        'configuracion': configuracion,
-                        'cuerpo_renderizado': cuerpo_con_datos,
-                        'datos': datos_certificado,
-                        'es_preview': False,
-                        'logo_base64': logo_base64,
-                        'logo_format': logo_format,
-                        'firma_base64': firma_base64,
-                        'firma_format': firma_format,
-                    })
-                    
-                    pdf_file = HTML(string=html_content, base_url=request.build_absolute_uri()).write_pdf()
-                    
-                    # Enviar por correo electrónico
-                    email = EmailMessage(
-                        subject=f'Certificado de Premiación - {evento.eve_nombre}',
-                        body=f'Estimado/a {datos_certificado["NOMBRE"]},\n\n¡Felicitaciones! Adjuntamos su certificado de premiación del evento "{evento.eve_nombre}" donde obtuvo el {datos_certificado["PUESTO"]} lugar con una puntuación de {datos_certificado["PUNTUACION"]} puntos.\n\nSaludos cordiales.',
-                        from_email=settings.DEFAULT_FROM_EMAIL,
-                        to=[usuario.email],
-                    )
-                    
-                    filename = f'certificado_premiacion_{usuario.documento}.pdf'
-                    email.attach(filename, pdf_file, 'application/pdf')
-                    email.send()
-                    
-                    enviados += 1
-                    
-                except Exception as e:
-                    errores.append(f'{participante_data["email"]}: {str(e)}')
-            
-            if enviados > 0:
-                messages.success(request, f"Se enviaron {enviados} certificados de premiación correctamente.")
-            
-            if errores:
-                messages.warning(request, f"Errores en el envío: {', '.join(errores)}")
+                participante_data = participantes_dict.get(part_id)
+                if participante_data is None:
+                    continue
+                usuario = participante_data['participante'].usuario
+                envios.append((usuario, datos_certificado(
+                    evento, usuario,
+                    PUESTO=f"{participante_data['puesto']}°",
+                    PUNTUACION=str(participante_data['puntuacion_total'])
+                )))
+
+            if envios:
+                encolar_certificados(
+                    evento, 'premiacion', envios,
+                    creado_por=request.user,
+                    base_url=request.build_absolute_uri(),
+                    solo_aviso=request.POST.get('solo_aviso') == 'on'
+                )
+                messages.success(request, f"Se programó el envío de {len(envios)} certificados de premiación. Puedes seguir el progreso en esta página.")
+            else:
+                messages.error(request, "Los participantes seleccionados no son válidos.")
             
             return redirect('enviar_certificados_premiacion', eve_id=eve_id)
     
@@ -2195,11 +1857,66 @@ def enviar_certificados_premiacion(request, eve_id):
     if not configuracion.firma:
         advertencias.append("No has configurado una firma para el certificado")
     
+    trabajo = evento.trabajos_certificados.filter(tipo='premiacion').order_by('-id').first()
+    
     return render(request, 'app_administradores/enviar_certificados_premiacion.html', {
         'evento': evento,
         'configuracion': configuracion,
         'participantes_ranking': participantes_ranking,
-        'advertencias': advertencias
+        'advertencias': advertencias,
+        'trabajo': trabajo
+    })
+
+
+@login_required
+@user_passes_test(es_administrador_evento, login_url='ver_eventos')
+def exportar_certificados_zip(request, eve_id, tipo):
+    """Descarga en un ZIP los certificados de todos los destinatarios de un tipo"""
+    evento = get_object_or_404(Evento, eve_id=eve_id)
+    
+    # Verificar que el usuario sea el administrador del evento
+    if evento.eve_administrador_fk != request.user.administrador:
+        messages.error(request, "No tienes permisos para gestionar certificados de este evento.")
+        return redirect('gestionar_certificados')
+    
+    if tipo not in ['asistencia', 'participacion', 'evaluador', 'premiacion']:
+        messages.error(request, "Tipo de certificado no válido.")
+        return redirect('seleccionar_tipo_certificado', eve_id=eve_id)
+    
+    try:
+        configuracion = ConfiguracionCertificado.objects.get(evento=evento, tipo=tipo)
+    except ConfiguracionCertificado.DoesNotExist:
+        messages.error(request, "Debe configurar el certificado primero.")
+        return redirect('configurar_certificado', eve_id=eve_id, tipo=tipo)
+    
+    # La descarga empieza con el primer certificado; el resto se genera mientras se transmite.
+    # Se renderiza en el propio proceso: el servidor web no debe iniciar procesos hijos
+    response = StreamingHttpResponse(
+        zip_certificados(evento, tipo, configuracion, request.build_absolute_uri(), procesos=1),
+        content_type='application/zip'
+    )
+    response['Content-Disposition'] = f'attachment; filename="certificados_{tipo}_{evento.eve_id}.zip"'
+    return response
+
+
+@login_required
+@user_passes_test(es_administrador_evento, login_url='ver_eventos')
+def progreso_certificados(request, trabajo_id):
+    """Estado de un envío masivo de certificados; lo consulta periódicamente la página de envío"""
+    trabajo = get_object_or_404(TrabajoCertificados.objects.select_related('evento'), id=trabajo_id)
+    if trabajo.evento.eve_administrador_fk != request.user.administrador:
+        return JsonResponse({'success': False, 'error': 'No tienes permisos sobre este envío.'}, status=403)
+
+    detalle_errores = list(
+        trabajo.envios.filter(estado='error').order_by('id').values('email', 'error')[:50]
+    )
+    return JsonResponse({
+        'success': True,
+        'estado': trabajo.estado,
+        'estado_display': trabajo.get_estado_display(),
+        'terminado': trabajo.fecha_fin is not None,
+        **trabajo.progreso(),
+        'detalle_errores': detalle_errores,
     })
 
 
@@ -2273,12 +1990,12 @@ def crear_codigo_invitacion(request):
                 )
                 
                 asunto = f'Invitación como {tipo.title()} - {evento.eve_nombre}'
-                mensaje_html = render_to_string('correo_invitacion_evento.html', {
-                    'evento': evento,
-                    'tipo': tipo.title(),
-                    'codigo': codigo.codigo,
-                    'url_registro': url_registro,
-                })
+                mensaje_html = renderizar_correo(
+                    'correo_invitacion_evento.html',
+                    {'evento': contexto_evento(evento), 'tipo': tipo.title()},
+                    codigo=codigo.codigo,
+                    url_registro=url_registro,
+                )
                 
                 email_obj = EmailMessage(
                     subject=asunto,
@@ -2286,7 +2003,7 @@ def crear_codigo_invitacion(request):
                     to=[email]
                 )
                 email_obj.content_subtype = 'html'
-                email_obj.send()
+                encolar_correo(email_obj)
                 
                 codigos_creados.append(codigo)
                 
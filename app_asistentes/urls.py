@@ -4,6 +4,7 @@ from . import views
 urlpatterns = [
     path('dashboard-asistente/', views.dashboard_asistente, name='dashboard_asistente'),
     path('evento/<int:eve_id>/detalle/', views.detalle_evento_asistente, name='detalle_evento_asistente'),
+    path('evento/<int:eve_id>/certificado/', views.descargar_certificado_asistente, name='descargar_certificado_asistente'),
     path('evento/<int:eve_id>/compartir/', views.compartir_evento, name='compartir_evento'),
     path('descargar-programacion-asistente/<int:evento_id>/', views.descargar_programacion, name='descargar_programacion_asistente'),
     path('asistente/evento/<int:evento_id>/info-tecnica/', views.descargar_info_tecnica_asistente, name='descargar_info_tecnica_asistente'),
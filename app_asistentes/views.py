@@ -6,6 +6,7 @@ from django.urls import reverse
 from app_usuarios.permisos import es_asistente
 from app_asistentes.models import AsistenteEvento
 from app_eventos.models import Evento
+from app_administradores.certificados import eventos_con_certificado, respuesta_certificado
 import mimetypes
 import os
 from django.conf import settings
@@ -24,6 +25,8 @@ def dashboard_asistente(request):
         'con_qr': relaciones.filter(asi_eve_qr__isnull=False).count(),
     }
 
+    con_certificado = eventos_con_certificado([relacion.evento for relacion in relaciones], 'asistencia')
+
     # Agregar información sobre memorias disponibles para cada relación
     relaciones_con_memorias = []
     for relacion in relaciones:
@@ -32,6 +35,10 @@ def dashboard_asistente(request):
             'evento': relacion.evento,
             'estado': relacion.asi_eve_estado,
             'tiene_memorias': bool(relacion.evento.eve_memorias),
+            'tiene_certificado': (
+                relacion.evento.pk in con_certificado
+                and relacion.asi_eve_estado == 'Aprobado' and relacion.confirmado
+            ),
         }
         relaciones_con_memorias.append(relacion_data)
 
@@ -41,6 +48,16 @@ def dashboard_asistente(request):
         'estadisticas': estadisticas
     })
 
+@login_required
+@user_passes_test(es_asistente, login_url='ver_eventos')
+def descargar_certificado_asistente(request, eve_id):
+    evento = get_object_or_404(Evento, pk=eve_id)
+    response = respuesta_certificado(request, evento, 'asistencia', request.user)
+    if response is None:
+        messages.warning(request, "Tu certificado de asistencia para este evento aún no está disponible.")
+        return redirect('dashboard_asistente')
+    return response
+
 @login_required
 @user_passes_test(es_asistente, login_url='ver_eventos')
 def detalle_evento_asistente(request, eve_id):
@@ -0,0 +1,115 @@
+from django.db import connection, transaction
+
+from app_participantes.grupos import lider_de_grupo
+from app_participantes.models import ParticipanteEvento, Proyecto
+from .models import Calificacion, PuntajeParticipante
+from .puntajes import recalcular_puntajes
+
+
+def guardar_calificaciones(evaluador, valores):
+    """
+    Escribe calificaciones de un evaluador con un único INSERT ... ON
+    CONFLICT/ON DUPLICATE KEY UPDATE sobre la clave (evaluador, criterio,
+    participante). valores: {(participante_id, criterio_id): (valor, observacion)}.
+    """
+    calificaciones = [
+        Calificacion(
+            evaluador=evaluador,
+            criterio_id=criterio_id,
+            participante_id=participante_id,
+            cal_valor=valor,
+            cal_observacion=observacion or None,
+        )
+        for (participante_id, criterio_id), (valor, observacion) in valores.items()
+    ]
+    # MySQL resuelve el conflicto con cualquier índice único y no admite indicarlo
+    campos_unicos = None
+    if connection.features.supports_update_conflicts_with_target:
+        campos_unicos = ['evaluador', 'criterio', 'participante']
+
+    Calificacion.objects.bulk_create(
+        calificaciones,
+        update_conflicts=True,
+        unique_fields=campos_unicos,
+        update_fields=['cal_valor', 'cal_observacion'],
+    )
+
+
+def propagar_nota(participacion, nota):
+    """
+    Lleva la nota del participante calificado a sus proyectos y, si es grupal,
+    a los integrantes del grupo y a los proyectos del líder.
+    """
+    evento_id = participacion.evento_id
+
+    if not participacion.codigo:
+        Proyecto.objects.filter(
+            evento_id=evento_id,
+            creador_id=participacion.participante_id
+        ).update(pro_valor=nota)
+        return
+
+    # Integrantes por la FK indexada al equipo; el código solo para filas sin sincronizar
+    if participacion.equipo_id:
+        grupo = {'equipo_id': participacion.equipo_id}
+    else:
+        grupo = {'evento_id': evento_id, 'codigo': participacion.codigo}
+    integrantes = list(ParticipanteEvento.objects.filter(
+        par_eve_estado='Aprobado',
+        **grupo
+    ).only('pk', 'participante_id', 'par_eve_valor'))
+
+    # Un integrante con calificaciones propias conserva su nota individual
+    notas_propias = {
+        p.participante_id: p.nota for p in PuntajeParticipante.objects.filter(
+            evento_id=evento_id,
+            participante_id__in=[pe.participante_id for pe in integrantes],
+            pun_num_evaluadores__gt=0
+        )
+    }
+    for pe in integrantes:
+        pe.par_eve_valor = notas_propias.get(pe.participante_id, nota)
+    ParticipanteEvento.objects.bulk_update(integrantes, ['par_eve_valor'])
+
+    lider_id = lider_de_grupo(evento_id, participacion.codigo)
+    if lider_id is not None:
+        Proyecto.objects.filter(
+            evento_id=evento_id,
+            creador_id=lider_id
+        ).update(pro_valor=nota)
+
+
+def registrar_rubricas(evaluador, evento_id, rubricas):
+    """
+    Guarda rúbricas de varios participantes del mismo evento y actualiza las
+    notas derivadas en un solo bloque atómico: si algo falla no quedan
+    calificaciones a medio escribir.
+    rubricas: lista de (participacion, {criterio_id: (valor, observacion)}).
+    Devuelve {participante_id: PuntajeParticipante} con los acumulados nuevos.
+    """
+    valores = {
+        (participacion.participante_id, criterio_id): valor
+        for participacion, valores_participante in rubricas
+        for criterio_id, valor in valores_participante.items()
+    }
+    with transaction.atomic():
+        guardar_calificaciones(evaluador, valores)
+        # bulk_create no emite señales, así que los acumulados se reconstruyen aquí
+        puntajes = recalcular_puntajes(
+            [participacion.participante_id for participacion, _ in rubricas],
+            evento_id
+        )
+        for participacion, _ in rubricas:
+            puntaje = puntajes[participacion.participante_id]
+            nota = puntaje.nota
+            if puntaje.pun_num_evaluadores:
+                ParticipanteEvento.objects.filter(pk=participacion.pk).update(par_eve_valor=nota)
+                participacion.par_eve_valor = nota
+            propagar_nota(participacion, nota)
+    return puntajes
+
+
+def registrar_rubrica(evaluador, participacion, valores):
+    """Atajo de registrar_rubricas para la rúbrica de un solo participante."""
+    puntajes = registrar_rubricas(evaluador, participacion.evento_id, [(participacion, valores)])
+    return puntajes[participacion.participante_id]
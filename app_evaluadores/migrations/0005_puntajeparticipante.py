@@ -0,0 +1,62 @@
+# Generated by Django 5.2.4 on 2026-10-18 01:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, F, FloatField, Sum
+
+
+def poblar_puntajes(apps, schema_editor):
+    Criterio = apps.get_model('app_evaluadores', 'Criterio')
+    Calificacion = apps.get_model('app_evaluadores', 'Calificacion')
+    PuntajeParticipante = apps.get_model('app_evaluadores', 'PuntajeParticipante')
+
+    pesos = dict(
+        Criterio.objects.values('cri_evento_fk_id')
+        .annotate(total=Sum('cri_peso'))
+        .values_list('cri_evento_fk_id', 'total')
+    )
+    filas = (
+        Calificacion.objects.values('participante_id', 'criterio__cri_evento_fk_id')
+        .annotate(
+            suma=Sum(F('cal_valor') * F('criterio__cri_peso'), output_field=FloatField()),
+            evaluadores=Count('evaluador', distinct=True),
+        )
+    )
+    PuntajeParticipante.objects.bulk_create([
+        PuntajeParticipante(
+            participante_id=fila['participante_id'],
+            evento_id=fila['criterio__cri_evento_fk_id'],
+            pun_suma_ponderada=fila['suma'] or 0,
+            pun_peso_total=pesos.get(fila['criterio__cri_evento_fk_id']) or 0,
+            pun_num_evaluadores=fila['evaluadores'],
+        )
+        for fila in filas
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_evaluadores', '0004_evaluadorevento_puede_gestionar_rubrica'),
+        ('app_eventos', '0004_remove_evento_inscripciones_habilitadas'),
+        ('app_participantes', '0008_alter_proyecto_pro_valor'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PuntajeParticipante',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('pun_suma_ponderada', models.FloatField(default=0)),
+                ('pun_peso_total', models.FloatField(default=0)),
+                ('pun_num_evaluadores', models.PositiveIntegerField(default=0)),
+                ('pun_actualizado', models.DateTimeField(auto_now=True)),
+                ('evento', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='puntajes', to='app_eventos.evento')),
+                ('participante', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='puntajes', to='app_participantes.participante')),
+            ],
+            options={
+                'unique_together': {('participante', 'evento')},
+            },
+        ),
+        migrations.RunPython(poblar_puntajes, migrations.RunPython.noop),
+    ]
@@ -41,4 +41,23 @@ class Calificacion(models.Model):
     cal_observacion = models.CharField(max_length=255, blank=True, null=True)
 
     class Meta:
-        unique_together = (('evaluador', 'criterio', 'participante'),)
\ No newline at end of file
+        unique_together = (('evaluador', 'criterio', 'participante'),)
+
+class PuntajeParticipante(models.Model):
+    """Acumulado de calificaciones de un participante en un evento, mantenido de forma incremental."""
+    participante = models.ForeignKey(Participante, on_delete=models.CASCADE, related_name='puntajes')
+    evento = models.ForeignKey(Evento, on_delete=models.CASCADE, related_name='puntajes')
+    pun_suma_ponderada = models.FloatField(default=0)
+    pun_peso_total = models.FloatField(default=0)
+    pun_num_evaluadores = models.PositiveIntegerField(default=0)
+    pun_actualizado = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = (('participante', 'evento'),)
+
+    @property
+    def nota(self):
+        if not self.pun_num_evaluadores:
+            return 0
+        peso_total = self.pun_peso_total or 1
+        return round(self.pun_suma_ponderada / (peso_total * self.pun_num_evaluadores), 1)
@@ -0,0 +1,140 @@
+from django.db.models import F, Sum, Count, FloatField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import Criterio, Calificacion, PuntajeParticipante
+
+
+def peso_total_evento(evento_id):
+    return Criterio.objects.filter(cri_evento_fk_id=evento_id).aggregate(
+        total=Coalesce(Sum('cri_peso'), 0.0)
+    )['total']
+
+
+def recalcular_puntaje(participante_id, evento_id):
+    """
+    Reconstruye desde cero el acumulado de un participante en un evento.
+    Solo se usa cuando no existe el acumulado o tras escrituras masivas.
+    """
+    datos = Calificacion.objects.filter(
+        participante_id=participante_id,
+        criterio__cri_evento_fk_id=evento_id
+    ).aggregate(
+        suma=Coalesce(Sum(F('cal_valor') * F('criterio__cri_peso'), output_field=FloatField()), 0.0),
+        evaluadores=Count('evaluador', distinct=True),
+    )
+    puntaje, _ = PuntajeParticipante.objects.update_or_create(
+        participante_id=participante_id,
+        evento_id=evento_id,
+        defaults={
+            'pun_suma_ponderada': datos['suma'],
+            'pun_peso_total': peso_total_evento(evento_id),
+            'pun_num_evaluadores': datos['evaluadores'],
+        }
+    )
+    return puntaje
+
+
+def recalcular_puntajes(participante_ids, evento_id):
+    """
+    Versión por lotes de recalcular_puntaje: una agregación agrupada por
+    participante y un bulk_update/bulk_create de los acumulados.
+    Devuelve {participante_id: PuntajeParticipante}.
+    """
+    participante_ids = set(participante_ids)
+    datos = {
+        d['participante_id']: d for d in Calificacion.objects.filter(
+            participante_id__in=participante_ids,
+            criterio__cri_evento_fk_id=evento_id
+        ).values('participante_id').annotate(
+            suma=Coalesce(Sum(F('cal_valor') * F('criterio__cri_peso'), output_field=FloatField()), 0.0),
+            evaluadores=Count('evaluador', distinct=True),
+        )
+    }
+    peso_total = peso_total_evento(evento_id)
+    ahora = timezone.now()
+
+    puntajes = {
+        p.participante_id: p for p in PuntajeParticipante.objects.filter(
+            evento_id=evento_id,
+            participante_id__in=participante_ids
+        )
+    }
+    nuevos = []
+    for participante_id in participante_ids:
+        fila = datos.get(participante_id, {'suma': 0.0, 'evaluadores': 0})
+        puntaje = puntajes.get(participante_id)
+        if puntaje is None:
+            puntaje = PuntajeParticipante(participante_id=participante_id, evento_id=evento_id)
+            puntajes[participante_id] = puntaje
+            nuevos.append(puntaje)
+        puntaje.pun_suma_ponderada = fila['suma']
+        puntaje.pun_peso_total = peso_total
+        puntaje.pun_num_evaluadores = fila['evaluadores']
+        puntaje.pun_actualizado = ahora
+
+    existentes = [p for p in puntajes.values() if p.pk]
+    if existentes:
+        PuntajeParticipante.objects.bulk_update(existentes, [
+            'pun_suma_ponderada', 'pun_peso_total', 'pun_num_evaluadores', 'pun_actualizado'
+        ])
+    if nuevos:
+        PuntajeParticipante.objects.bulk_create(nuevos)
+    return puntajes
+
+
+def obtener_puntaje(participante_id, evento_id):
+    puntaje = PuntajeParticipante.objects.filter(
+        participante_id=participante_id,
+        evento_id=evento_id
+    ).first()
+    if puntaje is None:
+        puntaje = recalcular_puntaje(participante_id, evento_id)
+    return puntaje
+
+
+def acumular_puntaje(participante_id, evento_id, delta_suma=0, delta_evaluadores=0, crear=True):
+    """Aplica un delta al acumulado con un único UPDATE; si aún no existe, lo construye."""
+    actualizados = PuntajeParticipante.objects.filter(
+        participante_id=participante_id,
+        evento_id=evento_id
+    ).update(
+        pun_suma_ponderada=F('pun_suma_ponderada') + delta_suma,
+        pun_num_evaluadores=F('pun_num_evaluadores') + delta_evaluadores,
+        pun_actualizado=timezone.now(),
+    )
+    if not actualizados and crear:
+        recalcular_puntaje(participante_id, evento_id)
+
+
+def evaluador_tiene_calificaciones(evaluador_id, participante_id, evento_id, excluir_id=None):
+    calificaciones = Calificacion.objects.filter(
+        evaluador_id=evaluador_id,
+        participante_id=participante_id,
+        criterio__cri_evento_fk_id=evento_id
+    )
+    if excluir_id is not None:
+        calificaciones = calificaciones.exclude(pk=excluir_id)
+    return calificaciones.exists()
+
+
+def ajustar_peso_criterio(criterio, delta_peso):
+    """
+    Propaga a todos los acumulados del evento el cambio de peso de un criterio:
+    el peso total cambia en delta_peso y la suma ponderada en delta_peso por la
+    suma de valores que cada participante tiene en ese criterio.
+    """
+    if not delta_peso:
+        return
+    suma_valores = Calificacion.objects.filter(
+        criterio=criterio,
+        participante_id=OuterRef('participante_id')
+    ).values('participante_id').annotate(total=Sum('cal_valor')).values('total')
+
+    PuntajeParticipante.objects.filter(evento_id=criterio.cri_evento_fk_id).update(
+        pun_peso_total=F('pun_peso_total') + delta_peso,
+        pun_suma_ponderada=F('pun_suma_ponderada') + delta_peso * Coalesce(
+            Subquery(suma_valores, output_field=FloatField()), 0.0
+        ),
+        pun_actualizado=timezone.now(),
+    )
@@ -0,0 +1,122 @@
+from django.db.models import F, FloatField, Value, Window
+from django.db.models.functions import Coalesce, Rank, RowNumber
+
+from app_participantes.grupos import proyectos_de_inscripciones
+from app_participantes.models import ParticipanteEvento
+from .models import PuntajeParticipante
+
+
+# Orden único para todas las tablas: puntaje descendente y, en empate,
+# orden de inscripción. El puesto (Rank) se comparte entre empatados y el
+# siguiente salta (1, 1, 3); la fila (RowNumber) siempre es consecutiva.
+PUNTAJE = Coalesce(F('par_eve_valor'), Value(0.0), output_field=FloatField())
+ORDEN_RANKING = [PUNTAJE.desc(), F('pk').asc()]
+
+
+def sincronizar_notas_pendientes(evento):
+    """
+    Copia a par_eve_valor la nota acumulada de los aprobados que ya tienen
+    calificaciones pero aún no tienen nota guardada.
+    """
+    pendientes = list(ParticipanteEvento.objects.filter(
+        evento=evento,
+        par_eve_estado='Aprobado',
+        par_eve_valor__isnull=True
+    ).only('pk', 'participante_id'))
+    if not pendientes:
+        return 0
+
+    puntajes = {
+        p.participante_id: p for p in PuntajeParticipante.objects.filter(
+            evento=evento,
+            pun_num_evaluadores__gt=0,
+            participante_id__in=[pe.participante_id for pe in pendientes]
+        )
+    }
+    actualizar = []
+    for pe in pendientes:
+        puntaje = puntajes.get(pe.participante_id)
+        if puntaje is not None:
+            pe.par_eve_valor = puntaje.nota
+            actualizar.append(pe)
+
+    if actualizar:
+        ParticipanteEvento.objects.bulk_update(actualizar, ['par_eve_valor'])
+    return len(actualizar)
+
+
+def inscripciones_rankeadas(evento, solo_calificados=False, solo_confirmados=False):
+    """
+    Inscripciones aprobadas del evento anotadas con puntaje, puesto y fila,
+    calculados por la base de datos en una sola consulta.
+    """
+    inscripciones = ParticipanteEvento.objects.filter(
+        evento=evento,
+        par_eve_estado='Aprobado'
+    )
+    if solo_calificados:
+        inscripciones = inscripciones.filter(par_eve_valor__isnull=False)
+    if solo_confirmados:
+        inscripciones = inscripciones.filter(confirmado=True)
+
+    return inscripciones.select_related('participante__usuario', 'proyecto').annotate(
+        puntaje=PUNTAJE,
+        puesto=Window(expression=Rank(), order_by=[PUNTAJE.desc()]),
+        fila=Window(expression=RowNumber(), order_by=ORDEN_RANKING),
+    ).order_by(*ORDEN_RANKING)
+
+
+def puesto_en_evento(participante_id, evento_id, estado='Aprobado'):
+    """
+    Puesto (Rank) de un participante sin recorrer la tabla: 1 más el número
+    de inscripciones con nota estrictamente mayor. Se apoya en el índice
+    (evento, par_eve_estado, par_eve_valor) y siempre refleja la nota vigente.
+    """
+    valor = ParticipanteEvento.objects.filter(
+        participante_id=participante_id,
+        evento_id=evento_id,
+        par_eve_estado=estado,
+        par_eve_valor__isnull=False
+    ).values_list('par_eve_valor', flat=True).first()
+    if valor is None:
+        return None
+
+    return ParticipanteEvento.objects.filter(
+        evento_id=evento_id,
+        par_eve_estado=estado,
+        par_eve_valor__gt=valor
+    ).count() + 1
+
+
+def ranking_evento(evento, solo_calificados=False, solo_confirmados=False, con_proyectos=True):
+    """
+    Tabla de posiciones del evento lista para vistas, PDF y certificados.
+    Cada elemento trae participante_evento, participante, puntaje, puesto,
+    fila, codigo y proyectos (principal primero y luego los extra).
+    """
+    inscripciones = list(inscripciones_rankeadas(
+        evento,
+        solo_calificados=solo_calificados,
+        solo_confirmados=solo_confirmados,
+    ))
+    proyectos = proyectos_de_inscripciones(evento, inscripciones) if con_proyectos else {}
+
+    posiciones = []
+    for pe in inscripciones:
+        lista_proyectos = []
+        if pe.participante_id in proyectos:
+            principal, extras = proyectos[pe.participante_id]
+            if principal:
+                lista_proyectos.append(principal)
+            lista_proyectos.extend(extras)
+
+        posiciones.append({
+            'participante_evento': pe,
+            'participante': pe.participante,
+            'puntaje': pe.puntaje,
+            'puesto': pe.puesto,
+            'fila': pe.fila,
+            'codigo': pe.codigo,
+            'proyectos': lista_proyectos,
+        })
+    return posiciones
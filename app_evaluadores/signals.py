@@ -0,0 +1,108 @@
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+
+from .models import Criterio, Calificacion
+from .puntajes import (
+    acumular_puntaje,
+    ajustar_peso_criterio,
+    evaluador_tiene_calificaciones,
+    recalcular_puntaje,
+)
+
+
+# ===============================
+# CALIFICACIONES
+# ===============================
+
+@receiver(pre_save, sender=Calificacion)
+def guardar_calificacion_anterior(sender, instance, raw=False, **kwargs):
+    instance._calificacion_anterior = None
+    if raw or not instance.pk:
+        return
+    instance._calificacion_anterior = Calificacion.objects.filter(pk=instance.pk).values(
+        'cal_valor', 'criterio_id', 'participante_id', 'evaluador_id', 'criterio__cri_evento_fk_id'
+    ).first()
+
+
+@receiver(post_save, sender=Calificacion)
+def actualizar_puntaje_calificacion(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    criterio = instance.criterio
+    evento_id = criterio.cri_evento_fk_id
+    anterior = getattr(instance, '_calificacion_anterior', None)
+
+    if created:
+        nuevo_evaluador = not evaluador_tiene_calificaciones(
+            instance.evaluador_id, instance.participante_id, evento_id, excluir_id=instance.pk
+        )
+        acumular_puntaje(
+            instance.participante_id,
+            evento_id,
+            delta_suma=instance.cal_valor * criterio.cri_peso,
+            delta_evaluadores=1 if nuevo_evaluador else 0,
+        )
+        return
+
+    if anterior is None:
+        recalcular_puntaje(instance.participante_id, evento_id)
+        return
+
+    misma_calificacion = (
+        anterior['criterio_id'] == instance.criterio_id
+        and anterior['participante_id'] == instance.participante_id
+        and anterior['evaluador_id'] == instance.evaluador_id
+    )
+    if not misma_calificacion:
+        recalcular_puntaje(anterior['participante_id'], anterior['criterio__cri_evento_fk_id'])
+        recalcular_puntaje(instance.participante_id, evento_id)
+        return
+
+    delta = (instance.cal_valor - anterior['cal_valor']) * criterio.cri_peso
+    if delta:
+        acumular_puntaje(instance.participante_id, evento_id, delta_suma=delta)
+
+
+@receiver(post_delete, sender=Calificacion)
+def descontar_puntaje_calificacion(sender, instance, **kwargs):
+    criterio = Criterio.objects.filter(pk=instance.criterio_id).values('cri_evento_fk_id', 'cri_peso').first()
+    if criterio is None:
+        return
+    evento_id = criterio['cri_evento_fk_id']
+    evaluador_sigue = evaluador_tiene_calificaciones(
+        instance.evaluador_id, instance.participante_id, evento_id
+    )
+    acumular_puntaje(
+        instance.participante_id,
+        evento_id,
+        delta_suma=-instance.cal_valor * criterio['cri_peso'],
+        delta_evaluadores=0 if evaluador_sigue else -1,
+        crear=False,
+    )
+
+
+# ===============================
+# CRITERIOS
+# ===============================
+
+@receiver(pre_save, sender=Criterio)
+def guardar_peso_anterior(sender, instance, raw=False, **kwargs):
+    instance._peso_anterior = None
+    if raw or not instance.pk:
+        return
+    instance._peso_anterior = Criterio.objects.filter(pk=instance.pk).values_list('cri_peso', flat=True).first()
+
+
+@receiver(post_save, sender=Criterio)
+def actualizar_puntajes_criterio(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    anterior = 0 if created else getattr(instance, '_peso_anterior', None)
+    if anterior is None:
+        return
+    ajustar_peso_criterio(instance, instance.cri_peso - anterior)
+
+
+@receiver(post_delete, sender=Criterio)
+def descontar_peso_criterio(sender, instance, **kwargs):
+    ajustar_peso_criterio(instance, -instance.cri_peso)
@@ -8,6 +8,7 @@ from unittest.mock import patch, MagicMock
 from django.core import mail
 
 from app_usuarios.models import Usuario, Rol, RolUsuario
+from app_usuarios.correos import procesar_bandeja
 from app_administradores.models import AdministradorEvento
 from app_eventos.models import Evento
 from app_evaluadores.models import Evaluador, EvaluadorEvento 
@@ -91,6 +92,7 @@ class PruebasGestionEvaluadoresHU33(TestCase):
         
         # Act: Cambiar de Pendiente a Aprobado
         response = self.client.post(self.url_detalle, {'estado': 'Aprobado'})
+        procesar_bandeja()
         
         # Assert 1: Estado cambió correctamente
         self.inscripcion.refresh_from_db()
@@ -150,6 +152,7 @@ class PruebasGestionEvaluadoresHU33(TestCase):
         
         # Act: Aprobar evaluador
         response = self.client.post(self.url_detalle, {'estado': 'Aprobado'})
+        procesar_bandeja()
         
         # Assert: Verificar contenido del correo
         self.assertEqual(len(mail.outbox), 1, "Debe enviarse 1 correo")
@@ -185,10 +188,12 @@ class PruebasGestionEvaluadoresHU33(TestCase):
         
         # Paso 1: Primera aprobación 
         response1 = self.client.post(self.url_detalle, {'estado': 'Aprobado'})
+        procesar_bandeja()
         correos_primer_envio = len(mail.outbox)
         
         # Paso 2: Re-envío del mismo estado 
         response2 = self.client.post(self.url_detalle, {'estado': 'Aprobado'})
+        procesar_bandeja()
         correos_segundo_envio = len(mail.outbox)
         
         # Assert: Tu vista ACTUAL envía correo siempre
@@ -8,6 +8,7 @@ from django.core import mail
 from unittest.mock import patch
 
 from app_usuarios.models import Usuario, Rol, RolUsuario
+from app_usuarios.correos import procesar_bandeja
 from app_administradores.models import AdministradorEvento
 from app_eventos.models import Evento
 from app_evaluadores.models import Evaluador, EvaluadorEvento
@@ -116,6 +117,7 @@ class PruebasClaveAccesoEvaluadorHU34(TestCase):
         
         # Act: Aprobar evaluador
         response = self.client.post(self.url_detalle_evaluador, {'estado': 'Aprobado'})
+        procesar_bandeja()
         
         # Assert 1: Se envió un correo
         self.assertEqual(len(mail.outbox), 1,
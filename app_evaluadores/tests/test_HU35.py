@@ -10,6 +10,7 @@ from django.core.files.base import ContentFile
 import io
 
 from app_usuarios.models import Usuario, Rol, RolUsuario
+from app_usuarios.correos import procesar_bandeja
 from app_administradores.models import AdministradorEvento
 from app_eventos.models import Evento
 from app_evaluadores.models import Evaluador, EvaluadorEvento
@@ -135,6 +136,7 @@ class PruebasQRInscripcionEvaluadorHU35(TestCase):
         
         # Act: Aprobar evaluador
         response = self.client.post(self.url_detalle_qr, {'estado': 'Aprobado'})
+        procesar_bandeja()
         
         # Assert 1: Se envió un correo
         self.assertEqual(len(mail.outbox), 1,
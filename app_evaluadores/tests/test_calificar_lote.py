@@ -0,0 +1,159 @@
+# app_evaluadores/tests/test_calificar_lote.py
+
+import json
+
+from django.test import TestCase, Client
+from django.urls import reverse
+from django.utils import timezone
+from datetime import timedelta
+
+from app_usuarios.models import Usuario, Rol, RolUsuario
+from app_administradores.models import AdministradorEvento
+from app_eventos.models import Evento
+from app_evaluadores.models import Evaluador, EvaluadorEvento, Criterio, Calificacion, PuntajeParticipante
+from app_participantes.models import Participante, ParticipanteEvento
+
+
+class PruebasCalificarLote(TestCase):
+
+    def setUp(self):
+        """Evaluador aprobado, dos criterios y tres participantes aprobados individuales."""
+        self.client = Client()
+        rol_evaluador = Rol.objects.create(nombre='evaluador', descripcion='Evaluador')
+
+        admin_user = Usuario.objects.create_user(
+            username='admin_lote', email='admin@lote.com', password='password123', documento='1'
+        )
+        administrador = AdministradorEvento.objects.create(usuario=admin_user)
+        self.evento = Evento.objects.create(
+            eve_nombre="Evento Lote",
+            eve_estado="Aprobado",
+            eve_capacidad=50,
+            eve_tienecosto="No",
+            eve_fecha_inicio=timezone.now().date(),
+            eve_fecha_fin=timezone.now().date() + timedelta(days=2),
+            eve_administrador_fk=administrador,
+        )
+        otro_evento = Evento.objects.create(
+            eve_nombre="Otro Evento",
+            eve_estado="Aprobado",
+            eve_capacidad=50,
+            eve_tienecosto="No",
+            eve_fecha_inicio=timezone.now().date(),
+            eve_fecha_fin=timezone.now().date() + timedelta(days=2),
+            eve_administrador_fk=administrador,
+        )
+
+        self.user_evaluador = Usuario.objects.create_user(
+            username='eval_lote', email='eval@lote.com', password='password123', documento='2'
+        )
+        RolUsuario.objects.create(usuario=self.user_evaluador, rol=rol_evaluador)
+        self.evaluador = Evaluador.objects.create(usuario=self.user_evaluador)
+        EvaluadorEvento.objects.create(
+            evaluador=self.evaluador,
+            evento=self.evento,
+            eva_eve_estado='Aprobado',
+            confirmado=True,
+            eva_eve_fecha_hora=timezone.now(),
+        )
+
+        self.criterio1 = Criterio.objects.create(cri_descripcion="Dominio", cri_peso=50.0, cri_evento_fk=self.evento)
+        self.criterio2 = Criterio.objects.create(cri_descripcion="Innovación", cri_peso=50.0, cri_evento_fk=self.evento)
+        self.criterio_ajeno = Criterio.objects.create(cri_descripcion="Ajeno", cri_peso=10.0, cri_evento_fk=otro_evento)
+
+        self.participantes = []
+        for i in range(3):
+            usuario = Usuario.objects.create_user(
+                username=f'part_lote{i}', email=f'part{i}@lote.com', password='password123', documento=f'3{i}'
+            )
+            participante = Participante.objects.create(usuario=usuario)
+            ParticipanteEvento.objects.create(
+                participante=participante,
+                evento=self.evento,
+                par_eve_estado='Aprobado',
+                par_eve_fecha_hora=timezone.now(),
+            )
+            self.participantes.append(participante)
+
+        self.url = reverse('api_calificar_lote', args=[self.evento.pk])
+        self.client.force_login(self.user_evaluador)
+        session = self.client.session
+        session['rol_sesion'] = 'evaluador'
+        session.save()
+
+    def enviar(self, calificaciones):
+        return self.client.post(
+            self.url,
+            data=json.dumps({'calificaciones': calificaciones}),
+            content_type='application/json',
+        )
+
+    def test_lote_guarda_varios_participantes_y_devuelve_acumulados(self):
+        calificaciones = []
+        for i, participante in enumerate(self.participantes):
+            calificaciones.append({'participante': participante.pk, 'criterio': self.criterio1.cri_id, 'valor': i + 1})
+            calificaciones.append({
+                'participante': participante.pk, 'criterio': self.criterio2.cri_id, 'valor': 5,
+                'observacion': 'Excelente',
+            })
+
+        response = self.enviar(calificaciones)
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertTrue(data['success'])
+        notas = {p['participante']: p['nota'] for p in data['puntajes']}
+        for i, participante in enumerate(self.participantes):
+            esperado = round(((i + 1) * 50 + 5 * 50) / 100, 1)
+            self.assertEqual(notas[participante.pk], esperado)
+            inscripcion = ParticipanteEvento.objects.get(participante=participante, evento=self.evento)
+            self.assertEqual(inscripcion.par_eve_valor, esperado)
+            puntaje = PuntajeParticipante.objects.get(participante=participante, evento=self.evento)
+            self.assertEqual(puntaje.pun_num_evaluadores, 1)
+        self.assertEqual(Calificacion.objects.filter(evaluador=self.evaluador).count(), 6)
+
+    def test_reenvio_actualiza_las_calificaciones_existentes(self):
+        item = {'participante': self.participantes[0].pk, 'criterio': self.criterio1.cri_id, 'valor': 2}
+        self.enviar([item])
+        item['valor'] = 4
+        response = self.enviar([item])
+
+        self.assertEqual(response.status_code, 200)
+        calificacion = Calificacion.objects.get(evaluador=self.evaluador, participante=self.participantes[0])
+        self.assertEqual(calificacion.cal_valor, 4)
+
+    def test_calificados_por_mi_cuenta_los_envios_anteriores(self):
+        participante = self.participantes[0].pk
+        self.enviar([{'participante': participante, 'criterio': self.criterio1.cri_id, 'valor': 3}])
+        response = self.enviar([{'participante': participante, 'criterio': self.criterio2.cri_id, 'valor': 4}])
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['puntajes'][0]['calificados_por_mi'], 2)
+
+    def test_lote_invalido_se_rechaza_completo(self):
+        response = self.enviar([
+            {'participante': self.participantes[0].pk, 'criterio': self.criterio1.cri_id, 'valor': 4},
+            {'participante': self.participantes[1].pk, 'criterio': self.criterio_ajeno.cri_id, 'valor': 4},
+            {'participante': self.participantes[2].pk, 'criterio': self.criterio1.cri_id, 'valor': 7},
+            {'participante': 99999, 'criterio': self.criterio1.cri_id, 'valor': 3},
+        ])
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual([e['indice'] for e in response.json()['errores']], [1, 2, 3])
+        self.assertFalse(Calificacion.objects.exists())
+
+    def test_cuerpo_mal_formado(self):
+        response = self.client.post(self.url, data='no es json', content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(response.json()['success'])
+
+    def test_evaluador_no_aprobado_no_puede_calificar(self):
+        EvaluadorEvento.objects.filter(evaluador=self.evaluador).update(eva_eve_estado='Pendiente')
+        response = self.enviar([
+            {'participante': self.participantes[0].pk, 'criterio': self.criterio1.cri_id, 'valor': 4},
+        ])
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(Calificacion.objects.exists())
+
+    def test_solo_acepta_post(self):
+        self.assertEqual(self.client.get(self.url).status_code, 405)
@@ -0,0 +1,135 @@
+# app_evaluadores/tests/test_lista_participantes.py
+
+from django.db import connection
+from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from datetime import timedelta
+
+from app_usuarios.models import Usuario, Rol, RolUsuario
+from app_administradores.models import AdministradorEvento
+from app_eventos.models import Evento
+from app_eventos.transiciones import asegurar_transiciones
+from app_evaluadores.models import Evaluador, EvaluadorEvento, Criterio, Calificacion
+from app_participantes.models import Participante, ParticipanteEvento, Proyecto
+
+
+class PruebasListaParticipantesConsultas(TestCase):
+
+    def setUp(self):
+        """Evento con un evaluador aprobado y criterios definidos."""
+        self.client = Client()
+        rol_evaluador = Rol.objects.create(nombre='evaluador', descripcion='Evaluador')
+
+        admin_user = Usuario.objects.create_user(
+            username='admin_lista', email='admin@lista.com', password='password123', documento='1'
+        )
+        administrador = AdministradorEvento.objects.create(usuario=admin_user)
+        self.evento = Evento.objects.create(
+            eve_nombre="Evento Lista",
+            eve_estado="Aprobado",
+            eve_capacidad=500,
+            eve_tienecosto="No",
+            eve_fecha_inicio=timezone.now().date(),
+            eve_fecha_fin=timezone.now().date() + timedelta(days=2),
+            eve_administrador_fk=administrador,
+        )
+
+        self.user_evaluador = Usuario.objects.create_user(
+            username='eval_lista', email='eval@lista.com', password='password123', documento='2'
+        )
+        RolUsuario.objects.create(usuario=self.user_evaluador, rol=rol_evaluador)
+        self.evaluador = Evaluador.objects.create(usuario=self.user_evaluador)
+        EvaluadorEvento.objects.create(
+            evaluador=self.evaluador,
+            evento=self.evento,
+            eva_eve_estado='Aprobado',
+            confirmado=True,
+            eva_eve_fecha_hora=timezone.now(),
+        )
+
+        self.criterios = [
+            Criterio.objects.create(cri_descripcion="Dominio", cri_peso=50.0, cri_evento_fk=self.evento),
+            Criterio.objects.create(cri_descripcion="Innovación", cri_peso=50.0, cri_evento_fk=self.evento),
+        ]
+        self.total = 0
+        self.url = reverse('lista_participantes_evaluador', args=[self.evento.pk])
+
+        self.client.force_login(self.user_evaluador)
+        session = self.client.session
+        session['rol_sesion'] = 'evaluador'
+        session.save()
+
+    def crear_participantes(self, cantidad, codigo=None):
+        """Crea participantes aprobados; si hay código, el primero lidera el proyecto del grupo."""
+        creados = []
+        proyecto_grupo = None
+        for _ in range(cantidad):
+            self.total += 1
+            usuario = Usuario.objects.create_user(
+                username=f'part_lista{self.total}',
+                email=f'part{self.total}@lista.com',
+                password='password123',
+                documento=f'9{self.total}',
+            )
+            participante = Participante.objects.create(usuario=usuario)
+            if codigo is None or proyecto_grupo is None:
+                proyecto = Proyecto.objects.create(
+                    evento=self.evento, titulo=f"Proyecto {self.total}", creador=participante
+                )
+                if codigo is not None:
+                    proyecto_grupo = proyecto
+            else:
+                proyecto = proyecto_grupo
+            ParticipanteEvento.objects.create(
+                participante=participante,
+                evento=self.evento,
+                par_eve_estado='Aprobado',
+                par_eve_fecha_hora=timezone.now(),
+                codigo=codigo,
+                proyecto=proyecto,
+            )
+            creados.append(participante)
+        return creados
+
+    def consultas_lista(self):
+        # La pasada diaria de transiciones de eventos no forma parte de la vista
+        asegurar_transiciones()
+        with CaptureQueriesContext(connection) as contexto:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        return len(contexto.captured_queries), response
+
+    def test_numero_de_consultas_no_crece_con_los_participantes(self):
+        individuales = self.crear_participantes(2)
+        self.crear_participantes(2, codigo='G1')
+        consultas_pocos, _ = self.consultas_lista()
+
+        self.crear_participantes(10)
+        self.crear_participantes(5, codigo='G2')
+        for criterio in self.criterios:
+            Calificacion.objects.create(
+                evaluador=self.evaluador, criterio=criterio, participante=individuales[0], cal_valor=4
+            )
+        consultas_muchos, response = self.consultas_lista()
+
+        self.assertEqual(consultas_pocos, consultas_muchos)
+        self.assertEqual(len(response.context['participantes_data']), 19)
+
+    def test_integrantes_de_grupo_ven_proyecto_del_lider_y_calificacion_compartida(self):
+        lider, integrante = self.crear_participantes(2, codigo='G1')
+        for criterio in self.criterios:
+            Calificacion.objects.create(
+                evaluador=self.evaluador, criterio=criterio, participante=lider, cal_valor=5
+            )
+
+        _, response = self.consultas_lista()
+        datos = {d['participante'].id: d for d in response.context['participantes_data']}
+
+        self.assertEqual(
+            [pr.titulo for pr in datos[integrante.id]['proyectos']],
+            [pr.titulo for pr in datos[lider.id]['proyectos']],
+        )
+        self.assertIn(lider.id, response.context['calificados_ids'])
+        self.assertIn(integrante.id, response.context['calificados_ids'])
@@ -0,0 +1,129 @@
+# app_evaluadores/tests/test_puntaje_participante.py
+
+from django.test import TestCase
+from django.utils import timezone
+from datetime import timedelta
+
+from app_usuarios.models import Usuario
+from app_administradores.models import AdministradorEvento
+from app_eventos.models import Evento
+from app_evaluadores.models import Evaluador, Criterio, Calificacion, PuntajeParticipante
+from app_evaluadores.views import calcular_y_guardar_nota_general
+from app_participantes.models import Participante, ParticipanteEvento
+
+
+class PruebasPuntajeParticipante(TestCase):
+
+    def setUp(self):
+        """Evento con dos criterios, dos evaluadores y un participante aprobado."""
+        admin_user = Usuario.objects.create_user(
+            username='admin_pun', email='admin@pun.com', password='password123', documento='1'
+        )
+        administrador = AdministradorEvento.objects.create(usuario=admin_user)
+        self.evento = Evento.objects.create(
+            eve_nombre="Evento Puntajes",
+            eve_estado="Aprobado",
+            eve_capacidad=50,
+            eve_tienecosto="No",
+            eve_fecha_inicio=timezone.now().date(),
+            eve_fecha_fin=timezone.now().date() + timedelta(days=2),
+            eve_administrador_fk=administrador,
+        )
+
+        self.evaluadores = []
+        for i in range(2):
+            usuario = Usuario.objects.create_user(
+                username=f'eval_pun{i}', email=f'eval{i}@pun.com', password='password123', documento=f'2{i}'
+            )
+            self.evaluadores.append(Evaluador.objects.create(usuario=usuario))
+
+        usuario_part = Usuario.objects.create_user(
+            username='part_pun', email='part@pun.com', password='password123', documento='3'
+        )
+        self.participante = Participante.objects.create(usuario=usuario_part)
+        self.participante_evento = ParticipanteEvento.objects.create(
+            participante=self.participante,
+            evento=self.evento,
+            par_eve_estado='Aprobado',
+            par_eve_fecha_hora=timezone.now(),
+        )
+
+        self.criterio1 = Criterio.objects.create(cri_descripcion="Dominio", cri_peso=60.0, cri_evento_fk=self.evento)
+        self.criterio2 = Criterio.objects.create(cri_descripcion="Presentación", cri_peso=40.0, cri_evento_fk=self.evento)
+
+    def calificar(self, evaluador, criterio, valor):
+        return Calificacion.objects.create(
+            evaluador=evaluador, criterio=criterio, participante=self.participante, cal_valor=valor
+        )
+
+    def puntaje(self):
+        return PuntajeParticipante.objects.get(participante=self.participante, evento=self.evento)
+
+    def test_creacion_acumula_suma_y_evaluadores(self):
+        self.calificar(self.evaluadores[0], self.criterio1, 5)
+        self.calificar(self.evaluadores[0], self.criterio2, 3)
+        self.calificar(self.evaluadores[1], self.criterio1, 4)
+
+        puntaje = self.puntaje()
+        self.assertEqual(puntaje.pun_suma_ponderada, 5 * 60 + 3 * 40 + 4 * 60)
+        self.assertEqual(puntaje.pun_peso_total, 100)
+        self.assertEqual(puntaje.pun_num_evaluadores, 2)
+
+    def test_modificacion_aplica_solo_el_delta(self):
+        calificacion = self.calificar(self.evaluadores[0], self.criterio1, 2)
+        calificacion.cal_valor = 5
+        calificacion.save()
+
+        puntaje = self.puntaje()
+        self.assertEqual(puntaje.pun_suma_ponderada, 5 * 60)
+        self.assertEqual(puntaje.pun_num_evaluadores, 1)
+
+    def test_eliminacion_descuenta_calificacion_y_evaluador(self):
+        self.calificar(self.evaluadores[0], self.criterio1, 5)
+        calificacion = self.calificar(self.evaluadores[1], self.criterio1, 3)
+        calificacion.delete()
+
+        puntaje = self.puntaje()
+        self.assertEqual(puntaje.pun_suma_ponderada, 5 * 60)
+        self.assertEqual(puntaje.pun_num_evaluadores, 1)
+
+    def test_cambio_de_peso_de_criterio(self):
+        self.calificar(self.evaluadores[0], self.criterio1, 5)
+        self.calificar(self.evaluadores[0], self.criterio2, 2)
+
+        self.criterio1.cri_peso = 50.0
+        self.criterio1.save()
+
+        puntaje = self.puntaje()
+        self.assertEqual(puntaje.pun_peso_total, 90)
+        self.assertEqual(puntaje.pun_suma_ponderada, 5 * 50 + 2 * 40)
+
+    def test_eliminar_criterio_descuenta_peso_y_calificaciones(self):
+        self.calificar(self.evaluadores[0], self.criterio1, 5)
+        self.calificar(self.evaluadores[0], self.criterio2, 2)
+
+        self.criterio2.delete()
+
+        puntaje = self.puntaje()
+        self.assertEqual(puntaje.pun_peso_total, 60)
+        self.assertEqual(puntaje.pun_suma_ponderada, 5 * 60)
+
+    def test_nota_general_es_lectura_constante(self):
+        self.calificar(self.evaluadores[0], self.criterio1, 4)
+        self.calificar(self.evaluadores[0], self.criterio2, 5)
+        self.calificar(self.evaluadores[1], self.criterio1, 3)
+        self.calificar(self.evaluadores[1], self.criterio2, 3)
+
+        # Una lectura del acumulado y un UPDATE de la inscripción
+        with self.assertNumQueries(2):
+            nota = calcular_y_guardar_nota_general(self.participante, self.evento)
+
+        esperado = round((4 * 60 + 5 * 40 + 3 * 60 + 3 * 40) / (100 * 2), 1)
+        self.assertEqual(nota, esperado)
+        self.participante_evento.refresh_from_db()
+        self.assertEqual(self.participante_evento.par_eve_valor, esperado)
+
+    def test_sin_calificaciones_retorna_cero(self):
+        self.assertEqual(calcular_y_guardar_nota_general(self.participante, self.evento), 0)
+        self.participante_evento.refresh_from_db()
+        self.assertIsNone(self.participante_evento.par_eve_valor)
@@ -0,0 +1,184 @@
+# app_evaluadores/tests/test_ranking.py
+
+from unittest import mock
+
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from datetime import timedelta
+
+from app_usuarios.models import Usuario, Rol, RolUsuario
+from app_administradores import views as vistas_admin
+from app_administradores.models import AdministradorEvento
+from app_eventos.models import Evento
+from app_evaluadores.models import Evaluador, Criterio, Calificacion
+from app_evaluadores.ranking import (
+    inscripciones_rankeadas, puesto_en_evento, ranking_evento, sincronizar_notas_pendientes
+)
+from app_evaluadores.views import obtener_puesto_participante
+from app_participantes.models import Participante, ParticipanteEvento, Proyecto
+
+
+class PruebasRankingEvento(TestCase):
+
+    def setUp(self):
+        """Evento con participantes aprobados y notas con empate en el primer lugar."""
+        admin_user = Usuario.objects.create_user(
+            username='admin_rank', email='admin@rank.com', password='password123', documento='1'
+        )
+        self.admin_user = admin_user
+        administrador = AdministradorEvento.objects.create(usuario=admin_user)
+        self.evento = Evento.objects.create(
+            eve_nombre="Evento Ranking",
+            eve_estado="Aprobado",
+            eve_capacidad=100,
+            eve_tienecosto="No",
+            eve_fecha_inicio=timezone.now().date(),
+            eve_fecha_fin=timezone.now().date() + timedelta(days=2),
+            eve_administrador_fk=administrador,
+        )
+        self.total = 0
+
+    def crear_inscripcion(self, valor, confirmado=True, estado='Aprobado', codigo=None, proyecto=None):
+        self.total += 1
+        usuario = Usuario.objects.create_user(
+            username=f'part_rank{self.total}',
+            email=f'part{self.total}@rank.com',
+            password='password123',
+            documento=f'9{self.total}',
+        )
+        participante = Participante.objects.create(usuario=usuario)
+        return ParticipanteEvento.objects.create(
+            participante=participante,
+            evento=self.evento,
+            par_eve_estado=estado,
+            par_eve_fecha_hora=timezone.now(),
+            par_eve_valor=valor,
+            confirmado=confirmado,
+            codigo=codigo,
+            proyecto=proyecto,
+        )
+
+    def test_empates_comparten_puesto_y_la_fila_es_consecutiva(self):
+        primero = self.crear_inscripcion(4.5)
+        segundo = self.crear_inscripcion(4.5)
+        tercero = self.crear_inscripcion(3.0)
+        self.crear_inscripcion(5.0, estado='Pendiente')
+
+        posiciones = ranking_evento(self.evento)
+
+        self.assertEqual(
+            [p['participante_evento'].pk for p in posiciones],
+            [primero.pk, segundo.pk, tercero.pk],
+        )
+        self.assertEqual([p['puesto'] for p in posiciones], [1, 1, 3])
+        self.assertEqual([p['fila'] for p in posiciones], [1, 2, 3])
+
+    def test_pdf_de_posiciones_usa_el_puesto_compartido(self):
+        self.crear_inscripcion(4.5)
+        self.crear_inscripcion(4.5)
+        self.crear_inscripcion(3.0)
+        RolUsuario.objects.create(
+            usuario=self.admin_user,
+            rol=Rol.objects.create(nombre='administrador_evento', descripcion='Administrador de evento')
+        )
+        self.client.force_login(self.admin_user)
+
+        with mock.patch.object(vistas_admin, 'Table', wraps=vistas_admin.Table) as tabla:
+            response = self.client.get(reverse('descargar_tabla_posiciones_pdf_admin', args=[self.evento.pk]))
+
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        filas = tabla.call_args.args[0]
+        self.assertEqual([fila[0] for fila in filas[1:]], ['1', '1', '3'])
+
+    def test_tabla_html_usa_el_puesto_compartido(self):
+        self.crear_inscripcion(4.5)
+        self.crear_inscripcion(4.5)
+        self.crear_inscripcion(3.0)
+        RolUsuario.objects.create(
+            usuario=self.admin_user,
+            rol=Rol.objects.create(nombre='administrador_evento', descripcion='Administrador de evento')
+        )
+        self.client.force_login(self.admin_user)
+
+        response = self.client.get(reverse('tabla_posiciones_administrador', args=[self.evento.pk]))
+
+        contenido = response.content.decode()
+        self.assertEqual(contenido.count('<strong>#1</strong>'), 2)
+        self.assertEqual(contenido.count('🥇'), 2)
+        self.assertNotIn('<strong>#2</strong>', contenido)
+        self.assertIn('<strong>#3</strong>', contenido)
+
+    def test_sin_nota_queda_al_final_salvo_que_se_pidan_solo_calificados(self):
+        self.crear_inscripcion(None)
+        calificado = self.crear_inscripcion(2.0)
+
+        todos = ranking_evento(self.evento)
+        self.assertEqual(todos[0]['participante_evento'].pk, calificado.pk)
+        self.assertEqual(todos[1]['puntaje'], 0)
+
+        solo = ranking_evento(self.evento, solo_calificados=True)
+        self.assertEqual([p['participante_evento'].pk for p in solo], [calificado.pk])
+
+    def test_ranking_es_una_sola_consulta(self):
+        for valor in range(30):
+            self.crear_inscripcion(float(valor % 7), confirmado=valor % 2 == 0)
+
+        with self.assertNumQueries(1):
+            inscripciones = list(inscripciones_rankeadas(self.evento, solo_calificados=True, solo_confirmados=True))
+            nombres = [pe.participante.usuario.username for pe in inscripciones]
+
+        self.assertEqual(len(nombres), 15)
+
+    def test_proyectos_no_generan_consultas_por_participante(self):
+        for _ in range(5):
+            self.crear_inscripcion(1.0)
+        with self.assertNumQueries(3):
+            ranking_evento(self.evento)
+
+        lider = self.crear_inscripcion(3.0, codigo='G1')
+        proyecto = Proyecto.objects.create(evento=self.evento, titulo="Grupal", creador=lider.participante)
+        lider.proyecto = proyecto
+        lider.save()
+        self.crear_inscripcion(2.0, codigo='G1', proyecto=proyecto)
+
+        with self.assertNumQueries(3):
+            posiciones = ranking_evento(self.evento)
+        self.assertEqual(posiciones[1]['proyectos'], [proyecto])
+
+    def test_sincronizar_notas_pendientes_usa_el_acumulado(self):
+        inscripcion = self.crear_inscripcion(None)
+        usuario_eval = Usuario.objects.create_user(
+            username='eval_rank', email='eval@rank.com', password='password123', documento='2'
+        )
+        evaluador = Evaluador.objects.create(usuario=usuario_eval)
+        criterio = Criterio.objects.create(cri_descripcion="Dominio", cri_peso=100.0, cri_evento_fk=self.evento)
+        Calificacion.objects.create(
+            evaluador=evaluador, criterio=criterio, participante=inscripcion.participante, cal_valor=4
+        )
+
+        self.assertEqual(sincronizar_notas_pendientes(self.evento), 1)
+        inscripcion.refresh_from_db()
+        self.assertEqual(inscripcion.par_eve_valor, 4.0)
+
+    def test_puesto_individual_coincide_con_el_ranking(self):
+        inscripciones = [self.crear_inscripcion(v) for v in (3.0, 4.5, 4.5, 1.0)]
+        sin_nota = self.crear_inscripcion(None)
+
+        esperados = {p['participante_evento'].pk: p['puesto'] for p in ranking_evento(self.evento)}
+        for pe in inscripciones:
+            with self.assertNumQueries(2):
+                puesto = obtener_puesto_participante(pe.participante, self.evento)
+            self.assertEqual(puesto, esperados[pe.pk])
+
+        self.assertIsNone(puesto_en_evento(sin_nota.participante_id, self.evento.pk))
+
+    def test_puesto_refleja_cambios_de_nota(self):
+        primero = self.crear_inscripcion(4.0)
+        segundo = self.crear_inscripcion(3.0)
+        self.assertEqual(puesto_en_evento(segundo.participante_id, self.evento.pk), 2)
+
+        segundo.par_eve_valor = 5.0
+        segundo.save()
+        self.assertEqual(puesto_en_evento(segundo.participante_id, self.evento.pk), 1)
+        self.assertEqual(puesto_en_evento(primero.participante_id, self.evento.pk), 2)
@@ -0,0 +1,129 @@
+# app_evaluadores/tests/test_registrar_rubrica.py
+
+from django.test import TestCase, Client
+from django.urls import reverse
+from django.utils import timezone
+from datetime import timedelta
+
+from app_usuarios.models import Usuario, Rol, RolUsuario
+from app_administradores.models import AdministradorEvento
+from app_eventos.models import Evento
+from app_evaluadores.models import Evaluador, EvaluadorEvento, Criterio, Calificacion, PuntajeParticipante
+from app_participantes.models import Participante, ParticipanteEvento, Proyecto
+
+
+class PruebasRegistrarRubrica(TestCase):
+
+    def setUp(self):
+        """Evaluador aprobado, dos criterios y un grupo de tres integrantes con proyecto del líder."""
+        self.client = Client()
+        rol_evaluador = Rol.objects.create(nombre='evaluador', descripcion='Evaluador')
+
+        admin_user = Usuario.objects.create_user(
+            username='admin_rub', email='admin@rub.com', password='password123', documento='1'
+        )
+        administrador = AdministradorEvento.objects.create(usuario=admin_user)
+        self.evento = Evento.objects.create(
+            eve_nombre="Evento Rúbrica",
+            eve_estado="Aprobado",
+            eve_capacidad=50,
+            eve_tienecosto="No",
+            eve_fecha_inicio=timezone.now().date(),
+            eve_fecha_fin=timezone.now().date() + timedelta(days=2),
+            eve_administrador_fk=administrador,
+        )
+
+        self.user_evaluador = Usuario.objects.create_user(
+            username='eval_rub', email='eval@rub.com', password='password123', documento='2'
+        )
+        RolUsuario.objects.create(usuario=self.user_evaluador, rol=rol_evaluador)
+        self.evaluador = Evaluador.objects.create(usuario=self.user_evaluador)
+        EvaluadorEvento.objects.create(
+            evaluador=self.evaluador,
+            evento=self.evento,
+            eva_eve_estado='Aprobado',
+            confirmado=True,
+            eva_eve_fecha_hora=timezone.now(),
+        )
+
+        self.criterio1 = Criterio.objects.create(cri_descripcion="Dominio", cri_peso=60.0, cri_evento_fk=self.evento)
+        self.criterio2 = Criterio.objects.create(cri_descripcion="Innovación", cri_peso=40.0, cri_evento_fk=self.evento)
+
+        self.integrantes = []
+        for i in range(3):
+            usuario = Usuario.objects.create_user(
+                username=f'part_rub{i}', email=f'part{i}@rub.com', password='password123', documento=f'3{i}'
+            )
+            self.integrantes.append(Participante.objects.create(usuario=usuario))
+        self.proyecto = Proyecto.objects.create(
+            evento=self.evento, titulo="Proyecto Grupal", creador=self.integrantes[0]
+        )
+        self.inscripciones = [
+            ParticipanteEvento.objects.create(
+                participante=p,
+                evento=self.evento,
+                par_eve_estado='Aprobado',
+                par_eve_fecha_hora=timezone.now(),
+                codigo='GRP1',
+                proyecto=self.proyecto,
+            )
+            for p in self.integrantes
+        ]
+
+        self.client.force_login(self.user_evaluador)
+        session = self.client.session
+        session['rol_sesion'] = 'evaluador'
+        session.save()
+
+    def calificar(self, participante, valor1, valor2):
+        url = reverse('calificar_participante_evaluador', args=[self.evento.pk, participante.pk])
+        return self.client.post(url, {
+            f'criterio_{self.criterio1.cri_id}': valor1,
+            f'criterio_{self.criterio2.cri_id}': valor2,
+            f'obs_{self.criterio1.cri_id}': 'Buen dominio',
+        })
+
+    def test_rubrica_grupal_propaga_nota_a_integrantes_y_proyecto(self):
+        response = self.calificar(self.integrantes[1], 5, 3)
+        self.assertEqual(response.status_code, 302)
+
+        esperado = round((5 * 60 + 3 * 40) / 100, 1)
+        for pe in self.inscripciones:
+            pe.refresh_from_db()
+            self.assertEqual(pe.par_eve_valor, esperado)
+        self.proyecto.refresh_from_db()
+        self.assertEqual(self.proyecto.pro_valor, esperado)
+
+        puntaje = PuntajeParticipante.objects.get(participante=self.integrantes[1], evento=self.evento)
+        self.assertEqual(puntaje.pun_num_evaluadores, 1)
+        self.assertEqual(puntaje.pun_suma_ponderada, 5 * 60 + 3 * 40)
+
+    def test_reenviar_la_rubrica_actualiza_sin_duplicar(self):
+        self.calificar(self.integrantes[0], 2, 2)
+        self.calificar(self.integrantes[0], 4, 5)
+
+        calificaciones = Calificacion.objects.filter(evaluador=self.evaluador, participante=self.integrantes[0])
+        self.assertEqual(calificaciones.count(), 2)
+        self.assertEqual(calificaciones.get(criterio=self.criterio1).cal_valor, 4)
+        self.assertEqual(calificaciones.get(criterio=self.criterio1).cal_observacion, 'Buen dominio')
+        self.assertIsNone(calificaciones.get(criterio=self.criterio2).cal_observacion)
+
+        puntaje = PuntajeParticipante.objects.get(participante=self.integrantes[0], evento=self.evento)
+        self.assertEqual(puntaje.pun_suma_ponderada, 4 * 60 + 5 * 40)
+        self.assertEqual(puntaje.pun_num_evaluadores, 1)
+
+    def test_integrante_con_calificacion_propia_conserva_su_nota(self):
+        self.calificar(self.integrantes[2], 1, 1)
+        self.calificar(self.integrantes[0], 5, 5)
+
+        self.inscripciones[2].refresh_from_db()
+        self.inscripciones[1].refresh_from_db()
+        self.assertEqual(self.inscripciones[2].par_eve_valor, 1.0)
+        self.assertEqual(self.inscripciones[1].par_eve_valor, 5.0)
+
+    def test_valor_invalido_no_escribe_nada(self):
+        response = self.calificar(self.integrantes[0], 4, 9)
+        self.assertEqual(response.status_code, 302)
+        self.assertFalse(Calificacion.objects.filter(participante=self.integrantes[0]).exists())
+        self.inscripciones[0].refresh_from_db()
+        self.assertIsNone(self.inscripciones[0].par_eve_valor)
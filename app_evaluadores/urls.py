@@ -3,6 +3,7 @@ from . import views
 
 urlpatterns = [
     path('dashboard-evaluador/', views.dashboard_evaluador, name='dashboard_evaluador'),
+    path('evento/<int:eve_id>/certificado/', views.descargar_certificado_evaluador, name='descargar_certificado_evaluador'),
     path('gestionar-items/<int:eve_id>/', views.gestionar_items, name='gestionar_items_evaluador'),
     path('agregar-item/<int:eve_id>/', views.agregar_item, name='agregar_item_evaluador'),
     path('editar-item/<int:criterio_id>/', views.editar_item, name='editar_item_evaluador'),
@@ -10,6 +11,7 @@ urlpatterns = [
     path('instrumento-evaluacion/<int:evento_id>/', views.instrumento_evaluacion, name='instrumento_evaluacion'),
     path('lista-participantes-evaluador/<int:eve_id>/', views.lista_participantes, name='lista_participantes_evaluador'),
     path('calificar-participante/<int:eve_id>/<int:participante_id>/', views.calificar_participante, name='calificar_participante_evaluador'),
+    path('api/calificaciones/<int:eve_id>/', views.calificar_lote, name='api_calificar_lote'),
     path('tabla-posiciones/<int:eve_id>/', views.ver_tabla_posiciones, name='tabla_posiciones_evaluador'),
     path('descargar-tabla-posiciones-pdf/<int:eve_id>/', views.descargar_tabla_posiciones_pdf, name='descargar_tabla_posiciones_pdf'),
     path('informacion-detallada/<int:eve_id>/', views.informacion_detallada, name='informacion_detallada_evaluador'),
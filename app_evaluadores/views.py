@@ -2,12 +2,20 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required, user_passes_test
 from app_usuarios.permisos import es_evaluador
 from django.contrib import messages
-from django.http import HttpResponse, FileResponse, Http404
+from django.http import HttpResponse, FileResponse, Http404, JsonResponse
+from django.views.decorators.http import require_POST
 from .models import Evaluador
 from app_eventos.models import Evento, EventoCategoria
 from app_evaluadores.models import Criterio, Calificacion, EvaluadorEvento
+from app_evaluadores.puntajes import obtener_puntaje
+from app_evaluadores.calificaciones import registrar_rubrica, registrar_rubricas
+from app_evaluadores.ranking import puesto_en_evento, ranking_evento, sincronizar_notas_pendientes
 from app_participantes.models import ParticipanteEvento, Participante
+from app_participantes.grupos import grupos_del_evento, proyectos_de_inscripciones
 from app_usuarios.models import Usuario
+from app_administradores.certificados import eventos_con_certificado, respuesta_certificado
+from django.db.models import Count
+import json
 import os
 from django.conf import settings
 from reportlab.lib.pagesizes import letter, landscape
@@ -19,30 +27,18 @@ from reportlab.lib.styles import ParagraphStyle
 
 
 def calcular_y_guardar_nota_general(participante, evento):
-    criterios = Criterio.objects.filter(cri_evento_fk=evento)
-    peso_total = sum(c.cri_peso for c in criterios) or 1
-
-    calificaciones = Calificacion.objects.filter(
-        participante=participante,
-        criterio__cri_evento_fk=evento
-    ).select_related('criterio')
-
-    evaluadores_ids = set(c.evaluador_id for c in calificaciones)
-    num_evaluadores = len(evaluadores_ids)
+    # El acumulado se mantiene al día con señales sobre Calificacion y Criterio,
+    # así que la nota es una lectura O(1) en lugar de recorrer todas las calificaciones.
+    puntaje = obtener_puntaje(participante.pk, evento.pk)
 
-    if num_evaluadores > 0:
-        puntaje_ponderado = sum(
-            c.cal_valor * c.criterio.cri_peso for c in calificaciones
-        ) / (peso_total * num_evaluadores)
-
-        participante_evento = ParticipanteEvento.objects.get(
+    if puntaje.pun_num_evaluadores > 0:
+        nota = puntaje.nota
+        ParticipanteEvento.objects.filter(
             participante=participante,
             evento=evento
-        )
-        participante_evento.par_eve_valor = round(puntaje_ponderado, 1)
-        participante_evento.save()
+        ).update(par_eve_valor=nota)
 
-        return round(puntaje_ponderado, 1)
+        return nota
 
     return 0
 
@@ -50,25 +46,16 @@ def obtener_puesto_participante(participante, evento):
     """
     Obtiene el puesto de un participante en un evento basado en su nota
     """
-    # Obtener todas las participaciones del evento ordenadas por nota
-    participaciones = ParticipanteEvento.objects.filter(
-        evento=evento,
-        par_eve_estado='Aprobado',
-        par_eve_valor__isnull=False
-    ).order_by('-par_eve_valor')
-    
-    # Encontrar el puesto del participante
-    for i, pe in enumerate(participaciones, 1):
-        if pe.participante == participante:
-            return i
-    
-    return None  # No encontrado o sin calificación
+    # Dos consultas indexadas (nota propia y conteo de notas mayores) en lugar
+    # de cargar y recorrer todas las inscripciones; los empates comparten puesto.
+    return puesto_en_evento(participante.pk, evento.pk)
 
 @login_required
 @user_passes_test(es_evaluador, login_url='login')
 def dashboard_evaluador(request):
     evaluador = request.user.evaluador
     inscripciones = EvaluadorEvento.objects.select_related('evento').filter(evaluador=evaluador)
+    con_certificado = eventos_con_certificado([inscripcion.evento for inscripcion in inscripciones], 'evaluador')
 
     # Agregar información sobre archivos disponibles a cada inscripción
     inscripciones_con_archivos = []
@@ -79,6 +66,10 @@ def dashboard_evaluador(request):
             'estado': inscripcion.eva_eve_estado,
             'tiene_memorias': bool(inscripcion.evento.eve_memorias),
             'tiene_info_tecnica': bool(inscripcion.evento.eve_informacion_tecnica),
+            'tiene_certificado': (
+                inscripcion.evento.pk in con_certificado
+                and inscripcion.eva_eve_estado == 'Aprobado' and inscripcion.confirmado
+            ),
         }
         inscripciones_con_archivos.append(inscripcion_data)
 
@@ -89,6 +80,17 @@ def dashboard_evaluador(request):
     })
 
 
+@login_required
+@user_passes_test(es_evaluador, login_url='login')
+def descargar_certificado_evaluador(request, eve_id):
+    evento = get_object_or_404(Evento, pk=eve_id)
+    response = respuesta_certificado(request, evento, 'evaluador', request.user)
+    if response is None:
+        messages.warning(request, "Tu certificado de evaluador para este evento aún no está disponible.")
+        return redirect('dashboard_evaluador')
+    return response
+
+
 @login_required
 @user_passes_test(es_evaluador, login_url='login')
 def gestionar_items(request, eve_id):
@@ -236,112 +238,42 @@ def lista_participantes(request, eve_id):
         messages.warning(request, "No estás registrado como evaluador.")
         return redirect('login_evaluador')
 
-    if not evento.criterios.exists():
+    total_criterios = evento.criterios.count()
+    if not total_criterios:
         messages.warning(request, "Este evento aún no tiene criterios definidos.")
         return redirect('gestionar_items_evaluador', eve_id=eve_id)
 
-    from app_participantes.models import Proyecto
-
     # 1) Participantes aprobados (fila principal, con su proyecto principal si lo hay)
-    participantes_evento = ParticipanteEvento.objects.filter(
+    participantes_evento = list(ParticipanteEvento.objects.filter(
         evento=evento,
         par_eve_estado='Aprobado'
-    ).select_related('participante__usuario', 'proyecto')
+    ).select_related('participante__usuario', 'proyecto'))
 
-    criterios_evento = Criterio.objects.filter(cri_evento_fk=evento)
-    total_criterios = criterios_evento.count()
+    # 2) Proyectos del evento y líderes de grupo, resueltos en memoria
+    proyectos = proyectos_de_inscripciones(evento, participantes_evento)
 
     participantes_data = {}
-
-    # ---- base por participante ----
     for pe in participantes_evento:
-        p = pe.participante
-        if p.id not in participantes_data:
-            participantes_data[p.id] = {
-                'participante': p,
-                'principal_proyecto': pe.proyecto,   # puede ser None
-                'proyectos_extra': set(),
-                'codigo': pe.codigo,
-            }
-
-    # ---- proyectos creados por cada participante (principal + extras) ----
-    for p_id, data in list(participantes_data.items()):
-        p = data['participante']
-
-        creados = Proyecto.objects.filter(
-            evento=evento,
-            creador=p
-        ).order_by('fecha_subida', 'id')
-
-        principal = data['principal_proyecto']
-        extras = set()
-
-        for pr in creados:
-            if principal and pr.id == principal.id:
-                continue
-            extras.add(pr)
-
-        data['proyectos_extra'] = extras
-
-    # ---- proyectos del líder para integrantes grupales ----
-    for p_id, data in list(participantes_data.items()):
-        codigo = data['codigo']
-        if not codigo:
-            continue
-
-        lider_ids = Proyecto.objects.filter(
-            evento=evento
-        ).exclude(creador__isnull=True).values_list('creador_id', flat=True)
-
-        pe_lider = ParticipanteEvento.objects.filter(
-            evento=evento,
-            codigo=codigo,
-            participante_id__in=lider_ids
-        ).first()
-
-        if not pe_lider:
-            continue
-
-        proyectos_lider = Proyecto.objects.filter(
-            evento=evento,
-            creador_id=pe_lider.participante_id
-        ).order_by('fecha_subida', 'id')
-
-        principal = data['principal_proyecto']
-        extras = data['proyectos_extra']
-
-        for pr in proyectos_lider:
-            if principal and pr.id == principal.id:
-                continue
-            extras.add(pr)
-
-        data['proyectos_extra'] = extras
-
-    # ---- lista final de proyectos por participante ----
-    for data in participantes_data.values():
-        proyectos = []
-        if data['principal_proyecto']:
-            proyectos.append(data['principal_proyecto'])
-        extras_ordenados = sorted(
-            list(data['proyectos_extra']),
-            key=lambda pr: (pr.fecha_subida, pr.id)
-        )
-        proyectos.extend(extras_ordenados)
-        data['proyectos'] = proyectos
-
-    # ---- participantes calificados: tienen calificación en TODOS los criterios ----
-    calificados_ids = set()
+        principal, extras = proyectos[pe.participante_id]
+        participantes_data[pe.participante_id] = {
+            'participante': pe.participante,
+            'principal_proyecto': principal,   # puede ser None
+            'proyectos_extra': set(extras),
+            'codigo': pe.codigo,
+            'proyectos': ([principal] if principal else []) + extras,
+        }
 
-    for p_id, data in participantes_data.items():
-        p = data['participante']
-        num_califs = Calificacion.objects.filter(
-            evaluador=evaluador,
-            participante=p,
-            criterio__cri_evento_fk=evento
-        ).values('criterio_id').distinct().count()
+    # 3) Participantes calificados: tienen calificación en TODOS los criterios (una consulta agrupada)
+    criterios_por_participante = Calificacion.objects.filter(
+        evaluador=evaluador,
+        criterio__cri_evento_fk=evento
+    ).values('participante_id').annotate(num=Count('criterio_id', distinct=True))
 
-        if num_califs == total_criterios and total_criterios > 0:
-            calificados_ids.add(p_id)
+    calificados_ids = {
+        fila['participante_id']
+        for fila in criterios_por_participante
+        if fila['num'] == total_criterios and fila['participante_id'] in participantes_data
+    }
 
     # Para grupales: si un integrante del código está calificado,
     # marcar a todos los del mismo código como calificados también.
@@ -400,82 +332,24 @@ def calificar_participante(request, eve_id, participante_id):
     criterios = Criterio.objects.filter(cri_evento_fk=evento)
 
     if request.method == "POST":
+        # Validar toda la rúbrica antes de escribir para no dejarla a medias
+        valores = {}
         for criterio in criterios:
             valor = request.POST.get(f"criterio_{criterio.cri_id}")
             observacion = request.POST.get(f"obs_{criterio.cri_id}", "").strip()
 
             try:
                 valor_int = int(valor)
-                if 1 <= valor_int <= 5:
-                    calificacion, created = Calificacion.objects.get_or_create(
-                        evaluador=evaluador,
-                        criterio=criterio,
-                        participante=participante,
-                        defaults={'cal_valor': valor_int, 'cal_observacion': observacion or None}
-                    )
-                    if not created:
-                        calificacion.cal_valor = valor_int
-                        calificacion.cal_observacion = observacion or None
-                    calificacion.save()
-                else:
-                    messages.error(request, f"El valor de {criterio.cri_descripcion} debe estar entre 1 y 5.")
-                    return redirect(request.path)
             except (TypeError, ValueError):
                 messages.error(request, f"Valor inválido para {criterio.cri_descripcion}.")
                 return redirect(request.path)
+            if not 1 <= valor_int <= 5:
+                messages.error(request, f"El valor de {criterio.cri_descripcion} debe estar entre 1 y 5.")
+                return redirect(request.path)
+            valores[criterio.cri_id] = (valor_int, observacion)
 
-        # Recalcular nota general del participante actual (1 decimal)
-        nota = calcular_y_guardar_nota_general(participante, evento)
-
-        from app_participantes.models import Proyecto
-
-        # 1) Caso individual (sin código de grupo):
-        #    aplicar la nota a TODOS los proyectos creados por este participante en el evento.
-        if not participacion.codigo:
-            proyectos_participante = Proyecto.objects.filter(
-                evento=evento,
-                creador=participante
-            )
-            for proyecto in proyectos_participante:
-                proyecto.pro_valor = round(nota, 1)
-                proyecto.save()
-
-        else:
-            # 2) Caso grupal: un solo integrante calificado basta.
-
-            # a) Identificar al líder (creador de proyectos en este evento dentro del grupo).
-            lider_ids = Proyecto.objects.filter(
-                evento=evento
-            ).exclude(creador__isnull=True).values_list('creador_id', flat=True)
-
-            pe_lider = ParticipanteEvento.objects.filter(
-                evento=evento,
-                codigo=participacion.codigo,
-                participante_id__in=lider_ids
-            ).first()
-
-            # a1) Participantes del grupo (mismo código, aprobados)
-            integrantes_grupo = ParticipanteEvento.objects.filter(
-                evento=evento,
-                codigo=participacion.codigo,
-                par_eve_estado='Aprobado'
-            ).select_related('participante')
-
-            for pe in integrantes_grupo:
-                pe.par_eve_valor = round(nota, 1)
-                pe.save()
-                # Recalcular y guardar nota general individual según calificaciones existentes
-                calcular_y_guardar_nota_general(pe.participante, evento)
-
-            # a2) Proyectos del grupo: todos los proyectos del líder en este evento
-            if pe_lider:
-                proyectos_grupo = Proyecto.objects.filter(
-                    evento=evento,
-                    creador_id=pe_lider.participante_id
-                )
-                for proyecto in proyectos_grupo:
-                    proyecto.pro_valor = round(nota, 1)
-                    proyecto.save()
+        # Calificaciones, nota general, integrantes del grupo y proyectos en una transacción
+        registrar_rubrica(evaluador, participacion, valores)
 
         messages.success(request, "Calificaciones guardadas exitosamente.")
         return redirect('lista_participantes_evaluador', eve_id=eve_id)
@@ -486,126 +360,131 @@ def calificar_participante(request, eve_id, participante_id):
         'evento': evento,
     })
 
+# Límite de calificaciones por petición para acotar el tamaño de la transacción
+MAX_CALIFICACIONES_LOTE = 1000
+
 @login_required
 @user_passes_test(es_evaluador, login_url='login')
-def ver_tabla_posiciones(request, eve_id):
+@require_POST
+def calificar_lote(request, eve_id):
+    """
+    API JSON para sincronizar de una vez las calificaciones hechas sin conexión.
+    Cuerpo: {"calificaciones": [{"participante": id, "criterio": cri_id,
+    "valor": 1-5, "observacion": "..."}]}. El lote se valida completo contra
+    los criterios del evento y se guarda en una sola transacción.
+    """
     evento = get_object_or_404(Evento, pk=eve_id)
     try:
         evaluador = request.user.evaluador
         inscripcion = EvaluadorEvento.objects.get(evaluador=evaluador, evento=evento)
-        if inscripcion.eva_eve_estado != 'Aprobado':
-            messages.warning(request, "Tu inscripción a este evento aún no ha sido aprobada.")
-            return redirect('dashboard_evaluador')
     except (EvaluadorEvento.DoesNotExist, Evaluador.DoesNotExist):
-        messages.error(request, "No estás inscrito en este evento.")
-        return redirect('dashboard_evaluador')
+        return JsonResponse({
+            'success': False,
+            'error': 'No estás inscrito como evaluador en este evento.'
+        }, status=403)
+    if inscripcion.eva_eve_estado != 'Aprobado':
+        return JsonResponse({
+            'success': False,
+            'error': 'Tu inscripción como evaluador aún no ha sido aprobada para este evento.'
+        }, status=403)
 
-    criterios = Criterio.objects.filter(cri_evento_fk=evento)
-    peso_total = sum(c.cri_peso for c in criterios) or 1
-
-    from app_participantes.models import Proyecto
-
-    participantes_evento = ParticipanteEvento.objects.filter(
-        evento=evento,
-        par_eve_estado='Aprobado'
-    ).select_related('participante__usuario', 'proyecto')
-
-    datos = {}
-
-    for pe in participantes_evento:
-        p = pe.participante
-        if p.id not in datos:
-            if pe.par_eve_valor is not None:
-                puntaje_ponderado = pe.par_eve_valor
-            else:
-                calificaciones = Calificacion.objects.filter(
-                    participante=p,
-                    criterio__cri_evento_fk=evento
-                ).select_related('criterio')
-                evaluadores_ids = set(c.evaluador_id for c in calificaciones)
-                num_evaluadores = len(evaluadores_ids)
-                if num_evaluadores > 0:
-                    puntaje_ponderado = sum(
-                        c.cal_valor * c.criterio.cri_peso for c in calificaciones
-                    ) / (peso_total * num_evaluadores)
-                    puntaje_ponderado = round(puntaje_ponderado, 2)
-                    pe.par_eve_valor = puntaje_ponderado
-                    pe.save()
-                else:
-                    puntaje_ponderado = 0
-
-            datos[p.id] = {
-                'participante': p,
-                'puntaje': puntaje_ponderado,
-                'principal_proyecto': pe.proyecto,
-                'proyectos_extra': set(),
-                'codigo': pe.codigo,
-            }
-
-    for p_id, info in list(datos.items()):
-        p = info['participante']
-        creados = Proyecto.objects.filter(
+    try:
+        items = json.loads(request.body).get('calificaciones')
+    except (ValueError, AttributeError):
+        items = None
+    if not isinstance(items, list) or not items:
+        return JsonResponse({
+            'success': False,
+            'error': 'El cuerpo debe ser un JSON con la lista "calificaciones".'
+        }, status=400)
+    if len(items) > MAX_CALIFICACIONES_LOTE:
+        return JsonResponse({
+            'success': False,
+            'error': f'Máximo {MAX_CALIFICACIONES_LOTE} calificaciones por envío.'
+        }, status=400)
+
+    criterios_ids = set(Criterio.objects.filter(cri_evento_fk=evento).values_list('cri_id', flat=True))
+    participante_ids = {
+        item.get('participante') for item in items
+        if isinstance(item, dict) and isinstance(item.get('participante'), int)
+    }
+    participaciones = {
+        pe.participante_id: pe for pe in ParticipanteEvento.objects.filter(
             evento=evento,
-            creador=p
-        ).order_by('fecha_subida', 'id')
-
-        principal = info['principal_proyecto']
-        extras = set()
-        for pr in creados:
-            if principal and pr.id == principal.id:
-                continue
-            extras.add(pr)
-
-        info['proyectos_extra'] = extras
+            par_eve_estado='Aprobado',
+            participante_id__in=participante_ids
+        )
+    }
 
-    for p_id, info in list(datos.items()):
-        codigo = info['codigo']
-        if not codigo:
+    errores = []
+    rubricas = {}
+    for i, item in enumerate(items):
+        if not isinstance(item, dict):
+            errores.append({'indice': i, 'error': 'Formato inválido.'})
             continue
+        participante_id = item.get('participante')
+        criterio_id = item.get('criterio')
+        valor = item.get('valor')
+        observacion = item.get('observacion') or ''
+
+        if not isinstance(participante_id, int) or participante_id not in participaciones:
+            errores.append({'indice': i, 'error': 'Participante no aprobado en este evento.'})
+        elif not isinstance(criterio_id, int) or criterio_id not in criterios_ids:
+            errores.append({'indice': i, 'error': 'El criterio no pertenece a este evento.'})
+        elif isinstance(valor, bool) or not isinstance(valor, int) or not 1 <= valor <= 5:
+            errores.append({'indice': i, 'error': 'El valor debe ser un entero entre 1 y 5.'})
+        elif not isinstance(observacion, str) or len(observacion) > 255:
+            errores.append({'indice': i, 'error': 'La observación debe ser texto de máximo 255 caracteres.'})
+        else:
+            rubricas.setdefault(participante_id, {})[criterio_id] = (valor, observacion.strip())
 
-        lider_ids = Proyecto.objects.filter(
-            evento=evento
-        ).exclude(creador__isnull=True).values_list('creador_id', flat=True)
+    if errores:
+        return JsonResponse({'success': False, 'errores': errores}, status=400)
 
-        pe_lider = ParticipanteEvento.objects.filter(
-            evento=evento,
-            codigo=codigo,
-            participante_id__in=lider_ids
-        ).first()
-        if not pe_lider:
-            continue
+    puntajes = registrar_rubricas(
+        evaluador,
+        evento.pk,
+        [(participaciones[pid], valores) for pid, valores in rubricas.items()]
+    )
+    # Criterios que este evaluador tiene calificados en total, no solo los de este envío
+    calificados = dict(
+        Calificacion.objects.filter(
+            evaluador=evaluador,
+            participante_id__in=puntajes.keys(),
+            criterio__cri_evento_fk=evento
+        ).values('participante').annotate(total=Count('id')).values_list('participante', 'total')
+    )
 
-        proyectos_lider = Proyecto.objects.filter(
-            evento=evento,
-            creador_id=pe_lider.participante_id
-        ).order_by('fecha_subida', 'id')
-
-        principal = info['principal_proyecto']
-        extras = info['proyectos_extra']
-        for pr in proyectos_lider:
-            if principal and pr.id == principal.id:
-                continue
-            extras.add(pr)
-        info['proyectos_extra'] = extras
-
-    posiciones = []
-    for info in datos.values():
-        proyectos = []
-        if info['principal_proyecto']:
-            proyectos.append(info['principal_proyecto'])
-        extras_ordenados = sorted(
-            list(info['proyectos_extra']),
-            key=lambda pr: (pr.fecha_subida, pr.id)
-        )
-        proyectos.extend(extras_ordenados)
-        posiciones.append({
-            'participante': info['participante'],
-            'puntaje': info['puntaje'],
-            'proyectos': proyectos,
-            'codigo': info['codigo'],
-        })
+    return JsonResponse({
+        'success': True,
+        'puntajes': [
+            {
+                'participante': pid,
+                'nota': puntaje.nota,
+                'num_evaluadores': puntaje.pun_num_evaluadores,
+                'calificados_por_mi': calificados.get(pid, 0),
+            }
+            for pid, puntaje in puntajes.items()
+        ],
+    })
+
+@login_required
+@user_passes_test(es_evaluador, login_url='login')
+def ver_tabla_posiciones(request, eve_id):
+    evento = get_object_or_404(Evento, pk=eve_id)
+    try:
+        evaluador = request.user.evaluador
+        inscripcion = EvaluadorEvento.objects.get(evaluador=evaluador, evento=evento)
+        if inscripcion.eva_eve_estado != 'Aprobado':
+            messages.warning(request, "Tu inscripción a este evento aún no ha sido aprobada.")
+            return redirect('dashboard_evaluador')
+    except (EvaluadorEvento.DoesNotExist, Evaluador.DoesNotExist):
+        messages.error(request, "No estás inscrito en este evento.")
+        return redirect('dashboard_evaluador')
 
-    posiciones.sort(key=lambda x: x['puntaje'], reverse=True)
+    # Completa las notas que falten y ordena en la base de datos
+    sincronizar_notas_pendientes(evento)
+    posiciones = ranking_evento(evento)
 
     return render(request, 'tabla_posiciones_evaluador.html', {
         'evento': evento,
@@ -626,88 +505,7 @@ def descargar_tabla_posiciones_pdf(request, eve_id):
         messages.error(request, "No estás inscrito en este evento.")
         return redirect('dashboard_evaluador')
 
-    participantes_evento = ParticipanteEvento.objects.filter(
-        evento=evento,
-        par_eve_estado='Aprobado',
-        par_eve_valor__isnull=False
-    ).select_related('participante__usuario', 'proyecto')
-
-    from app_participantes.models import Proyecto
-
-    datos = {}
-    for pe in participantes_evento:
-        p = pe.participante
-        if p.id not in datos:
-            datos[p.id] = {
-                'participante': p,
-                'puntaje': pe.par_eve_valor,
-                'principal_proyecto': pe.proyecto,
-                'proyectos_extra': set(),
-                'codigo': pe.codigo,
-            }
-
-    for p_id, info in list(datos.items()):
-        p = info['participante']
-        creados = Proyecto.objects.filter(
-            evento=evento,
-            creador=p
-        ).order_by('fecha_subida', 'id')
-
-        principal = info['principal_proyecto']
-        extras = set()
-        for pr in creados:
-            if principal and pr.id == principal.id:
-                continue
-            extras.add(pr)
-        info['proyectos_extra'] = extras
-
-    for p_id, info in list(datos.items()):
-        codigo = info['codigo']
-        if not codigo:
-            continue
-        lider_ids = Proyecto.objects.filter(
-            evento=evento
-        ).exclude(creador__isnull=True).values_list('creador_id', flat=True)
-
-        pe_lider = ParticipanteEvento.objects.filter(
-            evento=evento,
-            codigo=codigo,
-            participante_id__in=lider_ids
-        ).first()
-        if not pe_lider:
-            continue
-
-        proyectos_lider = Proyecto.objects.filter(
-            evento=evento,
-            creador_id=pe_lider.participante_id
-        ).order_by('fecha_subida', 'id')
-
-        principal = info['principal_proyecto']
-        extras = info['proyectos_extra']
-        for pr in proyectos_lider:
-            if principal and pr.id == principal.id:
-                continue
-            extras.add(pr)
-        info['proyectos_extra'] = extras
-
-    posiciones = []
-    for info in datos.values():
-        proyectos = []
-        if info['principal_proyecto']:
-            proyectos.append(info['principal_proyecto'])
-        extras_ordenados = sorted(
-            list(info['proyectos_extra']),
-            key=lambda pr: (pr.fecha_subida, pr.id)
-        )
-        proyectos.extend(extras_ordenados)
-        posiciones.append({
-            'participante': info['participante'],
-            'puntaje': info['puntaje'],
-            'proyectos': proyectos,
-            'codigo': info['codigo'],
-        })
-
-    posiciones.sort(key=lambda x: x['puntaje'], reverse=True)
+    posiciones = ranking_evento(evento, solo_calificados=True)
 
     # --- PDF landscape ---
     response = HttpResponse(content_type='application/pdf')
@@ -739,7 +537,7 @@ def descargar_tabla_posiciones_pdf(request, eve_id):
     data = [["Posición", "Nombre del Participante", "Correo",
              "Tipo de participación", "Proyectos", "Puntaje"]]
 
-    for i, pos in enumerate(posiciones, start=1):
+    for pos in posiciones:
         p = pos['participante']
         nombre = f"{p.usuario.first_name} {p.usuario.last_name}"
         correo = p.usuario.email
@@ -751,7 +549,7 @@ def descargar_tabla_posiciones_pdf(request, eve_id):
         proyectos_par = Paragraph(nombres_proyectos, styles['Normal'])
         puntaje = f"{pos['puntaje']:.1f}"
 
-        data.append([str(i), nombre, correo, tipo, proyectos_par, puntaje])
+        data.append([str(pos['puesto']), nombre, correo, tipo, proyectos_par, puntaje])
 
     col_widths = [
         0.8*inch,
@@ -807,37 +605,26 @@ def informacion_detallada(request, eve_id):
 
     participantes_info = []
 
+    # Referente de cada grupo y las calificaciones de este evaluador, en consultas fijas
+    grupos = grupos_del_evento(evento, evaluador=evaluador)
+    calificaciones_por_participante = {}
+    for c in Calificacion.objects.filter(
+        evaluador=evaluador,
+        criterio__cri_evento_fk=evento
+    ).select_related('criterio').order_by('pk'):
+        calificaciones_por_participante.setdefault(c.participante_id, []).append(c)
+
     for pe in participantes_evento:
         participante = pe.participante
 
-        # --- determinar participante de referencia para calificaciones grupales ---
-        participante_referencia = participante
-        if pe.codigo:
-            # buscar cualquier integrante del mismo código con calificaciones de este evaluador
-            pe_grupo = ParticipanteEvento.objects.filter(
-                evento=evento,
-                codigo=pe.codigo
-            ).select_related('participante')
-
-            ref_encontrado = None
-            for pe_g in pe_grupo:
-                if Calificacion.objects.filter(
-                    evaluador=evaluador,
-                    participante=pe_g.participante,
-                    criterio__cri_evento_fk=evento
-                ).exists():
-                    ref_encontrado = pe_g.participante
-                    break
-
-            if ref_encontrado:
-                participante_referencia = ref_encontrado
+        # --- participante de referencia: integrante del grupo con calificaciones de este evaluador ---
+        referencia_id = participante.id
+        grupo = grupos.get(pe.codigo) if pe.codigo else None
+        if grupo and grupo.referencia is not None:
+            referencia_id = grupo.referencia
 
         # --- calificaciones que este evaluador ha dado al participante/grupo ---
-        calificaciones_actual = Calificacion.objects.filter(
-            evaluador=evaluador,
-            participante=participante_referencia,
-            criterio__cri_evento_fk=evento
-        ).select_related('criterio')
+        calificaciones_actual = calificaciones_por_participante.get(referencia_id, [])
 
         total_aporte = 0
         calificaciones_lista = []
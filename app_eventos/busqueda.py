@@ -0,0 +1,129 @@
+"""
+Búsqueda de eventos del catálogo público.
+
+Cada evento tiene una fila IndiceBusquedaEvento con su nombre, ciudad y un
+texto que reúne nombre, descripción, ciudad, lugar, categorías y áreas, todo
+en minúsculas y sin tildes, de modo que "reunion" encuentra "Reunión". Las
+señales de Evento, EventoCategoria, Categoria y Area mantienen el índice al
+día; el comando reindexar_eventos lo reconstruye completo.
+
+En MySQL la búsqueda usa el índice FULLTEXT del texto (MATCH ... AGAINST en
+modo booleano, con prefijos) y ordena por su relevancia. En otros motores,
+o con términos más cortos que el mínimo que indexa InnoDB, cada término se
+busca con LIKE y la relevancia pondera las coincidencias en el nombre.
+"""
+import re
+import unicodedata
+
+from django.db import connection
+from django.db.models import Case, F, FloatField, Func, IntegerField, Q, Value, When
+
+from app_eventos.models import Evento, EventoCategoria, IndiceBusquedaEvento
+
+# innodb_ft_min_token_size por defecto; los términos más cortos no están en el índice FULLTEXT
+LONGITUD_MINIMA_FULLTEXT = 3
+# Peso de un término que aparece en el nombre frente a uno que solo aparece en el resto del texto
+PESO_NOMBRE = 3
+
+
+def normalizar(texto):
+    """Minúsculas, sin tildes y con los signos convertidos en espacios"""
+    descompuesto = unicodedata.normalize('NFKD', texto or '')
+    sin_tildes = ''.join(c for c in descompuesto if not unicodedata.combining(c))
+    return ' '.join(re.findall(r'\w+', sin_tildes.lower()))
+
+
+def terminos(consulta):
+    return normalizar(consulta).split()
+
+
+def indexar_evento(evento):
+    """Crea o actualiza la fila del índice de un evento"""
+    categorias = EventoCategoria.objects.filter(evento=evento).values_list(
+        'categoria__cat_nombre', 'categoria__cat_area_fk__are_nombre'
+    )
+    partes = [evento.eve_nombre, evento.eve_descripcion, evento.eve_ciudad, evento.eve_lugar]
+    for categoria, area in categorias:
+        partes.extend([categoria, area])
+    IndiceBusquedaEvento.objects.update_or_create(
+        evento_id=evento.pk,
+        defaults={
+            'nombre': normalizar(evento.eve_nombre),
+            'ciudad': normalizar(evento.eve_ciudad),
+            'texto': normalizar(' '.join(filter(None, partes))),
+        },
+    )
+
+
+def reindexar(eventos=None):
+    """Vuelve a indexar los eventos dados (por defecto, todos); devuelve cuántos"""
+    eventos = Evento.objects.all() if eventos is None else eventos
+    total = 0
+    for evento in eventos.iterator():
+        indexar_evento(evento)
+        total += 1
+    return total
+
+
+class RelevanciaFullText(Func):
+    """MATCH(columna) AGAINST (consulta IN BOOLEAN MODE) de MySQL"""
+    output_field = FloatField()
+
+    def __init__(self, columna, consulta):
+        super().__init__(columna, Value(consulta))
+
+    def as_sql(self, compiler, connection, **extra_context):
+        columna, parametros_columna = compiler.compile(self.source_expressions[0])
+        consulta, parametros_consulta = compiler.compile(self.source_expressions[1])
+        sql = f'MATCH({columna}) AGAINST ({consulta} IN BOOLEAN MODE)'
+        return sql, (*parametros_columna, *parametros_consulta)
+
+
+def usa_fulltext(lista_terminos):
+    return connection.vendor == 'mysql' and all(len(t) >= LONGITUD_MINIMA_FULLTEXT for t in lista_terminos)
+
+
+def buscar(eventos, consulta):
+    """
+    Filtra `eventos` por los términos de la consulta (todos deben aparecer) y
+    los anota con `relevancia`, de mayor a menor. Sin términos devuelve los
+    eventos sin cambios.
+    """
+    lista = terminos(consulta)
+    if not lista:
+        return eventos
+
+    if usa_fulltext(lista):
+        expresion = ' '.join(f'+{termino}*' for termino in lista)
+        return (
+            eventos.annotate(relevancia=RelevanciaFullText(F('indice_busqueda__texto'), expresion))
+            .filter(relevancia__gt=0)
+            .order_by('-relevancia', 'eve_fecha_inicio', 'eve_id')
+        )
+
+    filtro = Q()
+    puntaje = Value(0)
+    for termino in lista:
+        filtro &= Q(indice_busqueda__texto__contains=termino)
+        puntaje = puntaje + Case(
+            When(indice_busqueda__nombre__contains=termino, then=Value(PESO_NOMBRE)),
+            default=Value(1),
+            output_field=IntegerField(),
+        )
+    return (
+        eventos.filter(filtro)
+        .annotate(relevancia=puntaje)
+        .order_by('-relevancia', 'eve_fecha_inicio', 'eve_id')
+    )
+
+
+def filtrar_ciudad(eventos, ciudad):
+    """
+    Eventos cuya ciudad empieza por el texto dado, sin distinguir tildes ni
+    mayúsculas. Se compara por prefijo (LIKE 'x%') para que use el índice de
+    la columna ciudad.
+    """
+    ciudad = normalizar(ciudad)
+    if not ciudad:
+        return eventos
+    return eventos.filter(indice_busqueda__ciudad__startswith=ciudad)
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from app_eventos.busqueda import reindexar
+
+
+class Command(BaseCommand):
+    help = 'Reconstruye el índice de búsqueda del catálogo de eventos'
+
+    def handle(self, *args, **options):
+        total = reindexar()
+        self.stdout.write(self.style.SUCCESS(f'Eventos indexados: {total}'))
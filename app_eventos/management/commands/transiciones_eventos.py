@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from app_eventos.transiciones import aplicar_transiciones
+
+
+class Command(BaseCommand):
+    help = 'Aplica las transiciones de estado de los eventos según la fecha (ejecutar una vez al día)'
+
+    def handle(self, *args, **options):
+        cambios = aplicar_transiciones()
+        for eve_id, nombre, anterior, nuevo in cambios:
+            self.stdout.write(f'{eve_id} {nombre}: {anterior} -> {nuevo}')
+        self.stdout.write(self.style.SUCCESS(f'Eventos actualizados: {len(cambios)}'))
@@ -0,0 +1,71 @@
+# Generated by Django 5.2.4 on 2026-10-18 01:56
+
+import re
+import unicodedata
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def normalizar(texto):
+    # Copia de app_eventos.busqueda.normalizar al momento de la migración
+    descompuesto = unicodedata.normalize('NFKD', texto or '')
+    sin_tildes = ''.join(c for c in descompuesto if not unicodedata.combining(c))
+    return ' '.join(re.findall(r'\w+', sin_tildes.lower()))
+
+
+def crear_indice_fulltext(apps, schema_editor):
+    if schema_editor.connection.vendor == 'mysql':
+        schema_editor.execute(
+            'CREATE FULLTEXT INDEX indice_busqueda_texto_ft ON app_eventos_indicebusquedaevento (texto)'
+        )
+
+
+def eliminar_indice_fulltext(apps, schema_editor):
+    if schema_editor.connection.vendor == 'mysql':
+        schema_editor.execute('DROP INDEX indice_busqueda_texto_ft ON app_eventos_indicebusquedaevento')
+
+
+def indexar_eventos(apps, schema_editor):
+    Evento = apps.get_model('app_eventos', 'Evento')
+    EventoCategoria = apps.get_model('app_eventos', 'EventoCategoria')
+    IndiceBusquedaEvento = apps.get_model('app_eventos', 'IndiceBusquedaEvento')
+    categorias = {}
+    for evento_id, categoria, area in EventoCategoria.objects.values_list(
+        'evento_id', 'categoria__cat_nombre', 'categoria__cat_area_fk__are_nombre'
+    ):
+        categorias.setdefault(evento_id, []).extend([categoria, area])
+    IndiceBusquedaEvento.objects.bulk_create([
+        IndiceBusquedaEvento(
+            evento_id=evento.pk,
+            nombre=normalizar(evento.eve_nombre),
+            ciudad=normalizar(evento.eve_ciudad),
+            texto=normalizar(' '.join(filter(None, [
+                evento.eve_nombre, evento.eve_descripcion, evento.eve_ciudad, evento.eve_lugar,
+                *categorias.get(evento.pk, []),
+            ]))),
+        )
+        for evento in Evento.objects.iterator()
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_areas', '0001_initial'),
+        ('app_eventos', '0004_remove_evento_inscripciones_habilitadas'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IndiceBusquedaEvento',
+            fields=[
+                ('evento', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='indice_busqueda', serialize=False, to='app_eventos.evento')),
+                ('nombre', models.CharField(max_length=100)),
+                ('ciudad', models.CharField(db_index=True, max_length=45)),
+                ('texto', models.TextField()),
+            ],
+        ),
+        migrations.RunPython(crear_indice_fulltext, eliminar_indice_fulltext),
+        migrations.RunPython(indexar_eventos, migrations.RunPython.noop),
+    ]
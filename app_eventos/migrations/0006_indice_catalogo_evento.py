@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-18 03:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_administradores', '0005_trabajocertificados_solo_aviso'),
+        ('app_eventos', '0005_indice_busqueda_evento'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='evento',
+            index=models.Index(fields=['eve_estado', 'eve_fecha_inicio', 'eve_id'], name='evento_catalogo_idx'),
+        ),
+    ]
@@ -19,6 +19,12 @@ class Evento(models.Model):
     eve_memorias = models.FileField(upload_to='eventos/memorias/', null=True, blank=True)
     eve_informacion_tecnica = models.FileField(upload_to='eventos/informacion_tecnica/', null=True, blank=True)
 
+    class Meta:
+        indexes = [
+            # Catálogo público: filtra por estado y pagina por (fecha de inicio, id)
+            models.Index(fields=['eve_estado', 'eve_fecha_inicio', 'eve_id'], name='evento_catalogo_idx'),
+        ]
+
 class EventoCategoria(models.Model):
     evento = models.ForeignKey(Evento, on_delete=models.CASCADE)
     categoria = models.ForeignKey(Categoria, on_delete=models.CASCADE)
@@ -54,4 +60,20 @@ class ConfiguracionCertificado(models.Model):
         unique_together = (('evento', 'tipo'),)
 
     def __str__(self):
-        return f"{self.evento.eve_nombre} - {self.get_tipo_display()}"
\ No newline at end of file
+        return f"{self.evento.eve_nombre} - {self.get_tipo_display()}"
+
+
+class IndiceBusquedaEvento(models.Model):
+    """
+    Texto de búsqueda de un evento, en minúsculas y sin tildes; lo mantiene
+    app_eventos.busqueda a partir del evento y sus categorías. En MySQL la
+    columna texto tiene un índice FULLTEXT.
+    """
+    evento = models.OneToOneField(Evento, on_delete=models.CASCADE, primary_key=True, related_name='indice_busqueda')
+    nombre = models.CharField(max_length=100)
+    ciudad = models.CharField(max_length=45, db_index=True)
+    # Nombre, descripción, ciudad, lugar, categorías y áreas
+    texto = models.TextField()
+
+    def __str__(self):
+        return f"Índice de {self.evento_id}"
@@ -0,0 +1,94 @@
+"""
+Paginación por cursor (keyset) del catálogo público de eventos.
+
+Las páginas se ordenan por (eve_fecha_inicio, eve_id) y, cuando hay texto de
+búsqueda, primero por relevancia. En lugar de OFFSET, cada página continúa
+desde los valores de orden del último evento de la anterior, que viajan en
+un cursor opaco; así pedir la página cien cuesta lo mismo que la primera.
+
+Solo se leen las columnas que muestra la tarjeta del evento.
+"""
+import base64
+import json
+from datetime import date
+
+from django.db.models import Q
+
+TAMANO_PAGINA = 12
+# Hasta dónde se cuentan los eventos del catálogo; por encima se muestra "N+"
+LIMITE_CONTEO = 100
+
+# Columnas que usa app_eventos/_tarjetas_eventos.html
+CAMPOS_TARJETA = ('eve_id', 'eve_nombre', 'eve_ciudad', 'eve_fecha_inicio', 'eve_fecha_fin', 'eve_imagen')
+
+
+class CursorInvalido(ValueError):
+    pass
+
+
+def _con_relevancia(eventos):
+    return 'relevancia' in eventos.query.annotations
+
+
+def codificar_cursor(evento, con_relevancia):
+    valores = [evento.eve_fecha_inicio.isoformat(), evento.eve_id]
+    if con_relevancia:
+        valores.insert(0, evento.relevancia)
+    return base64.urlsafe_b64encode(json.dumps(valores).encode()).decode().rstrip('=')
+
+
+def decodificar_cursor(cursor, con_relevancia):
+    """Valores de orden guardados en el cursor; CursorInvalido si está alterado o no corresponde a la búsqueda"""
+    try:
+        relleno = '=' * (-len(cursor) % 4)
+        valores = json.loads(base64.urlsafe_b64decode(cursor + relleno))
+        if con_relevancia:
+            relevancia, fecha, eve_id = valores
+            if not isinstance(relevancia, (int, float)):
+                raise ValueError
+        else:
+            relevancia = None
+            fecha, eve_id = valores
+        return relevancia, date.fromisoformat(fecha), int(eve_id)
+    except (ValueError, TypeError):
+        raise CursorInvalido('El cursor de paginación no es válido.')
+
+
+def _despues_de(relevancia, fecha, eve_id, con_relevancia):
+    """Eventos que van después de la posición dada en el orden del catálogo"""
+    siguiente = Q(eve_fecha_inicio__gt=fecha) | Q(eve_fecha_inicio=fecha, eve_id__gt=eve_id)
+    if con_relevancia:
+        return Q(relevancia__lt=relevancia) | (Q(relevancia=relevancia) & siguiente)
+    return siguiente
+
+
+def contar(eventos, limite=None):
+    """
+    Cantidad de eventos contando como máximo `limite` y si hay más; el COUNT
+    se hace sobre un LIMIT, así que no recorre todo el catálogo.
+    """
+    limite = limite or LIMITE_CONTEO
+    total = eventos.order_by().values('pk')[:limite + 1].count()
+    return min(total, limite), total > limite
+
+
+def pagina(eventos, cursor=None, tamano=None):
+    """
+    Una página de `eventos` desde el cursor (o desde el inicio) y el cursor de
+    la siguiente, None si no hay más.
+    """
+    tamano = tamano or TAMANO_PAGINA
+    con_relevancia = _con_relevancia(eventos)
+    orden = ('eve_fecha_inicio', 'eve_id')
+    if con_relevancia:
+        orden = ('-relevancia',) + orden
+    eventos = eventos.only(*CAMPOS_TARJETA).order_by(*orden)
+    if cursor:
+        eventos = eventos.filter(_despues_de(*decodificar_cursor(cursor, con_relevancia), con_relevancia))
+
+    # Un evento de más indica si queda otra página sin tener que contarlos
+    lista = list(eventos[:tamano + 1])
+    if len(lista) <= tamano:
+        return lista, None
+    lista = lista[:tamano]
+    return lista, codificar_cursor(lista[-1], con_relevancia)
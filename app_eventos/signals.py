@@ -0,0 +1,52 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from app_areas.models import Area, Categoria
+from .busqueda import indexar_evento, reindexar
+from .models import Evento, EventoCategoria
+from .transiciones import marcar_pendiente, puede_cambiar_por_fecha
+
+
+@receiver(post_save, sender=Evento)
+def revisar_transiciones(sender, instance, raw=False, **kwargs):
+    """Un evento guardado con fechas ya vencidas se actualiza en la siguiente petición"""
+    if raw:
+        return
+    if puede_cambiar_por_fecha(instance):
+        marcar_pendiente()
+
+
+# ===============================
+# ÍNDICE DE BÚSQUEDA
+# ===============================
+
+@receiver(post_save, sender=Evento)
+def indexar_evento_guardado(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    indexar_evento(instance)
+
+
+@receiver(post_save, sender=EventoCategoria)
+@receiver(post_delete, sender=EventoCategoria)
+def indexar_categorias_evento(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    # Al borrar el evento en cascada sus categorías se eliminan antes que él
+    evento = Evento.objects.filter(pk=instance.evento_id).first()
+    if evento:
+        indexar_evento(evento)
+
+
+@receiver(post_save, sender=Categoria)
+def indexar_eventos_de_categoria(sender, instance, created=False, raw=False, **kwargs):
+    if raw or created:
+        return
+    reindexar(Evento.objects.filter(eventocategoria__categoria=instance).distinct())
+
+
+@receiver(post_save, sender=Area)
+def indexar_eventos_de_area(sender, instance, created=False, raw=False, **kwargs):
+    if raw or created:
+        return
+    reindexar(Evento.objects.filter(eventocategoria__categoria__cat_area_fk=instance).distinct())
@@ -1,3 +1,283 @@
+import re
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from app_administradores.models import AdministradorEvento
+from app_areas.models import Area, Categoria
+from app_eventos import busqueda, paginacion, transiciones
+from app_eventos.busqueda import normalizar, reindexar
+from app_eventos.models import Evento, EventoCategoria, IndiceBusquedaEvento
+from app_usuarios.models import Usuario
+
+
+class PruebasTransicionesEventos(TestCase):
+
+    def setUp(self):
+        transiciones.marcar_pendiente()
+        self.addCleanup(transiciones.marcar_pendiente)
+        usuario = Usuario.objects.create_user(
+            username='admin_trans', email='admin@trans.com', password='password123', documento='31'
+        )
+        self.administrador = AdministradorEvento.objects.create(usuario=usuario)
+        self.hoy = timezone.localdate()
+
+    def crear_evento(self, estado, dias_fin):
+        return Evento.objects.create(
+            eve_nombre=f'Evento {estado} {dias_fin}',
+            eve_descripcion='Descripción',
+            eve_ciudad='Manizales',
+            eve_lugar='Auditorio',
+            eve_fecha_inicio=self.hoy + timedelta(days=dias_fin - 2),
+            eve_fecha_fin=self.hoy + timedelta(days=dias_fin),
+            eve_estado=estado,
+            eve_capacidad=50,
+            eve_tienecosto='No',
+            eve_administrador_fk=self.administrador,
+        )
+
+    def test_finaliza_los_eventos_vencidos_y_registra_el_cambio(self):
+        vencido = self.crear_evento('Aprobado', -1)
+        vigente = self.crear_evento('Aprobado', 3)
+        rechazado = self.crear_evento('Rechazado', -1)
+
+        with self.assertLogs('app_eventos.transiciones', level='INFO') as registro:
+            cambios = transiciones.aplicar_transiciones()
+
+        self.assertEqual(cambios, [(vencido.pk, vencido.eve_nombre, 'Aprobado', 'Finalizado')])
+        self.assertIn(f'Evento {vencido.pk}', registro.output[0])
+        estados = dict(Evento.objects.values_list('eve_id', 'eve_estado'))
+        self.assertEqual(
+            (estados[vencido.pk], estados[vigente.pk], estados[rechazado.pk]),
+            ('Finalizado', 'Aprobado', 'Rechazado'),
+        )
+
+    def test_middleware_solo_consulta_en_la_primera_peticion_del_dia(self):
+        vencido = self.crear_evento('Pendiente', -2)
+        self.client.get(reverse('ver_eventos'))
+        self.assertEqual(Evento.objects.get(pk=vencido.pk).eve_estado, 'Finalizado')
+
+        with patch.object(transiciones, 'aplicar_transiciones') as aplicar:
+            self.client.get(reverse('ver_eventos'))
+        aplicar.assert_not_called()
+
+        # Al cambiar la fecha se hace una nueva pasada
+        manana = self.hoy + timedelta(days=1)
+        with patch('app_eventos.transiciones.timezone.localdate', return_value=manana):
+            with CaptureQueriesContext(connection) as consultas:
+                transiciones.asegurar_transiciones()
+        self.assertTrue(any('app_eventos_evento' in q['sql'] for q in consultas.captured_queries))
+
+    def test_guardar_un_evento_vencido_repite_la_pasada(self):
+        transiciones.aplicar_transiciones()
+        vencido = self.crear_evento('Aprobado', -1)
+        self.assertIsNone(cache.get(transiciones.CLAVE_ULTIMA_TRANSICION))
+
+        transiciones.asegurar_transiciones()
+
+        self.assertEqual(Evento.objects.get(pk=vencido.pk).eve_estado, 'Finalizado')
+
+    def test_pasada_de_otro_proceso_evita_la_consulta(self):
+        self.crear_evento('Aprobado', -1)
+        cache.set(transiciones.CLAVE_ULTIMA_TRANSICION, self.hoy.isoformat())
+
+        with self.assertNumQueries(0):
+            transiciones.asegurar_transiciones()
+
+    def test_comando_transiciones_eventos(self):
+        vencido = self.crear_evento('Inscripciones Cerradas', -5)
+        salida = StringIO()
+
+        with self.assertLogs('app_eventos.transiciones', level='INFO'):
+            call_command('transiciones_eventos', stdout=salida)
+
+        self.assertIn(f'{vencido.pk} {vencido.eve_nombre}: Inscripciones Cerradas -> Finalizado', salida.getvalue())
+        self.assertIn('Eventos actualizados: 1', salida.getvalue())
+
+
+class PruebasBusquedaEventos(TestCase):
+
+    def setUp(self):
+        usuario = Usuario.objects.create_user(
+            username='admin_busq', email='admin@busq.com', password='password123', documento='32'
+        )
+        self.administrador = AdministradorEvento.objects.create(usuario=usuario)
+        self.area = Area.objects.create(are_nombre='Tecnología', are_descripcion='Área')
+        self.categoria = Categoria.objects.create(
+            cat_nombre='Inteligencia Artificial', cat_descripcion='Categoría', cat_area_fk=self.area
+        )
+        self.url = reverse('ver_eventos')
+
+    def crear_evento(self, nombre, descripcion='Descripción', ciudad='Manizales', estado='Aprobado'):
+        hoy = timezone.localdate()
+        return Evento.objects.create(
+            eve_nombre=nombre,
+            eve_descripcion=descripcion,
+            eve_ciudad=ciudad,
+            eve_lugar='Auditorio',
+            eve_fecha_inicio=hoy + timedelta(days=5),
+            eve_fecha_fin=hoy + timedelta(days=6),
+            eve_estado=estado,
+            eve_capacidad=50,
+            eve_tienecosto='No',
+            eve_administrador_fk=self.administrador,
+        )
+
+    def buscar(self, **filtros):
+        return list(self.client.get(self.url, filtros).context['eventos'])
+
+    def test_normalizar_quita_tildes_y_signos(self):
+        self.assertEqual(normalizar('  Reunión  de BOGOTÁ, 2025! '), 'reunion de bogota 2025')
+
+    def test_busqueda_sin_tildes_y_por_descripcion_o_categoria(self):
+        reunion = self.crear_evento('Reunión Anual', ciudad='Bogotá')
+        taller = self.crear_evento('Taller', descripcion='Robótica educativa')
+        EventoCategoria.objects.create(evento=taller, categoria=self.categoria)
+        self.crear_evento('Reunión cancelada', estado='Rechazado')
+
+        self.assertEqual(self.buscar(nombre='reunion'), [reunion])
+        self.assertEqual(self.buscar(nombre='ROBOTICA'), [taller])
+        self.assertEqual(self.buscar(nombre='inteligencia tecnologia'), [taller])
+        self.assertEqual(self.buscar(ciudad='bogota'), [reunion])
+        self.assertEqual(self.buscar(ciudad='BOG'), [reunion])
+        self.assertEqual(self.buscar(ciudad='gota'), [])
+        self.assertEqual(self.buscar(nombre='reunion taller'), [])
+
+    def test_coincidencias_en_el_nombre_van_primero(self):
+        en_descripcion = self.crear_evento('Encuentro', descripcion='Feria de ciencia')
+        en_nombre = self.crear_evento('Feria de Ciencia')
+
+        self.assertEqual(self.buscar(nombre='ciencia'), [en_nombre, en_descripcion])
+
+    def test_filtro_por_area_sin_duplicados(self):
+        evento = self.crear_evento('Congreso')
+        otra = Categoria.objects.create(cat_nombre='Datos', cat_descripcion='Categoría', cat_area_fk=self.area)
+        EventoCategoria.objects.create(evento=evento, categoria=self.categoria)
+        EventoCategoria.objects.create(evento=evento, categoria=otra)
+
+        self.assertEqual(self.buscar(area=self.area.pk), [evento])
+
+    def test_el_indice_sigue_los_cambios(self):
+        evento = self.crear_evento('Congreso')
+        EventoCategoria.objects.create(evento=evento, categoria=self.categoria)
+        self.categoria.cat_nombre = 'Aprendizaje Automático'
+        self.categoria.save()
+        self.assertIn('aprendizaje automatico', IndiceBusquedaEvento.objects.get(evento=evento).texto)
+
+        EventoCategoria.objects.filter(evento=evento).delete()
+        self.assertNotIn('aprendizaje', IndiceBusquedaEvento.objects.get(evento=evento).texto)
+
+        evento.eve_nombre = 'Simposio'
+        evento.save()
+        self.assertEqual(self.buscar(nombre='simposio'), [evento])
+
+    def test_reindexar_reconstruye_filas_faltantes(self):
+        evento = self.crear_evento('Congreso')
+        IndiceBusquedaEvento.objects.all().delete()
+
+        self.assertEqual(reindexar(), 1)
+        self.assertEqual(self.buscar(nombre='congreso'), [evento])
+
+
+class PruebasPaginacionEventos(TestCase):
+
+    def setUp(self):
+        usuario = Usuario.objects.create_user(
+            username='admin_pag', email='admin@pag.com', password='password123', documento='33'
+        )
+        self.administrador = AdministradorEvento.objects.create(usuario=usuario)
+        hoy = timezone.localdate()
+        # Dos eventos por fecha para que el desempate por eve_id cuente
+        self.eventos = [
+            Evento.objects.create(
+                eve_nombre=f'Congreso {i}',
+                eve_descripcion='Descripción',
+                eve_ciudad='Manizales',
+                eve_lugar='Auditorio',
+                eve_fecha_inicio=hoy + timedelta(days=10 - i // 2),
+                eve_fecha_fin=hoy + timedelta(days=20),
+                eve_estado='Aprobado',
+                eve_capacidad=50,
+                eve_tienecosto='No',
+                eve_administrador_fk=self.administrador,
+            )
+            for i in range(7)
+        ]
+        self.ordenados = sorted(self.eventos, key=lambda e: (e.eve_fecha_inicio, e.eve_id))
+        transiciones.asegurar_transiciones()
+
+    def recorrer(self, **filtros):
+        """Todas las páginas por el endpoint JSON; devuelve los ids en orden"""
+        respuesta = self.client.get(reverse('ver_eventos'), filtros)
+        ids = [e.eve_id for e in respuesta.context['eventos']]
+        cursor = respuesta.context['siguiente']
+        while cursor:
+            datos = self.client.get(reverse('mas_eventos'), {**filtros, 'cursor': cursor}).json()
+            self.assertTrue(datos['success'])
+            ids.extend(int(i) for i in re.findall(r'data-evento-id="(\d+)"', datos['html']))
+            cursor = datos['siguiente']
+        return ids
+
+    def test_recorre_todo_en_orden_sin_repetir(self):
+        with patch.object(paginacion, 'TAMANO_PAGINA', 3):
+            ids = self.recorrer()
+            respuesta = self.client.get(reverse('ver_eventos'))
+        self.assertEqual(ids, [e.eve_id for e in self.ordenados])
+        self.assertEqual(respuesta.context['total_eventos'], 7)
+        self.assertEqual(len(respuesta.context['eventos']), 3)
+
+    def test_el_conteo_se_acota(self):
+        with patch.object(paginacion, 'TAMANO_PAGINA', 3), patch.object(paginacion, 'LIMITE_CONTEO', 5):
+            respuesta = self.client.get(reverse('ver_eventos'))
+        self.assertEqual(respuesta.context['total_eventos'], 5)
+        self.assertTrue(respuesta.context['hay_mas_eventos'])
+        self.assertContains(respuesta, '5+')
+        self.assertEqual(paginacion.contar(Evento.objects.all(), limite=7), (7, False))
+
+    def test_pagina_solo_lee_columnas_de_la_tarjeta(self):
+        eventos, siguiente = paginacion.pagina(Evento.objects.all(), tamano=2)
+        self.assertIsNotNone(siguiente)
+        self.assertIn('eve_descripcion', eventos[0].get_deferred_fields())
+        self.assertIn('eve_programacion', eventos[0].get_deferred_fields())
+
+    def test_ultima_pagina_sin_cursor(self):
+        eventos, siguiente = paginacion.pagina(Evento.objects.all(), tamano=7)
+        self.assertEqual(len(eventos), 7)
+        self.assertIsNone(siguiente)
+
+    def test_cursor_con_busqueda_respeta_relevancia(self):
+        destacado = self.ordenados[-1]
+        destacado.eve_nombre = 'Feria de Ciencia'
+        destacado.save()
+        for evento in self.ordenados[:3]:
+            evento.eve_descripcion = 'Muestra de ciencia'
+            evento.save()
+
+        eventos, cursor = paginacion.pagina(busqueda.buscar(Evento.objects.all(), 'ciencia'), tamano=2)
+        resto, siguiente = paginacion.pagina(busqueda.buscar(Evento.objects.all(), 'ciencia'), cursor, tamano=2)
+
+        self.assertEqual(eventos + resto, [destacado] + self.ordenados[:3])
+        self.assertIsNone(siguiente)
+
+    def test_consultas_constantes_por_pagina(self):
+        _, cursor = paginacion.pagina(Evento.objects.all(), tamano=2)
+        with self.assertNumQueries(1):
+            paginacion.pagina(Evento.objects.all(), cursor, tamano=2)
+
+    def test_cursor_invalido(self):
+        respuesta = self.client.get(reverse('mas_eventos'), {'cursor': 'no-es-un-cursor'})
+        self.assertEqual(respuesta.status_code, 400)
+        self.assertFalse(respuesta.json()['success'])
 
-# Create your tests here.
+        # Un cursor sin relevancia no sirve para una búsqueda
+        _, cursor = paginacion.pagina(Evento.objects.all(), tamano=2)
+        respuesta = self.client.get(reverse('mas_eventos'), {'cursor': cursor, 'nombre': 'congreso'})
+        self.assertEqual(respuesta.status_code, 400)
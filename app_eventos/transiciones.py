@@ -0,0 +1,89 @@
+"""
+Transiciones automáticas del estado de los eventos según la fecha.
+
+Las transiciones se aplican una vez por día: el comando transiciones_eventos
+(para ejecutarse por cron poco después de medianoche) o, si no se programó,
+la primera petición del día a través de ActualizarEventosFinalizadosMiddleware.
+La fecha de la última pasada se guarda en memoria y en la caché, así que el
+resto de las peticiones solo comparan dos fechas.
+
+Guardar un evento en un estado de origen de alguna transición (por ejemplo,
+uno aprobado con fechas pasadas) marca la pasada del día como pendiente para
+que se aplique en la siguiente petición.
+
+Cada cambio se registra con nivel INFO en el logger app_eventos.transiciones;
+dónde se escribe lo decide la configuración de logging del despliegue.
+"""
+import logging
+
+from django.core.cache import cache
+from django.db.models import Q
+from django.utils import timezone
+
+from app_eventos.models import Evento
+
+logger = logging.getLogger(__name__)
+
+CLAVE_ULTIMA_TRANSICION = 'eventos:ultima_transicion'
+
+
+def _terminados(hoy):
+    return Q(eve_fecha_fin__lt=hoy)
+
+
+# (estados de origen, condición según la fecha, estado de destino), en orden de aplicación
+TRANSICIONES = [
+    (('Aprobado', 'Inscripciones Cerradas', 'Pendiente'), _terminados, 'Finalizado'),
+]
+
+# Fecha de la última pasada en este proceso
+_ultima_fecha = None
+
+
+def aplicar_transiciones(hoy=None):
+    """
+    Aplica las transiciones para la fecha `hoy` y registra la pasada.
+    Devuelve [(evento_id, nombre, estado_anterior, estado_nuevo), ...].
+    """
+    global _ultima_fecha
+    hoy = hoy or timezone.localdate()
+    cambios = []
+    for origenes, condicion, destino in TRANSICIONES:
+        eventos = Evento.objects.filter(condicion(hoy), eve_estado__in=origenes)
+        afectados = list(eventos.values_list('eve_id', 'eve_nombre', 'eve_estado'))
+        if not afectados:
+            continue
+        # Se vuelve a exigir el estado de origen por si otro proceso lo cambió entretanto
+        eventos.filter(eve_id__in=[eve_id for eve_id, _, _ in afectados]).update(eve_estado=destino)
+        for eve_id, nombre, estado in afectados:
+            logger.info('Evento %s (%s): %s -> %s', eve_id, nombre, estado, destino)
+            cambios.append((eve_id, nombre, estado, destino))
+
+    _ultima_fecha = hoy
+    cache.set(CLAVE_ULTIMA_TRANSICION, hoy.isoformat(), None)
+    return cambios
+
+
+def asegurar_transiciones():
+    """Aplica las transiciones si aún no se hizo la pasada de hoy; si ya se hizo no consulta la base de datos"""
+    global _ultima_fecha
+    hoy = timezone.localdate()
+    if _ultima_fecha == hoy:
+        return
+    if cache.get(CLAVE_ULTIMA_TRANSICION) == hoy.isoformat():
+        # Otro proceso (o el comando) ya hizo la pasada
+        _ultima_fecha = hoy
+        return
+    aplicar_transiciones(hoy)
+
+
+def marcar_pendiente():
+    """Obliga a repetir la pasada del día en la siguiente petición"""
+    global _ultima_fecha
+    _ultima_fecha = None
+    cache.delete(CLAVE_ULTIMA_TRANSICION)
+
+
+def puede_cambiar_por_fecha(evento):
+    """True si el estado del evento es origen de alguna transición"""
+    return any(evento.eve_estado in origenes for origenes, _, _ in TRANSICIONES)
@@ -4,6 +4,7 @@ from . import views
 
 urlpatterns = [
     path('', views.ver_eventos, name='ver_eventos'),
+    path('mas-eventos/', views.mas_eventos, name='mas_eventos'),
     path("manual/", views.manual_visitante, name="manual_visitante"),
     path('detalle-evento/<int:eve_id>/', views.detalle_evento, name='detalle_evento_visitante'),
     path('<int:eve_id>/compartir/', views.compartir_evento_visitante, name='compartir_evento_visitante'),
@@ -2,7 +2,6 @@ from app_administradores.models import CodigoInvitacionAdminEvento, Administrado
 from django.db import transaction
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_POST
-from django.core.mail import send_mail
 from django.http import HttpResponse, JsonResponse, Http404, FileResponse
 from django.conf import settings
 from django.shortcuts import render, get_object_or_404, redirect
@@ -15,8 +14,12 @@ from app_areas.models import Area, Categoria
 from app_asistentes.models import Asistente, AsistenteEvento
 from app_evaluadores.models import Evaluador, EvaluadorEvento
 from .models import Evento, EventoCategoria
-from app_usuarios.models import Usuario, Rol, RolUsuario
-from django.core.mail import EmailMessage
+from . import busqueda, paginacion
+from app_usuarios.models import Usuario, RolUsuario
+from app_usuarios.catalogo_roles import id_rol, id_rol_o_crear
+from django.core.mail import EmailMessage, EmailMultiAlternatives
+from app_usuarios.correos import encolar_correo
+from app_usuarios.plantillas_correo import renderizar_correo
 from django.template.loader import render_to_string
 from io import BytesIO
 from django.core.files.base import ContentFile
@@ -40,7 +43,8 @@ def manual_visitante(request):
         return FileResponse(open(ruta_manual, "rb"), content_type="application/pdf")
     raise Http404("Manual no encontrado")
 
-def ver_eventos(request):
+def _eventos_del_catalogo(request):
+    """Eventos públicos que cumplen los filtros de la petición"""
     area = request.GET.get('area')
     categoria = request.GET.get('categoria')
     ciudad = request.GET.get('ciudad')
@@ -48,25 +52,62 @@ def ver_eventos(request):
     nombre = request.GET.get('nombre')
     eventos = Evento.objects.filter(eve_estado__in=['Aprobado', 'Inscripciones Cerradas'])
     if ciudad:
-        eventos = eventos.filter(eve_ciudad__icontains=ciudad)
+        eventos = busqueda.filtrar_ciudad(eventos, ciudad)
     if fecha:
         eventos = eventos.filter(eve_fecha_inicio__lte=fecha, eve_fecha_fin__gte=fecha)
-    if nombre:
-        eventos = eventos.filter(eve_nombre__icontains=nombre)
+    # Subconsultas sobre EventoCategoria: sin JOIN en la consulta principal no hacen falta DISTINCT
     if categoria:
-        eventos = eventos.filter(eventocategoria__categoria__cat_codigo=categoria)
+        eventos = eventos.filter(
+            eve_id__in=EventoCategoria.objects.filter(categoria__cat_codigo=categoria).values('evento_id')
+        )
     if area:
-        eventos = eventos.filter(eventocategoria__categoria__cat_area_fk__are_codigo=area)
+        eventos = eventos.filter(
+            eve_id__in=EventoCategoria.objects.filter(categoria__cat_area_fk__are_codigo=area).values('evento_id')
+        )
+    # El texto busca en nombre, descripción, ciudad, lugar y categorías, ordenado por relevancia
+    if nombre:
+        eventos = busqueda.buscar(eventos, nombre)
+    return eventos
+
+
+def ver_eventos(request):
+    area = request.GET.get('area')
+    eventos = _eventos_del_catalogo(request)
+    # La primera página; las siguientes llegan por mas_eventos con el cursor
+    pagina_eventos, siguiente = paginacion.pagina(eventos)
     areas = Area.objects.all()
     categorias = Categoria.objects.filter(cat_area_fk__are_codigo=area) if area else Categoria.objects.all()
+    total, hay_mas = paginacion.contar(eventos) if siguiente else (len(pagina_eventos), False)
+    filtros = request.GET.copy()
+    filtros.pop('cursor', None)
     context = {
-        'eventos': eventos.distinct(),
+        'eventos': pagina_eventos,
+        'total_eventos': total,
+        'hay_mas_eventos': hay_mas,
+        'siguiente': siguiente,
+        'filtros': filtros.urlencode(),
         'areas': areas,
         'categorias': categorias,
     }
     return render(request, 'eventos.html', context)
 
 
+def mas_eventos(request):
+    """Siguiente página del catálogo en JSON: las tarjetas ya renderizadas y el cursor de la próxima"""
+    try:
+        pagina_eventos, siguiente = paginacion.pagina(
+            _eventos_del_catalogo(request), request.GET.get('cursor')
+        )
+    except paginacion.CursorInvalido as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
+    return JsonResponse({
+        'success': True,
+        'html': render_to_string('_tarjetas_eventos.html', {'eventos': pagina_eventos}, request=request),
+        'cantidad': len(pagina_eventos),
+        'siguiente': siguiente,
+    })
+
+
 def detalle_evento(request, eve_id):
     evento = get_object_or_404(Evento.objects.select_related('eve_administrador_fk'), pk=eve_id)
     categorias = EventoCategoria.objects.select_related('categoria__cat_area_fk').filter(evento=evento)
@@ -176,15 +217,15 @@ def solicitar_acceso_evento(request, eve_id):
     html_message = render_to_string('solicitud_acceso_evento.html', contexto)
     plain_message = strip_tags(html_message)
 
+    email = EmailMultiAlternatives(
+        subject=asunto_correo,
+        body=plain_message,
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=destinatarios,
+    )
+    email.attach_alternative(html_message, 'text/html')
     try:
-        send_mail(
-            subject=asunto_correo,
-            message=plain_message,
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=destinatarios,
-            html_message=html_message,
-            fail_silently=False,
-        )
+        encolar_correo(email)
         return JsonResponse({'success': True})
     except Exception:
         return JsonResponse({
@@ -367,9 +408,9 @@ def procesar_registro_con_codigo(request, eve_id, tipo, email_prefijado):
     # -------------------------
     def procesar_participante(usuario_param, archivo_param, es_principal=True):
         """Función interna para procesar inscripción de participante"""
-        rol = Rol.objects.filter(nombre__iexact='participante').first()
-        if rol and not RolUsuario.objects.filter(usuario=usuario_param, rol=rol).exists():
-            RolUsuario.objects.create(usuario=usuario_param, rol=rol)
+        rol_id = id_rol('participante')
+        if rol_id and not RolUsuario.objects.filter(usuario=usuario_param, rol_id=rol_id).exists():
+            RolUsuario.objects.create(usuario=usuario_param, rol_id=rol_id)
 
         participante, _ = Participante.objects.get_or_create(usuario=usuario_param)
 
@@ -439,7 +480,7 @@ def procesar_registro_con_codigo(request, eve_id, tipo, email_prefijado):
     # -------------------------
     def procesar_integrantes_adicionales(integrantes_lista, proyecto_principal, codigo_grupo_principal):
         """Función para procesar los integrantes adicionales del proyecto grupal"""
-        rol_participante = Rol.objects.filter(nombre='participante').first()
+        rol_participante_id = id_rol('participante')
         integrantes_procesados = 0
 
         for index, integrante_data in enumerate(integrantes_lista):
@@ -478,13 +519,13 @@ def procesar_registro_con_codigo(request, eve_id, tipo, email_prefijado):
                     usuario_int.set_password(clave)
                     usuario_int.save()
 
-                    cuerpo_html = render_to_string('correo_registro_completado.html', {
-                        'nombre': usuario_int.first_name,
-                        'evento': evento.eve_nombre,
-                        'tipo': 'Participante',
-                        'clave': clave,
-                        'email': usuario_int.email,
-                    })
+                    cuerpo_html = renderizar_correo(
+                        'correo_registro_completado.html',
+                        {'evento': evento.eve_nombre, 'tipo': 'Participante'},
+                        nombre=usuario_int.first_name,
+                        clave=clave,
+                        email=usuario_int.email,
+                    )
 
                     email = EmailMessage(
                         subject=f'Registro completado - {evento.eve_nombre}',
@@ -492,15 +533,12 @@ def procesar_registro_con_codigo(request, eve_id, tipo, email_prefijado):
                         to=[usuario_int.email],
                     )
                     email.content_subtype = 'html'
-                    try:
-                        email.send()
-                    except:
-                        pass
+                    encolar_correo(email)
 
-                if rol_participante and not RolUsuario.objects.filter(
-                    usuario=usuario_int, rol=rol_participante
+                if rol_participante_id and not RolUsuario.objects.filter(
+                    usuario=usuario_int, rol_id=rol_participante_id
                 ).exists():
-                    RolUsuario.objects.create(usuario=usuario_int, rol=rol_participante)
+                    RolUsuario.objects.create(usuario=usuario_int, rol_id=rol_participante_id)
 
                 participante, _ = Participante.objects.get_or_create(usuario=usuario_int)
 
@@ -562,9 +600,9 @@ def procesar_registro_con_codigo(request, eve_id, tipo, email_prefijado):
                 )
 
         elif tipo == 'evaluador':
-            rol_eval = Rol.objects.filter(nombre__iexact='evaluador').first()
-            if rol_eval and not RolUsuario.objects.filter(usuario=usuario, rol=rol_eval).exists():
-                RolUsuario.objects.create(usuario=usuario, rol=rol_eval)
+            rol_eval_id = id_rol('evaluador')
+            if rol_eval_id and not RolUsuario.objects.filter(usuario=usuario, rol_id=rol_eval_id).exists():
+                RolUsuario.objects.create(usuario=usuario, rol_id=rol_eval_id)
 
             evaluador, _ = Evaluador.objects.get_or_create(usuario=usuario)
             EvaluadorEvento.objects.get_or_create(
@@ -613,9 +651,9 @@ def procesar_registro_con_codigo(request, eve_id, tipo, email_prefijado):
                 )
 
         elif tipo == 'evaluador':
-            rol_eval = Rol.objects.filter(nombre__iexact='evaluador').first()
-            if rol_eval and not RolUsuario.objects.filter(usuario=usuario, rol=rol_eval).exists():
-                RolUsuario.objects.create(usuario=usuario, rol=rol_eval)
+            rol_eval_id = id_rol('evaluador')
+            if rol_eval_id and not RolUsuario.objects.filter(usuario=usuario, rol_id=rol_eval_id).exists():
+                RolUsuario.objects.create(usuario=usuario, rol_id=rol_eval_id)
 
             evaluador, _ = Evaluador.objects.get_or_create(usuario=usuario)
             EvaluadorEvento.objects.get_or_create(
@@ -670,9 +708,9 @@ def procesar_registro_con_codigo(request, eve_id, tipo, email_prefijado):
                 )
 
         elif tipo == 'evaluador':
-            rol_eval = Rol.objects.filter(nombre__iexact='evaluador').first()
-            if rol_eval and not RolUsuario.objects.filter(usuario=usuario, rol=rol_eval).exists():
-                RolUsuario.objects.create(usuario=usuario, rol=rol_eval)
+            rol_eval_id = id_rol('evaluador')
+            if rol_eval_id and not RolUsuario.objects.filter(usuario=usuario, rol_id=rol_eval_id).exists():
+                RolUsuario.objects.create(usuario=usuario, rol_id=rol_eval_id)
 
             evaluador = Evaluador.objects.create(usuario=usuario)
             EvaluadorEvento.objects.create(
@@ -688,13 +726,13 @@ def procesar_registro_con_codigo(request, eve_id, tipo, email_prefijado):
         usuario.set_password(clave)
         usuario.save()
 
-        cuerpo_html = render_to_string('correo_registro_completado.html', {
-            'nombre': usuario.first_name,
-            'evento': evento.eve_nombre,
-            'tipo': tipo.title(),
-            'clave': clave,
-            'email': usuario.email,
-        })
+        cuerpo_html = renderizar_correo(
+            'correo_registro_completado.html',
+            {'evento': evento.eve_nombre, 'tipo': tipo.title()},
+            nombre=usuario.first_name,
+            clave=clave,
+            email=usuario.email,
+        )
 
         email = EmailMessage(
             subject=f'Registro completado - {evento.eve_nombre}',
@@ -702,10 +740,7 @@ def procesar_registro_con_codigo(request, eve_id, tipo, email_prefijado):
             to=[usuario.email],
         )
         email.content_subtype = 'html'
-        try:
-            email.send()
-        except:
-            pass
+        encolar_correo(email)
 
     # -------------------------
     # 🔹 Mensaje de confirmación
@@ -803,9 +838,9 @@ def registro_evento(request, eve_id, tipo):
         # Si usuario existe y está activo, asignar rol asistente y crear relación evento-asistente
         if usuario and usuario.is_active:
             # Asignar rol asistente si no lo tiene
-            rol = Rol.objects.filter(nombre__iexact=tipo).first()
-            if rol and not RolUsuario.objects.filter(usuario=usuario, rol=rol).exists():
-                RolUsuario.objects.create(usuario=usuario, rol=rol)
+            rol_id = id_rol(tipo)
+            if rol_id and not RolUsuario.objects.filter(usuario=usuario, rol_id=rol_id).exists():
+                RolUsuario.objects.create(usuario=usuario, rol_id=rol_id)
             # Crear relación evento-asistente si no existe
             asistente, _ = Asistente.objects.get_or_create(usuario=usuario)
             if not AsistenteEvento.objects.filter(asistente=asistente, evento=evento).exists():
@@ -839,12 +874,13 @@ def registro_evento(request, eve_id, tipo):
                 
                 # Enviar correo con QR si es gratuito y aprobado
                 if estado == "Aprobado":
-                    cuerpo_html = render_to_string('correo_clave.html', {
-                        'nombre': usuario.first_name,
-                        'evento': evento.eve_nombre,
-                        'clave': None,  # No mostrar clave porque ya está activo
-                        'qr_url': asistencia.asi_eve_qr.url if asistencia.asi_eve_qr else None,
-                    })
+                    cuerpo_html = renderizar_correo(
+                        'correo_clave.html',
+                        {'evento': evento.eve_nombre},
+                        nombre=usuario.first_name,
+                        clave=None,  # No mostrar clave porque ya está activo
+                        qr_url=asistencia.asi_eve_qr.url if asistencia.asi_eve_qr else None,
+                    )
                     email = EmailMessage(
                         subject=f'Registro aprobado - {evento.eve_nombre}',
                         body=cuerpo_html,
@@ -853,7 +889,7 @@ def registro_evento(request, eve_id, tipo):
                     email.content_subtype = 'html'
                     if qr_img_bytes:
                         email.attach('qr_acceso.png', qr_img_bytes, 'image/png')
-                    email.send()
+                    encolar_correo(email)
                     
             return render(request, "ya_registrado.html", {
                 'nombre': usuario.first_name,
@@ -864,9 +900,9 @@ def registro_evento(request, eve_id, tipo):
         # Si usuario existe y está inactivo, crear objeto asistente-evento con archivo y estado 'Pendiente', mostrar proceso pendiente
         if usuario and not usuario.is_active:
             # Crear RolUsuario si no existe
-            rol_obj = Rol.objects.filter(nombre__iexact=tipo).first()
-            if rol_obj and not RolUsuario.objects.filter(usuario=usuario, rol=rol_obj).exists():
-                RolUsuario.objects.create(usuario=usuario, rol=rol_obj)
+            rol_id = id_rol(tipo)
+            if rol_id and not RolUsuario.objects.filter(usuario=usuario, rol_id=rol_id).exists():
+                RolUsuario.objects.create(usuario=usuario, rol_id=rol_id)
             asistente, _ = Asistente.objects.get_or_create(usuario=usuario)
             if not AsistenteEvento.objects.filter(asistente=asistente, evento=evento).exists():
                 asistencia = AsistenteEvento(
@@ -883,18 +919,19 @@ def registro_evento(request, eve_id, tipo):
             serializer = URLSafeTimedSerializer(settings.SECRET_KEY)
             token = serializer.dumps({'email': usuario.email, 'evento': evento.eve_id, 'rol': tipo})
             confirm_url = request.build_absolute_uri(reverse('confirmar_registro', args=[token]))
-            cuerpo_html = render_to_string('correo_confirmacion.html', {
-                'nombre': usuario.first_name,
-                'evento': evento.eve_nombre,
-                'confirm_url': confirm_url,
-            })
+            cuerpo_html = renderizar_correo(
+                'correo_confirmacion.html',
+                {'evento': evento.eve_nombre},
+                nombre=usuario.first_name,
+                confirm_url=confirm_url,
+            )
             email = EmailMessage(
                 subject=f'Confirma tu registro como {tipo} en {evento.eve_nombre}',
                 body=cuerpo_html,
                 to=[usuario.email],
             )
             email.content_subtype = 'html'
-            email.send()
+            encolar_correo(email)
             return render(request, "registro_pendiente.html", {
                 'nombre': usuario.first_name,
                 'correo': usuario.email,
@@ -913,9 +950,9 @@ def registro_evento(request, eve_id, tipo):
                 is_active=False
             )
         # Asignar rol asistente y crear objeto asistente-evento, luego enviar correo de confirmación
-        rol_obj = Rol.objects.filter(nombre__iexact=tipo).first()
-        if rol_obj and not RolUsuario.objects.filter(usuario=usuario, rol=rol_obj).exists():
-            RolUsuario.objects.create(usuario=usuario, rol=rol_obj)
+        rol_id = id_rol(tipo)
+        if rol_id and not RolUsuario.objects.filter(usuario=usuario, rol_id=rol_id).exists():
+            RolUsuario.objects.create(usuario=usuario, rol_id=rol_id)
         asistente, _ = Asistente.objects.get_or_create(usuario=usuario)
         if not AsistenteEvento.objects.filter(asistente=asistente, evento=evento).exists():
             asistencia = AsistenteEvento(
@@ -931,18 +968,19 @@ def registro_evento(request, eve_id, tipo):
         serializer = URLSafeTimedSerializer(settings.SECRET_KEY)
         token = serializer.dumps({'email': usuario.email, 'evento': evento.eve_id, 'rol': tipo})
         confirm_url = request.build_absolute_uri(reverse('confirmar_registro', args=[token]))
-        cuerpo_html = render_to_string('correo_confirmacion.html', {
-            'nombre': usuario.first_name,
-            'evento': evento.eve_nombre,
-            'confirm_url': confirm_url,
-        })
+        cuerpo_html = renderizar_correo(
+            'correo_confirmacion.html',
+            {'evento': evento.eve_nombre},
+            nombre=usuario.first_name,
+            confirm_url=confirm_url,
+        )
         email = EmailMessage(
             subject=f'Confirma tu registro como {tipo} en {evento.eve_nombre}',
             body=cuerpo_html,
             to=[usuario.email],
         )
         email.content_subtype = 'html'
-        email.send()
+        encolar_correo(email)
         return render(request, "registro_pendiente.html", {
             'nombre': usuario.first_name,
             'correo': usuario.email,
@@ -968,10 +1006,10 @@ def confirmar_registro(request, token):
             evento = Evento.objects.filter(eve_id=evento_id).first()
             print(f"[DEBUG] Usuario antes de limpieza: {usuario}")
             if usuario and evento:
-                rol_obj = Rol.objects.filter(nombre__iexact=rol).first()
+                rol_id = id_rol(rol)
                 rol_usuario = None
-                if rol_obj:
-                    rol_usuario = RolUsuario.objects.filter(usuario=usuario, rol=rol_obj).first()
+                if rol_id:
+                    rol_usuario = RolUsuario.objects.filter(usuario=usuario, rol_id=rol_id).first()
                 # --- Limpieza por rol ---
                 if rol == 'asistente':
                     asistente = getattr(usuario, 'asistente', None)
@@ -1064,9 +1102,9 @@ def confirmar_registro(request, token):
     if usuario.is_active:
         # Si ya está activo, procesar la confirmación sin generar nueva clave
         # Asignar el rol confirmado solo si no lo tiene ya (solo asistente permitido)
-        rol_obj = Rol.objects.filter(nombre__iexact=rol).first()
-        if rol_obj and not RolUsuario.objects.filter(usuario=usuario, rol=rol_obj).exists():
-            RolUsuario.objects.create(usuario=usuario, rol=rol_obj)
+        rol_id = id_rol(rol)
+        if rol_id and not RolUsuario.objects.filter(usuario=usuario, rol_id=rol_id).exists():
+            RolUsuario.objects.create(usuario=usuario, rol_id=rol_id)
         
         qr_url = None
         qr_img_bytes = None
@@ -1097,12 +1135,13 @@ def confirmar_registro(request, token):
                 
                 # Enviar correo con QR si corresponde
                 if evento.eve_tienecosto == 'NO':
-                    cuerpo_html = render_to_string('correo_clave.html', {
-                        'nombre': usuario.first_name,
-                        'evento': evento.eve_nombre,
-                        'clave': None,  # No mostrar clave porque ya está activo
-                        'qr_url': qr_url,
-                    })
+                    cuerpo_html = renderizar_correo(
+                        'correo_clave.html',
+                        {'evento': evento.eve_nombre},
+                        nombre=usuario.first_name,
+                        clave=None,  # No mostrar clave porque ya está activo
+                        qr_url=qr_url,
+                    )
                     email = EmailMessage(
                         subject=f'Confirmación de registro - {evento.eve_nombre}',
                         body=cuerpo_html,
@@ -1111,7 +1150,7 @@ def confirmar_registro(request, token):
                     email.content_subtype = 'html'
                     if qr_img_bytes:
                         email.attach('qr_acceso.png', qr_img_bytes, 'image/png')
-                    email.send()
+                    encolar_correo(email)
         else:
             return HttpResponse('Tipo de registro inválido para este flujo.')
         
@@ -1126,9 +1165,9 @@ def confirmar_registro(request, token):
     usuario.is_active = True
     usuario.save()
     # Asignar el rol confirmado solo si no lo tiene ya (solo asistente permitido)
-    rol_obj = Rol.objects.filter(nombre__iexact=rol).first()
-    if rol_obj and not RolUsuario.objects.filter(usuario=usuario, rol=rol_obj).exists():
-        RolUsuario.objects.create(usuario=usuario, rol=rol_obj)
+    rol_id = id_rol(rol)
+    if rol_id and not RolUsuario.objects.filter(usuario=usuario, rol_id=rol_id).exists():
+        RolUsuario.objects.create(usuario=usuario, rol_id=rol_id)
     qr_url = None
     qr_img_bytes = None
     
@@ -1154,12 +1193,13 @@ def confirmar_registro(request, token):
             asistencia.save()
     else:
         return HttpResponse('Tipo de registro inválido para este flujo.')
-    cuerpo_html = render_to_string('correo_clave.html', {
-        'nombre': usuario.first_name,
-        'evento': evento.eve_nombre,
-        'clave': clave,
-        'qr_url': qr_url,
-    })
+    cuerpo_html = renderizar_correo(
+        'correo_clave.html',
+        {'evento': evento.eve_nombre},
+        nombre=usuario.first_name,
+        clave=clave,
+        qr_url=qr_url,
+    )
     email = EmailMessage(
         subject=f'Tu clave de acceso para el evento {evento.eve_nombre}',
         body=cuerpo_html,
@@ -1168,7 +1208,7 @@ def confirmar_registro(request, token):
     email.content_subtype = 'html'
     if qr_img_bytes:
         email.attach('qr_acceso.png', qr_img_bytes, 'image/png')
-    email.send()
+    encolar_correo(email)
     return render(request, 'registro_confirmado.html', {
         'nombre': usuario.first_name,
         'evento': evento.eve_nombre,
@@ -1219,8 +1259,7 @@ def registrarse_admin_evento(request):
                 telefono=telefono,
                 documento=documento
             )
-            rol_admin, _ = Rol.objects.get_or_create(nombre='administrador_evento')
-            RolUsuario.objects.create(usuario=user, rol=rol_admin)
+            RolUsuario.objects.create(usuario=user, rol_id=id_rol_o_crear('administrador_evento'))
             AdministradorEvento.objects.create(usuario=user)
             invitacion.estado = 'usado'
             invitacion.fecha_uso = timezone.now()
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class AppParticipantesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'app_participantes'
+
+    def ready(self):
+        from . import signals  # noqa: F401
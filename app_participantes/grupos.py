@@ -0,0 +1,154 @@
+from collections import namedtuple
+
+from django.db.models import F
+
+from app_evaluadores.models import Calificacion
+from app_participantes.models import Equipo, ParticipanteEvento, Proyecto
+
+
+# lider: creador de los proyectos del grupo; referencia: primer integrante con
+# calificaciones (None si nadie ha sido calificado); proyectos: los del líder.
+Grupo = namedtuple('Grupo', ['lider', 'referencia', 'integrantes', 'proyectos'])
+
+
+def proyectos_por_creador(evento):
+    """Todos los proyectos del evento agrupados por su creador, en una sola consulta."""
+    proyectos = {}
+    for proyecto in Proyecto.objects.filter(
+        evento=evento,
+        creador__isnull=False
+    ).order_by('fecha_subida', 'id'):
+        proyectos.setdefault(proyecto.creador_id, []).append(proyecto)
+    return proyectos
+
+
+def lideres_por_codigo(evento):
+    """Mapa codigo -> participante_id del líder de cada equipo del evento."""
+    return dict(
+        Equipo.objects.filter(
+            evento=evento,
+            lider__isnull=False
+        ).values_list('codigo', 'lider_id')
+    )
+
+
+def actualizar_lider(equipo_id):
+    """
+    Recalcula el líder guardado del equipo: el primer integrante (por orden
+    de inscripción) que sea creador de algún proyecto en el evento. Un equipo
+    que se quedó sin integrantes se elimina.
+    """
+    if not ParticipanteEvento.objects.filter(equipo_id=equipo_id).exists():
+        Equipo.objects.filter(pk=equipo_id).delete()
+        return None
+    lider_id = ParticipanteEvento.objects.filter(
+        equipo_id=equipo_id,
+        participante__proyectos_creados__evento_id=F('evento_id')
+    ).order_by('pk').values_list('participante_id', flat=True).first()
+    Equipo.objects.filter(pk=equipo_id).update(lider_id=lider_id)
+    return lider_id
+
+
+def lider_de_grupo(evento_id, codigo):
+    """participante_id del líder de un grupo o None si ningún integrante creó proyectos."""
+    return Equipo.objects.filter(
+        evento_id=evento_id,
+        codigo=codigo
+    ).values_list('lider_id', flat=True).first()
+
+
+def proyectos_de_inscripciones(evento, inscripciones):
+    """
+    Para cada inscripción devuelve (proyecto principal, proyectos extra ordenados):
+    los que creó el participante y, si es integrante grupal, los del líder.
+    Usa un número fijo de consultas sin importar cuántas inscripciones haya.
+    """
+    por_creador = proyectos_por_creador(evento)
+    lideres = lideres_por_codigo(evento)
+
+    resultado = {}
+    for pe in inscripciones:
+        principal = pe.proyecto
+        candidatos = list(por_creador.get(pe.participante_id, []))
+        lider_id = lideres.get(pe.codigo) if pe.codigo else None
+        if lider_id is not None:
+            candidatos.extend(por_creador.get(lider_id, []))
+
+        vistos = {principal.id} if principal else set()
+        extras = []
+        for pr in sorted(candidatos, key=lambda pr: (pr.fecha_subida, pr.id)):
+            if pr.id not in vistos:
+                vistos.add(pr.id)
+                extras.append(pr)
+
+        resultado[pe.participante_id] = (principal, extras)
+    return resultado
+
+
+def mapa_grupos(evento_ids, codigos=None, evaluador=None):
+    """
+    Mapa (evento_id, codigo) -> Grupo para todos los grupos de los eventos
+    dados, en tres consultas: integrantes con su equipo y líder guardado,
+    proyectos de los integrantes y quiénes tienen calificaciones (solo de
+    `evaluador` si se indica).
+    """
+    integrantes = ParticipanteEvento.objects.filter(
+        evento_id__in=evento_ids,
+        equipo__isnull=False
+    )
+    if codigos is not None:
+        integrantes = integrantes.filter(equipo__codigo__in=codigos)
+    integrantes = list(integrantes.order_by('pk').values_list(
+        'evento_id', 'equipo__codigo', 'participante_id', 'equipo__lider_id'
+    ))
+    if not integrantes:
+        return {}
+    participante_ids = {pid for _, _, pid, _ in integrantes}
+
+    proyectos = {}
+    for proyecto in Proyecto.objects.filter(
+        evento_id__in=evento_ids,
+        creador_id__in=participante_ids
+    ).order_by('fecha_subida', 'id'):
+        proyectos.setdefault((proyecto.evento_id, proyecto.creador_id), []).append(proyecto)
+
+    calificaciones = Calificacion.objects.filter(
+        criterio__cri_evento_fk_id__in=evento_ids,
+        participante_id__in=participante_ids
+    )
+    if evaluador is not None:
+        calificaciones = calificaciones.filter(evaluador=evaluador)
+    calificados = set(calificaciones.values_list('criterio__cri_evento_fk_id', 'participante_id').distinct())
+
+    miembros = {}
+    lideres = {}
+    for evento_id, codigo, participante_id, lider_id in integrantes:
+        miembros.setdefault((evento_id, codigo), []).append(participante_id)
+        lideres[(evento_id, codigo)] = lider_id
+
+    grupos = {}
+    for (evento_id, codigo), ids in miembros.items():
+        lider = lideres[(evento_id, codigo)]
+        referencia = next((pid for pid in ids if (evento_id, pid) in calificados), None)
+        grupos[(evento_id, codigo)] = Grupo(
+            lider=lider,
+            referencia=referencia,
+            integrantes=ids,
+            proyectos=proyectos.get((evento_id, lider), []),
+        )
+    return grupos
+
+
+def grupos_del_evento(evento, evaluador=None):
+    """
+    mapa_grupos de un solo evento, indexado por código. Se memoriza en la
+    instancia del evento, que vive lo que dura la petición.
+    """
+    memoria = evento.__dict__.setdefault('_grupos_por_evaluador', {})
+    clave = evaluador.pk if evaluador is not None else None
+    if clave not in memoria:
+        memoria[clave] = {
+            codigo: grupo
+            for (_, codigo), grupo in mapa_grupos([evento.pk], evaluador=evaluador).items()
+        }
+    return memoria[clave]
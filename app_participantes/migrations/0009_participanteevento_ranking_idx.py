@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-18 01:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_eventos', '0004_remove_evento_inscripciones_habilitadas'),
+        ('app_participantes', '0008_alter_proyecto_pro_valor'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='participanteevento',
+            index=models.Index(fields=['evento', 'par_eve_estado', 'par_eve_valor'], name='par_eve_ranking_idx'),
+        ),
+    ]
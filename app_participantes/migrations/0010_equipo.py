@@ -0,0 +1,70 @@
+# Generated by Django 5.2.4 on 2026-10-18 01:11
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def poblar_equipos(apps, schema_editor):
+    ParticipanteEvento = apps.get_model('app_participantes', 'ParticipanteEvento')
+    Proyecto = apps.get_model('app_participantes', 'Proyecto')
+    Equipo = apps.get_model('app_participantes', 'Equipo')
+
+    creadores = set(
+        Proyecto.objects.exclude(creador__isnull=True).values_list('evento_id', 'creador_id')
+    )
+    inscripciones = list(
+        ParticipanteEvento.objects.filter(codigo__isnull=False)
+        .exclude(codigo='')
+        .order_by('pk')
+        .only('pk', 'evento_id', 'codigo', 'participante_id')
+    )
+
+    # El líder es el primer integrante (por pk) que creó proyectos en el evento
+    lideres = {}
+    for pe in inscripciones:
+        clave = (pe.evento_id, pe.codigo)
+        lideres.setdefault(clave, None)
+        if lideres[clave] is None and (pe.evento_id, pe.participante_id) in creadores:
+            lideres[clave] = pe.participante_id
+
+    Equipo.objects.bulk_create([
+        Equipo(evento_id=evento_id, codigo=codigo, lider_id=lider_id)
+        for (evento_id, codigo), lider_id in lideres.items()
+    ], batch_size=500)
+
+    equipos = {
+        (evento_id, codigo): pk
+        for pk, evento_id, codigo in Equipo.objects.values_list('pk', 'evento_id', 'codigo')
+    }
+    for pe in inscripciones:
+        pe.equipo_id = equipos[(pe.evento_id, pe.codigo)]
+    ParticipanteEvento.objects.bulk_update(inscripciones, ['equipo'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_eventos', '0004_remove_evento_inscripciones_habilitadas'),
+        ('app_participantes', '0009_participanteevento_ranking_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Equipo',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('codigo', models.CharField(max_length=20)),
+                ('evento', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='equipos', to='app_eventos.evento')),
+                ('lider', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='equipos_liderados', to='app_participantes.participante')),
+            ],
+            options={
+                'unique_together': {('evento', 'codigo')},
+            },
+        ),
+        migrations.AddField(
+            model_name='participanteevento',
+            name='equipo',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='integrantes', to='app_participantes.equipo'),
+        ),
+        migrations.RunPython(poblar_equipos, migrations.RunPython.noop),
+    ]
@@ -33,6 +33,25 @@ class Proyecto(models.Model):
     def __str__(self):
         return f"{self.titulo} ({self.evento.eve_nombre})"
     
+class Equipo(models.Model):
+    """Grupo de un evento identificado por el código de proyecto grupal de sus integrantes."""
+    evento = models.ForeignKey(Evento, on_delete=models.CASCADE, related_name='equipos')
+    codigo = models.CharField(max_length=20)
+    # Primer integrante (por orden de inscripción) que creó proyectos en el evento
+    lider = models.ForeignKey(
+        Participante,
+        on_delete=models.SET_NULL,
+        related_name='equipos_liderados',
+        null=True,
+        blank=True
+    )
+
+    class Meta:
+        unique_together = (('evento', 'codigo'),)
+
+    def __str__(self):
+        return f"{self.codigo} ({self.evento.eve_nombre})"
+
 class ParticipanteEvento(models.Model):
     participante = models.ForeignKey(Participante, on_delete=models.CASCADE)
     evento = models.ForeignKey(Evento, on_delete=models.CASCADE)
@@ -44,6 +63,22 @@ class ParticipanteEvento(models.Model):
     confirmado = models.BooleanField(default=False)
     codigo = models.CharField(max_length=20, blank=True, null=True, help_text="Código de proyecto grupal")
     proyecto = models.ForeignKey('Proyecto', on_delete=models.SET_NULL, null=True, blank=True, related_name="participantes")
+    # Se mantiene sincronizado con `codigo` desde app_participantes.signals
+    equipo = models.ForeignKey('Equipo', on_delete=models.SET_NULL, null=True, blank=True, related_name="integrantes")
 
     class Meta:
-        unique_together = (('participante', 'evento'),)
\ No newline at end of file
+        unique_together = (('participante', 'evento'),)
+        indexes = [
+            models.Index(fields=['evento', 'par_eve_estado', 'par_eve_valor'], name='par_eve_ranking_idx'),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instancia = super().from_db(db, field_names, values)
+        # Valores con los que se cargó; la señal pre_save solo resuelve el equipo si cambian
+        instancia._equipo_cargado = (
+            instancia.__dict__.get('evento_id'),
+            instancia.__dict__.get('codigo'),
+            instancia.__dict__.get('equipo_id'),
+        )
+        return instancia
\ No newline at end of file
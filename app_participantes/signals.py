@@ -0,0 +1,86 @@
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+
+from .grupos import actualizar_lider
+from .models import Equipo, ParticipanteEvento, Proyecto
+
+
+# ===============================
+# INSCRIPCIONES
+# ===============================
+
+def _equipo_vigente(instance):
+    """True si el equipo asignado ya corresponde al evento y código de la inscripción, sin consultar."""
+    if not instance.equipo_id:
+        return False
+    if ParticipanteEvento.equipo.is_cached(instance):
+        equipo = instance.equipo
+        return (equipo.evento_id, equipo.codigo) == (instance.evento_id, instance.codigo)
+    return getattr(instance, '_equipo_cargado', None) == (instance.evento_id, instance.codigo, instance.equipo_id)
+
+
+@receiver(pre_save, sender=ParticipanteEvento)
+def asignar_equipo(sender, instance, raw=False, **kwargs):
+    """Mantiene ParticipanteEvento.equipo sincronizado con el código de grupo."""
+    instance._equipo_anterior = instance.equipo_id
+    if raw:
+        return
+    if not instance.codigo:
+        instance.equipo = None
+        return
+    # Los cambios de estado u otros campos no tocan el equipo
+    if _equipo_vigente(instance):
+        return
+    instance.equipo, _ = Equipo.objects.get_or_create(
+        evento_id=instance.evento_id,
+        codigo=instance.codigo
+    )
+
+
+@receiver(post_save, sender=ParticipanteEvento)
+def actualizar_lider_inscripcion(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    anterior = getattr(instance, '_equipo_anterior', None)
+    instance._equipo_cargado = (instance.evento_id, instance.codigo, instance.equipo_id)
+    if anterior == instance.equipo_id:
+        return
+    if anterior:
+        # Puede quedar sin integrantes, en cuyo caso se elimina
+        actualizar_lider(anterior)
+    if instance.equipo_id and instance.equipo.lider_id is None:
+        actualizar_lider(instance.equipo_id)
+
+
+@receiver(post_delete, sender=ParticipanteEvento)
+def actualizar_lider_baja(sender, instance, **kwargs):
+    if instance.equipo_id:
+        actualizar_lider(instance.equipo_id)
+
+
+# ===============================
+# PROYECTOS
+# ===============================
+
+def _actualizar_equipo_del_creador(proyecto):
+    if not proyecto.creador_id:
+        return
+    equipo_id = ParticipanteEvento.objects.filter(
+        evento_id=proyecto.evento_id,
+        participante_id=proyecto.creador_id,
+        equipo__isnull=False
+    ).values_list('equipo_id', flat=True).first()
+    if equipo_id:
+        actualizar_lider(equipo_id)
+
+
+@receiver(post_save, sender=Proyecto)
+def actualizar_lider_proyecto(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    _actualizar_equipo_del_creador(instance)
+
+
+@receiver(post_delete, sender=Proyecto)
+def actualizar_lider_proyecto_eliminado(sender, instance, **kwargs):
+    _actualizar_equipo_del_creador(instance)
@@ -1,3 +1,227 @@
+from datetime import timedelta
+from importlib import import_module
+
+from django.apps import apps
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from app_usuarios.models import Usuario
+from app_administradores.models import AdministradorEvento
+from app_eventos.models import Evento
+from app_evaluadores.models import Evaluador, Criterio, Calificacion
+from app_participantes.grupos import grupos_del_evento, lider_de_grupo, mapa_grupos
+from app_participantes.models import Equipo, Participante, ParticipanteEvento, Proyecto
+
+poblar_equipos = import_module('app_participantes.migrations.0010_equipo').poblar_equipos
+
+
+class PruebasMapaGrupos(TestCase):
+
+    def setUp(self):
+        """Evento con dos grupos: G1 con líder y proyecto, G2 sin proyectos."""
+        admin_user = Usuario.objects.create_user(
+            username='admin_grp', email='admin@grp.com', password='password123', documento='1'
+        )
+        administrador = AdministradorEvento.objects.create(usuario=admin_user)
+        self.evento = Evento.objects.create(
+            eve_nombre="Evento Grupos",
+            eve_estado="Aprobado",
+            eve_capacidad=50,
+            eve_tienecosto="No",
+            eve_fecha_inicio=timezone.now().date(),
+            eve_fecha_fin=timezone.now().date() + timedelta(days=2),
+            eve_administrador_fk=administrador,
+        )
+        self.total = 0
+        self.g1 = [self.crear_integrante('G1') for _ in range(3)]
+        self.g2 = [self.crear_integrante('G2') for _ in range(2)]
+        self.proyecto = Proyecto.objects.create(evento=self.evento, titulo="Proyecto G1", creador=self.g1[1])
+
+        usuario_eval = Usuario.objects.create_user(
+            username='eval_grp', email='eval@grp.com', password='password123', documento='2'
+        )
+        self.evaluador = Evaluador.objects.create(usuario=usuario_eval)
+        self.criterio = Criterio.objects.create(cri_descripcion="Dominio", cri_peso=100.0, cri_evento_fk=self.evento)
+
+    def crear_integrante(self, codigo):
+        self.total += 1
+        usuario = Usuario.objects.create_user(
+            username=f'part_grp{self.total}',
+            email=f'part{self.total}@grp.com',
+            password='password123',
+            documento=f'9{self.total}',
+        )
+        participante = Participante.objects.create(usuario=usuario)
+        ParticipanteEvento.objects.create(
+            participante=participante,
+            evento=self.evento,
+            par_eve_estado='Aprobado',
+            par_eve_fecha_hora=timezone.now(),
+            codigo=codigo,
+        )
+        return participante
+
+    def test_lider_referencia_e_integrantes(self):
+        Calificacion.objects.create(
+            evaluador=self.evaluador, criterio=self.criterio, participante=self.g1[2], cal_valor=4
+        )
+
+        with self.assertNumQueries(3):
+            grupos = mapa_grupos([self.evento.pk])
+
+        g1 = grupos[(self.evento.pk, 'G1')]
+        self.assertEqual(g1.lider, self.g1[1].pk)
+        self.assertEqual(g1.referencia, self.g1[2].pk)
+        self.assertEqual(g1.integrantes, [p.pk for p in self.g1])
+        self.assertEqual(g1.proyectos, [self.proyecto])
+
+        g2 = grupos[(self.evento.pk, 'G2')]
+        self.assertIsNone(g2.lider)
+        self.assertIsNone(g2.referencia)
+        self.assertEqual(g2.proyectos, [])
+
+    def test_referencia_filtrada_por_evaluador(self):
+        usuario_otro = Usuario.objects.create_user(
+            username='eval_grp2', email='eval2@grp.com', password='password123', documento='3'
+        )
+        otro = Evaluador.objects.create(usuario=usuario_otro)
+        Calificacion.objects.create(evaluador=otro, criterio=self.criterio, participante=self.g1[0], cal_valor=3)
+
+        self.assertEqual(grupos_del_evento(self.evento)['G1'].referencia, self.g1[0].pk)
+        self.assertIsNone(grupos_del_evento(self.evento, evaluador=self.evaluador)['G1'].referencia)
+
+    def test_consultas_no_crecen_con_los_grupos(self):
+        with self.assertNumQueries(3):
+            mapa_grupos([self.evento.pk])
+        for i in range(10):
+            self.crear_integrante(f'N{i}')
+            self.crear_integrante(f'N{i}')
+        with self.assertNumQueries(3):
+            grupos = mapa_grupos([self.evento.pk])
+        self.assertEqual(len(grupos), 12)
+
+    def test_grupos_del_evento_se_memoriza_en_la_instancia(self):
+        grupos_del_evento(self.evento)
+        with self.assertNumQueries(0):
+            grupos_del_evento(self.evento)
+
+
+class PruebasEquipo(TestCase):
+
+    def setUp(self):
+        admin_user = Usuario.objects.create_user(
+            username='admin_eq', email='admin@eq.com', password='password123', documento='1'
+        )
+        administrador = AdministradorEvento.objects.create(usuario=admin_user)
+        self.evento = Evento.objects.create(
+            eve_nombre="Evento Equipos",
+            eve_estado="Aprobado",
+            eve_capacidad=50,
+            eve_tienecosto="No",
+            eve_fecha_inicio=timezone.now().date(),
+            eve_fecha_fin=timezone.now().date() + timedelta(days=2),
+            eve_administrador_fk=administrador,
+        )
+        self.total = 0
+
+    def crear_participante(self):
+        self.total += 1
+        usuario = Usuario.objects.create_user(
+            username=f'part_eq{self.total}',
+            email=f'part{self.total}@eq.com',
+            password='password123',
+            documento=f'9{self.total}',
+        )
+        return Participante.objects.create(usuario=usuario)
+
+    def inscribir(self, participante, codigo):
+        return ParticipanteEvento.objects.create(
+            participante=participante,
+            evento=self.evento,
+            par_eve_estado='Pendiente',
+            par_eve_fecha_hora=timezone.now(),
+            codigo=codigo,
+        )
+
+    def test_inscripcion_con_codigo_crea_y_reutiliza_el_equipo(self):
+        pe1 = self.inscribir(self.crear_participante(), 'ABC')
+        pe2 = self.inscribir(self.crear_participante(), 'ABC')
+        individual = self.inscribir(self.crear_participante(), None)
+
+        self.assertIsNotNone(pe1.equipo_id)
+        self.assertEqual(pe1.equipo_id, pe2.equipo_id)
+        self.assertIsNone(individual.equipo_id)
+        self.assertEqual(Equipo.objects.get(pk=pe1.equipo_id).integrantes.count(), 2)
+
+    def test_cambio_de_estado_no_consulta_equipos(self):
+        pe = ParticipanteEvento.objects.get(pk=self.inscribir(self.crear_participante(), 'ABC').pk)
+        pe.par_eve_estado = 'Aprobado'
+        with CaptureQueriesContext(connection) as consultas:
+            pe.save()
+        self.assertFalse([q for q in consultas if Equipo._meta.db_table in q['sql']])
+
+    def test_equipo_sin_integrantes_se_elimina(self):
+        pe = self.inscribir(self.crear_participante(), 'VIEJO')
+        otro = self.inscribir(self.crear_participante(), 'OTRO')
+        anterior = pe.equipo_id
+
+        pe = ParticipanteEvento.objects.get(pk=pe.pk)
+        pe.codigo = 'NUEVO'
+        pe.save()
+        self.assertNotEqual(pe.equipo_id, anterior)
+        self.assertEqual(Equipo.objects.get(pk=pe.equipo_id).codigo, 'NUEVO')
+        self.assertFalse(Equipo.objects.filter(pk=anterior).exists())
+
+        equipo_otro = otro.equipo_id
+        otro.delete()
+        self.assertFalse(Equipo.objects.filter(pk=equipo_otro).exists())
+
+    def test_lider_se_guarda_al_crear_el_proyecto(self):
+        # Flujo de registro: el líder crea el proyecto antes de su inscripción
+        lider = self.crear_participante()
+        Proyecto.objects.create(evento=self.evento, titulo="Grupal", creador=lider)
+        pe_lider = self.inscribir(lider, 'G1')
+        self.inscribir(self.crear_participante(), 'G1')
+        self.assertEqual(Equipo.objects.get(pk=pe_lider.equipo_id).lider_id, lider.pk)
+
+        # Proyecto creado después de la inscripción
+        integrante = self.crear_participante()
+        pe = self.inscribir(integrante, 'G2')
+        self.assertIsNone(Equipo.objects.get(pk=pe.equipo_id).lider_id)
+        Proyecto.objects.create(evento=self.evento, titulo="Otro", creador=integrante)
+        self.assertEqual(Equipo.objects.get(pk=pe.equipo_id).lider_id, integrante.pk)
+
+    def test_lider_cambia_si_pierde_sus_proyectos(self):
+        primero, segundo = self.crear_participante(), self.crear_participante()
+        pe = self.inscribir(primero, 'G1')
+        self.inscribir(segundo, 'G1')
+        proyecto = Proyecto.objects.create(evento=self.evento, titulo="Del primero", creador=primero)
+        Proyecto.objects.create(evento=self.evento, titulo="Del segundo", creador=segundo)
+        self.assertEqual(Equipo.objects.get(pk=pe.equipo_id).lider_id, primero.pk)
+
+        proyecto.delete()
+        self.assertEqual(Equipo.objects.get(pk=pe.equipo_id).lider_id, segundo.pk)
+
+    def test_lider_de_grupo_es_una_consulta(self):
+        lider = self.crear_participante()
+        Proyecto.objects.create(evento=self.evento, titulo="Grupal", creador=lider)
+        self.inscribir(lider, 'G1')
+        with self.assertNumQueries(1):
+            self.assertEqual(lider_de_grupo(self.evento.pk, 'G1'), lider.pk)
+
+    def test_migracion_puebla_equipos_desde_los_codigos(self):
+        lider, integrante = self.crear_participante(), self.crear_participante()
+        self.inscribir(integrante, 'G1')
+        self.inscribir(lider, 'G1')
+        Proyecto.objects.create(evento=self.evento, titulo="Grupal", creador=lider)
+        # Estado previo a la migración: sin equipos
+        ParticipanteEvento.objects.update(equipo=None)
+        Equipo.objects.all().delete()
+
+        poblar_equipos(apps, None)
 
-# Create your tests here.
+        equipo = Equipo.objects.get(evento=self.evento, codigo='G1')
+        self.assertEqual(equipo.lider_id, lider.pk)
+        self.assertEqual(equipo.integrantes.count(), 2)
@@ -4,6 +4,7 @@ from . import views
 urlpatterns = [
     path('dashboard-participante/', views.dashboard_participante_general, name='dashboard_participante_general'),
     path('dashboard-participante/evento/<int:evento_id>/', views.dashboard_participante_evento, name='dashboard_participante_evento'),
+    path('dashboard-participante/evento/<int:evento_id>/certificado/<str:tipo>/', views.descargar_certificado_participante, name='descargar_certificado_participante'),
     path('modificar-preinscripcion/<int:evento_id>', views.modificar_preinscripcion, name='modificar_preinscripcion_participante'),
     path('cancelar-inscripcion-participante/', views.cancelar_inscripcion, name='cancelar_preinscripcion_participante'),
     path('ver-qr-participante/<int:evento_id>/', views.ver_qr_participante, name='ver_qr_participante'),
@@ -1,11 +1,13 @@
 from django.shortcuts import render , redirect, get_object_or_404
 from django.contrib import messages
 from app_participantes.models import ParticipanteEvento , Participante, Proyecto
+from app_participantes.grupos import mapa_grupos
 from app_eventos.models import EventoCategoria, Evento
 from app_evaluadores.models import Criterio, Calificacion
 from django.views.decorators.http import require_http_methods, require_POST
 from django.contrib.auth.decorators import login_required, user_passes_test
 from app_usuarios.permisos import es_participante
+from app_administradores.certificados import eventos_con_certificado, respuesta_certificado
 from django.urls import reverse
 from django.http import Http404, HttpResponse, FileResponse
 from django.conf import settings
@@ -83,12 +85,37 @@ def dashboard_participante_evento(request, evento_id):
         'par_id': participante.id,
         'eve_id': inscripcion.evento.eve_id
     }
+
+    # Certificados descargables: solo con inscripción aprobada y confirmada
+    certificados = []
+    if inscripcion.par_eve_estado == 'Aprobado' and inscripcion.confirmado:
+        certificados.append('participacion')
+        if inscripcion.par_eve_valor is not None:
+            certificados.append('premiacion')
+        certificados = [
+            tipo for tipo in certificados
+            if inscripcion.evento.pk in eventos_con_certificado([inscripcion.evento], tipo, request.user)
+        ]
     return render(request, 'dashboard_participante.html', {
         'datos': datos,
         'proyectos_lider': proyectos_lider,
+        'certificados': certificados,
     })
 
 
+@login_required
+@user_passes_test(es_participante, login_url='login')
+def descargar_certificado_participante(request, evento_id, tipo):
+    if tipo not in ('participacion', 'premiacion'):
+        raise Http404("Tipo de certificado no válido")
+    evento = get_object_or_404(Evento, pk=evento_id)
+    response = respuesta_certificado(request, evento, tipo, request.user)
+    if response is None:
+        messages.warning(request, "Tu certificado para este evento aún no está disponible.")
+        return redirect('dashboard_participante_evento', evento_id=evento_id)
+    return response
+
+
 @login_required
 @user_passes_test(es_participante, login_url='login')
 @require_http_methods(["GET", "POST"])
@@ -249,30 +276,16 @@ def ver_calificaciones_participante(request, evento_id):
         messages.warning(request, "No estás inscrito en este evento.")
         return redirect('dashboard_participante_evento', evento_id=evento_id)
 
-    # Por defecto, se usan sus propias calificaciones
-    participante_referencia = participante
-
-    # Si es grupal (tiene código), buscar dentro del grupo quién tiene calificaciones
+    # Por defecto, se usan sus propias calificaciones; si es grupal (tiene código),
+    # las del primer integrante del grupo que tenga calificaciones
+    referencia_id = participante.id
     if pe_usuario.codigo:
-        grupo = ParticipanteEvento.objects.filter(
-            evento=evento,
-            codigo=pe_usuario.codigo
-        ).select_related('participante')
-
-        ref = None
-        for pe in grupo:
-            if Calificacion.objects.filter(
-                participante=pe.participante,
-                criterio__cri_evento_fk=evento
-            ).exists():
-                ref = pe.participante
-                break
-
-        if ref:
-            participante_referencia = ref
+        grupo = mapa_grupos([evento.pk], codigos=[pe_usuario.codigo]).get((evento.pk, pe_usuario.codigo))
+        if grupo and grupo.referencia is not None:
+            referencia_id = grupo.referencia
 
     calificaciones = Calificacion.objects.select_related('evaluador__usuario', 'criterio').filter(
-        participante=participante_referencia,
+        participante_id=referencia_id,
         criterio__cri_evento_fk=evento
     )
 
@@ -373,66 +386,46 @@ def mis_proyectos(request):
             }
 
     # 2) Proyectos que el participante creó (principal + extras) en cada evento
-    # 2) Proyectos que el participante creó (principal + extras) en cada evento
+    estados_por_evento = dict(
+        ParticipanteEvento.objects.filter(participante=participante).values_list('evento_id', 'par_eve_estado')
+    )
     proyectos_creados = Proyecto.objects.filter(creador=participante).select_related('evento')
 
     for proyecto in proyectos_creados:
         key = (proyecto.id, proyecto.evento.eve_id)
         if key not in proyectos_map:
-            # Buscar la inscripción del participante en ese evento para tomar su estado real
-            pe = ParticipanteEvento.objects.filter(
-                participante=participante,
-                evento=proyecto.evento
-            ).first()
-
-            estado = pe.par_eve_estado if pe else 'Pendiente'
-
+            # El estado real es el de la inscripción del participante en ese evento
             proyectos_map[key] = {
                 'proyecto': proyecto,
                 'evento': proyecto.evento,
-                'estado_inscripcion': estado,
+                'estado_inscripcion': estados_por_evento.get(proyecto.evento_id, 'Pendiente'),
             }
 
-
     # 3) Si es integrante grupal (no creador), incluir también los proyectos del líder del grupo
     #    para cada evento donde tenga código de grupo.
-    pe_con_codigo = ParticipanteEvento.objects.filter(
+    pe_con_codigo = list(ParticipanteEvento.objects.filter(
         participante=participante,
         codigo__isnull=False
-    ).select_related('evento')
+    ).select_related('evento'))
+    grupos = mapa_grupos(
+        {pe.evento_id for pe in pe_con_codigo},
+        codigos={pe.codigo for pe in pe_con_codigo}
+    ) if pe_con_codigo else {}
 
     for pe_usuario in pe_con_codigo:
-        evento = pe_usuario.evento
-
-        # Buscar líder del grupo en este evento: alguien del mismo código que sea creador de proyectos
-        lider_ids = Proyecto.objects.filter(
-            evento=evento
-        ).exclude(creador__isnull=True).values_list('creador_id', flat=True)
-
-        pe_lider = ParticipanteEvento.objects.filter(
-            evento=evento,
-            codigo=pe_usuario.codigo,
-            participante_id__in=lider_ids
-        ).first()
-
-        if not pe_lider:
+        grupo = grupos.get((pe_usuario.evento_id, pe_usuario.codigo))
+        if not grupo or grupo.lider is None:
             continue
 
         # Proyectos del líder en este evento = proyectos del grupo
-        proyectos_lider = Proyecto.objects.filter(
-            evento=evento,
-            creador_id=pe_lider.participante_id
-        ).select_related('evento')
-
-        for proyecto in proyectos_lider:
-            key = (proyecto.id, proyecto.evento.eve_id)
+        for proyecto in grupo.proyectos:
+            key = (proyecto.id, pe_usuario.evento.eve_id)
             if key not in proyectos_map:
                 # El estado que ve el integrante es el de su propia inscripción
-                estado = pe_usuario.par_eve_estado
                 proyectos_map[key] = {
                     'proyecto': proyecto,
-                    'evento': proyecto.evento,
-                    'estado_inscripcion': estado,
+                    'evento': pe_usuario.evento,
+                    'estado_inscripcion': pe_usuario.par_eve_estado,
                 }
 
     proyectos_data = list(proyectos_map.values())
@@ -568,26 +561,17 @@ def gestionar_proyectos_evento(request, evento_id):
             participante=participante,
             evento=evento,
             codigo__isnull=False
-        ).first()
+        ).select_related('equipo').first()
 
         if pe_usuario and pe_usuario.codigo:
-            # Obtener al líder del grupo: cualquier PE del mismo código cuyo participante sea creador
-            # de algún proyecto en este evento.
-            lider_ids = Proyecto.objects.filter(
-                evento=evento
-            ).exclude(creador__isnull=True).values_list('creador_id', flat=True)
-
-            pe_lider = ParticipanteEvento.objects.filter(
-                evento=evento,
-                codigo=pe_usuario.codigo,
-                participante_id__in=lider_ids
-            ).first()
+            # Líder del grupo guardado en su equipo
+            lider_id = pe_usuario.equipo.lider_id if pe_usuario.equipo_id else None
 
-            if pe_lider:
+            if lider_id:
                 # Proyectos del líder en este evento = proyectos del grupo
                 proyectos = Proyecto.objects.filter(
                     evento=evento,
-                    creador_id=pe_lider.participante_id
+                    creador_id=lider_id
                 )
             else:
                 # Si no se encuentra líder (caso raro), el integrante solo verá proyectos donde tenga PE directo
@@ -1,6 +1,6 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
-from .models import Usuario, Rol, RolUsuario
+from .models import Usuario, Rol, RolUsuario, CorreoSaliente, MetricaCorreo
 
 class RolUsuarioInline(admin.TabularInline):
     model = RolUsuario
@@ -30,4 +30,20 @@ class UsuarioAdmin(UserAdmin):
     ordering = ('username',)
 
 admin.site.register(Usuario, UsuarioAdmin)
-admin.site.register(Rol)
\ No newline at end of file
+admin.site.register(Rol)
+
+
+@admin.register(CorreoSaliente)
+class CorreoSalienteAdmin(admin.ModelAdmin):
+    list_display = ('asunto', 'estado', 'intentos', 'fecha_creacion', 'fecha_envio')
+    list_filter = ('estado',)
+    search_fields = ('asunto', 'para')
+    exclude = ('alternativas',)
+
+
+@admin.register(MetricaCorreo)
+class MetricaCorreoAdmin(admin.ModelAdmin):
+    list_display = ('fecha', 'origen', 'resultado', 'destinatarios', 'ms_preparacion', 'ms_envio', 'clase_error')
+    list_filter = ('origen', 'resultado', 'clase_error')
+    date_hierarchy = 'fecha'
+    raw_id_fields = ('correo',)
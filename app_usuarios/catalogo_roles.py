@@ -0,0 +1,42 @@
+"""
+Catálogo en memoria de la tabla Rol.
+
+La tabla tiene unas pocas filas que casi nunca cambian; los registros y las
+limpiezas solo necesitan el id de un rol por su nombre para filtrar RolUsuario
+por rol_id sin unir con Rol. El catálogo se carga con la primera consulta del
+proceso y se descarta con las señales de Rol (ver signals.py). Un nombre que
+no está en el catálogo provoca una sola recarga, así que un rol creado desde
+otro proceso también se encuentra.
+"""
+from app_usuarios.models import Rol
+
+# {nombre en minúsculas: id}
+_catalogo = None
+
+
+def _cargar():
+    global _catalogo
+    _catalogo = {nombre.lower(): rol_id for rol_id, nombre in Rol.objects.values_list('id', 'nombre')}
+    return _catalogo
+
+
+def id_rol(nombre):
+    """Id del rol con ese nombre (sin distinguir mayúsculas) o None si no existe"""
+    clave = (nombre or '').lower()
+    catalogo = _catalogo if _catalogo is not None else _cargar()
+    if clave not in catalogo:
+        catalogo = _cargar()
+    return catalogo.get(clave)
+
+
+def id_rol_o_crear(nombre):
+    """Id del rol, creándolo si aún no existe"""
+    rol_id = id_rol(nombre)
+    if rol_id is None:
+        rol_id = Rol.objects.get_or_create(nombre=nombre)[0].pk
+    return rol_id
+
+
+def invalidar_catalogo():
+    global _catalogo
+    _catalogo = None
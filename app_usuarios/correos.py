@@ -0,0 +1,334 @@
+"""
+Bandeja de salida de correos.
+
+Las vistas guardan el mensaje con encolar_correo en lugar de enviarlo dentro
+de la petición, y el comando procesar_correos los envía en lotes por una sola
+conexión al servidor de correo, respetando el límite de envío del backend
+(limite_correos). Un envío fallido se reintenta con espera exponencial y, al
+agotar los intentos, queda en estado 'error' para revisión.
+
+Las notificaciones masivas se guardan en lotes de varios destinatarios con
+los datos de cada uno. Con un proveedor de Anymail que admite envío por lotes
+(Brevo) cada lote es una sola llamada a la API y el proveedor personaliza los
+**MARCADORES**; con cualquier otro backend el lote se expande en un mensaje
+por destinatario.
+
+Cada intento de envío deja su métrica (tiempos, resultado, clase de error)
+mediante app_usuarios.metricas_correo.
+"""
+import uuid
+from datetime import timedelta
+from email.mime.base import MIMEBase
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.utils import timezone
+from django.utils.html import escape
+
+from app_usuarios.limite_correos import reservar_envio
+from app_usuarios.metricas_correo import Cronometro, origen_correo, registrar_aplazados, registrar_envio
+from app_usuarios.models import CorreoSaliente, AdjuntoCorreo
+from app_usuarios.plantillas import PATRON_MARCADOR
+
+# Intentos de un correo antes de marcarlo como error definitivo
+MAX_INTENTOS = 5
+# Espera tras el primer fallo; se duplica en cada intento siguiente
+ESPERA_REINTENTO = timedelta(minutes=1)
+# Un correo 'procesando' más tiempo que esto se considera abandonado por un worker caído
+TIEMPO_MAXIMO_PROCESANDO = timedelta(minutes=15)
+# Cómo escribe cada proveedor de Anymail (esp_name) un dato del destinatario en el cuerpo
+SINTAXIS_ESP = {
+    'Brevo': '{{{{ params.{} }}}}',
+}
+
+
+def destinatarios_por_lote():
+    return getattr(settings, 'CORREOS_DESTINATARIOS_POR_LOTE', 100)
+
+
+def encolar_correo(mensaje, datos_destinatarios=None, grupo=None, creado_por=None):
+    """
+    Guarda un EmailMessage (o EmailMultiAlternatives) en la bandeja de salida.
+    Los adjuntos se copian en la base de datos, así que el archivo original
+    puede borrarse aunque el correo aún no haya salido. Con datos_destinatarios
+    ({email: {MARCADOR: valor}}) cada destinatario recibe su propia copia.
+    """
+    with transaction.atomic():
+        correo = CorreoSaliente.objects.create(
+            asunto=str(mensaje.subject),
+            cuerpo=mensaje.body or '',
+            tipo_contenido=mensaje.content_subtype,
+            remitente=mensaje.from_email or '',
+            para=list(mensaje.to),
+            cc=list(mensaje.cc),
+            cco=list(mensaje.bcc),
+            responder_a=list(mensaje.reply_to),
+            alternativas=[list(alternativa) for alternativa in getattr(mensaje, 'alternatives', [])],
+            datos_destinatarios=datos_destinatarios or {},
+            grupo=grupo,
+            creado_por=creado_por,
+        )
+        AdjuntoCorreo.objects.bulk_create([
+            AdjuntoCorreo(correo=correo, nombre=nombre or '', contenido=contenido, mimetype=mimetype or '')
+            for nombre, contenido, mimetype in map(_datos_adjunto, mensaje.attachments)
+        ])
+    return correo
+
+
+def encolar_notificacion(asunto, cuerpo, datos_destinatarios, html=True, creado_por=None):
+    """
+    Encola un mensaje personalizado para muchos destinatarios, partido en lotes
+    de CORREOS_DESTINATARIOS_POR_LOTE. El asunto y el cuerpo pueden usar
+    **MARCADORES** que se reemplazan con los datos de cada destinatario.
+    Devuelve el identificador de grupo con el que consultar resumen_notificacion.
+    """
+    correos = sorted(datos_destinatarios)
+    tamano = destinatarios_por_lote()
+    grupo = uuid.uuid4()
+    with transaction.atomic():
+        for inicio in range(0, len(correos), tamano):
+            lote = correos[inicio:inicio + tamano]
+            mensaje = EmailMultiAlternatives(subject=asunto, body=cuerpo, to=lote)
+            if html:
+                mensaje.content_subtype = 'html'
+            encolar_correo(
+                mensaje, {email: datos_destinatarios[email] for email in lote},
+                grupo=grupo, creado_por=creado_por,
+            )
+    return grupo
+
+
+def resumen_notificacion(grupo):
+    """
+    Destinatarios de una notificación masiva por situación: enviados, pendientes
+    de su turno, aplazados (por el límite de envío o esperando un reintento) y
+    fallidos definitivamente.
+    """
+    resumen = {'total': 0, 'enviados': 0, 'pendientes': 0, 'aplazados': 0, 'fallidos': 0}
+    ahora = timezone.now()
+    filas = CorreoSaliente.objects.filter(grupo=grupo).values_list(
+        'estado', 'para', 'entregados', 'proximo_intento'
+    )
+    for estado, para, entregados, proximo_intento in filas:
+        resumen['enviados'] += entregados
+        if estado == 'error':
+            resumen['fallidos'] += len(para)
+        elif estado == 'pendiente' and proximo_intento > ahora:
+            resumen['aplazados'] += len(para)
+        elif estado != 'enviado':
+            resumen['pendientes'] += len(para)
+    resumen['total'] = sum(resumen.values())
+    resumen['terminado'] = not (resumen['pendientes'] or resumen['aplazados'])
+    return resumen
+
+
+def _datos_adjunto(adjunto):
+    if isinstance(adjunto, MIMEBase):
+        return adjunto.get_filename(), adjunto.get_payload(decode=True) or b'', adjunto.get_content_type()
+    nombre, contenido, mimetype = adjunto
+    if isinstance(contenido, str):
+        contenido = contenido.encode('utf-8')
+    return nombre, contenido, mimetype
+
+
+def construir_mensaje(correo):
+    """EmailMultiAlternatives equivalente al mensaje que se encoló"""
+    mensaje = EmailMultiAlternatives(
+        subject=correo.asunto,
+        body=correo.cuerpo,
+        from_email=correo.remitente or None,
+        to=correo.para,
+        cc=correo.cc,
+        bcc=correo.cco,
+        reply_to=correo.responder_a,
+        alternatives=[tuple(alternativa) for alternativa in correo.alternativas],
+    )
+    mensaje.content_subtype = correo.tipo_contenido
+    for adjunto in correo.adjuntos.all():
+        mensaje.attach(adjunto.nombre or None, bytes(adjunto.contenido), adjunto.mimetype or None)
+    return mensaje
+
+
+def construir_mensajes(correo, conexion):
+    """
+    Mensajes que hay que entregar a la conexión para enviar el correo. Un envío
+    personalizado es un solo mensaje con merge_data si el proveedor lo admite,
+    o un mensaje por destinatario con los marcadores ya reemplazados.
+    """
+    if not correo.datos_destinatarios:
+        return [construir_mensaje(correo)]
+
+    sintaxis = SINTAXIS_ESP.get(getattr(conexion, 'esp_name', None))
+    if sintaxis:
+        claves = {clave for datos in correo.datos_destinatarios.values() for clave in datos}
+
+        def marcador_esp(coincidencia):
+            nombre = coincidencia.group(1)
+            return sintaxis.format(nombre) if nombre in claves else coincidencia.group(0)
+
+        mensaje = construir_mensaje(correo)
+        mensaje.subject = PATRON_MARCADOR.sub(marcador_esp, mensaje.subject)
+        mensaje.body = PATRON_MARCADOR.sub(marcador_esp, mensaje.body)
+        mensaje.merge_data = {email: correo.datos_destinatarios.get(email, {}) for email in correo.para}
+        return [mensaje]
+
+    mensajes = []
+    for email in correo.para:
+        datos = correo.datos_destinatarios.get(email, {})
+        mensaje = construir_mensaje(correo)
+        mensaje.to = [email]
+        mensaje.subject = _reemplazar_marcadores(mensaje.subject, datos)
+        mensaje.body = _reemplazar_marcadores(mensaje.body, datos, html=correo.tipo_contenido == 'html')
+        mensajes.append(mensaje)
+    return mensajes
+
+
+def _reemplazar_marcadores(texto, datos, html=False):
+    def valor(coincidencia):
+        nombre = coincidencia.group(1)
+        if nombre not in datos:
+            return coincidencia.group(0)
+        return escape(str(datos[nombre])) if html else str(datos[nombre])
+    return PATRON_MARCADOR.sub(valor, texto)
+
+
+def liberar_correos_abandonados():
+    """Devuelve a la cola los correos que un worker dejó a medias"""
+    limite = timezone.now() - TIEMPO_MAXIMO_PROCESANDO
+    return CorreoSaliente.objects.filter(
+        estado='procesando',
+        iniciado__lt=limite
+    ).update(estado='pendiente')
+
+
+def reclamar_correos(limite):
+    """
+    Marca como 'procesando' hasta `limite` correos listos para enviarse. SKIP
+    LOCKED permite que varios workers reclamen lotes sin tomar las mismas filas.
+    """
+    ahora = timezone.now()
+    with transaction.atomic():
+        ids = list(
+            CorreoSaliente.objects.select_for_update(skip_locked=True)
+            .filter(estado='pendiente', proximo_intento__lte=ahora)
+            .order_by('proximo_intento', 'id')
+            .values_list('id', flat=True)[:limite]
+        )
+        CorreoSaliente.objects.filter(id__in=ids).update(estado='procesando', iniciado=ahora)
+    return list(
+        CorreoSaliente.objects.filter(id__in=ids)
+        .prefetch_related('adjuntos')
+        .order_by('proximo_intento', 'id')
+    )
+
+
+def procesar_bandeja(limite=50):
+    """
+    Envía un lote de correos pendientes reutilizando una sola conexión.
+    Devuelve cuántos correos se procesaron (con éxito o no); 0 indica que no
+    hay correos listos para enviarse.
+    """
+    correos = reclamar_correos(limite)
+    if not correos:
+        return 0
+
+    conexion = get_connection()
+    cronometro = Cronometro('envio')
+    try:
+        conexion.open()
+    except Exception as e:
+        for correo in correos:
+            registrar_fallo(correo, e)
+            registrar_envio(origen_correo(correo), 'error', _destinatarios(correo), cronometro, e, correo)
+        return len(correos)
+
+    try:
+        for i, correo in enumerate(correos):
+            _, espera = reservar_envio(_destinatarios(correo))
+            if espera:
+                # Límite de envío alcanzado: el resto del lote sale más tarde
+                aplazar_correos(correos[i:], espera)
+                registrar_aplazados(correos[i:])
+                break
+            cronometro = Cronometro()
+            entregados = correo.entregados
+            try:
+                _enviar(conexion, correo, cronometro)
+            except Exception as e:
+                registrar_fallo(correo, e)
+                registrar_envio(origen_correo(correo), 'error', correo.entregados - entregados, cronometro, e, correo)
+                # Tras un error la sesión SMTP puede quedar inutilizable
+                reabrir_conexion(conexion)
+                continue
+            correo.estado = 'enviado'
+            correo.fecha_envio = timezone.now()
+            correo.error = ''
+            correo.save(update_fields=['estado', 'error', 'fecha_envio', 'entregados'])
+            registrar_envio(origen_correo(correo), 'enviado', correo.entregados - entregados, cronometro, correo=correo)
+    finally:
+        conexion.close()
+    return len(correos)
+
+
+def _destinatarios(correo):
+    return len(correo.para) + len(correo.cc) + len(correo.cco)
+
+
+def _enviar(conexion, correo, cronometro):
+    mensajes = construir_mensajes(correo, conexion)
+    cronometro.cambiar('envio')
+    for i, mensaje in enumerate(mensajes):
+        try:
+            conexion.send_messages([mensaje])
+        except Exception:
+            if i:
+                # Los destinatarios ya atendidos no se repiten en el reintento
+                correo.para = [email for pendiente in mensajes[i:] for email in pendiente.to]
+                correo.save(update_fields=['para', 'entregados'])
+            raise
+        correo.entregados += len(mensaje.to) + len(mensaje.cc) + len(mensaje.bcc)
+
+
+def aplazar_correos(correos, segundos):
+    """Devuelve correos reclamados a la cola sin gastar intentos"""
+    CorreoSaliente.objects.filter(id__in=[correo.id for correo in correos]).update(
+        estado='pendiente',
+        proximo_intento=timezone.now() + timedelta(seconds=segundos),
+    )
+
+
+def reabrir_conexion(conexion):
+    conexion.close()
+    try:
+        conexion.open()
+    except Exception:
+        # El siguiente send_messages intentará abrirla de nuevo
+        pass
+
+
+def registrar_fallo(correo, error):
+    """Programa un reintento con espera exponencial o marca el correo como error"""
+    correo.intentos += 1
+    correo.error = str(error)
+    if correo.intentos >= MAX_INTENTOS:
+        correo.estado = 'error'
+    else:
+        correo.estado = 'pendiente'
+        correo.proximo_intento = timezone.now() + ESPERA_REINTENTO * 2 ** (correo.intentos - 1)
+    correo.save(update_fields=['estado', 'intentos', 'error', 'proximo_intento'])
+
+
+def reintentar_correos(ids=None):
+    """Devuelve a la cola correos en estado 'error' para un nuevo ciclo de intentos"""
+    correos = CorreoSaliente.objects.filter(estado='error')
+    if ids is not None:
+        correos = correos.filter(id__in=ids)
+    return correos.update(estado='pendiente', intentos=0, proximo_intento=timezone.now())
+
+
+def purgar_enviados(dias):
+    """Elimina los correos enviados hace más de `dias` días junto con sus adjuntos"""
+    limite = timezone.now() - timedelta(days=dias)
+    _, por_modelo = CorreoSaliente.objects.filter(estado='enviado', fecha_envio__lt=limite).delete()
+    return por_modelo.get(CorreoSaliente._meta.label, 0)
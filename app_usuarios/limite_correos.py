@@ -0,0 +1,120 @@
+"""
+Límite de envío de correos por backend.
+
+Un cubo de tokens reparte los envíos en el tiempo (CORREOS_POR_MINUTO, con
+ráfagas de hasta un minuto de envíos) y una cuota diaria (CORREOS_CUOTA_DIARIA)
+evita superar el tope del proveedor. Cada destinatario consume un token. El
+estado vive en la tabla CuotaCorreo para que todos los workers lo compartan.
+Un límite en 0 lo desactiva.
+"""
+import math
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from app_usuarios.models import CuotaCorreo
+
+
+def limites():
+    """(envíos por minuto, cuota diaria) del backend configurado"""
+    return (
+        getattr(settings, 'CORREOS_POR_MINUTO', 0),
+        getattr(settings, 'CORREOS_CUOTA_DIARIA', 0),
+    )
+
+
+def backend_actual():
+    return settings.EMAIL_BACKEND
+
+
+def _segundos_hasta_manana(ahora):
+    manana = timezone.localdate(ahora) + timedelta(days=1)
+    inicio = timezone.make_aware(datetime.combine(manana, time.min))
+    return (inicio - ahora).total_seconds()
+
+
+def reservar_envio(cantidad, parcial=False):
+    """
+    Reserva `cantidad` envíos. Devuelve (concedidos, espera): los envíos que
+    pueden salir ya y, si no se concedió nada, los segundos que conviene esperar.
+
+    Con parcial=True se concede lo que haya disponible (hasta `cantidad`). Sin
+    él se concede todo o nada; una cantidad mayor que la ráfaga se admite con
+    el cubo lleno y deja el saldo en negativo para frenar los envíos siguientes.
+    """
+    por_minuto, cuota = limites()
+    if cantidad <= 0 or (not por_minuto and not cuota):
+        return max(cantidad, 0), 0
+
+    ahora = timezone.now()
+    with transaction.atomic():
+        registro, _ = CuotaCorreo.objects.select_for_update().get_or_create(
+            backend=backend_actual(),
+            fecha=timezone.localdate(ahora),
+            defaults={'tokens': por_minuto, 'actualizado': ahora},
+        )
+        if por_minuto:
+            transcurrido = (ahora - registro.actualizado).total_seconds()
+            registro.tokens = min(por_minuto, registro.tokens + transcurrido * por_minuto / 60)
+            disponibles = math.floor(registro.tokens)
+        else:
+            disponibles = cantidad
+        restante = cuota - registro.enviados if cuota else cantidad
+
+        # Lo mínimo que debe haber disponible para conceder algo
+        necesarios = 1 if parcial else cantidad
+        if parcial:
+            concedidos = max(0, min(cantidad, disponibles, restante))
+        elif disponibles >= min(cantidad, por_minuto or cantidad) and restante >= min(cantidad, cuota or cantidad):
+            concedidos = cantidad
+        else:
+            concedidos = 0
+
+        if concedidos:
+            espera = 0
+        elif cuota and restante < min(necesarios, cuota):
+            espera = _segundos_hasta_manana(ahora)
+        else:
+            faltan = min(necesarios, por_minuto) - registro.tokens
+            espera = max(1, math.ceil(faltan * 60 / por_minuto))
+
+        if por_minuto:
+            registro.tokens -= concedidos
+        registro.enviados += concedidos
+        registro.actualizado = ahora
+        registro.save(update_fields=['tokens', 'enviados', 'actualizado'])
+    return concedidos, espera
+
+
+def devolver_envio(cantidad):
+    """Devuelve envíos reservados que finalmente no salieron"""
+    por_minuto, cuota = limites()
+    if cantidad <= 0 or (not por_minuto and not cuota):
+        return
+    with transaction.atomic():
+        registro = (
+            CuotaCorreo.objects.select_for_update()
+            .filter(backend=backend_actual(), fecha=timezone.localdate())
+            .first()
+        )
+        if registro is None:
+            return
+        if por_minuto:
+            registro.tokens = min(por_minuto, registro.tokens + cantidad)
+        registro.enviados = max(0, registro.enviados - cantidad)
+        registro.save(update_fields=['tokens', 'enviados'])
+
+
+def uso_del_dia(backend=None):
+    """Envíos del día y cuota del backend (None si no hay cuota)"""
+    _, cuota = limites()
+    registro = CuotaCorreo.objects.filter(
+        backend=backend or backend_actual(),
+        fecha=timezone.localdate(),
+    ).first()
+    return {
+        'enviados': registro.enviados if registro else 0,
+        'cuota': cuota or None,
+    }
@@ -2,6 +2,7 @@ from django.core.management.base import BaseCommand
 from django.utils import timezone
 from datetime import timedelta
 from app_usuarios.models import Usuario, RolUsuario
+from app_usuarios.catalogo_roles import id_rol
 from app_asistentes.models import Asistente, AsistenteEvento
 from app_participantes.models import Participante, ParticipanteEvento
 from app_evaluadores.models import Evaluador, EvaluadorEvento
@@ -20,7 +21,7 @@ class Command(BaseCommand):
             # Si el asistente no tiene más eventos, borrar el objeto y su RolUsuario
             if not AsistenteEvento.objects.filter(asistente=asistente).exists():
                 asistente.delete()
-                RolUsuario.objects.filter(usuario=usuario, rol__nombre__iexact='asistente').delete()
+                RolUsuario.objects.filter(usuario=usuario, rol_id=id_rol('asistente')).delete()
                 # Si el usuario no tiene más roles y está inactivo, eliminar usuario
                 tiene_participante = hasattr(usuario, 'participante') and ParticipanteEvento.objects.filter(participante=usuario.participante).exists()
                 tiene_evaluador = hasattr(usuario, 'evaluador') and EvaluadorEvento.objects.filter(evaluador=usuario.evaluador).exists()
@@ -35,7 +36,7 @@ class Command(BaseCommand):
             insc.delete()
             if not ParticipanteEvento.objects.filter(participante=participante).exists():
                 participante.delete()
-                RolUsuario.objects.filter(usuario=usuario, rol__nombre__iexact='participante').delete()
+                RolUsuario.objects.filter(usuario=usuario, rol_id=id_rol('participante')).delete()
                 tiene_asistente = hasattr(usuario, 'asistente') and AsistenteEvento.objects.filter(asistente=usuario.asistente).exists()
                 tiene_evaluador = hasattr(usuario, 'evaluador') and EvaluadorEvento.objects.filter(evaluador=usuario.evaluador).exists()
                 if not (tiene_asistente or tiene_evaluador) and not usuario.is_active:
@@ -49,7 +50,7 @@ class Command(BaseCommand):
             insc.delete()
             if not EvaluadorEvento.objects.filter(evaluador=evaluador).exists():
                 evaluador.delete()
-                RolUsuario.objects.filter(usuario=usuario, rol__nombre__iexact='evaluador').delete()
+                RolUsuario.objects.filter(usuario=usuario, rol_id=id_rol('evaluador')).delete()
                 tiene_asistente = hasattr(usuario, 'asistente') and AsistenteEvento.objects.filter(asistente=usuario.asistente).exists()
                 tiene_participante = hasattr(usuario, 'participante') and ParticipanteEvento.objects.filter(participante=usuario.participante).exists()
                 if not (tiene_asistente or tiene_participante) and not usuario.is_active:
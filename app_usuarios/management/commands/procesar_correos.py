@@ -0,0 +1,38 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from app_usuarios.correos import liberar_correos_abandonados, procesar_bandeja, purgar_enviados
+from app_usuarios.metricas_correo import purgar_metricas
+
+
+class Command(BaseCommand):
+    help = 'Envía los correos de la bandeja de salida reutilizando una sola conexión por lote'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--una-vez', action='store_true', help='Vacía la bandeja actual y termina')
+        parser.add_argument('--lote', type=int, default=50, help='Correos reclamados por iteración')
+        parser.add_argument('--espera', type=float, default=5, help='Segundos de espera con la bandeja vacía')
+        parser.add_argument('--conservar-dias', type=int, default=30, help='Días que se conservan los correos enviados')
+        parser.add_argument('--conservar-metricas-dias', type=int, default=90, help='Días que se conservan las métricas de envío')
+
+    def handle(self, *args, **options):
+        liberados = liberar_correos_abandonados()
+        if liberados:
+            self.stdout.write(self.style.WARNING(f'Correos abandonados devueltos a la cola: {liberados}'))
+
+        procesados = 0
+        while True:
+            cantidad = procesar_bandeja(options['lote'])
+            procesados += cantidad
+            if cantidad:
+                continue
+            # Con la bandeja vacía se eliminan los correos ya enviados más antiguos
+            purgar_enviados(options['conservar_dias'])
+            purgar_metricas(options['conservar_metricas_dias'])
+            if options['una_vez']:
+                break
+            time.sleep(options['espera'])
+            liberar_correos_abandonados()
+
+        self.stdout.write(self.style.SUCCESS(f'Correos procesados: {procesados}'))
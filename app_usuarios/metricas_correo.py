@@ -0,0 +1,149 @@
+"""
+Métricas del envío de correos.
+
+Cada intento de envío de la bandeja (transaccionales y notificaciones masivas)
+y de los certificados deja una fila MetricaCorreo con el tiempo de armado del
+mensaje, la latencia del servidor SMTP o de la API, el resultado y la clase
+del error. resumen_metricas las agrega junto con el estado de la bandeja para
+el panel del superadmin; la cola de certificados la informa quien la consulta
+(app_administradores), para que esta app no dependa de ella.
+"""
+import time
+from datetime import timedelta
+
+from django.db.models import Avg, Count, Max, Min, Q, Sum
+from django.utils import timezone
+
+from app_usuarios.limite_correos import backend_actual, uso_del_dia
+from app_usuarios.models import CorreoSaliente, MetricaCorreo
+
+
+class Cronometro:
+    """Acumula en milisegundos el tiempo de las fases de un envío ('preparacion', 'envio')"""
+
+    def __init__(self, fase='preparacion'):
+        self.ms = {'preparacion': 0, 'envio': 0}
+        self._fase = fase
+        self._inicio = time.perf_counter()
+
+    def cambiar(self, fase):
+        """Cierra la fase en curso y empieza `fase` (None para detener el cronómetro)"""
+        ahora = time.perf_counter()
+        if self._fase:
+            self.ms[self._fase] += (ahora - self._inicio) * 1000
+        self._fase, self._inicio = fase, ahora
+
+
+def registrar_envio(origen, resultado, destinatarios, cronometro=None, error=None, correo=None):
+    """Guarda la métrica de un intento de envío"""
+    if cronometro:
+        cronometro.cambiar(None)
+    ms = cronometro.ms if cronometro else {}
+    return MetricaCorreo.objects.create(
+        origen=origen,
+        resultado=resultado,
+        backend=backend_actual(),
+        destinatarios=destinatarios,
+        ms_preparacion=ms.get('preparacion', 0),
+        ms_envio=ms.get('envio', 0),
+        clase_error=type(error).__name__ if error else '',
+        error=str(error) if error else '',
+        correo=correo,
+    )
+
+
+def registrar_aplazados(correos):
+    """Métricas de correos devueltos a la cola por el límite de envío"""
+    backend = backend_actual()
+    MetricaCorreo.objects.bulk_create([
+        MetricaCorreo(
+            origen=origen_correo(correo),
+            resultado='aplazado',
+            backend=backend,
+            destinatarios=len(correo.para) + len(correo.cc) + len(correo.cco),
+            correo=correo,
+        )
+        for correo in correos
+    ])
+
+
+def origen_correo(correo):
+    return 'notificacion' if correo.datos_destinatarios else 'transaccional'
+
+
+def profundidad_colas(certificados_pendientes=None):
+    """
+    Correos esperando turno y la fecha del más viejo listo para salir, más los
+    certificados pendientes que informe el llamador (None si no se conocen).
+    """
+    ahora = timezone.now()
+    bandeja = CorreoSaliente.objects.aggregate(
+        listos=Count('id', filter=Q(estado='pendiente', proximo_intento__lte=ahora)),
+        aplazados=Count('id', filter=Q(estado='pendiente', proximo_intento__gt=ahora)),
+        procesando=Count('id', filter=Q(estado='procesando')),
+        errores=Count('id', filter=Q(estado='error')),
+        mas_antiguo=Min('fecha_creacion', filter=Q(estado='pendiente', proximo_intento__lte=ahora)),
+    )
+    bandeja['certificados_pendientes'] = certificados_pendientes
+    return bandeja
+
+
+def _percentil(metricas, campo, fraccion):
+    """Valor de `campo` por debajo del cual queda la `fraccion` de las métricas"""
+    total = metricas.count()
+    if not total:
+        return None
+    posicion = min(total - 1, int(total * fraccion))
+    return metricas.order_by(campo).values_list(campo, flat=True)[posicion]
+
+
+def resumen_metricas(dias=7, certificados_pendientes=None):
+    """Agregados de los últimos `dias` días por origen y por clase de error, más el estado de las colas"""
+    desde = timezone.now() - timedelta(days=dias)
+    metricas = MetricaCorreo.objects.filter(fecha__gte=desde)
+    intentos = metricas.exclude(resultado='aplazado')
+
+    por_origen = list(
+        metricas.values('origen').annotate(
+            intentos=Count('id', filter=~Q(resultado='aplazado')),
+            enviados=Count('id', filter=Q(resultado='enviado')),
+            errores=Count('id', filter=Q(resultado='error')),
+            aplazados=Count('id', filter=Q(resultado='aplazado')),
+            destinatarios=Sum('destinatarios', filter=Q(resultado='enviado')),
+            ms_preparacion_media=Avg('ms_preparacion', filter=~Q(resultado='aplazado')),
+            ms_envio_medio=Avg('ms_envio', filter=~Q(resultado='aplazado')),
+            ms_envio_max=Max('ms_envio'),
+        ).order_by('origen')
+    )
+    etiquetas = dict(MetricaCorreo.ORIGENES)
+    for fila in por_origen:
+        fila['etiqueta'] = etiquetas.get(fila['origen'], fila['origen'])
+        fila['tasa_error'] = 100 * fila['errores'] / fila['intentos'] if fila['intentos'] else 0
+
+    errores = list(
+        metricas.filter(resultado='error')
+        .values('origen', 'clase_error')
+        .annotate(cantidad=Count('id'), ultimo=Max('fecha'))
+        .order_by('-cantidad', 'clase_error')
+    )
+    for fila in errores:
+        fila['ejemplo'] = (
+            metricas.filter(resultado='error', origen=fila['origen'], clase_error=fila['clase_error'])
+            .order_by('-fecha').values_list('error', flat=True).first()
+        )
+
+    return {
+        'dias': dias,
+        'por_origen': por_origen,
+        'errores': errores,
+        'ms_envio_p95': _percentil(intentos, 'ms_envio', 0.95),
+        'colas': profundidad_colas(certificados_pendientes),
+        'uso_del_dia': uso_del_dia(),
+    }
+
+
+def purgar_metricas(dias):
+    """Elimina las métricas de hace más de `dias` días"""
+    limite = timezone.now() - timedelta(days=dias)
+    borradas, _ = MetricaCorreo.objects.filter(fecha__lt=limite).delete()
+    return borradas
@@ -0,0 +1,52 @@
+# Generated by Django 5.2.4 on 2026-10-18 01:32
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_usuarios', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CorreoSaliente',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('asunto', models.TextField()),
+                ('cuerpo', models.TextField(blank=True)),
+                ('tipo_contenido', models.CharField(default='plain', max_length=10)),
+                ('remitente', models.CharField(blank=True, max_length=255)),
+                ('para', models.JSONField(default=list)),
+                ('cc', models.JSONField(blank=True, default=list)),
+                ('cco', models.JSONField(blank=True, default=list)),
+                ('responder_a', models.JSONField(blank=True, default=list)),
+                ('alternativas', models.JSONField(blank=True, default=list)),
+                ('estado', models.CharField(choices=[('pendiente', 'Pendiente'), ('procesando', 'Procesando'), ('enviado', 'Enviado'), ('error', 'Error')], default='pendiente', max_length=12)),
+                ('intentos', models.PositiveSmallIntegerField(default=0)),
+                ('error', models.TextField(blank=True)),
+                ('proximo_intento', models.DateTimeField(default=django.utils.timezone.now)),
+                ('iniciado', models.DateTimeField(blank=True, null=True)),
+                ('fecha_creacion', models.DateTimeField(default=django.utils.timezone.now)),
+                ('fecha_envio', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Correo Saliente',
+                'verbose_name_plural': 'Correos Salientes',
+                'indexes': [models.Index(fields=['estado', 'proximo_intento'], name='correo_cola_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='AdjuntoCorreo',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nombre', models.CharField(blank=True, max_length=255)),
+                ('contenido', models.BinaryField()),
+                ('mimetype', models.CharField(blank=True, max_length=100)),
+                ('correo', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='adjuntos', to='app_usuarios.correosaliente')),
+            ],
+        ),
+    ]
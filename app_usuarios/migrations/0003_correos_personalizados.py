@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-18 01:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_usuarios', '0002_bandeja_correos'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='correosaliente',
+            name='datos_destinatarios',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.4 on 2026-10-18 01:37
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_usuarios', '0003_correos_personalizados'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='correosaliente',
+            name='creado_por',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='correos_encolados', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='correosaliente',
+            name='entregados',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='correosaliente',
+            name='grupo',
+            field=models.UUIDField(blank=True, db_index=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='CuotaCorreo',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('backend', models.CharField(max_length=255)),
+                ('fecha', models.DateField()),
+                ('enviados', models.PositiveIntegerField(default=0)),
+                ('tokens', models.FloatField(default=0)),
+                ('actualizado', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name': 'Cuota de Correo',
+                'verbose_name_plural': 'Cuotas de Correo',
+                'unique_together': {('backend', 'fecha')},
+            },
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.4 on 2026-10-18 01:45
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_usuarios', '0004_limite_envio_correos'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MetricaCorreo',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('origen', models.CharField(choices=[('transaccional', 'Transaccional'), ('notificacion', 'Notificación masiva'), ('certificado', 'Certificado')], max_length=15)),
+                ('resultado', models.CharField(choices=[('enviado', 'Enviado'), ('error', 'Error'), ('aplazado', 'Aplazado por límite de envío')], max_length=10)),
+                ('backend', models.CharField(max_length=255)),
+                ('destinatarios', models.PositiveIntegerField(default=0)),
+                ('ms_preparacion', models.FloatField(default=0)),
+                ('ms_envio', models.FloatField(default=0)),
+                ('clase_error', models.CharField(blank=True, max_length=100)),
+                ('error', models.TextField(blank=True)),
+                ('fecha', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+                ('correo', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='metricas', to='app_usuarios.correosaliente')),
+            ],
+            options={
+                'verbose_name': 'Métrica de Correo',
+                'verbose_name_plural': 'Métricas de Correo',
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-18 01:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_usuarios', '0005_metricas_correo'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='usuario',
+            name='version_roles',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
@@ -1,29 +1,62 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.utils import timezone
 
 class Usuario(AbstractUser):
     email = models.EmailField(unique=True)
     telefono = models.CharField(max_length=20, null=True, blank=True)
     documento = models.CharField(max_length=20)
 
+    # Aumenta con cada cambio en los RolUsuario del usuario; invalida los roles guardados en la sesión
+    version_roles = models.PositiveIntegerField(default=0, editable=False)
+
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = ['username']
 
+    # [(nombre, descripcion), ...] ya cargados; ver roles_cargados
+    _roles_cargados = None
+
     def __str__(self):
         return f"{self.username}"
 
+    def save(self, *args, **kwargs):
+        # version_roles solo se incrementa con UPDATE (app_usuarios.roles); un objeto
+        # cargado antes de un cambio de roles no debe devolverla a un valor anterior
+        if not self._state.adding and kwargs.get('update_fields') is None and not kwargs.get('force_insert'):
+            kwargs['update_fields'] = [
+                campo.name for campo in self._meta.concrete_fields
+                if not campo.primary_key and campo.name != 'version_roles'
+            ]
+        super().save(*args, **kwargs)
+
+    def roles_cargados(self):
+        """Roles del usuario en orden de asignación; se consultan (con un solo JOIN) una vez por instancia"""
+        if self._roles_cargados is None:
+            self._roles_cargados = [
+                tuple(rol) for rol in
+                self.roles.order_by('id').values_list('rol__nombre', 'rol__descripcion')
+            ]
+        return self._roles_cargados
+
+    @property
+    def nombres_roles(self):
+        return frozenset(nombre for nombre, _ in self.roles_cargados())
+
+    def tiene_rol(self, nombre):
+        return nombre in self.nombres_roles
+
     @property
     def rol_principal(self):
-        rol_usuario = self.roles.first()
-        if rol_usuario:
-            return rol_usuario.rol.nombre
+        roles = self.roles_cargados()
+        if roles:
+            return roles[0][0]
         return "Sin rol"
 
     @property
     def rol_descripcion(self):
-        rol_usuario = self.roles.first()
-        if rol_usuario:
-            return rol_usuario.rol.descripcion
+        roles = self.roles_cargados()
+        if roles:
+            return roles[0][1]
         return "Sin descripción"
     
 class Rol(models.Model):
@@ -41,4 +74,118 @@ class RolUsuario(models.Model):
         unique_together = (('usuario', 'rol'),)
 
     def __str__(self):
-        return f"{self.usuario.username} - {self.rol.nombre}"
\ No newline at end of file
+        return f"{self.usuario.username} - {self.rol.nombre}"
+
+
+class CorreoSaliente(models.Model):
+    """Correo en la bandeja de salida; lo envía el comando procesar_correos"""
+    ESTADOS = [
+        ('pendiente', 'Pendiente'),
+        ('procesando', 'Procesando'),
+        ('enviado', 'Enviado'),
+        ('error', 'Error'),
+    ]
+
+    asunto = models.TextField()
+    cuerpo = models.TextField(blank=True)
+    # 'plain' o 'html', como EmailMessage.content_subtype
+    tipo_contenido = models.CharField(max_length=10, default='plain')
+    remitente = models.CharField(max_length=255, blank=True)
+    para = models.JSONField(default=list)
+    cc = models.JSONField(default=list, blank=True)
+    cco = models.JSONField(default=list, blank=True)
+    responder_a = models.JSONField(default=list, blank=True)
+    # Versiones alternativas del cuerpo: [[contenido, mimetype], ...]
+    alternativas = models.JSONField(default=list, blank=True)
+    # Envío masivo personalizado: {email: {MARCADOR: valor}}; cada destinatario
+    # de `para` recibe su propia copia con los **MARCADORES** reemplazados
+    datos_destinatarios = models.JSONField(default=dict, blank=True)
+    # Notificación masiva a la que pertenece el lote y quién la envió
+    grupo = models.UUIDField(null=True, blank=True, db_index=True)
+    creado_por = models.ForeignKey(Usuario, on_delete=models.SET_NULL, null=True, blank=True, related_name='correos_encolados')
+    # Destinatarios ya atendidos; en un envío personalizado puede avanzar por partes
+    entregados = models.PositiveIntegerField(default=0)
+    estado = models.CharField(max_length=12, choices=ESTADOS, default='pendiente')
+    intentos = models.PositiveSmallIntegerField(default=0)
+    error = models.TextField(blank=True)
+    # Tras un fallo el correo no se reintenta antes de esta fecha
+    proximo_intento = models.DateTimeField(default=timezone.now)
+    iniciado = models.DateTimeField(null=True, blank=True)
+    fecha_creacion = models.DateTimeField(default=timezone.now)
+    fecha_envio = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.asunto} -> {', '.join(self.para)} ({self.estado})"
+
+    class Meta:
+        verbose_name = "Correo Saliente"
+        verbose_name_plural = "Correos Salientes"
+        indexes = [
+            models.Index(fields=['estado', 'proximo_intento'], name='correo_cola_idx'),
+        ]
+
+
+class AdjuntoCorreo(models.Model):
+    correo = models.ForeignKey(CorreoSaliente, on_delete=models.CASCADE, related_name='adjuntos')
+    nombre = models.CharField(max_length=255, blank=True)
+    contenido = models.BinaryField()
+    mimetype = models.CharField(max_length=100, blank=True)
+
+    def __str__(self):
+        return self.nombre
+
+
+class CuotaCorreo(models.Model):
+    """
+    Envíos del día por backend de correo y estado del cubo de tokens que los
+    reparte en el tiempo; lo actualiza app_usuarios.limite_correos.
+    """
+    backend = models.CharField(max_length=255)
+    fecha = models.DateField()
+    enviados = models.PositiveIntegerField(default=0)
+    tokens = models.FloatField(default=0)
+    actualizado = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"{self.backend} {self.fecha}: {self.enviados}"
+
+    class Meta:
+        verbose_name = "Cuota de Correo"
+        verbose_name_plural = "Cuotas de Correo"
+        unique_together = (('backend', 'fecha'),)
+
+
+class MetricaCorreo(models.Model):
+    """
+    Resultado y tiempos de un intento de envío; lo registra
+    app_usuarios.metricas_correo desde la bandeja y el envío de certificados.
+    """
+    ORIGENES = [
+        ('transaccional', 'Transaccional'),
+        ('notificacion', 'Notificación masiva'),
+        ('certificado', 'Certificado'),
+    ]
+    RESULTADOS = [
+        ('enviado', 'Enviado'),
+        ('error', 'Error'),
+        ('aplazado', 'Aplazado por límite de envío'),
+    ]
+
+    origen = models.CharField(max_length=15, choices=ORIGENES)
+    resultado = models.CharField(max_length=10, choices=RESULTADOS)
+    backend = models.CharField(max_length=255)
+    destinatarios = models.PositiveIntegerField(default=0)
+    # Armado del mensaje (personalización, adjuntos, PDF) y entrega al servidor o API
+    ms_preparacion = models.FloatField(default=0)
+    ms_envio = models.FloatField(default=0)
+    clase_error = models.CharField(max_length=100, blank=True)
+    error = models.TextField(blank=True)
+    correo = models.ForeignKey(CorreoSaliente, on_delete=models.SET_NULL, null=True, blank=True, related_name='metricas')
+    fecha = models.DateTimeField(default=timezone.now, db_index=True)
+
+    def __str__(self):
+        return f"{self.origen} {self.resultado} ({self.fecha:%Y-%m-%d %H:%M})"
+
+    class Meta:
+        verbose_name = "Métrica de Correo"
+        verbose_name_plural = "Métricas de Correo"
@@ -5,8 +5,8 @@ def get_rol_usuario(user):
     rol_actual = getattr(user, 'rol_actual', None)
     if rol_actual:
         return rol_actual
-    rol_usuario = user.roles.first()
-    return rol_usuario.rol.nombre if rol_usuario else None
+    roles = user.roles_cargados()
+    return roles[0][0] if roles else None
 
 def es_superadmin(user):
     return get_rol_usuario(user) == 'superadmin'
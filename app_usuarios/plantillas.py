@@ -0,0 +1,43 @@
+"""
+Utilidades de plantillas compartidas por los correos y los certificados.
+
+PATRON_MARCADOR reconoce los marcadores **CLAVE** de los textos que redacta
+el usuario (cuerpo de los certificados, notificaciones masivas).
+
+renderizar_en_segmentos renderiza una plantilla una sola vez dejando huecos
+donde van los datos de cada destinatario; unir_segmentos completa esos huecos,
+así que un envío masivo no vuelve a pasar por el motor de plantillas.
+"""
+import re
+import secrets
+
+PATRON_MARCADOR = re.compile(r'\*\*([A-Z_]+)\*\*')
+
+
+def renderizar_en_segmentos(renderizar):
+    """
+    Llama a renderizar(hueco), donde hueco(nombre) devuelve la marca que se
+    pone en el contexto en lugar del valor. Devuelve la lista de segmentos:
+    en las posiciones pares el HTML fijo y en las impares el nombre del hueco.
+    """
+    # Separador aleatorio: solo caracteres hexadecimales, que el escape HTML
+    # y el filtro linebreaks dejan intactos, así que sobrevive al renderizado
+    separador = secrets.token_hex(8)
+    nombres = []
+
+    def hueco(nombre):
+        nombres.append(nombre)
+        return f'{separador}{len(nombres) - 1}{separador}'
+
+    segmentos = re.split(f'{separador}(\\d+){separador}', renderizar(hueco))
+    for i in range(1, len(segmentos), 2):
+        segmentos[i] = nombres[int(segmentos[i])]
+    return segmentos
+
+
+def unir_segmentos(segmentos, valor):
+    """Une los segmentos reemplazando cada hueco por valor(nombre), que debe venir ya escapado"""
+    piezas = list(segmentos)
+    for i in range(1, len(piezas), 2):
+        piezas[i] = valor(piezas[i])
+    return ''.join(piezas)
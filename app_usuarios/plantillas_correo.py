@@ -0,0 +1,84 @@
+"""
+Renderizado de los correos transaccionales (cambios de estado, confirmaciones,
+claves de acceso, invitaciones).
+
+Las plantillas compiladas las guarda el cargador con caché de Django, que
+se vacía al editarlas con el autoreload. Además, la parte fija de un correo
+(datos del evento, estado, tipo de inscripción) se renderiza una vez y se
+guarda como segmentos; para cada destinatario solo se intercalan sus
+valores (nombre, clave, enlaces). Un cambio de estado masivo renderiza así la
+plantilla una vez en lugar de una por destinatario.
+
+Las variables por destinatario deben imprimirse en la plantilla sin filtros
+({{ nombre }}), porque su valor se escapa y se intercala después del render.
+"""
+from django.template.loader import get_template
+from django.utils.html import conditional_escape
+
+from app_usuarios.plantillas import renderizar_en_segmentos, unir_segmentos
+
+# Segmentos renderizados por (plantilla compilada, contexto fijo, variables); se vacía al llenarse
+MAX_SEGMENTOS_EN_CACHE = 512
+_segmentos_en_cache = {}
+
+
+def contexto_evento(evento):
+    """Datos del evento que usan los correos; forman parte de la clave de la caché"""
+    return {
+        'eve_id': evento.pk,
+        'eve_nombre': evento.eve_nombre,
+        'eve_descripcion': evento.eve_descripcion,
+        'eve_ciudad': evento.eve_ciudad,
+        'eve_lugar': evento.eve_lugar,
+        'eve_fecha_inicio': evento.eve_fecha_inicio,
+        'eve_fecha_fin': evento.eve_fecha_fin,
+        'eve_capacidad': evento.eve_capacidad,
+    }
+
+
+def _huella(valor):
+    """Representación estable de un contexto fijo (diccionarios y valores simples)"""
+    if isinstance(valor, dict):
+        return tuple(sorted((clave, _huella(v)) for clave, v in valor.items()))
+    return repr(valor)
+
+
+def _segmentos(plantilla, contexto_fijo, variables):
+    compilada = get_template(plantilla)
+    # La plantilla del motor es la misma mientras el cargador con caché no la
+    # descarte; si se edita (autoreload) cambia y los segmentos se regeneran
+    clave = (getattr(compilada, 'template', compilada), _huella(contexto_fijo), variables)
+    segmentos = _segmentos_en_cache.get(clave)
+    if segmentos is not None:
+        return segmentos
+
+    segmentos = tuple(renderizar_en_segmentos(
+        lambda hueco: compilada.render({**contexto_fijo, **{variable: hueco(variable) for variable in variables}})
+    ))
+    if len(_segmentos_en_cache) >= MAX_SEGMENTOS_EN_CACHE:
+        _segmentos_en_cache.clear()
+    _segmentos_en_cache[clave] = segmentos
+    return segmentos
+
+
+def renderizar_correo(plantilla, contexto_fijo, /, **por_destinatario):
+    """
+    HTML de la plantilla con el contexto fijo (compartido por muchos
+    correos) y las variables de un destinatario.
+    """
+    fijo = dict(contexto_fijo)
+    variables = []
+    for variable, valor in por_destinatario.items():
+        if valor in (None, ''):
+            # Un valor vacío va en el contexto fijo para que los {% if %} lo vean como falso
+            fijo[variable] = valor
+        else:
+            variables.append(variable)
+    return unir_segmentos(
+        _segmentos(plantilla, fijo, tuple(sorted(variables))),
+        lambda variable: conditional_escape(por_destinatario[variable])
+    )
+
+
+def limpiar_cache():
+    _segmentos_en_cache.clear()
@@ -0,0 +1,43 @@
+"""
+Roles del usuario guardados en la sesión.
+
+Al iniciar sesión los roles se cargan con una sola consulta y se guardan en la
+sesión junto con Usuario.version_roles. En cada petición RolSesionMiddleware
+los copia en request.user si la versión coincide (el usuario ya lo carga
+AuthenticationMiddleware), así que rol_principal, nombres_roles y los
+decoradores es_* no consultan la base de datos. Crear o eliminar un RolUsuario
+incrementa la versión y la siguiente petición vuelve a cargarlos.
+"""
+from django.db.models import F
+
+from app_usuarios.models import Usuario
+
+CLAVE_SESION = 'roles_usuario'
+
+
+def guardar_roles_en_sesion(request, usuario):
+    request.session[CLAVE_SESION] = {
+        'version': usuario.version_roles,
+        'roles': [list(rol) for rol in usuario.roles_cargados()],
+    }
+
+
+def roles_de_sesion(request):
+    """Deja en request.user los roles de la sesión, recargándolos si cambiaron"""
+    usuario = request.user
+    guardados = request.session.get(CLAVE_SESION)
+    if guardados and guardados.get('version') == usuario.version_roles:
+        usuario._roles_cargados = [tuple(rol) for rol in guardados['roles']]
+    else:
+        usuario._roles_cargados = None
+        guardar_roles_en_sesion(request, usuario)
+    return usuario.roles_cargados()
+
+
+def invalidar_roles(usuario_id, usuario=None):
+    """Obliga a recargar los roles del usuario en todas sus sesiones"""
+    Usuario.objects.filter(pk=usuario_id).update(version_roles=F('version_roles') + 1)
+    if usuario is not None:
+        # El objeto en memoria queda al día para no usar roles viejos en esta petición
+        usuario.version_roles += 1
+        usuario._roles_cargados = None
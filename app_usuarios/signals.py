@@ -0,0 +1,29 @@
+from django.contrib.auth.signals import user_logged_in
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .catalogo_roles import invalidar_catalogo
+from .models import Rol, RolUsuario
+from .roles import guardar_roles_en_sesion, invalidar_roles
+
+
+@receiver(user_logged_in)
+def cargar_roles_al_iniciar_sesion(sender, request, user, **kwargs):
+    if request is not None and hasattr(request, 'session'):
+        guardar_roles_en_sesion(request, user)
+
+
+@receiver(post_save, sender=RolUsuario)
+@receiver(post_delete, sender=RolUsuario)
+def roles_modificados(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    # Sin acceder a instance.usuario: en un borrado en cascada el usuario puede no existir ya
+    usuario = instance.usuario if RolUsuario.usuario.is_cached(instance) else None
+    invalidar_roles(instance.usuario_id, usuario)
+
+
+@receiver(post_save, sender=Rol)
+@receiver(post_delete, sender=Rol)
+def catalogo_modificado(sender, **kwargs):
+    invalidar_catalogo()
@@ -1,3 +1,435 @@
-from django.test import TestCase
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import patch
 
-# Create your tests here.
+from django.core import mail
+from django.core.mail import EmailMessage, EmailMultiAlternatives
+from django.core.mail.backends import locmem
+from django.core.management import call_command
+from django.template import engines
+from django.template.loader import render_to_string
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from app_usuarios.correos import (
+    encolar_correo, encolar_notificacion, procesar_bandeja, reintentar_correos, resumen_notificacion,
+    MAX_INTENTOS
+)
+from app_usuarios.limite_correos import reservar_envio, uso_del_dia
+from app_usuarios.metricas_correo import resumen_metricas, purgar_metricas
+from app_usuarios.models import CorreoSaliente, CuotaCorreo, MetricaCorreo, Usuario, Rol, RolUsuario
+from app_usuarios.roles import CLAVE_SESION
+from app_usuarios.catalogo_roles import id_rol, invalidar_catalogo
+from app_usuarios import plantillas_correo
+from app_usuarios.plantillas_correo import renderizar_correo, limpiar_cache
+
+
+class PruebasBandejaCorreos(TestCase):
+
+    def encolar(self, destinatario='ana@correo.com', **extra):
+        email = EmailMessage(subject='Asunto', body='<p>Hola</p>', to=[destinatario], **extra)
+        email.content_subtype = 'html'
+        return encolar_correo(email)
+
+    def test_encolar_no_envia_y_conserva_el_mensaje(self):
+        email = EmailMultiAlternatives(subject='Aviso', body='Texto', to=['ana@correo.com'], cc=['eva@correo.com'])
+        email.attach_alternative('<b>Texto</b>', 'text/html')
+        email.attach('qr.png', b'\x89PNG', 'image/png')
+
+        correo = encolar_correo(email)
+
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(correo.estado, 'pendiente')
+        self.assertEqual(correo.adjuntos.get().nombre, 'qr.png')
+
+        procesar_bandeja()
+
+        enviado = mail.outbox[0]
+        self.assertEqual((enviado.subject, enviado.body, enviado.to, enviado.cc),
+                         ('Aviso', 'Texto', ['ana@correo.com'], ['eva@correo.com']))
+        self.assertEqual(enviado.alternatives[0][1], 'text/html')
+        self.assertEqual(enviado.attachments[0][:2], ('qr.png', b'\x89PNG'))
+
+    def test_el_lote_usa_una_sola_conexion(self):
+        for i in range(3):
+            self.encolar(f'user{i}@correo.com')
+
+        with patch('app_usuarios.correos.get_connection', wraps=mail.get_connection) as conexion:
+            self.assertEqual(procesar_bandeja(), 3)
+
+        self.assertEqual(conexion.call_count, 1)
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertEqual(mail.outbox[0].content_subtype, 'html')
+        self.assertFalse(CorreoSaliente.objects.exclude(estado='enviado').exists())
+
+    def test_fallo_se_reintenta_con_espera_y_termina_en_error(self):
+        correo = self.encolar()
+
+        with patch('django.core.mail.backends.locmem.EmailBackend.send_messages', side_effect=OSError('SMTP caído')):
+            procesar_bandeja()
+            correo.refresh_from_db()
+            self.assertEqual((correo.estado, correo.intentos), ('pendiente', 1))
+            self.assertGreater(correo.proximo_intento, timezone.now())
+            # Hasta que venza la espera el correo no se vuelve a tomar
+            self.assertEqual(procesar_bandeja(), 0)
+
+            for _ in range(MAX_INTENTOS - 1):
+                CorreoSaliente.objects.update(proximo_intento=timezone.now() - timedelta(seconds=1))
+                procesar_bandeja()
+
+        correo.refresh_from_db()
+        self.assertEqual(correo.estado, 'error')
+        self.assertEqual(correo.error, 'SMTP caído')
+
+        self.assertEqual(reintentar_correos(), 1)
+        procesar_bandeja()
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_un_fallo_no_detiene_el_resto_del_lote(self):
+        self.encolar('malo@correo.com')
+        self.encolar('bueno@correo.com')
+        original = mail.backends.locmem.EmailBackend.send_messages
+
+        def enviar(backend, mensajes):
+            if mensajes[0].to == ['malo@correo.com']:
+                raise OSError('Destinatario rechazado')
+            return original(backend, mensajes)
+
+        with patch('django.core.mail.backends.locmem.EmailBackend.send_messages', enviar):
+            procesar_bandeja()
+
+        self.assertEqual([m.to for m in mail.outbox], [['bueno@correo.com']])
+        self.assertEqual(CorreoSaliente.objects.get(para=['malo@correo.com']).estado, 'pendiente')
+
+    def test_comando_procesar_correos(self):
+        self.encolar()
+        abandonado = self.encolar('otro@correo.com')
+        CorreoSaliente.objects.filter(pk=abandonado.pk).update(
+            estado='procesando', iniciado=timezone.now() - timedelta(hours=1)
+        )
+        viejo = self.encolar('viejo@correo.com')
+        CorreoSaliente.objects.filter(pk=viejo.pk).update(
+            estado='enviado', fecha_envio=timezone.now() - timedelta(days=60)
+        )
+
+        call_command('procesar_correos', '--una-vez', stdout=StringIO())
+
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertFalse(CorreoSaliente.objects.filter(pk=viejo.pk).exists())
+
+
+@override_settings(CORREOS_POR_MINUTO=0)
+class PruebasNotificacionesMasivas(TestCase):
+
+    def setUp(self):
+        self.datos = {
+            f'user{i:03d}@correo.com': {'NOMBRE': f'Usuario <{i}>', 'EVENTO': 'Feria'}
+            for i in range(120)
+        }
+
+    @override_settings(EMAIL_BACKEND='anymail.backends.test.EmailBackend', CORREOS_DESTINATARIOS_POR_LOTE=50)
+    def test_proveedor_con_lotes_envia_una_llamada_por_lote(self):
+        encolar_notificacion('Aviso de **EVENTO**', '<p>Hola **NOMBRE**, **OTRO**</p>', self.datos)
+
+        with patch.dict('app_usuarios.correos.SINTAXIS_ESP', {'Test': '{{{{ params.{} }}}}'}):
+            procesar_bandeja()
+
+        # 120 destinatarios en lotes de 50: tres llamadas a la API
+        self.assertEqual([len(m.to) for m in mail.outbox], [50, 50, 20])
+        parametros = mail.outbox[0].anymail_test_params
+        self.assertTrue(parametros['is_batch_send'])
+        self.assertEqual(parametros['subject'], 'Aviso de {{ params.EVENTO }}')
+        self.assertEqual(parametros['html_body'], '<p>Hola {{ params.NOMBRE }}, **OTRO**</p>')
+        self.assertEqual(parametros['merge_data']['user007@correo.com']['NOMBRE'], 'Usuario <7>')
+        self.assertEqual(CorreoSaliente.objects.filter(estado='enviado').count(), 3)
+
+    @override_settings(CORREOS_DESTINATARIOS_POR_LOTE=50)
+    def test_otro_backend_recibe_un_mensaje_personalizado_por_destinatario(self):
+        encolar_notificacion('Aviso de **EVENTO**', '<p>Hola **NOMBRE**</p>', self.datos)
+
+        procesar_bandeja()
+
+        self.assertEqual(len(mail.outbox), 120)
+        primero = mail.outbox[0]
+        self.assertEqual(primero.to, ['user000@correo.com'])
+        self.assertEqual(primero.subject, 'Aviso de Feria')
+        self.assertEqual(primero.body, '<p>Hola Usuario &lt;0&gt;</p>')
+
+    @override_settings(CORREOS_DESTINATARIOS_POR_LOTE=50)
+    def test_fallo_a_mitad_de_lote_no_repite_los_enviados(self):
+        encolar_notificacion('Aviso', 'Hola **NOMBRE**', dict(list(self.datos.items())[:3]), html=False)
+        original = mail.backends.locmem.EmailBackend.send_messages
+
+        def enviar(backend, mensajes):
+            if mensajes[0].to == ['user001@correo.com']:
+                raise OSError('Tiempo de espera agotado')
+            return original(backend, mensajes)
+
+        with patch('django.core.mail.backends.locmem.EmailBackend.send_messages', enviar):
+            procesar_bandeja()
+
+        correo = CorreoSaliente.objects.get()
+        self.assertEqual(correo.para, ['user001@correo.com', 'user002@correo.com'])
+        CorreoSaliente.objects.update(proximo_intento=timezone.now())
+        procesar_bandeja()
+        self.assertEqual(
+            [m.to[0] for m in mail.outbox],
+            ['user000@correo.com', 'user001@correo.com', 'user002@correo.com'],
+        )
+
+
+class PruebasLimiteCorreos(TestCase):
+
+    def notificar(self, cantidad):
+        datos = {f'user{i}@correo.com': {'NOMBRE': str(i)} for i in range(cantidad)}
+        with self.settings(CORREOS_DESTINATARIOS_POR_LOTE=1):
+            return encolar_notificacion('Aviso', 'Hola **NOMBRE**', datos)
+
+    @override_settings(CORREOS_POR_MINUTO=2, CORREOS_CUOTA_DIARIA=0)
+    def test_el_cubo_reparte_los_envios_en_el_tiempo(self):
+        grupo = self.notificar(3)
+
+        procesar_bandeja()
+
+        self.assertEqual(len(mail.outbox), 2)
+        resumen = resumen_notificacion(grupo)
+        self.assertEqual((resumen['enviados'], resumen['aplazados'], resumen['fallidos']), (2, 1, 0))
+        self.assertFalse(resumen['terminado'])
+        aplazado = CorreoSaliente.objects.get(estado='pendiente')
+        self.assertEqual(aplazado.intentos, 0)
+        # Sin tokens nuevos el correo aplazado no se toma antes de tiempo
+        self.assertEqual(procesar_bandeja(), 0)
+
+        # Pasado un minuto el cubo se rellena
+        hace_un_minuto = timezone.now() - timedelta(minutes=1)
+        CuotaCorreo.objects.update(actualizado=hace_un_minuto)
+        CorreoSaliente.objects.filter(pk=aplazado.pk).update(proximo_intento=hace_un_minuto)
+        procesar_bandeja()
+
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertTrue(resumen_notificacion(grupo)['terminado'])
+
+    @override_settings(CORREOS_POR_MINUTO=0, CORREOS_CUOTA_DIARIA=2)
+    def test_cuota_diaria_agotada_aplaza_hasta_manana(self):
+        self.notificar(3)
+
+        procesar_bandeja()
+
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertEqual(uso_del_dia(), {'enviados': 2, 'cuota': 2})
+        aplazado = CorreoSaliente.objects.get(estado='pendiente')
+        self.assertGreater(timezone.localdate(aplazado.proximo_intento), timezone.localdate())
+
+    @override_settings(CORREOS_POR_MINUTO=10, CORREOS_CUOTA_DIARIA=0)
+    def test_lote_mayor_que_la_rafaga_sale_con_el_cubo_lleno(self):
+        self.assertEqual(reservar_envio(25), (25, 0))
+        concedidos, espera = reservar_envio(1)
+        # Quedan 15 tokens de deuda: hay que esperar a recuperar uno
+        self.assertEqual(concedidos, 0)
+        self.assertGreaterEqual(espera, 90)
+
+    @override_settings(CORREOS_POR_MINUTO=0, CORREOS_CUOTA_DIARIA=0)
+    def test_sin_limites_no_se_registra_nada(self):
+        self.assertEqual(reservar_envio(1000), (1000, 0))
+        self.assertFalse(CuotaCorreo.objects.exists())
+
+
+class PruebasPlantillasCorreo(TestCase):
+
+    def setUp(self):
+        limpiar_cache()
+        self.addCleanup(limpiar_cache)
+        self.evento = {'eve_nombre': 'Congreso & Feria', 'eve_ciudad': 'Manizales'}
+
+    def test_la_parte_fija_se_renderiza_una_vez(self):
+        with patch.object(
+            plantillas_correo, 'renderizar_en_segmentos', wraps=plantillas_correo.renderizar_en_segmentos
+        ) as renderizar:
+            cuerpos = [
+                renderizar_correo(
+                    'correo_estado_asistente.html',
+                    {'evento': self.evento, 'nuevo_estado': 'Aprobado'},
+                    nombre=f'Usuario {i}',
+                )
+                for i in range(20)
+            ]
+
+        self.assertEqual(renderizar.call_count, 1)
+        self.assertEqual(len(plantillas_correo._segmentos_en_cache), 1)
+        self.assertIn('Hola Usuario 7,', cuerpos[7])
+
+    def test_plantilla_recargada_regenera_los_segmentos(self):
+        contexto = {'evento': self.evento, 'nuevo_estado': 'Aprobado'}
+        renderizar_correo('correo_estado_asistente.html', contexto, nombre='Ana')
+
+        # Lo que hace el autoreload al editar una plantilla
+        for cargador in engines['django'].engine.template_loaders:
+            cargador.reset()
+        with patch.object(
+            plantillas_correo, 'renderizar_en_segmentos', wraps=plantillas_correo.renderizar_en_segmentos
+        ) as renderizar:
+            renderizar_correo('correo_estado_asistente.html', contexto, nombre='Ana')
+
+        self.assertEqual(renderizar.call_count, 1)
+
+    def test_coincide_con_el_render_completo_y_escapa_los_valores(self):
+        contexto = {'evento': self.evento, 'nuevo_estado': 'Rechazado'}
+
+        cuerpo = renderizar_correo('correo_estado_asistente.html', contexto, nombre='Ana <b>&</b>')
+
+        self.assertEqual(cuerpo, render_to_string('correo_estado_asistente.html', {**contexto, 'nombre': 'Ana <b>&</b>'}))
+        self.assertIn('Ana &lt;b&gt;&amp;&lt;/b&gt;', cuerpo)
+
+    def test_valor_vacio_toma_la_rama_falsa_de_la_plantilla(self):
+        con_clave = renderizar_correo('correo_clave.html', {'evento': 'Feria'}, nombre='Ana', clave='x1y2', qr_url=None)
+        sin_clave = renderizar_correo('correo_clave.html', {'evento': 'Feria'}, nombre='Ana', clave=None, qr_url=None)
+
+        self.assertEqual(
+            sin_clave,
+            render_to_string('correo_clave.html', {'evento': 'Feria', 'nombre': 'Ana', 'clave': None, 'qr_url': None}),
+        )
+        self.assertIn('x1y2', con_clave)
+        self.assertNotEqual(con_clave, sin_clave)
+
+
+@override_settings(CORREOS_POR_MINUTO=0, CORREOS_CUOTA_DIARIA=0)
+class PruebasMetricasCorreo(TestCase):
+
+    def encolar(self, destinatario):
+        return encolar_correo(EmailMessage(subject='Asunto', body='Hola', to=[destinatario]))
+
+    def test_cada_envio_registra_tiempos_y_resultado(self):
+        self.encolar('malo@correo.com')
+        self.encolar('bueno@correo.com')
+        encolar_notificacion('Aviso', 'Hola **NOMBRE**', {'ana@correo.com': {'NOMBRE': 'Ana'}})
+        original = locmem.EmailBackend.send_messages
+
+        def enviar(backend, mensajes):
+            if mensajes[0].to == ['malo@correo.com']:
+                raise ConnectionResetError('Conexión cerrada por el servidor')
+            return original(backend, mensajes)
+
+        with patch('django.core.mail.backends.locmem.EmailBackend.send_messages', enviar):
+            procesar_bandeja()
+
+        error = MetricaCorreo.objects.get(resultado='error')
+        self.assertEqual((error.origen, error.clase_error), ('transaccional', 'ConnectionResetError'))
+        enviados = MetricaCorreo.objects.filter(resultado='enviado')
+        self.assertEqual(sorted(enviados.values_list('origen', flat=True)), ['notificacion', 'transaccional'])
+        self.assertTrue(all(m.ms_envio > 0 and m.destinatarios == 1 for m in enviados))
+
+        resumen = resumen_metricas(dias=1)
+        transaccional = next(f for f in resumen['por_origen'] if f['origen'] == 'transaccional')
+        self.assertEqual((transaccional['intentos'], transaccional['errores']), (2, 1))
+        self.assertEqual(transaccional['tasa_error'], 50)
+        self.assertEqual(resumen['errores'][0]['ejemplo'], 'Conexión cerrada por el servidor')
+        # El correo fallido vuelve a la cola con espera
+        self.assertEqual(resumen['colas']['aplazados'], 1)
+
+    @override_settings(CORREOS_POR_MINUTO=1)
+    def test_correos_aplazados_por_el_limite_se_registran(self):
+        self.encolar('uno@correo.com')
+        self.encolar('dos@correo.com')
+
+        procesar_bandeja()
+
+        self.assertEqual(
+            list(MetricaCorreo.objects.order_by('id').values_list('resultado', flat=True)),
+            ['enviado', 'aplazado'],
+        )
+        self.assertEqual(resumen_metricas()['por_origen'][0]['aplazados'], 1)
+
+    def test_purgar_metricas_antiguas(self):
+        self.encolar('ana@correo.com')
+        procesar_bandeja()
+        MetricaCorreo.objects.update(fecha=timezone.now() - timedelta(days=100))
+        self.encolar('eva@correo.com')
+        procesar_bandeja()
+
+        self.assertEqual(purgar_metricas(90), 1)
+        self.assertEqual(MetricaCorreo.objects.count(), 1)
+
+
+class PruebasRolesEnSesion(TestCase):
+
+    def setUp(self):
+        self.usuario = Usuario.objects.create_user(
+            username='roles', email='roles@correo.com', password='clave123', documento='55'
+        )
+        self.superadmin = Rol.objects.create(nombre='superadmin', descripcion='Super administrador')
+        RolUsuario.objects.create(usuario=self.usuario, rol=self.superadmin)
+        self.client.login(email='roles@correo.com', password='clave123')
+
+    def consultas_roles(self, url):
+        with CaptureQueriesContext(connection) as contexto:
+            response = self.client.get(url)
+        return response, [q['sql'] for q in contexto.captured_queries if 'app_usuarios_rolusuario' in q['sql']]
+
+    def test_los_roles_se_guardan_al_iniciar_sesion_y_no_se_consultan_por_peticion(self):
+        self.assertEqual(self.client.session[CLAVE_SESION]['roles'], [['superadmin', 'Super administrador']])
+
+        response, consultas = self.consultas_roles(reverse('metricas_correo'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(consultas, [])
+        self.assertEqual(response.wsgi_request.user.nombres_roles, {'superadmin'})
+
+    def test_cambiar_los_roles_invalida_la_sesion(self):
+        RolUsuario.objects.filter(usuario=self.usuario).delete()
+        RolUsuario.objects.create(
+            usuario=self.usuario, rol=Rol.objects.create(nombre='asistente', descripcion='Asistente')
+        )
+
+        response, consultas = self.consultas_roles(reverse('metricas_correo'))
+
+        # Se recargan una vez y el usuario ya no pasa es_superadmin
+        self.assertEqual(len(consultas), 1)
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(self.client.session[CLAVE_SESION]['roles'], [['asistente', 'Asistente']])
+        self.assertEqual(self.consultas_roles(reverse('metricas_correo'))[1], [])
+
+    def test_guardar_un_usuario_desactualizado_no_revierte_la_version(self):
+        desactualizado = Usuario.objects.get(pk=self.usuario.pk)
+        RolUsuario.objects.filter(usuario=self.usuario).delete()
+
+        desactualizado.first_name = 'Ana'
+        desactualizado.save()
+
+        self.usuario.refresh_from_db()
+        self.assertEqual(self.usuario.first_name, 'Ana')
+        self.assertEqual(self.usuario.version_roles, desactualizado.version_roles + 1)
+        self.assertEqual(self.usuario.rol_principal, 'Sin rol')
+
+
+class PruebasCatalogoRoles(TestCase):
+
+    def setUp(self):
+        invalidar_catalogo()
+        self.addCleanup(invalidar_catalogo)
+        self.asistente = Rol.objects.create(nombre='asistente')
+
+    def test_resuelve_nombres_sin_consultar_de_nuevo(self):
+        self.assertEqual(id_rol('Asistente'), self.asistente.pk)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(id_rol('asistente'), self.asistente.pk)
+
+    def test_cambios_en_rol_refrescan_el_catalogo(self):
+        id_rol('asistente')
+        evaluador = Rol.objects.create(nombre='evaluador')
+        self.assertEqual(id_rol('evaluador'), evaluador.pk)
+
+        self.asistente.delete()
+        self.assertIsNone(id_rol('asistente'))
+
+    def test_rol_creado_por_otro_proceso_se_encuentra_con_una_recarga(self):
+        id_rol('asistente')
+        # bulk_create no envía señales, como un alta hecha desde otro proceso
+        Rol.objects.bulk_create([Rol(nombre='participante')])
+        participante = Rol.objects.get(nombre='participante')
+
+        with self.assertNumQueries(1):
+            self.assertEqual(id_rol('participante'), participante.pk)
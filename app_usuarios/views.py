@@ -16,7 +16,7 @@ def login_view(request):
         user = authenticate(request, email=email, password=password)
         if user is not None:
             # Verificar si el usuario tiene el rol seleccionado
-            if not user.roles.filter(rol__nombre=rol).exists():
+            if not user.tiene_rol(rol):
                 messages.error(request, f"No tienes asignado el rol seleccionado.")
                 return redirect('login')
             # Validar confirmación según el rol
@@ -71,8 +71,8 @@ def cambiar_contrasena(request):
         nueva = request.POST.get('nueva')
         confirmar = request.POST.get('confirmar')
         user = request.user
-        rol_usuario = user.roles.first()
-        rol = rol_usuario.rol.nombre if rol_usuario else None
+        roles = user.roles_cargados()
+        rol = roles[0][0] if roles else None
         if not check_password(actual, user.password):
             messages.error(request, 'La contraseña actual no es correcta.')
         elif nueva != confirmar:
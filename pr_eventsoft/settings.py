@@ -166,6 +166,14 @@ STATIC_ROOT = BASE_DIR / "staticfiles"
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Procesos con los que el comando procesar_certificados genera en paralelo los PDF
+# (1 = en el mismo proceso). Las vistas siempre renderizan en el proceso del servidor web
+CERTIFICADOS_PROCESOS_PDF = config("CERTIFICADOS_PROCESOS_PDF", default=1, cast=int)
+# Tamaño máximo de la caché de PDF de certificados en MEDIA_ROOT/certificados/cache
+CERTIFICADOS_CACHE_MAX_MB = config("CERTIFICADOS_CACHE_MAX_MB", default=500, cast=int)
+# Destinatarios por mensaje en las notificaciones masivas (una llamada a la API con Brevo)
+CORREOS_DESTINATARIOS_POR_LOTE = config("CORREOS_DESTINATARIOS_POR_LOTE", default=100, cast=int)
+
 
 if USE_BREVO:
     # Producción: Brevo por API HTTP (Anymail)
@@ -175,6 +183,8 @@ if USE_BREVO:
     ANYMAIL = {
         "BREVO_API_KEY": config("BREVO_API_KEY"),
     }
+    # Plan gratuito de Brevo: 300 correos diarios
+    CORREOS_CUOTA_DIARIA = config("CORREOS_CUOTA_DIARIA", default=300, cast=int)
 else:
     # Desarrollo local: Gmail SMTP
     EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
@@ -183,4 +193,9 @@ else:
     EMAIL_USE_TLS = True
     EMAIL_HOST_USER = 'correosdjango073@gmail.com'
     EMAIL_HOST_PASSWORD = 'rxxdfsngxrbaqtmm'
-    DEFAULT_FROM_EMAIL = 'correosdjango073@gmail.com'
\ No newline at end of file
+    DEFAULT_FROM_EMAIL = 'correosdjango073@gmail.com'
+    # Gmail admite unos 500 destinatarios diarios por cuenta
+    CORREOS_CUOTA_DIARIA = config("CORREOS_CUOTA_DIARIA", default=500, cast=int)
+
+# Envíos por minuto que reparte el limitador de correo (0 desactiva el límite)
+CORREOS_POR_MINUTO = config("CORREOS_POR_MINUTO", default=20, cast=int)
\ No newline at end of file